@@ -0,0 +1,124 @@
+"""
+Authentification par jeton DRF, résolue depuis le cache.
+
+`TokenAuthentication` lit `Token` + `User` (une jointure) à chaque requête
+authentifiée, et presque toutes les vues lisent ensuite
+`request.user.profile` (une seconde requête) : les deux requêtes les plus
+exécutées de l'API. Ici :
+
+- `auth_jeton:<empreinte>` → `(user_id, créé_le)` : l'empreinte SHA-256
+  du jeton, jamais le jeton lui-même, sert de clé ;
+- `auth_utilisateur:<user_id>` → l'utilisateur, profil déjà attaché.
+
+Les deux entrées sont dans le cache `CACHE_PARTAGE` (Redis en production,
+partagé par tous les process), vivent `AUTH_TOKEN_CACHE_SECONDES` et sont
+supprimées explicitement (apps/accounts/signals.py) : suppression du jeton
+(`LogoutView`, `ChangePasswordView`, `ResetPasswordView`), écriture de
+l'utilisateur (mot de passe, `is_active`) ou du profil (désactivation,
+changement de rôle). La suppression vaut pour tous les process : un jeton
+révoqué est refusé dès la requête suivante, où qu'elle arrive.
+
+Expiration optionnelle : `AUTH_TOKEN_DUREE_VIE` (secondes, `None` =
+jamais). Un jeton expiré est refusé et supprimé ; `obtenir_jeton()` en
+émet un neuf à la connexion suivante.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+DUREE_CACHE_PAR_DEFAUT = 30
+
+
+def _cache():
+    return caches[settings.CACHE_PARTAGE]
+
+
+def _cle_jeton(cle) -> str:
+    return f"auth_jeton:{hashlib.sha256(cle.encode()).hexdigest()}"
+
+
+def _cle_utilisateur(user_id) -> str:
+    return f"auth_utilisateur:{user_id}"
+
+
+def _duree_cache() -> int:
+    return getattr(settings, "AUTH_TOKEN_CACHE_SECONDES", DUREE_CACHE_PAR_DEFAUT)
+
+
+def jeton_expire(cree_le) -> bool:
+    duree_vie = getattr(settings, "AUTH_TOKEN_DUREE_VIE", None)
+    return bool(duree_vie) and (timezone.now() - cree_le).total_seconds() > duree_vie
+
+
+def obtenir_jeton(user) -> Token:
+    """Jeton de `user`, remplacé s'il a expiré (connexion, inscription)."""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and jeton_expire(token.created):
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+def _oublier(cle_cache):
+    # Maintenant, et au commit : une requête concurrente qui aurait relu
+    # l'ancienne ligne avant le commit ne la laisse pas en cache.
+    _cache().delete(cle_cache)
+    transaction.on_commit(lambda: _cache().delete(cle_cache))
+
+
+def oublier_jeton(cle):
+    _oublier(_cle_jeton(cle))
+
+
+def oublier_utilisateur(user_id):
+    _oublier(_cle_utilisateur(user_id))
+
+
+def _mettre_en_cache(key, user_id, cree_le, user):
+    _cache().set_many(
+        {_cle_jeton(key): (user_id, cree_le), _cle_utilisateur(user_id): user},
+        timeout=_duree_cache(),
+    )
+
+
+class YekiTokenAuthentication(TokenAuthentication):
+    """`TokenAuthentication` (même en-tête `Token <clé>`, mêmes erreurs),
+    sans requête SQL tant que le cache est chaud."""
+
+    def authenticate_credentials(self, key):
+        entree = _cache().get(_cle_jeton(key))
+        if entree is None:
+            # Cache froid : une seule requête, comme `TokenAuthentication`,
+            # profil compris (jointure inverse, `None` si absent).
+            token = Token.objects.select_related("user", "user__profile").filter(key=key).first()
+            if token is None:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            entree = (token.user_id, token.created)
+            _mettre_en_cache(key, token.user_id, token.created, token.user)
+        user_id, cree_le = entree
+
+        if jeton_expire(cree_le):
+            Token.objects.filter(key=key).delete()
+            raise exceptions.AuthenticationFailed("Token expiré, reconnectez-vous.")
+
+        user = _cache().get(_cle_utilisateur(user_id))
+        if user is None:
+            user = User.objects.select_related("profile").filter(pk=user_id).first()
+            if user is None:
+                oublier_jeton(key)
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            _mettre_en_cache(key, user_id, cree_le, user)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return user, Token(key=key, user_id=user_id, created=cree_le)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_profile_date_naissance"),
+        ("formation", "0006_index_filtres_chauds"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["user_type", "cursus", "is_active"], name="yeki_profil_user_ty_0384b8_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_index_filtres_chauds"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="avatar_derivees",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Versions réduites (apps/core/images.py)",
+            ),
+        ),
+    ]
@@ -59,6 +59,12 @@ class Profile(models.Model):
         max_length=20, blank=True, help_text="Numéro WhatsApp pour les répétiteurs"
     )
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
+    avatar_derivees = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Versions réduites (apps/core/images.py)",
+    )
     bio = models.TextField(blank=True)
 
     # Validé par le Service Client (P2.1, CDC §7.1). Ne concerne que les
@@ -72,6 +78,9 @@ class Profile(models.Model):
 
     class Meta:
         db_table = "yeki_profile"
+        # Apprenants d'un cursus (notifications de devoir/olympiade,
+        # rappels) : `user_type="apprenant", cursus=…, is_active=True`.
+        indexes = [models.Index(fields=["user_type", "cursus", "is_active"])]
 
     def __str__(self):
         return f"{self.user.username} ({self.user_type})"
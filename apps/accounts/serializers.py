@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
 
 from apps.accounts.models import Profile
+from apps.core.serializers import ImagesDeriveesField
 from apps.formation.models import Departement, Parcours
 
 User = get_user_model()
@@ -211,10 +212,11 @@ class LoginSerializer(serializers.Serializer):
 class EnseignantSerializer(serializers.ModelSerializer):
     user = UserSerializer()
     avatar = serializers.SerializerMethodField()
+    avatar_derivees = ImagesDeriveesField("avatar")
 
     class Meta:
         model = Profile
-        fields = ["id", "user", "user_type", "avatar"]
+        fields = ["id", "user", "user_type", "avatar", "avatar_derivees"]
 
     def get_avatar(self, obj):
         # Même motif que `ProfilDetailSerializer.get_avatar` (règle 1) —
@@ -238,6 +240,7 @@ class EnseignantCadreLightSerializer(serializers.ModelSerializer):
 class ProfilDetailSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     avatar = serializers.SerializerMethodField()
+    avatar_derivees = ImagesDeriveesField("avatar")
 
     first_name = serializers.CharField(source="user.first_name", read_only=True)
     last_name = serializers.CharField(source="user.last_name", read_only=True)
@@ -265,6 +268,7 @@ class ProfilDetailSerializer(serializers.ModelSerializer):
             "licence",
             "is_active",
             "avatar",
+            "avatar_derivees",
         ]
 
     def get_avatar(self, obj):
@@ -2,6 +2,16 @@ from django.conf import settings
 from django.core.mail import send_mail
 
 from apps.accounts.models import Profile
+from apps.core.recherche import POIDS_SECONDAIRE, POIDS_TEXTE, POIDS_TITRE
+
+# Rôles listés par la recherche d'enseignants de l'admin général.
+TYPES_RECHERCHE_ENSEIGNANTS = [
+    "enseignant",
+    "enseignant_principal",
+    "enseignant_cadre",
+    "enseignant_admin",
+    "service_client",
+]
 
 
 def _get_profile(user):
@@ -460,3 +470,20 @@ def _envoyer_email_confirmation(user):
         recipient_list=[user.email],
         fail_silently=True,
     )
+
+
+def documents_recherche_enseignants(ids):
+    """Source de l'index de recherche `enseignant` (apps/core/recherche.py) :
+    nom, identifiant, email et bio des profils de `TYPES_RECHERCHE_ENSEIGNANTS`."""
+    documents = {}
+    for profile in Profile.objects.filter(
+        pk__in=ids, user_type__in=TYPES_RECHERCHE_ENSEIGNANTS
+    ).select_related("user"):
+        user = profile.user
+        documents[profile.pk] = [
+            (f"{user.first_name} {user.last_name}", POIDS_TITRE),
+            (user.username, POIDS_TITRE),
+            (user.email, POIDS_SECONDAIRE),
+            (profile.bio, POIDS_TEXTE),
+        ]
+    return documents
@@ -1,12 +1,21 @@
 """
-Signaux Profile (P2.1) + notifications (P10.3). Connectés depuis
-AccountsConfig.ready().
+Signaux Profile (P2.1) + notifications (P10.3) + index de recherche des
+enseignants (apps/core/recherche.py) + avatars réduits (apps/core/images.py)
++ cache d'authentification (apps/accounts/authentication.py). Connectés
+depuis AccountsConfig.ready().
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.authentication import oublier_jeton, oublier_utilisateur
 from apps.accounts.models import Profile
+from apps.accounts.services import TYPES_RECHERCHE_ENSEIGNANTS
+from apps.core.images import deriver_apres_commit
+from apps.core.recherche import TYPE_ENSEIGNANT, reindexer
 from apps.notifications.models import creer_notification
 
 
@@ -19,11 +28,7 @@ def _memoriser_ancien_is_repetiteur(sender, instance, **kwargs):
     valeur dans post_save).
     """
     if instance.pk:
-        ancien = (
-            Profile.objects.filter(pk=instance.pk)
-            .values("is_repetiteur", "user_type")
-            .first()
-        )
+        ancien = Profile.objects.filter(pk=instance.pk).values("is_repetiteur", "user_type").first()
         instance._ancien_is_repetiteur = ancien["is_repetiteur"] if ancien else None
         instance._ancien_user_type = ancien["user_type"] if ancien else None
     else:
@@ -86,3 +91,74 @@ def _notifier_changement_de_grade(sender, instance, created, **kwargs):
             objet_type="Profile",
             action_route="/profile",
         )
+
+
+# ── Index de recherche des enseignants ──────────────────────────────────────
+# Champs lus par `documents_recherche_enseignants` (apps/accounts/services.py).
+CHAMPS_USER_INDEXES = {"first_name", "last_name", "username", "email"}
+CHAMPS_PROFIL_INDEXES = {"user_type", "bio"}
+
+
+@receiver(post_save, sender=Profile)
+def _indexer_profil(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and not CHAMPS_PROFIL_INDEXES & set(update_fields):
+        return
+    # Un profil apprenant qui ne l'a jamais quitté n'a rien dans l'index.
+    if (
+        instance.user_type not in TYPES_RECHERCHE_ENSEIGNANTS
+        and getattr(instance, "_ancien_user_type", None) not in TYPES_RECHERCHE_ENSEIGNANTS
+    ):
+        return
+    reindexer(TYPE_ENSEIGNANT, [instance.pk])
+
+
+@receiver(post_delete, sender=Profile)
+def _desindexer_profil(sender, instance, **kwargs):
+    if instance.user_type in TYPES_RECHERCHE_ENSEIGNANTS:
+        reindexer(TYPE_ENSEIGNANT, [instance.pk])
+
+
+@receiver(post_save, sender=User)
+def _indexer_user(sender, instance, created, update_fields, **kwargs):
+    # Le profil est créé après l'utilisateur : son propre signal l'indexe.
+    if created or (update_fields is not None and not CHAMPS_USER_INDEXES & set(update_fields)):
+        return
+    reindexer(
+        TYPE_ENSEIGNANT,
+        Profile.objects.filter(
+            user=instance, user_type__in=TYPES_RECHERCHE_ENSEIGNANTS
+        ).values_list("pk", flat=True),
+    )
+
+
+# ── Images dérivées ─────────────────────────────────────────────────────────
+# Avant le cache d'authentification : le profil en cache est relu après
+# l'écriture de `avatar_derivees`.
+
+
+@receiver(post_save, sender=Profile)
+def _deriver_avatar(sender, instance, update_fields, **kwargs):
+    deriver_apres_commit(instance, "avatar", update_fields=update_fields)
+
+
+# ── Cache d'authentification ────────────────────────────────────────────────
+# Déconnexion, changement ou réinitialisation du mot de passe suppriment le
+# jeton ; désactivation et changement de rôle écrivent l'utilisateur ou le
+# profil. Dans tous les cas, l'entrée en cache disparaît.
+
+
+@receiver(post_delete, sender=Token)
+def _oublier_jeton_supprime(sender, instance, **kwargs):
+    oublier_jeton(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _oublier_user(sender, instance, **kwargs):
+    oublier_utilisateur(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def _oublier_user_du_profil(sender, instance, **kwargs):
+    oublier_utilisateur(instance.user_id)
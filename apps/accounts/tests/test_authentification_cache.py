@@ -0,0 +1,125 @@
+"""
+Authentification par jeton depuis le cache (apps/accounts/authentication.py) :
+aucune requête une fois le cache chaud, invalidation à la déconnexion, au
+changement de mot de passe et à la désactivation, expiration optionnelle.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from apps.accounts.authentication import YekiTokenAuthentication
+
+
+def _client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.mark.django_db
+def test_cache_chaud_sans_requete(user_apprenant):
+    token = Token.objects.create(user=user_apprenant)
+    auth = YekiTokenAuthentication()
+    auth.authenticate_credentials(token.key)
+
+    with CaptureQueriesContext(connection) as requetes:
+        user, _token = auth.authenticate_credentials(token.key)
+        user_type = user.profile.user_type
+
+    assert len(requetes) == 0
+    assert (user.pk, user_type) == (user_apprenant.pk, "apprenant")
+
+
+@pytest.mark.django_db
+def test_deconnexion_invalide_le_jeton(user_apprenant):
+    client = _client(Token.objects.create(user=user_apprenant))
+    assert client.get(reverse("profil-me")).status_code == 200
+
+    assert client.post(reverse("logout")).status_code == 200
+
+    assert client.get(reverse("profil-me")).status_code == 401
+
+
+@pytest.mark.django_db
+def test_changement_mot_de_passe_remplace_le_jeton(user_apprenant):
+    client = _client(Token.objects.create(user=user_apprenant))
+    client.get(reverse("profil-me"))
+
+    response = client.post(
+        reverse("change-password"),
+        {"old_password": "Test1234!", "new_password": "Nouveau123"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert client.get(reverse("profil-me")).status_code == 401
+    nouveau = APIClient()
+    nouveau.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+    assert nouveau.get(reverse("profil-me")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_desactivation_et_profil_rafraichis(user_apprenant):
+    client = _client(Token.objects.create(user=user_apprenant))
+    client.get(reverse("profil-me"))
+
+    profil = user_apprenant.profile
+    profil.bio = "Nouvelle bio"
+    profil.save()
+    assert client.get(reverse("profil-me")).data["bio"] == "Nouvelle bio"
+
+    user_apprenant.is_active = False
+    user_apprenant.save()
+    assert client.get(reverse("profil-me")).status_code == 401
+
+
+@pytest.mark.django_db
+def test_expiration_optionnelle(user_apprenant):
+    token = Token.objects.create(user=user_apprenant)
+    Token.objects.filter(pk=token.pk).update(created=timezone.now() - timedelta(days=2))
+    client = _client(token)
+
+    assert client.get(reverse("profil-me")).status_code == 200
+    with override_settings(AUTH_TOKEN_DUREE_VIE=24 * 3600):
+        assert client.get(reverse("profil-me")).status_code == 401
+        assert not Token.objects.filter(key=token.key).exists()
+
+        response = APIClient().post(
+            reverse("login"),
+            {"identifier": user_apprenant.username, "password": "Test1234!"},
+            format="json",
+        )
+        assert response.status_code == 200
+        assert response.data["token"] != token.key
+
+
+@pytest.mark.django_db
+def test_cache_partage_entre_process(user_apprenant):
+    with override_settings(
+        CACHE_PARTAGE="partage",
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "partage": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "auth-test",
+            },
+        },
+    ):
+        from django.core.cache import caches
+
+        token = Token.objects.create(user=user_apprenant)
+        client = _client(token)
+        assert client.get(reverse("profil-me")).status_code == 200
+        assert caches["default"].get(f"auth_utilisateur:{user_apprenant.pk}") is None
+        assert caches["partage"].get(f"auth_utilisateur:{user_apprenant.pk}") is not None
+
+        token.delete()
+        assert client.get(reverse("profil-me")).status_code == 401
+        caches["partage"].clear()
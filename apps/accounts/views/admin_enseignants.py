@@ -13,12 +13,14 @@ from rest_framework.permissions import IsAuthenticated
 from apps.accounts.models import Profile
 from apps.accounts.serializers import EnseignantSerializer, EnseignantCadreLightSerializer
 from apps.accounts.services import (
+    TYPES_RECHERCHE_ENSEIGNANTS,
     _nom_profil,
     _envoyer_email_desactivation_enseignant,
     _envoyer_email_activation_enseignant,
     _envoyer_email_changement_type,
 )
 from apps.core.models import enregistrer_activite
+from apps.core.recherche import TYPE_ENSEIGNANT, filtrer_par_pertinence
 from apps.core.pagination import PaginatedListMixin, YekiPageNumberPagination
 from apps.formation.models import Parcours, Departement, Cours
 
@@ -823,7 +825,9 @@ class AdminGeneralModifierEnseignantView(APIView):
         description=(
             "Recherche paginée des profils enseignants par texte libre, type, "
             "état d'activation, parcours, département, cours et plage de dates "
-            "de création. Réservé au profil `admin`. Chaque élément contient : "
+            "de création. Réservé au profil `admin`. Avec `q`, résultats triés "
+            "par pertinence et bornés à `RECHERCHE_LIMITE_RESULTATS` ; sinon, du "
+            "plus récent au plus ancien. Chaque élément contient : "
             "id, username, email, nom, user_type, is_active, date_joined, bio, "
             "phone, avatar."
         ),
@@ -835,7 +839,10 @@ class AdminGeneralModifierEnseignantView(APIView):
                 OpenApiTypes.STR,
                 OpenApiParameter.QUERY,
                 required=False,
-                description="Texte de recherche (nom, email, username, bio).",
+                description=(
+                    "Texte de recherche (nom, email, username, bio) : chaque mot "
+                    "est un préfixe, sans casse ni accents."
+                ),
             ),
             OpenApiParameter(
                 "user_type",
@@ -922,38 +929,20 @@ class AdminGeneralSearchEnseignantsView(PaginatedListMixin, APIView):
 
         # Base queryset
         qs = (
-            Profile.objects.filter(
-                user_type__in=[
-                    "enseignant",
-                    "enseignant_principal",
-                    "enseignant_cadre",
-                    "enseignant_admin",
-                    "service_client",
-                ]
-            )
+            Profile.objects.filter(user_type__in=TYPES_RECHERCHE_ENSEIGNANTS)
             .select_related("user")
             .order_by("-user__date_joined")
         )
 
         # ── Filtres ──────────────────────────────────────────────
+        # Texte libre : index de recherche (apps/core/recherche.py) plutôt que
+        # cinq `icontains` en OU, parcours complet de la table à chaque appel.
         q = request.query_params.get("q", "").strip()
         if q:
-            qs = qs.filter(
-                Q(user__username__icontains=q)
-                | Q(user__email__icontains=q)
-                | Q(user__first_name__icontains=q)
-                | Q(user__last_name__icontains=q)
-                | Q(bio__icontains=q)
-            )
+            qs = filtrer_par_pertinence(qs, TYPE_ENSEIGNANT, q)
 
         user_type = request.query_params.get("user_type", "").strip()
-        if user_type and user_type in [
-            "enseignant",
-            "enseignant_principal",
-            "enseignant_cadre",
-            "enseignant_admin",
-            "service_client",
-        ]:
+        if user_type and user_type in TYPES_RECHERCHE_ENSEIGNANTS:
             qs = qs.filter(user_type=user_type)
 
         is_active = request.query_params.get("is_active")
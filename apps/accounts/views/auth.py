@@ -10,6 +10,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token
 
+from apps.accounts.authentication import obtenir_jeton
 from apps.accounts.models import Profile, PasswordResetOTP
 from apps.accounts.serializers import RegisterSerializer, LoginSerializer
 from apps.accounts.services import (
@@ -52,7 +53,7 @@ class RegisterView(APIView):
         serializer.is_valid(raise_exception=True)
         profile = serializer.save()
 
-        token, _ = Token.objects.get_or_create(user=profile.user)
+        token = obtenir_jeton(profile.user)
 
         return Response(
             {
@@ -105,7 +106,7 @@ class LoginView(APIView):
                 status=403,
             )
 
-        token, _ = Token.objects.get_or_create(user=user)
+        token = obtenir_jeton(user)
 
         return Response(
             {
@@ -441,7 +442,7 @@ class ChangePasswordView(APIView):
             user.auth_token.delete()
         except Token.DoesNotExist:
             pass
-        token, _ = Token.objects.get_or_create(user=user)
+        token = obtenir_jeton(user)
 
         return Response(
             {"detail": "Mot de passe modifié avec succès.", "token": token.key}, status=200
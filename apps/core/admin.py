@@ -1,6 +1,11 @@
 from django.contrib import admin
 
-from apps.core.models import ParametreSysteme
+from apps.core.models import (
+    HistoriqueActiviteArchive,
+    ParametreSysteme,
+    SessionTeleversement,
+    TransfertMedia,
+)
 
 # `AppVersion` a déjà son admin — `yeki/admin.py:30-44` (`AppVersionAdmin`,
 # legacy mais actif et fonctionnel, confirmé en essayant d'en enregistrer
@@ -15,3 +20,40 @@ class ParametreSystemeAdmin(admin.ModelAdmin):
     list_filter = ["type", "modifiable_par"]
     search_fields = ["cle", "description"]
     ordering = ["cle"]
+
+
+@admin.register(HistoriqueActiviteArchive)
+class HistoriqueActiviteArchiveAdmin(admin.ModelAdmin):
+    """Lecture seule : alimentée uniquement par `archiver_historique_activite`."""
+
+    list_display = ["timestamp", "user", "action", "description"]
+    list_filter = ["action"]
+    search_fields = ["user__username", "description"]
+    raw_id_fields = ["user"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TransfertMedia)
+class TransfertMediaAdmin(admin.ModelAdmin):
+    """File des uploads en transfert vers le stockage (apps/core/transferts.py)."""
+
+    list_display = ["id", "modele", "objet_id", "champ", "statut", "tentatives", "hote", "cree_le"]
+    list_filter = ["statut", "modele", "hote"]
+    ordering = ["-cree_le"]
+    readonly_fields = ["cree_le", "pris_le", "transfere_le", "erreur"]
+
+
+@admin.register(SessionTeleversement)
+class SessionTeleversementAdmin(admin.ModelAdmin):
+    """Téléversements directs vers le stockage (apps/core/televersement_direct.py)."""
+
+    list_display = ["id", "modele", "objet_id", "champ", "taille", "statut", "cree_par", "cree_le"]
+    list_filter = ["statut", "modele", "champ"]
+    ordering = ["-cree_le"]
+    raw_id_fields = ["cree_par"]
+    readonly_fields = ["cree_le", "finalise_le", "erreur"]
@@ -0,0 +1,232 @@
+"""
+Cache de réponses rendues, déclaré par endpoint.
+
+Quelques GET publics ou quasi publics (page d'accueil, niveaux, palette,
+départements d'un parcours, paramètres publics) renvoient des données qui
+changent rarement, mais chaque appel refaisait requêtes SQL,
+sérialisation et rendu. `@reponse_en_cache(nom)` posé sur la méthode
+`get` d'une `APIView` (ou sur la fonction d'une vue `@api_view` ou
+Django) garde le corps rendu dans le cache `CACHE_PARTAGE` :
+
+- la vue tourne après authentification, permissions et négociation de
+  contenu : le cache ne court-circuite que le calcul de la réponse ;
+- clé : endpoint, chemin, paramètres de requête, format négocié et
+  en-têtes `vary` de l'endpoint ;
+- seules les réponses 200 sont gardées, avec leurs en-têtes de contenu
+  (`ENTETES_CONSERVES`) ; un ETag gardé est revalidé (304) au service ;
+- invalidation : `POINTS` déclare les modèles dont dépend chaque endpoint.
+  Une écriture sur l'un d'eux (signaux post_save/post_delete/m2m_changed,
+  apps/core/signals.py) change la génération de l'endpoint, tout de suite
+  puis au commit. Une entrée d'une autre génération est ignorée. Les
+  écritures sans signal (`QuerySet.update()`, compteurs en `F()`) ne sont
+  vues qu'à l'expiration (`duree`) ;
+- compteurs de succès/échecs par endpoint : `statistiques()`, commande
+  `stats_cache_reponses`.
+
+La génération est un jeton aléatoire, pas un compteur : une clé de
+génération évincée du cache ne peut pas ressusciter d'anciennes entrées.
+"""
+
+import functools
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.views import View
+
+from apps.core import versions_contenu
+
+# Endpoint → modèles (labels `app.Modele`) dont une écriture l'invalide,
+# durée de vie (secondes, défaut CACHE_REPONSES_DUREE) et en-têtes de
+# requête qui font varier la réponse.
+POINTS = {
+    "landing": {"modeles": ()},
+    "palette_couleurs": {"modeles": ()},
+    "niveaux": {"modeles": ("formation.Cours",)},
+    "niveaux_formation": {"modeles": ("core.ParametreSysteme",)},
+    "departement_niveaux": {"modeles": ("formation.Cours", "formation.Departement")},
+    # Nombre d'apprenants et taux moyen viennent de compteurs mis à jour
+    # sans signal, et le nom des enseignants de `User` (réécrit à chaque
+    # connexion) : durée courte plutôt qu'invalidation.
+    "departements_parcours": {
+        "modeles": (
+            "formation.Parcours",
+            "formation.Departement",
+            "formation.HistoriquePrixDepartement",
+            "formation.Cours",
+            "formation.Lecon",
+            "accounts.Profile",
+        ),
+        "duree": 300,
+    },
+    "parametres_publics": {"modeles": ("core.ParametreSysteme",)},
+}
+
+VARY_PAR_DEFAUT = ("Accept", "Accept-Language")
+
+ENTETES_CONSERVES = ("Content-Type", "Content-Language", "ETag", "Last-Modified")
+
+# Label de modèle → endpoints à invalider.
+DEPENDANCES = {}
+for _nom, _point in POINTS.items():
+    for _label in _point["modeles"]:
+        DEPENDANCES.setdefault(_label, []).append(_nom)
+
+
+def _cache():
+    return caches[settings.CACHE_PARTAGE]
+
+
+def _cle_generation(nom) -> str:
+    return f"cache_reponses:{nom}:generation"
+
+
+def _cle_compteur(nom, resultat) -> str:
+    return f"cache_reponses:{nom}:{resultat}"
+
+
+def _cle(nom, request) -> str:
+    rendu = getattr(request, "accepted_renderer", None)
+    elements = [
+        request.path,
+        sorted(request.GET.lists()),
+        getattr(rendu, "format", ""),
+        getattr(request, "accepted_media_type", ""),
+        [request.headers.get(e, "") for e in POINTS[nom].get("vary", VARY_PAR_DEFAUT)],
+    ]
+    empreinte = hashlib.sha1(json.dumps(elements).encode()).hexdigest()
+    return f"cache_reponses:{nom}:{empreinte}"
+
+
+def _generation(store, nom, valeurs) -> str:
+    cle = _cle_generation(nom)
+    generation = valeurs.get(cle)
+    if generation is None:
+        nouvelle = uuid.uuid4().hex
+        store.add(cle, nouvelle, None)
+        generation = store.get(cle) or nouvelle
+    return generation
+
+
+def _compter(store, nom, resultat) -> None:
+    cle = _cle_compteur(nom, resultat)
+    try:
+        store.incr(cle)
+    except ValueError:
+        if not store.add(cle, 1, None):
+            store.incr(cle)
+
+
+def _memoriser(store, nom, cle, generation, response) -> None:
+    if response.status_code != 200 or response.streaming:
+        return
+
+    def stocker(rendue):
+        entree = {
+            "generation": generation,
+            "contenu": rendue.content,
+            "entetes": {e: rendue[e] for e in ENTETES_CONSERVES if e in rendue},
+        }
+        duree = POINTS[nom].get("duree", settings.CACHE_REPONSES_DUREE)
+        store.set(cle, entree, duree)
+
+    if getattr(response, "is_rendered", True):
+        stocker(response)
+    else:
+        # Réponse DRF : rendue après la vue, par le handler Django.
+        response.add_post_render_callback(stocker)
+
+
+def _servir_entree(request, entree):
+    etag = entree["entetes"].get("ETag")
+    if etag:
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
+    reponse = HttpResponse(entree["contenu"], headers=entree["entetes"])
+    if etag:
+        # `Cache-Control` dépend de l'appelant (authentifié ou non).
+        versions_contenu.avec_etag(reponse, request, etag)
+    return reponse
+
+
+def servir(nom, request, calculer):
+    """Réponse de l'endpoint `nom` depuis le cache, sinon `calculer()`
+    (gardée si 200)."""
+    if request.method not in ("GET", "HEAD"):
+        return calculer()
+    store = _cache()
+    cle = _cle(nom, request)
+    valeurs = store.get_many([_cle_generation(nom), cle])
+    generation = _generation(store, nom, valeurs)
+    entree = valeurs.get(cle)
+    if entree is not None and entree["generation"] == generation:
+        _compter(store, nom, "succes")
+        return _servir_entree(request, entree)
+    _compter(store, nom, "echecs")
+    response = calculer()
+    _memoriser(store, nom, cle, generation, response)
+    return response
+
+
+def reponse_en_cache(nom):
+    """Décorateur de la méthode `get` d'une `APIView`, ou d'une vue
+    fonction : réponses servies depuis le cache, endpoint déclaré dans
+    `POINTS`."""
+    if nom not in POINTS:
+        raise KeyError(f"Endpoint non déclaré dans cache_reponses.POINTS : {nom}")
+
+    def decorateur(vue):
+        @functools.wraps(vue)
+        def enveloppe(*args, **kwargs):
+            request = args[1] if isinstance(args[0], View) else args[0]
+            return servir(nom, request, lambda: vue(*args, **kwargs))
+
+        return enveloppe
+
+    return decorateur
+
+
+def invalider(*noms) -> None:
+    """Nouvelle génération pour les endpoints `noms`."""
+    _cache().set_many({_cle_generation(nom): uuid.uuid4().hex for nom in noms}, None)
+
+
+def modele_modifie(modele) -> None:
+    """Appelé par les signaux d'écriture : invalide les endpoints qui
+    dépendent de `modele`, tout de suite puis au commit (une requête
+    concurrente a pu garder l'état d'avant le commit)."""
+    noms = DEPENDANCES.get(modele._meta.label)
+    if not noms:
+        return
+    invalider(*noms)
+    transaction.on_commit(lambda: invalider(*noms))
+
+
+def statistiques() -> list:
+    """Succès/échecs cumulés et taux de succès, par endpoint."""
+    store = _cache()
+    cles = [_cle_compteur(nom, r) for nom in POINTS for r in ("succes", "echecs")]
+    valeurs = store.get_many(cles)
+    lignes = []
+    for nom in POINTS:
+        succes = valeurs.get(_cle_compteur(nom, "succes"), 0)
+        echecs = valeurs.get(_cle_compteur(nom, "echecs"), 0)
+        total = succes + echecs
+        lignes.append(
+            {
+                "endpoint": nom,
+                "succes": succes,
+                "echecs": echecs,
+                "taux_succes": round(succes / total, 4) if total else None,
+            }
+        )
+    return lignes
+
+
+def reinitialiser_statistiques() -> None:
+    _cache().delete_many([_cle_compteur(nom, r) for nom in POINTS for r in ("succes", "echecs")])
@@ -0,0 +1,234 @@
+"""
+Diffusion des médias par URL signée, avec requêtes partielles (`Range`).
+
+Servi par `/media/…` (`django.views.static.serve`), un fichier partait
+toujours en entier : déplacer la lecture d'une vidéo de leçon la
+retéléchargeait depuis le début. L'accès, lui, n'était vérifié qu'au
+moment de masquer l'URL dans la réponse de l'API.
+
+Ici, l'accès est vérifié UNE fois, par la vue qui émet l'URL (par exemple
+`AccesService.peut_voir_video_lecon` pour la vidéo d'une leçon). L'URL
+porte un jeton signé (`django.core.signing`), valable
+`MEDIAS_URL_DUREE_SECONDES`. Il désigne le stockage (modèle, champ) et le
+nom du fichier. Chaque requête du lecteur vérifie seulement la signature,
+sans requête SQL ni authentification, puis :
+
+- `FileSystemStorage` : réponse 206 sur la plage demandée (une seule plage
+  par requête ; plusieurs plages : fichier entier, ce que la RFC 9110
+  permet), 200 sinon. ETag fort (date de modification et taille), 304 sur
+  `If-None-Match`, `If-Range` respecté. Le contenu est lu en flux
+  (`FileResponse`). Avec `MEDIAS_SENDFILE`, le serveur frontal envoie
+  lui-même le fichier (`X-Accel-Redirect` pour nginx, `X-Sendfile`) et
+  gère les plages. Sous ASGI (Daphne), le corps est un itérateur
+  asynchrone lu par blocs de `TAILLE_BLOC` : Django lirait sinon un
+  itérateur synchrone en entier (`sync_to_async(list)`) avant d'envoyer
+  le premier octet, soit toute la vidéo en mémoire pour un `bytes=0-` ;
+- Google Cloud Storage : redirection vers une URL signée V4 du bucket, qui
+  gère `Range` et ETag nativement (les octets ne passent pas par Django).
+"""
+
+import mimetypes
+import os
+import re
+from datetime import timedelta
+from hashlib import sha1
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import FileSystemStorage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+SEL_JETON = "apps.core.diffusion_medias"
+TAILLE_BLOC = 64 * 1024
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class PlageInvalide(Exception):
+    """Plage `Range` hors du fichier (réponse 416)."""
+
+
+def duree() -> timedelta:
+    return timedelta(seconds=settings.MEDIAS_URL_DUREE_SECONDES)
+
+
+def url_signee(request, instance, champ):
+    """URL de diffusion du fichier `instance.champ`, à n'émettre qu'après
+    le contrôle d'accès. Retourne (url absolue, expiration)."""
+    fichier = getattr(instance, champ)
+    jeton = signing.dumps(
+        {"m": instance._meta.label, "c": champ, "n": fichier.name}, salt=SEL_JETON, compress=True
+    )
+    chemin = reverse("media-signe", args=[jeton, os.path.basename(fichier.name)])
+    return request.build_absolute_uri(chemin), timezone.now() + duree()
+
+
+def lire_jeton(jeton):
+    """(stockage, nom du fichier) désignés par `jeton`, ou None s'il est
+    invalide ou expiré."""
+    try:
+        contenu = signing.loads(jeton, salt=SEL_JETON, max_age=duree())
+    except signing.BadSignature:
+        return None
+    champ = apps.get_model(contenu["m"])._meta.get_field(contenu["c"])
+    return champ.storage, contenu["n"]
+
+
+def plage(entete, taille):
+    """(début, fin) inclusifs de l'en-tête `Range`, ou None pour le fichier
+    entier (absent, autre unité, plusieurs plages). Lève PlageInvalide si
+    la plage ne recoupe pas le fichier."""
+    correspondance = _RANGE.fullmatch((entete or "").strip())
+    if correspondance is None:
+        return None
+    premier, dernier = correspondance.groups()
+    if not premier and not dernier:
+        return None
+    if not premier:
+        # `bytes=-N` : les N derniers octets.
+        if int(dernier) == 0:
+            raise PlageInvalide
+        return max(0, taille - int(dernier)), taille - 1
+    debut = int(premier)
+    fin = min(int(dernier), taille - 1) if dernier else taille - 1
+    if debut >= taille or fin < debut:
+        raise PlageInvalide
+    return debut, fin
+
+
+def etag(nom, taille, modifie_le) -> str:
+    """ETag fort : change dès que le fichier est remplacé ou réécrit."""
+    empreinte = sha1(f"{nom}:{taille}:{modifie_le.timestamp()}".encode()).hexdigest()
+    return f'"{empreinte[:32]}"'
+
+
+class _Tranche:
+    """Lecture bornée à `longueur` octets de `fichier` (plage d'une 206)."""
+
+    def __init__(self, fichier, longueur):
+        self.fichier = fichier
+        self.reste = longueur
+
+    def read(self, taille=-1):
+        if self.reste <= 0:
+            return b""
+        taille = self.reste if taille is None or taille < 0 else min(taille, self.reste)
+        donnees = self.fichier.read(taille)
+        self.reste -= len(donnees)
+        return donnees
+
+    def close(self):
+        self.fichier.close()
+
+
+async def _blocs(fichier, longueur):
+    """Lecture asynchrone de `longueur` octets de `fichier`, bloc par bloc,
+    dans un thread (lecture disque bloquante)."""
+    lire = sync_to_async(fichier.read, thread_sensitive=False)
+    try:
+        while longueur > 0:
+            bloc = await lire(min(TAILLE_BLOC, longueur))
+            if not bloc:
+                break
+            longueur -= len(bloc)
+            yield bloc
+    finally:
+        await sync_to_async(fichier.close, thread_sensitive=False)()
+
+
+def _flux(request, fichier, longueur, status, type_contenu, nom):
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        envoi = StreamingHttpResponse(
+            _blocs(fichier, longueur), status=status, content_type=type_contenu
+        )
+        envoi["Content-Disposition"] = content_disposition_header(False, os.path.basename(nom))
+        return envoi
+    # WSGI : lecture synchrone en flux par FileResponse.
+    corps = fichier if status == 200 else _Tranche(fichier, longueur)
+    envoi = FileResponse(
+        corps, status=status, content_type=type_contenu, filename=os.path.basename(nom)
+    )
+    envoi.block_size = TAILLE_BLOC
+    return envoi
+
+
+def _redirection_gcs(storage, nom):
+    from storages.utils import clean_name
+
+    blob = storage.bucket.blob(storage._normalize_name(clean_name(nom)))
+    return HttpResponseRedirect(
+        blob.generate_signed_url(version="v4", expiration=duree(), method="GET")
+    )
+
+
+def _sendfile(storage, nom, type_contenu, entetes):
+    chemin = storage.path(nom)
+    envoi = HttpResponse(content_type=type_contenu)
+    if settings.MEDIAS_SENDFILE == "x-accel-redirect":
+        relatif = os.path.relpath(chemin, storage.location).replace(os.sep, "/")
+        envoi["X-Accel-Redirect"] = settings.MEDIAS_SENDFILE_PREFIXE.rstrip("/") + "/" + relatif
+    else:
+        envoi["X-Sendfile"] = chemin
+    for cle, valeur in entetes.items():
+        envoi[cle] = valeur
+    return envoi
+
+
+def reponse(request, storage, nom):
+    """Réponse HTTP du fichier `nom` de `storage` (voir en-tête du module)."""
+    if type(storage).__module__.startswith("storages.backends.gcloud"):
+        return _redirection_gcs(storage, nom)
+    if not storage.exists(nom):
+        return HttpResponse(status=404)
+
+    taille = storage.size(nom)
+    modifie_le = storage.get_modified_time(nom)
+    type_contenu = mimetypes.guess_type(nom)[0] or "application/octet-stream"
+    entetes = {
+        "ETag": etag(nom, taille, modifie_le),
+        "Last-Modified": http_date(modifie_le.timestamp()),
+        "Accept-Ranges": "bytes",
+        # Réservé à qui détient l'URL : jamais dans un cache partagé.
+        "Cache-Control": f"private, max-age={int(duree().total_seconds())}",
+    }
+
+    conditionnelle = get_conditional_response(
+        request, etag=entetes["ETag"], last_modified=modifie_le.timestamp()
+    )
+    if conditionnelle is not None:
+        for cle, valeur in entetes.items():
+            conditionnelle[cle] = valeur
+        return conditionnelle
+
+    if settings.MEDIAS_SENDFILE and isinstance(storage, FileSystemStorage):
+        return _sendfile(storage, nom, type_contenu, entetes)
+
+    if_range = request.headers.get("If-Range")
+    demande = request.headers.get("Range") if if_range in (None, entetes["ETag"]) else None
+    try:
+        morceau = plage(demande, taille)
+    except PlageInvalide:
+        refus = HttpResponse(status=416)
+        refus["Content-Range"] = f"bytes */{taille}"
+        return refus
+
+    fichier = storage.open(nom, "rb")
+    if morceau is None:
+        reponse_fichier = _flux(request, fichier, taille, 200, type_contenu, nom)
+        reponse_fichier["Content-Length"] = taille
+    else:
+        debut, fin = morceau
+        fichier.seek(debut)
+        reponse_fichier = _flux(request, fichier, fin - debut + 1, 206, type_contenu, nom)
+        reponse_fichier["Content-Length"] = fin - debut + 1
+        reponse_fichier["Content-Range"] = f"bytes {debut}-{fin}/{taille}"
+    for cle, valeur in entetes.items():
+        reponse_fichier[cle] = valeur
+    return reponse_fichier
@@ -0,0 +1,232 @@
+"""
+Images dérivées : versions réduites des images uploadées, pour que les
+clients mobiles ne téléchargent plus la photo d'origine (souvent plusieurs
+Mo) pour l'afficher en 48 px.
+
+Pour chaque champ image déclaré dans `IMAGES`, à chaque nouvelle image
+(signaux post_save des apps) ou par `manage.py generer_images_derivees`
+pour l'existant :
+
+- orientation EXIF appliquée aux pixels, puis métadonnées retirées
+  (EXIF, GPS, profils) : les dérivées n'en portent aucune ;
+- une version par largeur de `largeurs`, jamais agrandie (une image plus
+  étroite est réutilisée pour les largeurs supérieures), en WebP et en
+  JPEG (repli pour les clients sans WebP) ;
+- fichiers écrits à côté de l'original, sur le stockage du champ
+  (`STORAGES["default"]` : disque en développement, Firebase Storage en
+  production) : `avatars/photo.jpg` → `avatars/photo__w96.webp`, … ;
+- noms enregistrés dans le champ JSON `<champ>_derivees` du modèle :
+  `{"source": <nom de l'original>, "largeurs": {"96": {"webp": …,
+  "jpeg": …}, …}}`. Les serializers n'exposent donc que des fichiers qui
+  existent (`urls_derivees`).
+
+L'original n'est pas modifié. Un fichier illisible ou trop grand
+(`Image.MAX_IMAGE_PIXELS`) est journalisé et marqué sans dérivées, pour
+ne pas être retraité à chaque sauvegarde ; `--forcer` le retente.
+
+Forum et chat Yéki IA appellent `deriver()` directement : en production,
+leurs images sont attachées par les workers de transfert, déjà hors
+requête. Les autres signaux appellent `deriver_apres_commit()`. Avec
+`TRANSFERT_MEDIAS_DIFFERE` (production, Firebase Storage), le travail
+Pillow et les six écritures sur le bucket ne se font pas dans la requête :
+l'objet est mis en file au commit et un thread démon par processus (même
+modèle que apps/core/transferts.py) calcule ses dérivées. Une file perdue
+au redémarrage est rattrapée par `generer_images_derivees`. Sans transfert
+différé (développement, tests), les dérivées sont calculées tout de suite.
+"""
+
+import io
+import logging
+import os
+import queue
+import threading
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from apps.core import transferts
+
+logger = logging.getLogger(__name__)
+
+LARGEURS_AVATAR = (48, 96, 192)
+LARGEURS_CONTENU = (320, 640, 1280)
+
+# (modèle, champ) → largeurs produites.
+IMAGES = {
+    ("accounts.Profile", "avatar"): LARGEURS_AVATAR,
+    ("evaluation.Exercice", "enonce_image"): LARGEURS_CONTENU,
+    ("formation.Departement", "image"): LARGEURS_CONTENU,
+    ("forum.QuestionForum", "image"): LARGEURS_CONTENU,
+    ("forum.ReponseImage", "image"): LARGEURS_CONTENU,
+    ("ia.YekiIAChatHistorique", "image"): LARGEURS_CONTENU,
+}
+
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def nom_derivee(nom, largeur, extension) -> str:
+    racine, _ = os.path.splitext(nom)
+    return f"{racine}__w{largeur}.{extension}"
+
+
+def _preparer(image, extension):
+    """Mode compatible avec le format ; transparence sur fond blanc en JPEG."""
+    alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if alpha and extension == "webp":
+        return image.convert("RGBA")
+    if alpha:
+        fond = Image.new("RGB", image.size, (255, 255, 255))
+        fond.paste(image.convert("RGBA"), mask=image.convert("RGBA").getchannel("A"))
+        return fond
+    return image.convert("RGB")
+
+
+def generer(fichier, largeurs) -> dict:
+    """Écrit les dérivées de `fichier` (FieldFile) ; `{largeur: {format: nom}}`."""
+    with fichier.open("rb") as source:
+        image = Image.open(source)
+        # JPEG : décodage directement à l'échelle 1/2, 1/4 ou 1/8 la plus
+        # petite qui couvre encore la plus grande largeur (carré : l'image
+        # peut être tournée par l'EXIF). Sans effet sur les autres formats.
+        image.draft(image.mode, (max(largeurs), max(largeurs)))
+        image.load()
+    image = ImageOps.exif_transpose(image)
+
+    resultat, par_largeur_effective = {}, {}
+    for largeur in sorted(largeurs):
+        effective = min(largeur, image.width)
+        if effective not in par_largeur_effective:
+            reduite = image
+            if effective < image.width:
+                hauteur = max(1, round(image.height * effective / image.width))
+                reduite = image.resize((effective, hauteur), Image.Resampling.LANCZOS)
+            noms = {}
+            for extension, (format_pil, options) in FORMATS.items():
+                tampon = io.BytesIO()
+                # Sans `exif=`/`icc_profile=` : Pillow n'écrit aucune métadonnée.
+                _preparer(reduite, extension).save(tampon, format_pil, **options)
+                noms[extension] = fichier.storage.save(
+                    nom_derivee(fichier.name, effective, extension),
+                    ContentFile(tampon.getvalue()),
+                )
+            par_largeur_effective[effective] = noms
+        resultat[str(largeur)] = par_largeur_effective[effective]
+    return resultat
+
+
+def supprimer(storage, derivees):
+    noms = {
+        nom for formats in (derivees or {}).get("largeurs", {}).values() for nom in formats.values()
+    }
+    for nom in noms:
+        storage.delete(nom)
+
+
+def deriver(instance, champ, largeurs=None, update_fields=None, forcer=False) -> bool:
+    """
+    Met les dérivées de `instance.<champ>` en accord avec son image
+    courante. Sans effet si elles correspondent déjà (ou si `update_fields`
+    ne touche pas le champ), sauf `forcer`. Enregistre `<champ>_derivees`
+    par `update()` (aucun signal relancé). Retourne True si elles ont été
+    recalculées.
+    """
+    if update_fields is not None and champ not in update_fields:
+        return False
+    fichier = getattr(instance, champ)
+    attribut = f"{champ}_derivees"
+    anciennes = getattr(instance, attribut) or {}
+    source = fichier.name if fichier else ""
+    if not forcer and anciennes.get("source", "") == source:
+        return False
+
+    if largeurs is None:
+        largeurs = IMAGES[(instance._meta.label, champ)]
+    supprimer(fichier.storage, anciennes)
+    nouvelles = {}
+    if source:
+        try:
+            nouvelles = {"source": source, "largeurs": generer(fichier, largeurs)}
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError, ValueError):
+            logger.exception(
+                "Dérivées impossibles pour %s.%s (%s)", instance._meta.label, champ, source
+            )
+            nouvelles = {"source": source, "largeurs": {}}
+    type(instance)._base_manager.filter(pk=instance.pk).update(**{attribut: nouvelles})
+    setattr(instance, attribut, nouvelles)
+    return True
+
+
+def deriver_objet(label, pk, champ) -> bool:
+    """`deriver()` sur l'objet relu en base (`label` : `app.Modele`)."""
+    objet = apps.get_model(label)._base_manager.filter(pk=pk).first()
+    if objet is None:
+        return False
+    return deriver(objet, champ)
+
+
+# ── Calcul hors requête ─────────────────────────────────────────────────
+
+_file = queue.Queue()
+_verrou = threading.Lock()
+_worker = None
+
+
+def _boucle_worker():
+    while True:
+        label, pk, champ = _file.get()
+        try:
+            deriver_objet(label, pk, champ)
+        except Exception:
+            logger.exception("Dérivées hors requête interrompues pour %s #%s", label, pk)
+        finally:
+            connection.close()
+
+
+def _mettre_en_file(label, pk, champ) -> None:
+    global _worker
+    _file.put((label, pk, champ))
+    with _verrou:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_boucle_worker, daemon=True)
+            _worker.start()
+
+
+def deriver_apres_commit(instance, champ, update_fields=None) -> None:
+    """Pour les signaux post_save : `deriver()` tout de suite, ou, avec
+    `TRANSFERT_MEDIAS_DIFFERE`, hors requête après le commit. Les cas sans
+    travail (champ hors `update_fields`, dérivées déjà à jour) ne mettent
+    rien en file."""
+    if not transferts.actif():
+        deriver(instance, champ, update_fields=update_fields)
+        return
+    if update_fields is not None and champ not in update_fields:
+        return
+    fichier = getattr(instance, champ)
+    anciennes = getattr(instance, f"{champ}_derivees") or {}
+    if anciennes.get("source", "") == (fichier.name if fichier else ""):
+        return
+    label, pk = instance._meta.label, instance.pk
+    transaction.on_commit(lambda: _mettre_en_file(label, pk, champ))
+
+
+def urls_derivees(derivees, request=None, storage=None):
+    """`{largeur: {format: url}}` pour les serializers, ou `None` sans dérivée."""
+    largeurs = (derivees or {}).get("largeurs")
+    if not largeurs:
+        return None
+    if storage is None:
+        from django.core.files.storage import default_storage as storage
+
+    def url(nom):
+        brute = storage.url(nom)
+        return request.build_absolute_uri(brute) if request else brute
+
+    return {
+        largeur: {extension: url(nom) for extension, nom in formats.items()}
+        for largeur, formats in largeurs.items()
+    }
@@ -0,0 +1,128 @@
+"""
+Écriture groupée du journal d'activité (`HistoriqueActivite`).
+
+`enregistrer_activite()` est appelé depuis presque toutes les vues
+d'écriture : un `INSERT` synchrone par action faisait du journal à la fois
+un point chaud d'écriture et la table qui grossit le plus vite. Les
+événements sont désormais ajoutés à un tampon en mémoire (par processus)
+puis écrits par `bulk_create` :
+- dès que le tampon atteint `JOURNAL_ACTIVITE_TAILLE_LOT` lignes ;
+- dès que l'événement le plus ancien du tampon a plus de
+  `JOURNAL_ACTIVITE_DELAI_SECONDES` (vérifié à chaque ajout) ;
+- en fin de chaque requête (`request_finished`, voir apps/core/signals.py) ;
+- à l'arrêt du processus (`atexit`, commandes de gestion, shell).
+
+Aucune file de tâches n'existe dans ce projet (voir apps/notifications/
+fcm.py) : pas de thread de vidage dédié, les seuils sont évalués au fil des
+appels — suffisant puisque chaque requête se termine par un vidage.
+
+Deux garanties conservées de l'ancien `objects.create` :
+- un échec d'écriture du journal ne fait JAMAIS échouer l'action métier
+  (journalisé, lot abandonné — jamais propagé) ;
+- un événement émis À L'INTÉRIEUR d'un `transaction.atomic()` métier est
+  écrit immédiatement, dans cette transaction : il disparaît avec elle en
+  cas de rollback, au lieu de survivre dans le tampon à une action annulée.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.core.services import invalider_stats_activite
+
+logger = logging.getLogger(__name__)
+
+
+def _dans_transaction_metier() -> bool:
+    """Vrai si un `atomic()` applicatif est ouvert — les `atomic()` posés
+    par les tests Django (`_from_testcase`) ne comptent pas : ils
+    envelopperaient sinon toute la suite et masqueraient le tampon."""
+    return any(not getattr(bloc, "_from_testcase", False) for bloc in connection.atomic_blocks)
+
+
+class TamponActivites:
+    """Tampon thread-safe d'instances `HistoriqueActivite` non sauvegardées."""
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._en_attente = []
+        self._plus_ancien = None
+
+    @property
+    def taille_lot(self) -> int:
+        return getattr(settings, "JOURNAL_ACTIVITE_TAILLE_LOT", 100)
+
+    @property
+    def delai_secondes(self) -> float:
+        return getattr(settings, "JOURNAL_ACTIVITE_DELAI_SECONDES", 5)
+
+    def __len__(self):
+        return len(self._en_attente)
+
+    def ajouter(self, activite) -> None:
+        with self._verrou:
+            if not self._en_attente:
+                self._plus_ancien = time.monotonic()
+            self._en_attente.append(activite)
+            a_vider = (
+                len(self._en_attente) >= self.taille_lot
+                or time.monotonic() - self._plus_ancien >= self.delai_secondes
+            )
+        if a_vider:
+            self.vider()
+
+    def vider(self) -> int:
+        """Écrit tout le tampon en un `bulk_create` ; retourne le nombre de
+        lignes écrites (0 en cas d'échec, jamais d'exception)."""
+        from apps.core.models import HistoriqueActivite
+
+        with self._verrou:
+            lot, self._en_attente = self._en_attente, []
+            self._plus_ancien = None
+        if not lot:
+            return 0
+
+        try:
+            # Savepoint : un échec ici ne doit pas non plus empoisonner une
+            # transaction englobante éventuelle.
+            with transaction.atomic():
+                HistoriqueActivite.objects.bulk_create(lot, batch_size=self.taille_lot)
+        except Exception:
+            # Volontairement large, comme l'ancien `objects.create` : le
+            # journal ne doit jamais faire échouer quoi que ce soit.
+            logger.exception("Échec écriture groupée HistoriqueActivite (%d lignes)", len(lot))
+            return 0
+
+        for user_id in {a.user_id for a in lot}:
+            invalider_stats_activite(user_id)
+        return len(lot)
+
+
+tampon_activites = TamponActivites()
+
+
+def journaliser(activite) -> None:
+    """Point d'entrée de `enregistrer_activite()` : écriture immédiate dans
+    une transaction métier ouverte, tampon sinon."""
+    if _dans_transaction_metier():
+        with transaction.atomic():
+            activite.save(force_insert=True)
+        # Tout de suite ET au commit : des stats recalculées entre-temps par
+        # une requête concurrente (lignes pas encore commitées) ne survivent
+        # pas.
+        invalider_stats_activite(activite.user_id)
+        transaction.on_commit(lambda: invalider_stats_activite(activite.user_id))
+        return
+    tampon_activites.ajouter(activite)
+
+
+@atexit.register
+def _vider_a_l_arret():
+    try:
+        tampon_activites.vider()
+    except Exception:
+        logger.exception("Échec vidage du journal d'activité à l'arrêt")
@@ -0,0 +1,82 @@
+"""
+Rétention du journal d'activité : déplace les lignes de `HistoriqueActivite`
+plus anciennes que `--jours` vers `HistoriqueActiviteArchive`, puis purge
+éventuellement les archives plus anciennes que `--purger-archives-jours`.
+
+La table vive est la plus grosse du projet et lue à chaque ouverture de
+profil (`HistoriqueActiviteView`, `HistoriqueStatsView`) : la garder bornée
+aux derniers mois suffit à tenir ses index en mémoire.
+
+Déplacement par lots d'ids (`--lot`), chacun dans sa propre transaction
+courte (copie puis suppression) : jamais un verrou long sur toute la table,
+et une exécution interrompue se relance sans doublon (l'archive reprend
+l'`id` d'origine, `ignore_conflicts`).
+
+À planifier côté hébergeur (tâche quotidienne), comme `envoyer_rappels` —
+aucun scheduler n'existe dans le code.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.models import HistoriqueActivite, HistoriqueActiviteArchive
+
+_CHAMPS = ("id", "user_id", "action", "description", "data", "timestamp", "objet_id", "objet_type")
+
+
+class Command(BaseCommand):
+    help = "Archive les entrées du journal d'activité au-delà de la durée de rétention."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jours",
+            type=int,
+            required=True,
+            help="Âge (en jours) au-delà duquel une activité quitte la table vive.",
+        )
+        parser.add_argument(
+            "--purger-archives-jours",
+            type=int,
+            default=None,
+            help="Supprime définitivement les archives plus anciennes que ce nombre de jours.",
+        )
+        parser.add_argument("--lot", type=int, default=5000, help="Taille d'un lot de déplacement.")
+
+    def handle(self, *args, **options):
+        jours, lot = options["jours"], options["lot"]
+        purge = options["purger_archives_jours"]
+        if jours <= 0 or lot <= 0:
+            raise CommandError("--jours et --lot doivent être strictement positifs.")
+        if purge is not None and purge < jours:
+            raise CommandError("--purger-archives-jours doit être ≥ --jours.")
+
+        maintenant = timezone.now()
+        deplaces = self._archiver(maintenant - timedelta(days=jours), lot)
+        self.stdout.write(f"{deplaces} activité(s) archivée(s).")
+
+        if purge is not None:
+            purges, _ = HistoriqueActiviteArchive.objects.filter(
+                timestamp__lt=maintenant - timedelta(days=purge)
+            ).delete()
+            self.stdout.write(f"{purges} archive(s) purgée(s).")
+
+    def _archiver(self, limite, lot) -> int:
+        total = 0
+        while True:
+            with transaction.atomic():
+                lignes = list(
+                    HistoriqueActivite.objects.filter(timestamp__lt=limite)
+                    .order_by("id")
+                    .values(*_CHAMPS)[:lot]
+                )
+                if not lignes:
+                    return total
+                HistoriqueActiviteArchive.objects.bulk_create(
+                    [HistoriqueActiviteArchive(**ligne) for ligne in lignes],
+                    ignore_conflicts=True,
+                )
+                HistoriqueActivite.objects.filter(id__in=[ligne["id"] for ligne in lignes]).delete()
+            total += len(lignes)
@@ -0,0 +1,108 @@
+"""
+Banc d'essai du throttling : `ScopedRateThrottle` natif de DRF (liste
+d'horodatages relue, filtrée et réécrite à chaque requête) contre
+`YekiScopedRateThrottle` (compteur à fenêtre glissante,
+apps/core/throttling.py), sur le cache `THROTTLE_CACHE`.
+
+Usage :
+    python manage.py comparer_throttling --taux 120/min --requetes 20000 --clients 50
+
+Chaque client envoie ses requêtes à cadence régulière, juste sous la
+limite : c'est le cas le plus coûteux pour la liste d'horodatages, qui
+porte alors `num_requests` entrées. Les clés du banc sont supprimées à la
+fin.
+"""
+
+import pickle
+import time
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+
+from apps.core.throttling import YekiScopedRateThrottle, magasin, parser_taux
+
+SCOPE = "banc_throttling"
+
+
+class _Vue(APIView):
+    throttle_scope = SCOPE
+
+
+class _DRFNatif(ScopedRateThrottle):
+    """Algorithme natif ; seul le multiplicateur ("3/10min") est emprunté."""
+
+    cache = None  # remplacé par le magasin du banc
+
+    def parse_rate(self, rate):
+        return parser_taux(rate) if rate else (None, None)
+
+
+class Command(BaseCommand):
+    help = "Compare le coût du throttling DRF natif à la fenêtre glissante Yéki."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--taux", default="120/min")
+        parser.add_argument("--requetes", type=int, default=20000)
+        parser.add_argument("--clients", type=int, default=50)
+
+    def handle(self, *args, **options):
+        store = magasin()
+        _DRFNatif.cache = store
+        taux = {SCOPE: options["taux"]}
+        num_requests, duree = parser_taux(options["taux"])
+        clients = [self._requete(i) for i in range(options["clients"])]
+        # Juste sous la limite, pour chaque client.
+        pas = duree / num_requests * 1.01
+        self.duree = duree
+
+        for nom, classe in (
+            ("DRF natif", _DRFNatif),
+            ("fenêtre glissante", YekiScopedRateThrottle),
+        ):
+            with mock.patch.object(classe, "THROTTLE_RATES", taux):
+                us, refusees, octets = self._mesurer(classe, clients, options["requetes"], pas)
+            self.stdout.write(
+                f"{nom:<18} : {us:7.1f} µs/requête, {refusees} refusée(s), "
+                f"{octets} octets stockés par client"
+            )
+
+    def _requete(self, i):
+        requete = APIRequestFactory().get(
+            "/", REMOTE_ADDR=f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"
+        )
+        requete.user = AnonymousUser()
+        return requete
+
+    def _mesurer(self, classe, clients, n, pas):
+        vue = _Vue()
+        store = magasin()
+        horloge = [1_000_000.0]
+        refusees = 0
+        cles = set()
+        with mock.patch.object(classe, "timer", side_effect=lambda: horloge[0]):
+            debut = time.perf_counter()
+            for i in range(n):
+                requete = clients[i % len(clients)]
+                if i % len(clients) == 0:
+                    horloge[0] += pas
+                throttle = classe()
+                if not throttle.allow_request(requete, vue):
+                    refusees += 1
+                cles.add(throttle.key)
+            ecoule = time.perf_counter() - debut
+
+        # Taille stockée pour un client : sa liste, ou ses deux compteurs.
+        cle = next(iter(cles))
+        valeurs = store.get_many([cle, *(f"{cle}:{f}" for f in self._fenetres(horloge[0]))])
+        octets = sum(len(pickle.dumps(v)) for v in valeurs.values())
+        for cle in cles:
+            store.delete_many([cle, *(f"{cle}:{f}" for f in self._fenetres(horloge[0]))])
+        return ecoule / n * 1e6, refusees, octets
+
+    def _fenetres(self, maintenant):
+        fenetre = int(maintenant // self.duree)
+        return (fenetre - 1, fenetre)
@@ -0,0 +1,49 @@
+"""
+Génère les versions réduites (apps/core/images.py) des images déjà en
+base : avatars, images d'exercice, de département, du forum et du chat
+Yéki IA.
+
+Les signaux post_save les produisent pour chaque nouvelle image ; cette
+commande rattrape l'existant (images antérieures au pipeline, imports en
+masse par `update()`/`bulk_create`). Idempotente : une image dont les
+dérivées correspondent déjà est ignorée, sauf `--forcer` (nouvelles
+largeurs ou qualité, échecs précédents à retenter).
+
+Usage :
+    python manage.py generer_images_derivees [--modele forum.QuestionForum] [--forcer]
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.core.images import IMAGES, deriver
+
+
+class Command(BaseCommand):
+    help = "Génère les versions réduites des images existantes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modele",
+            choices=sorted({modele for modele, _ in IMAGES}),
+            help="Limiter à ce modèle.",
+        )
+        parser.add_argument(
+            "--forcer", action="store_true", help="Régénérer même les dérivées à jour."
+        )
+
+    def handle(self, *args, **options):
+        for (label, champ), largeurs in IMAGES.items():
+            if options["modele"] and label != options["modele"]:
+                continue
+            modele = apps.get_model(label)
+            objets = (
+                modele._base_manager.exclude(**{champ: ""})
+                .exclude(**{f"{champ}__isnull": True})
+                .only("pk", champ, f"{champ}_derivees")
+                .order_by("pk")
+            )
+            generees = 0
+            for objet in objets.iterator(chunk_size=200):
+                generees += deriver(objet, champ, largeurs, forcer=options["forcer"])
+            self.stdout.write(f"{label}.{champ} : {generees} image(s) traitée(s)")
@@ -0,0 +1,20 @@
+"""
+Supprime du stockage les fichiers des téléversements directs ouverts puis
+jamais finalisés (voir apps/core/televersement_direct.py), une fois leur
+session expirée (`TELEVERSEMENT_DIRECT_DUREE_HEURES`). À planifier, par
+exemple une fois par jour.
+
+Usage :
+    python manage.py purger_televersements_expires
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.televersement_direct import purger_expirees
+
+
+class Command(BaseCommand):
+    help = "Supprime les fichiers des téléversements directs expirés sans finalisation."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{purger_expirees()} téléversement(s) expiré(s) purgé(s).")
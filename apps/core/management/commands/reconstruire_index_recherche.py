@@ -0,0 +1,51 @@
+"""
+Reconstruit l'index de recherche textuelle (apps/core/recherche.py) :
+enseignants de l'admin général et questions du forum.
+
+L'index est tenu à jour par signaux ; cette commande le remplit après la
+migration qui le crée (vide), et sert après un import en masse (`bulk_create`/`update()` ne déclenchent aucun signal), après un
+changement de base (SQLite → PostgreSQL : chaque moteur a sa table), ou
+pour corriger une dérive. Idempotente.
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.core.models import DocumentRecherche, TermeRecherche
+from apps.core.recherche import LOT, SOURCES, TYPE_ENSEIGNANT, TYPE_QUESTION_FORUM, reindexer
+
+# Modèle dont les ids sont candidats, par type indexé.
+MODELES = {
+    TYPE_ENSEIGNANT: "accounts.Profile",
+    TYPE_QUESTION_FORUM: "forum.QuestionForum",
+}
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche textuelle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--type", choices=sorted(SOURCES), help="Limiter à ce type d'objet.")
+
+    def handle(self, *args, **options):
+        types = [options["type"]] if options["type"] else sorted(SOURCES)
+        for type_objet in types:
+            # Objets déjà indexés aussi : ceux supprimés ou devenus non
+            # cherchables perdent leur entrée.
+            ids = sorted(
+                set(apps.get_model(MODELES[type_objet]).objects.values_list("pk", flat=True))
+                | set(
+                    TermeRecherche.objects.filter(type_objet=type_objet).values_list(
+                        "objet_id", flat=True
+                    )
+                )
+                | set(
+                    DocumentRecherche.objects.filter(type_objet=type_objet).values_list(
+                        "objet_id", flat=True
+                    )
+                )
+            )
+            indexes = 0
+            for i in range(0, len(ids), LOT):
+                indexes += reindexer(type_objet, ids[i : i + LOT])
+            self.stdout.write(f"{type_objet} : {indexes} objet(s) indexé(s) sur {len(ids)}.")
@@ -0,0 +1,34 @@
+"""
+Taux de succès du cache de réponses (apps/core/cache_reponses.py), par
+endpoint, depuis la dernière remise à zéro. Compteurs dans le cache
+`CACHE_PARTAGE` : en production, cumul de tous les process.
+
+Usage :
+    python manage.py stats_cache_reponses [--reinitialiser]
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.cache_reponses import reinitialiser_statistiques, statistiques
+
+
+class Command(BaseCommand):
+    help = "Affiche les succès/échecs du cache de réponses, par endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reinitialiser",
+            action="store_true",
+            help="Remet les compteurs à zéro après affichage.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'endpoint':<24}{'succès':>10}{'échecs':>10}{'taux':>8}")
+        for ligne in statistiques():
+            taux = "-" if ligne["taux_succes"] is None else f"{ligne['taux_succes']:.0%}"
+            self.stdout.write(
+                f"{ligne['endpoint']:<24}{ligne['succes']:>10}{ligne['echecs']:>10}{taux:>8}"
+            )
+        if options["reinitialiser"]:
+            reinitialiser_statistiques()
+            self.stdout.write("Compteurs remis à zéro.")
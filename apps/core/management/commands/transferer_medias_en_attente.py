@@ -0,0 +1,81 @@
+"""
+Pousse vers le stockage les uploads en attente de CETTE machine (transfert
+différé, voir apps/core/transferts.py) hors du serveur web : après un
+redémarrage qui a coupé les workers en arrière-plan, ou comme worker
+dédié.
+
+Usage :
+    python manage.py transferer_medias_en_attente
+    python manage.py transferer_medias_en_attente --workers 4 --continu
+    python manage.py transferer_medias_en_attente --reessayer-echecs
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.core.models import TransfertMedia
+from apps.core.transferts import drainer, hote, reessayer_echecs
+
+
+class Command(BaseCommand):
+    help = "Transfère vers le stockage les fichiers uploadés mis en file sur cette machine."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Nombre de workers parallèles")
+        parser.add_argument(
+            "--continu",
+            action="store_true",
+            help="Ne s'arrête pas quand la file est vide (Ctrl+C pour quitter)",
+        )
+        parser.add_argument(
+            "--intervalle", type=float, default=5.0, help="Secondes entre deux passes (--continu)"
+        )
+        parser.add_argument(
+            "--reessayer-echecs",
+            action="store_true",
+            help="Remet d'abord en file les échecs dont la copie locale existe encore",
+        )
+
+    def handle(self, *args, **options):
+        if options["reessayer_echecs"]:
+            self.stdout.write(f"{reessayer_echecs()} échec(s) remis en file.")
+
+        total_transferes = total_echecs = 0
+        while True:
+            transferes, echecs = self._passe(options["workers"])
+            total_transferes += transferes
+            total_echecs += echecs
+            if not options["continu"]:
+                break
+            if not transferes and not echecs:
+                time.sleep(options["intervalle"])
+
+        file = TransfertMedia.objects.filter(hote=hote())
+        restants = file.filter(statut="en_attente").count()
+        en_echec = file.filter(statut="echec").count()
+        self.stdout.write(
+            f"{total_transferes} fichier(s) transféré(s), {total_echecs} erreur(s) ; "
+            f"{restants} en attente, {en_echec} en échec."
+        )
+
+    def _passe(self, nb_workers):
+        if nb_workers <= 1:
+            return drainer()
+
+        resultats = []
+
+        def worker():
+            try:
+                resultats.append(drainer())
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(nb_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(r[0] for r in resultats), sum(r[1] for r in resultats)
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_alter_historiqueactivite_action"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="historiqueactivite",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name="HistoriqueActiviteArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("action", models.CharField(max_length=50)),
+                ("description", models.TextField(blank=True)),
+                ("data", models.JSONField(blank=True, default=dict)),
+                ("timestamp", models.DateTimeField(db_index=True)),
+                ("objet_id", models.PositiveIntegerField(blank=True, null=True)),
+                ("objet_type", models.CharField(blank=True, max_length=50)),
+                ("archive_le", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="historique_activites_archivees",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Activité archivée",
+                "verbose_name_plural": "Historique des activités (archives)",
+                "db_table": "yeki_historiqueactivite_archive",
+                "ordering": ["-timestamp"],
+            },
+        ),
+    ]
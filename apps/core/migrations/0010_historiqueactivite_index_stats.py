@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_historiqueactivite_tampon_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="historiqueactivite",
+            index=models.Index(
+                fields=["user", "timestamp", "action"], name="yeki_histor_user_id_b081cf_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_historiqueactivite_index_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionContenu",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "type_objet",
+                    models.CharField(
+                        choices=[
+                            ("cours", "Cours"),
+                            ("departement", "Département"),
+                            ("parametres_publics", "Paramètres publics"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("objet_id", models.PositiveBigIntegerField(default=0)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Version de contenu",
+                "verbose_name_plural": "Versions de contenu",
+                "db_table": "yeki_version_contenu",
+                "unique_together": {("type_objet", "objet_id")},
+            },
+        ),
+    ]
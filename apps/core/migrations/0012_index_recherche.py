@@ -0,0 +1,111 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+# Index GIN du moteur PostgreSQL (apps/core/recherche.py) : l'expression
+# plein texte est celle de `SearchVector("texte", config="french")`.
+INDEX_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS yeki_document_recherche_trgm "
+    "ON yeki_document_recherche USING gin (texte gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS yeki_document_recherche_fts "
+    "ON yeki_document_recherche USING gin "
+    "(to_tsvector('french'::regconfig, COALESCE(texte, '')))",
+]
+
+
+def creer_index_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in INDEX_POSTGRES:
+        schema_editor.execute(sql)
+
+
+def supprimer_index_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS yeki_document_recherche_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS yeki_document_recherche_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_index_filtres_chauds"),
+        ("core", "0011_version_contenu"),
+        ("forum", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentRecherche",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "type_objet",
+                    models.CharField(
+                        choices=[
+                            ("enseignant", "Enseignant"),
+                            ("question_forum", "Question du forum"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("objet_id", models.PositiveBigIntegerField()),
+                ("titre", models.TextField(blank=True, default="")),
+                ("texte", models.TextField(blank=True, default="")),
+            ],
+            options={
+                "verbose_name": "Document de recherche",
+                "verbose_name_plural": "Documents de recherche",
+                "db_table": "yeki_document_recherche",
+                "unique_together": {("type_objet", "objet_id")},
+            },
+        ),
+        migrations.CreateModel(
+            name="TermeRecherche",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "type_objet",
+                    models.CharField(
+                        choices=[
+                            ("enseignant", "Enseignant"),
+                            ("question_forum", "Question du forum"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("objet_id", models.PositiveBigIntegerField()),
+                ("terme", models.CharField(max_length=64)),
+                ("poids", models.PositiveSmallIntegerField(default=1)),
+            ],
+            options={
+                "verbose_name": "Terme de recherche",
+                "verbose_name_plural": "Termes de recherche",
+                "db_table": "yeki_terme_recherche",
+                "indexes": [
+                    models.Index(
+                        fields=["type_objet", "terme"], name="yeki_terme__type_ob_5f8e96_idx"
+                    ),
+                    models.Index(
+                        fields=["type_objet", "objet_id"], name="yeki_terme__type_ob_e9b810_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(creer_index_postgres, supprimer_index_postgres),
+        # Index créé vide : son calcul vit dans apps/core/recherche.py, qu'une
+        # migration ne doit pas importer (modèles courants, pas historiques).
+        # Le remplir ensuite avec `manage.py reconstruire_index_recherche`.
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_index_recherche"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransfertMedia",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "modele",
+                    models.CharField(
+                        help_text="Label du modèle porteur, ex. forum.QuestionForum", max_length=100
+                    ),
+                ),
+                ("objet_id", models.PositiveBigIntegerField()),
+                ("champ", models.CharField(max_length=50)),
+                ("nom_cible", models.CharField(max_length=255)),
+                ("chemin_local", models.CharField(max_length=500)),
+                (
+                    "hote",
+                    models.CharField(
+                        help_text="Machine qui détient la copie locale", max_length=255
+                    ),
+                ),
+                ("taille", models.PositiveBigIntegerField(default=0)),
+                ("cree_le", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "statut",
+                    models.CharField(
+                        choices=[
+                            ("en_attente", "En attente"),
+                            ("en_cours", "En cours de transfert"),
+                            ("transfere", "Transféré"),
+                            ("echec", "Échec"),
+                            ("abandonne", "Abandonné (objet supprimé)"),
+                        ],
+                        default="en_attente",
+                        max_length=15,
+                    ),
+                ),
+                ("tentatives", models.PositiveIntegerField(default=0)),
+                ("reessayer_apres", models.DateTimeField(default=django.utils.timezone.now)),
+                ("pris_le", models.DateTimeField(blank=True, null=True)),
+                ("transfere_le", models.DateTimeField(blank=True, null=True)),
+                ("erreur", models.TextField(blank=True)),
+            ],
+            options={
+                "verbose_name": "Transfert de média",
+                "verbose_name_plural": "Transferts de médias",
+                "db_table": "yeki_transfert_media",
+                "indexes": [
+                    models.Index(
+                        fields=["hote", "statut", "reessayer_apres"],
+                        name="yeki_transf_hote_1881ae_idx",
+                    ),
+                    models.Index(
+                        fields=["modele", "objet_id"], name="yeki_transf_modele_ff5788_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_transferts_medias"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SessionTeleversement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "modele",
+                    models.CharField(
+                        help_text="Label du modèle porteur, ex. formation.Lecon", max_length=100
+                    ),
+                ),
+                ("objet_id", models.PositiveBigIntegerField()),
+                ("champ", models.CharField(max_length=50)),
+                ("nom_cible", models.CharField(max_length=255)),
+                ("taille", models.PositiveBigIntegerField(help_text="Taille annoncée, en octets")),
+                ("type_contenu", models.CharField(max_length=100)),
+                ("cree_le", models.DateTimeField(default=django.utils.timezone.now)),
+                ("expire_le", models.DateTimeField()),
+                (
+                    "statut",
+                    models.CharField(
+                        choices=[
+                            ("ouverte", "Ouverte"),
+                            ("finalisee", "Finalisée"),
+                            ("rejetee", "Rejetée"),
+                            ("expiree", "Expirée"),
+                        ],
+                        default="ouverte",
+                        max_length=10,
+                    ),
+                ),
+                ("finalise_le", models.DateTimeField(blank=True, null=True)),
+                ("erreur", models.TextField(blank=True)),
+                (
+                    "cree_par",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Session de téléversement direct",
+                "verbose_name_plural": "Sessions de téléversement direct",
+                "db_table": "yeki_session_televersement",
+                "indexes": [
+                    models.Index(
+                        fields=["statut", "expire_le"], name="yeki_sessio_statut_4b1545_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -83,7 +83,10 @@ class HistoriqueActivite(models.Model):
     # Données contextuelles JSON (titre du cours, nom de l'enseignant, etc.)
     data = models.JSONField(default=dict, blank=True)
 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # `default` plutôt que `auto_now_add` : l'instance est construite au
+    # moment de l'action mais insérée plus tard par lot (apps/core/
+    # journal.py) — `auto_now_add` l'horodaterait à l'heure du vidage.
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     # Référence optionnelle vers l'objet concerné
     objet_id = models.PositiveIntegerField(null=True, blank=True)
@@ -92,6 +95,9 @@ class HistoriqueActivite(models.Model):
     class Meta:
         db_table = "yeki_historiqueactivite"
         ordering = ["-timestamp"]
+        # Couvre `HistoriqueStatsView` (agrégat conditionnel par utilisateur,
+        # fenêtres de dates + actions) et la liste paginée par utilisateur.
+        indexes = [models.Index(fields=["user", "timestamp", "action"])]
         verbose_name = "Activité"
         verbose_name_plural = "Historique des activités"
 
@@ -101,6 +107,41 @@ class HistoriqueActivite(models.Model):
         )
 
 
+class HistoriqueActiviteArchive(models.Model):
+    """
+    Lignes de `HistoriqueActivite` sorties de la table vive par la commande
+    `archiver_historique_activite` (rétention) : la table lue par l'API
+    reste bornée aux N derniers jours, l'historique complet reste
+    consultable ici (admin, exports) jusqu'à sa purge éventuelle.
+
+    Même `id` que la ligne d'origine (pas d'auto-incrément) : un
+    déplacement interrompu puis relancé ne crée jamais de doublon.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="historique_activites_archivees",
+    )
+    action = models.CharField(max_length=50)
+    description = models.TextField(blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    timestamp = models.DateTimeField(db_index=True)
+    objet_id = models.PositiveIntegerField(null=True, blank=True)
+    objet_type = models.CharField(max_length=50, blank=True)
+    archive_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "yeki_historiqueactivite_archive"
+        ordering = ["-timestamp"]
+        verbose_name = "Activité archivée"
+        verbose_name_plural = "Historique des activités (archives)"
+
+    def __str__(self):
+        return f"[archive] {self.action} — {self.timestamp:%d/%m/%Y %H:%M}"
+
+
 # ─────────────────────────────────────────────────────────────────
 # HELPER : enregistrer une activité facilement depuis n'importe
 #          quelle view
@@ -116,7 +157,10 @@ def enregistrer_activite(
     objet_type: str = "",
 ):
     """
-    Crée une entrée HistoriqueActivite.
+    Crée une entrée HistoriqueActivite — écrite de façon groupée (voir
+    apps/core/journal.py) : immédiatement si l'appel a lieu dans un
+    `transaction.atomic()` métier, sinon via le tampon vidé en fin de
+    requête ou au seuil de taille/délai.
 
     Usage dans une view :
         from apps.core.models import enregistrer_activite
@@ -129,14 +173,18 @@ def enregistrer_activite(
             objet_type='Cours',
         )
     """
+    from apps.core.journal import journaliser
+
     try:
-        HistoriqueActivite.objects.create(
-            user=user,
-            action=action,
-            description=description,
-            data=data or {},
-            objet_id=objet_id,
-            objet_type=objet_type,
+        journaliser(
+            HistoriqueActivite(
+                user=user,
+                action=action,
+                description=description,
+                data=data or {},
+                objet_id=objet_id,
+                objet_type=objet_type,
+            )
         )
         return True
     except Exception:
@@ -277,3 +325,214 @@ class ParametreSysteme(models.Model):
 
         cache.set(cache_key, valeur, timeout=None)
         return valeur
+
+
+# ─────────────────────────────────────────────────────────────────
+# VERSIONS DE CONTENU
+# Numéro monotone par contenu lu en boucle par l'application mobile,
+# source des ETag des GET conditionnels (voir apps/core/versions_contenu.py).
+# ─────────────────────────────────────────────────────────────────
+
+
+class VersionContenu(models.Model):
+    """
+    Version d'un contenu : un cours et tout son arbre (modules, leçons,
+    exercices, questions), un département, les paramètres publics.
+    Incrémentée par signaux à chaque écriture, uniquement par `UPDATE …
+    SET version = version + 1` — jamais par la sauvegarde d'une instance
+    en mémoire, qui pourrait la faire reculer. Table séparée plutôt qu'un
+    champ de `Cours` pour cette raison.
+    """
+
+    TYPE_CHOICES = [
+        ("cours", "Cours"),
+        ("departement", "Département"),
+        ("parametres_publics", "Paramètres publics"),
+    ]
+
+    type_objet = models.CharField(max_length=30, choices=TYPE_CHOICES)
+    # 0 pour un contenu unique (paramètres publics).
+    objet_id = models.PositiveBigIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = "yeki_version_contenu"
+        unique_together = ("type_objet", "objet_id")
+        verbose_name = "Version de contenu"
+        verbose_name_plural = "Versions de contenu"
+
+    def __str__(self):
+        return f"{self.type_objet}:{self.objet_id} v{self.version}"
+
+
+# ─────────────────────────────────────────────────────────────────
+# RECHERCHE TEXTUELLE
+# Documents indexés des recherches d'enseignants et du forum, un modèle
+# par moteur (voir apps/core/recherche.py).
+# ─────────────────────────────────────────────────────────────────
+
+TYPES_RECHERCHE = [
+    ("enseignant", "Enseignant"),
+    ("question_forum", "Question du forum"),
+]
+
+
+class DocumentRecherche(models.Model):
+    """
+    Moteur PostgreSQL : texte normalisé (minuscules, sans accents) d'un
+    objet cherchable. Index GIN plein texte et trigramme sur `texte`,
+    créés par la migration sous PostgreSQL uniquement.
+    """
+
+    type_objet = models.CharField(max_length=30, choices=TYPES_RECHERCHE)
+    objet_id = models.PositiveBigIntegerField()
+    titre = models.TextField(blank=True, default="")
+    texte = models.TextField(blank=True, default="")
+
+    class Meta:
+        db_table = "yeki_document_recherche"
+        unique_together = ("type_objet", "objet_id")
+        verbose_name = "Document de recherche"
+        verbose_name_plural = "Documents de recherche"
+
+    def __str__(self):
+        return f"{self.type_objet}:{self.objet_id}"
+
+
+class TermeRecherche(models.Model):
+    """
+    Moteur des autres bases (SQLite) : index inversé, un terme normalisé
+    par ligne et par objet, au poids du champ le plus important où il
+    apparaît.
+    """
+
+    type_objet = models.CharField(max_length=30, choices=TYPES_RECHERCHE)
+    objet_id = models.PositiveBigIntegerField()
+    terme = models.CharField(max_length=64)
+    poids = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        db_table = "yeki_terme_recherche"
+        indexes = [
+            models.Index(fields=["type_objet", "terme"]),
+            models.Index(fields=["type_objet", "objet_id"]),
+        ]
+        verbose_name = "Terme de recherche"
+        verbose_name_plural = "Termes de recherche"
+
+    def __str__(self):
+        return f"{self.type_objet}:{self.objet_id} {self.terme}"
+
+
+# ─────────────────────────────────────────────────────────────────
+# TRANSFERTS DE MÉDIAS
+# Fichiers uploadés mis en file sur le disque local, poussés ensuite vers
+# le stockage par les workers de apps/core/transferts.py.
+# ─────────────────────────────────────────────────────────────────
+
+# `transfert_statut` des modèles porteurs de fichiers uploadés.
+STATUTS_TRANSFERT = [
+    ("pret", "Prêt"),
+    ("en_attente", "Transfert en attente"),
+    ("echec", "Échec du transfert"),
+]
+
+
+class TransfertMedia(models.Model):
+    """
+    Un fichier uploadé en attente d'écriture sur le stockage : copie locale
+    (`chemin_local`, sur la machine `hote`) et nom final calculé par
+    l'`upload_to` du champ. Le champ de l'objet porteur
+    (`modele`/`objet_id`/`champ`) n'est renseigné qu'une fois le fichier
+    écrit.
+    """
+
+    STATUT_CHOICES = [
+        ("en_attente", "En attente"),
+        ("en_cours", "En cours de transfert"),
+        ("transfere", "Transféré"),
+        ("echec", "Échec"),
+        ("abandonne", "Abandonné (objet supprimé)"),
+    ]
+
+    modele = models.CharField(
+        max_length=100, help_text="Label du modèle porteur, ex. forum.QuestionForum"
+    )
+    objet_id = models.PositiveBigIntegerField()
+    champ = models.CharField(max_length=50)
+    nom_cible = models.CharField(max_length=255)
+    chemin_local = models.CharField(max_length=500)
+    hote = models.CharField(max_length=255, help_text="Machine qui détient la copie locale")
+    taille = models.PositiveBigIntegerField(default=0)
+    cree_le = models.DateTimeField(default=timezone.now)
+
+    statut = models.CharField(max_length=15, choices=STATUT_CHOICES, default="en_attente")
+    tentatives = models.PositiveIntegerField(default=0)
+    reessayer_apres = models.DateTimeField(default=timezone.now)
+    pris_le = models.DateTimeField(null=True, blank=True)
+    transfere_le = models.DateTimeField(null=True, blank=True)
+    erreur = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "yeki_transfert_media"
+        verbose_name = "Transfert de média"
+        verbose_name_plural = "Transferts de médias"
+        indexes = [
+            # Les workers prennent les plus anciens disponibles de leur machine.
+            models.Index(fields=["hote", "statut", "reessayer_apres"]),
+            models.Index(fields=["modele", "objet_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.modele}#{self.objet_id}.{self.champ} ({self.statut})"
+
+
+# ─────────────────────────────────────────────────────────────────
+# TÉLÉVERSEMENT DIRECT VERS LE STOCKAGE
+# Le client écrit le fichier sur le stockage par une URL signée, sans
+# passer par Django (apps/core/televersement_direct.py).
+# ─────────────────────────────────────────────────────────────────
+
+
+class SessionTeleversement(models.Model):
+    """
+    Un fichier annoncé par le client (taille, type) et envoyé directement
+    au stockage sous `nom_cible`. Le champ de l'objet porteur
+    (`modele`/`objet_id`/`champ`) n'est renseigné qu'à la finalisation,
+    une fois le fichier reçu vérifié.
+    """
+
+    STATUT_CHOICES = [
+        ("ouverte", "Ouverte"),
+        ("finalisee", "Finalisée"),
+        ("rejetee", "Rejetée"),
+        ("expiree", "Expirée"),
+    ]
+
+    modele = models.CharField(
+        max_length=100, help_text="Label du modèle porteur, ex. formation.Lecon"
+    )
+    objet_id = models.PositiveBigIntegerField()
+    champ = models.CharField(max_length=50)
+    nom_cible = models.CharField(max_length=255)
+    taille = models.PositiveBigIntegerField(help_text="Taille annoncée, en octets")
+    type_contenu = models.CharField(max_length=100)
+    cree_par = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    cree_le = models.DateTimeField(default=timezone.now)
+    expire_le = models.DateTimeField()
+
+    statut = models.CharField(max_length=10, choices=STATUT_CHOICES, default="ouverte")
+    finalise_le = models.DateTimeField(null=True, blank=True)
+    erreur = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "yeki_session_televersement"
+        verbose_name = "Session de téléversement direct"
+        verbose_name_plural = "Sessions de téléversement direct"
+        indexes = [
+            # Purge des sessions ouvertes expirées.
+            models.Index(fields=["statut", "expire_le"]),
+        ]
+
+    def __str__(self):
+        return f"{self.modele}#{self.objet_id}.{self.champ} ({self.statut})"
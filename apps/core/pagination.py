@@ -1,4 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class YekiPageNumberPagination(PageNumberPagination):
@@ -15,6 +24,163 @@ class YekiPageNumberPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class YekiKeysetPagination(BasePagination):
+    """
+    Pagination par curseur (keyset) pour les grandes listes en ajout seul
+    (journal d'activité, notifications, paiements, soumissions) — opt-in
+    via `pagination_class = YekiKeysetPagination` sur une vue
+    `PaginatedListMixin`, voir docs/API_FOUNDATIONS.md §2.
+
+    `YekiPageNumberPagination` fait un OFFSET/LIMIT plus un `COUNT(*)`
+    complet à chaque page : sur une table de plusieurs millions de lignes,
+    les pages profondes et le comptage dominent la latence. Ici, la page
+    suivante est une simple condition `(horodatage, id) < (t, id)` sur
+    l'index `(…, horodatage)`, quelle que soit la profondeur.
+
+    Enveloppe INCHANGÉE pour le client mobile (`count`/`next`/`previous`/
+    `results`) :
+    - `next`/`previous` sont des URL complètes portant `?cursor=` — le
+      client les suit telles quelles, comme avant ;
+    - `count` est exact jusqu'à `count_plafond`, estimé au-delà (plan
+      PostgreSQL, sinon le plafond lui-même) — `count_estime` le signale ;
+    - un ancien client qui construit lui-même `?page=N` (sans `cursor`)
+      retombe sur `YekiPageNumberPagination`, réponse strictement
+      identique à l'existant.
+
+    La vue désigne son champ d'horodatage via `keyset_champ` (défaut
+    `timestamp`) ; l'ordre appliqué est toujours `(-champ, -id)`.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    champ_par_defaut = "timestamp"
+    # Au-delà, le comptage exact coûterait plus cher que la page elle-même.
+    count_plafond = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.legacy = None
+
+        curseur = request.query_params.get(self.cursor_query_param)
+        if not curseur and request.query_params.get("page"):
+            self.legacy = YekiPageNumberPagination()
+            return self.legacy.paginate_queryset(queryset, request, view=view)
+
+        self.champ = getattr(view, "keyset_champ", self.champ_par_defaut)
+        self.page_size = self._get_page_size(request)
+        self.count, self.count_estime = self._compter(queryset)
+
+        sens_inverse, position = self._decoder_curseur(curseur) if curseur else (False, None)
+
+        if sens_inverse:
+            qs = queryset.order_by(self.champ, "id")
+            if position is not None:
+                t, pk = position
+                qs = qs.filter(Q(**{f"{self.champ}__gt": t}) | Q(**{self.champ: t, "id__gt": pk}))
+        else:
+            qs = queryset.order_by(f"-{self.champ}", "-id")
+            if position is not None:
+                t, pk = position
+                qs = qs.filter(Q(**{f"{self.champ}__lt": t}) | Q(**{self.champ: t, "id__lt": pk}))
+
+        # Une ligne de plus que la page : indique s'il reste quelque chose
+        # dans le sens de lecture, sans second aller-retour.
+        lignes = list(qs[: self.page_size + 1])
+        encore = len(lignes) > self.page_size
+        lignes = lignes[: self.page_size]
+        if sens_inverse:
+            lignes.reverse()
+
+        self.page = lignes
+        if sens_inverse:
+            self.a_suivant, self.a_precedent = True, encore
+        else:
+            self.a_suivant, self.a_precedent = encore, position is not None
+        return lignes
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "count_estime": self.count_estime,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.a_suivant or not self.page:
+            return None
+        return self._lien(self.page[-1], sens_inverse=False)
+
+    def get_previous_link(self):
+        if not self.a_precedent or not self.page:
+            return None
+        return self._lien(self.page[0], sens_inverse=True)
+
+    # ── Internes ────────────────────────────────────────────────────────
+
+    def _get_page_size(self, request):
+        try:
+            taille = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if taille <= 0:
+            return self.page_size
+        return min(taille, self.max_page_size)
+
+    def _lien(self, objet, sens_inverse):
+        url = remove_query_param(self.base_url, "page")
+        return replace_query_param(
+            url, self.cursor_query_param, self._encoder_curseur(objet, sens_inverse)
+        )
+
+    def _encoder_curseur(self, objet, sens_inverse):
+        valeur = getattr(objet, self.champ)
+        brut = f"{'r' if sens_inverse else 'n'}|{valeur.isoformat()}|{objet.pk}"
+        return base64.urlsafe_b64encode(brut.encode()).decode().rstrip("=")
+
+    def _decoder_curseur(self, curseur):
+        try:
+            brut = base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4)).decode()
+            sens, horodatage, pk = brut.split("|")
+            t = parse_datetime(horodatage)
+            if sens not in ("n", "r") or t is None:
+                raise ValueError(curseur)
+            return sens == "r", (t, int(pk))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound("Curseur de pagination invalide.")
+
+    def _compter(self, queryset):
+        """(count, estimé?) — exact si la liste tient sous le plafond (un
+        `LIMIT` borné sur l'index, jamais un parcours complet), estimé
+        sinon."""
+        qs = queryset.order_by()
+        borne = qs[: self.count_plafond + 1].count()
+        if borne <= self.count_plafond:
+            return borne, False
+        return max(self._estimer(qs), self.count_plafond), True
+
+    def _estimer(self, queryset):
+        """Estimation du planificateur PostgreSQL (`EXPLAIN`, aucune ligne
+        lue) ; sur les autres moteurs (SQLite en tests), pas d'équivalent
+        fiable — le plafond fait office de borne basse."""
+        connexion = connections[queryset.db]
+        if connexion.vendor != "postgresql":
+            return self.count_plafond
+        sql, params = queryset.query.sql_with_params()
+        with connexion.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
 class PaginatedListMixin:
     """
     Ajoute `paginate_queryset()`/`get_paginated_response()` à une `APIView`
@@ -28,6 +194,10 @@ class PaginatedListMixin:
                 page = self.paginate_queryset(qs)
                 serializer = MonSerializer(page, many=True)
                 return self.get_paginated_response(serializer.data)
+
+    Opt-in keyset (grandes tables en ajout seul) : déclarer en plus
+    `pagination_class = YekiKeysetPagination` et `keyset_champ = "<champ
+    d'horodatage>"`, sans rien changer au corps de `get()`.
     """
 
     pagination_class = YekiPageNumberPagination
@@ -0,0 +1,214 @@
+"""
+Recherche textuelle indexée : recherche d'enseignants de l'admin général
+(`AdminGeneralSearchEnseignantsView`) et filtre `q` du forum
+(`ListeQuestionsView`).
+
+Ces recherches faisaient des `icontains` (`LIKE '%…%'`) sur plusieurs
+colonnes : parcours séquentiel de la table à chaque frappe, sans ordre de
+pertinence. Ici, chaque objet cherchable a un document indexé, tenu à jour
+par signaux (apps/accounts/signals.py, apps/forum/signals.py) et
+reconstructible par `manage.py reconstruire_index_recherche`.
+
+Normalisation commune (texte indexé et requête) : minuscules, accents
+retirés (« Élève » = « eleve »), découpage en termes alphanumériques,
+mots vides français ignorés. Deux moteurs, choisis selon la base :
+
+- PostgreSQL : un `DocumentRecherche` par objet ; correspondance par
+  plein texte (`tsvector` en configuration `french`, termes en préfixe)
+  ou par sous-chaîne de chaque terme (index trigramme `pg_trgm`), rang =
+  rang plein texte + similarité trigramme avec le titre. Index GIN créés
+  par la migration core 0012 ;
+- autres bases (SQLite en développement et en tests) : index inversé
+  `TermeRecherche`, un terme par ligne ; chaque terme de la requête est
+  un préfixe cherché par intervalle sur l'index `(type_objet, terme)`,
+  score = somme des poids des champs touchés.
+
+Tous les termes de la requête doivent correspondre. Résultats bornés à
+`RECHERCHE_LIMITE_RESULTATS` identifiants, du plus pertinent au moins
+pertinent.
+
+Les sources de documents (`SOURCES`) sont des fonctions
+`documents(ids) -> {id: [(texte, poids), …]}` ; un id absent du résultat
+(objet supprimé ou plus cherchable) sort de l'index.
+"""
+
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+from django.utils.module_loading import import_string
+
+from apps.core.models import DocumentRecherche, TermeRecherche
+
+TYPE_ENSEIGNANT = "enseignant"
+TYPE_QUESTION_FORUM = "question_forum"
+
+SOURCES = {
+    TYPE_ENSEIGNANT: "apps.accounts.services.documents_recherche_enseignants",
+    TYPE_QUESTION_FORUM: "apps.forum.services.documents_recherche_questions",
+}
+
+# Poids d'un champ : titre (nom, identifiant) > secondaire > corps de texte.
+POIDS_TITRE = 3
+POIDS_SECONDAIRE = 2
+POIDS_TEXTE = 1
+
+LIMITE_PAR_DEFAUT = 500
+LOT = 500
+TAILLE_TERME = 64
+
+MOTS_VIDES = frozenset(
+    "au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me "
+    "meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta "
+    "te tes toi ton tu un une vos votre vous est".split()
+)
+
+
+# Ligatures françaises que NFKD ne décompose pas.
+LIGATURES = str.maketrans({"œ": "oe", "æ": "ae"})
+
+
+def normaliser(texte) -> str:
+    """Minuscules, sans accents ni ligatures."""
+    decompose = unicodedata.normalize("NFKD", (texte or "").casefold().translate(LIGATURES))
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def termes(texte) -> list:
+    """Termes cherchables de `texte`, dans l'ordre, sans doublon."""
+    vus = {}
+    for terme in re.findall(r"[a-z0-9]+", normaliser(texte)):
+        if terme in MOTS_VIDES or (len(terme) < 2 and not terme.isdigit()):
+            continue
+        vus.setdefault(terme[:TAILLE_TERME], None)
+    return list(vus)
+
+
+def limite_resultats() -> int:
+    return getattr(settings, "RECHERCHE_LIMITE_RESULTATS", LIMITE_PAR_DEFAUT)
+
+
+class _IndexInverse:
+    """Un `TermeRecherche` par (objet, terme), au poids du meilleur champ."""
+
+    def indexer(self, type_objet, ids, documents):
+        lignes = []
+        for objet_id, champs in documents.items():
+            poids_par_terme = {}
+            for texte, poids in champs:
+                for terme in termes(texte):
+                    poids_par_terme[terme] = max(poids, poids_par_terme.get(terme, 0))
+            lignes.extend(
+                TermeRecherche(type_objet=type_objet, objet_id=objet_id, terme=t, poids=p)
+                for t, p in poids_par_terme.items()
+            )
+        with transaction.atomic():
+            TermeRecherche.objects.filter(type_objet=type_objet, objet_id__in=ids).delete()
+            TermeRecherche.objects.bulk_create(lignes, batch_size=LOT)
+
+    def rechercher(self, type_objet, termes_requete, limite):
+        # Préfixe par intervalle [t, t + "{") : les termes ne contiennent que
+        # [a-z0-9], tous inférieurs à "{" ; l'index est utilisable, ce qui
+        # n'est pas le cas de `LIKE 't%' ESCAPE …` sous SQLite.
+        conditions = [Q(terme__gte=t, terme__lt=f"{t}{{") for t in termes_requete]
+        filtre = Q()
+        for condition in conditions:
+            filtre |= condition
+        par_terme = {
+            f"t{i}": Max(Case(When(condition, then=F("poids")), default=Value(0)))
+            for i, condition in enumerate(conditions)
+        }
+        qs = (
+            TermeRecherche.objects.filter(filtre, type_objet=type_objet)
+            .values("objet_id")
+            .annotate(**par_terme)
+            .filter(**{f"{nom}__gt": 0 for nom in par_terme})
+            .annotate(score=sum((F(nom) for nom in par_terme), Value(0)))
+            .order_by("-score", "-objet_id")
+        )
+        return list(qs.values_list("objet_id", flat=True)[:limite])
+
+
+class _PostgresPleinTexte:
+    """Un `DocumentRecherche` par objet : texte complet et titre normalisés."""
+
+    def indexer(self, type_objet, ids, documents):
+        lignes = [
+            DocumentRecherche(
+                type_objet=type_objet,
+                objet_id=objet_id,
+                titre=" ".join(normaliser(t) for t, p in champs if t and p >= POIDS_TITRE),
+                texte=" ".join(normaliser(t) for t, _p in champs if t),
+            )
+            for objet_id, champs in documents.items()
+        ]
+        with transaction.atomic():
+            DocumentRecherche.objects.filter(type_objet=type_objet, objet_id__in=ids).delete()
+            DocumentRecherche.objects.bulk_create(lignes, batch_size=LOT)
+
+    def rechercher(self, type_objet, termes_requete, limite):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVector,
+            TrigramWordSimilarity,
+        )
+
+        # Même expression que l'index GIN plein texte de la migration.
+        vecteur = SearchVector("texte", config="french")
+        requete = SearchQuery(
+            " & ".join(f"{t}:*" for t in termes_requete), config="french", search_type="raw"
+        )
+        sous_chaines = Q()
+        for t in termes_requete:
+            sous_chaines &= Q(texte__contains=t)
+        qs = (
+            DocumentRecherche.objects.filter(type_objet=type_objet)
+            .annotate(vecteur=vecteur)
+            .filter(Q(vecteur=requete) | sous_chaines)
+            .annotate(
+                score=SearchRank(F("vecteur"), requete)
+                + TrigramWordSimilarity(Value(" ".join(termes_requete)), "titre")
+            )
+            .order_by("-score", "-objet_id")
+        )
+        return list(qs.values_list("objet_id", flat=True)[:limite])
+
+
+def moteur(vendor=None):
+    return (
+        _PostgresPleinTexte() if (vendor or connection.vendor) == "postgresql" else _IndexInverse()
+    )
+
+
+def reindexer(type_objet, ids) -> int:
+    """Recalcule les documents de ces objets. Retourne le nombre indexé."""
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return 0
+    documents = import_string(SOURCES[type_objet])(ids)
+    moteur().indexer(type_objet, ids, documents)
+    return len(documents)
+
+
+def rechercher(type_objet, requete, limite=None) -> list:
+    """Identifiants correspondant à `requete`, du plus pertinent au moins
+    pertinent, au plus `limite` (défaut : `RECHERCHE_LIMITE_RESULTATS`).
+    Requête sans terme cherchable (vide, mots vides seuls) : aucun."""
+    termes_requete = termes(requete)
+    if not termes_requete:
+        return []
+    return moteur().rechercher(type_objet, termes_requete, limite or limite_resultats())
+
+
+def filtrer_par_pertinence(qs, type_objet, requete, limite=None):
+    """`qs` restreint aux résultats de `requete`, ordonné par pertinence."""
+    ids = rechercher(type_objet, requete, limite)
+    if not ids:
+        return qs.none()
+    rang = Case(
+        *(When(pk=pk, then=Value(i)) for i, pk in enumerate(ids)), output_field=IntegerField()
+    )
+    return qs.filter(pk__in=ids).order_by(rang)
@@ -116,6 +116,19 @@ PARAMS_PAGINATION = [
     ),
 ]
 
+# Vues en pagination keyset (YekiKeysetPagination) : `cursor` en plus —
+# `page` reste accepté pour les anciens clients (repli page-numéro).
+PARAMS_PAGINATION_KEYSET = [
+    OpenApiParameter(
+        "cursor",
+        OpenApiTypes.STR,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Curseur opaque, tel que fourni par `next`/`previous`.",
+    ),
+    *PARAMS_PAGINATION,
+]
+
 EXEMPLE_PAGINATION = OpenApiExample(
     name="Réponse paginée",
     summary="Enveloppe de pagination standard (YekiPageNumberPagination)",
@@ -128,3 +141,16 @@ EXEMPLE_PAGINATION = OpenApiExample(
     response_only=True,
     status_codes=["200"],
 )
+
+# Vues à GET conditionnel (apps/core/versions_contenu.py) : la réponse 200
+# porte un `ETag` ; le renvoyer dans `If-None-Match` donne un 304 sans corps
+# tant que le contenu n'a pas changé.
+PARAMS_GET_CONDITIONNEL = [
+    OpenApiParameter(
+        "If-None-Match",
+        OpenApiTypes.STR,
+        OpenApiParameter.HEADER,
+        required=False,
+        description="ETag d'une réponse précédente : 304 sans corps si le contenu est inchangé.",
+    ),
+]
@@ -1,8 +1,34 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from apps.core.images import urls_derivees
 from apps.core.models import HistoriqueActivite, AppVersion
 
 
+@extend_schema_field(OpenApiTypes.OBJECT)
+class ImagesDeriveesField(serializers.Field):
+    """
+    URLs des versions réduites d'un champ image (apps/core/images.py) :
+    `{"48": {"webp": url, "jpeg": url}, …}`, ou `null` tant qu'aucune
+    n'existe (le client garde alors l'URL d'origine). `source` pointe sur
+    l'objet qui porte l'image (`"*"` par défaut, `"user.profile"` pour un
+    auteur, …).
+    """
+
+    def __init__(self, champ, **kwargs):
+        self.champ = champ
+        kwargs.setdefault("source", "*")
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        fichier = getattr(obj, self.champ)
+        return urls_derivees(
+            getattr(obj, f"{self.champ}_derivees"), self.context.get("request"), fichier.storage
+        )
+
+
 class HistoriqueActiviteSerializer(serializers.ModelSerializer):
     action_label = serializers.CharField(source="get_action_display", read_only=True)
     user_nom = serializers.SerializerMethodField()
@@ -64,3 +90,10 @@ class AppVersionCreateSerializer(serializers.ModelSerializer):
             "is_active",
             "file_size",
         ]
+
+
+class UrlMediaSigneeSerializer(serializers.Serializer):
+    """URL de lecture signée d'un média (apps/core/diffusion_medias.py)."""
+
+    url = serializers.URLField()
+    expire_le = serializers.DateTimeField()
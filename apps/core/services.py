@@ -1,4 +1,8 @@
+from datetime import timedelta
+
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Max, Q
 from django.utils import timezone
 
 
@@ -228,3 +232,76 @@ def _get_client_ip(request):
     if x_forwarded:
         return x_forwarded.split(",")[0].strip()
     return request.META.get("REMOTE_ADDR")
+
+
+# Catégories exposées par `HistoriqueStatsView` (contrat de réponse figé —
+# distinct de `HistoriqueActiviteView.CATEGORIES`, qui sert au filtrage).
+CATEGORIES_STATS_ACTIVITE = {
+    "cours": ["course_created", "course_modified", "course_deleted"],
+    "modules": ["module_created", "module_modified", "module_deleted"],
+    "lecons": ["lesson_created", "lesson_modified", "lesson_deleted"],
+    "devoirs": ["homework_created", "homework_modified", "homework_graded"],
+    "exercices": ["exercise_created", "question_added"],
+    "olympiades": ["olympiad_created", "olympiad_closed", "ranking_computed"],
+    "enseignants": [
+        "teacher_assigned",
+        "teacher_changed",
+        "secondary_added",
+        "secondary_removed",
+    ],
+    "corrections": ["submission_graded", "homework_graded"],
+}
+
+# Filet de sécurité : les fenêtres "cette semaine"/"ce mois" glissent avec
+# le temps même sans nouvelle activité — l'invalidation à l'écriture ne
+# suffit donc pas à elle seule.
+STATS_ACTIVITE_TTL = 300
+
+
+def _cle_stats_activite(user_id):
+    return f"historique_stats:{user_id}"
+
+
+def invalider_stats_activite(user_id):
+    """Appelé à chaque écriture effective du journal (apps/core/journal.py)."""
+    cache.delete(_cle_stats_activite(user_id))
+
+
+def stats_activite(user):
+    """
+    Statistiques d'activité de `user` (`HistoriqueStatsView`) en UNE requête
+    d'agrégation conditionnelle — total, fenêtres semaine/mois, chaque
+    catégorie et dernière activité — au lieu de 10+ `count()` successifs,
+    servie depuis le cache par utilisateur (voir `invalider_stats_activite`).
+    """
+    cle = _cle_stats_activite(user.pk)
+    stats = cache.get(cle)
+    if stats is not None:
+        return stats
+
+    from apps.core.models import HistoriqueActivite
+
+    now = timezone.now()
+    semaine_debut = now - timedelta(days=7)
+    mois_debut = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    agregats = HistoriqueActivite.objects.filter(user=user).aggregate(
+        total=Count("id"),
+        cette_semaine=Count("id", filter=Q(timestamp__gte=semaine_debut)),
+        ce_mois=Count("id", filter=Q(timestamp__gte=mois_debut)),
+        derniere=Max("timestamp"),
+        **{
+            f"categorie_{cat}": Count("id", filter=Q(action__in=actions))
+            for cat, actions in CATEGORIES_STATS_ACTIVITE.items()
+        },
+    )
+
+    stats = {
+        "total": agregats["total"],
+        "cette_semaine": agregats["cette_semaine"],
+        "ce_mois": agregats["ce_mois"],
+        "categories": {cat: agregats[f"categorie_{cat}"] for cat in CATEGORIES_STATS_ACTIVITE},
+        "derniere_activite": agregats["derniere"].isoformat() if agregats["derniere"] else None,
+    }
+    cache.set(cle, stats, timeout=STATS_ACTIVITE_TTL)
+    return stats
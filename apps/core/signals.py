@@ -3,10 +3,14 @@ Signaux core (P2.4). Connectés depuis CoreConfig.ready().
 """
 
 from django.core.cache import cache
-from django.db.models.signals import post_delete, post_save
+from django.core.signals import request_finished
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from apps.core.models import ParametreSysteme
+from apps.core import cache_reponses, versions_app
+from apps.core.journal import tampon_activites
+from apps.core.models import AppVersion, ParametreSysteme
+from apps.core.versions_contenu import TYPE_PARAMETRES_PUBLICS, incrementer
 
 
 @receiver(post_save, sender=ParametreSysteme)
@@ -18,3 +22,44 @@ def _invalider_cache_parametre(sender, instance, **kwargs):
     redéploiement ni redémarrage du process (voir ParametreSysteme.get()).
     """
     cache.delete(ParametreSysteme._cache_key(instance.cle))
+    # ETag de `ParametresPubliquesView` (apps/core/versions_contenu.py).
+    incrementer(TYPE_PARAMETRES_PUBLICS)
+
+
+@receiver(post_save, sender=AppVersion)
+@receiver(post_delete, sender=AppVersion)
+def _invalider_versions_app(sender, instance, **kwargs):
+    """
+    Fiches « dernière version » servies au démarrage de l'application
+    (apps/core/versions_app.py) : recalculées après chaque publication,
+    que ce soit par l'admin, l'API ou `publier_version_android`.
+    """
+    versions_app.invalider()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def _invalider_reponses_en_cache(sender, **kwargs):
+    """
+    Réponses gardées par `@reponse_en_cache` (apps/core/cache_reponses.py) :
+    toute écriture sur un modèle déclaré dans `POINTS` invalide les
+    endpoints qui en dépendent. Simple recherche de label pour les autres.
+    """
+    cache_reponses.modele_modifie(sender)
+
+
+@receiver(m2m_changed)
+def _invalider_reponses_en_cache_m2m(sender, instance, action, model, **kwargs):
+    if action.startswith("post_"):
+        cache_reponses.modele_modifie(type(instance))
+        cache_reponses.modele_modifie(model)
+
+
+@receiver(request_finished)
+def _vider_journal_activite(sender, **kwargs):
+    """
+    Fin de requête = vidage du tampon du journal d'activité (voir
+    apps/core/journal.py) : les événements d'une requête sont visibles dès
+    la requête suivante, sans attendre le seuil de taille ou de délai.
+    """
+    tampon_activites.vider()
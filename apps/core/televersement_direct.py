@@ -0,0 +1,302 @@
+"""
+Téléversement direct des gros fichiers vers le stockage.
+
+La vidéo et le PDF d'une leçon passaient par Django : le fichier entier
+traversait Daphne (mémoire, disque temporaire) avant d'être renvoyé au
+bucket, soit deux fois la bande passante. Ici, Django ne voit plus que
+des métadonnées :
+
+1. le client annonce le fichier (nom, taille, type) ; `ouvrir()` crée une
+   `SessionTeleversement` et retourne une URL d'upload signée et reprenable ;
+2. le client envoie le fichier à cette URL, par morceaux `Content-Range`
+   (protocole d'upload reprenable de Google Cloud Storage) ;
+3. `finaliser()` vérifie l'objet reçu (taille, type annoncé, signature
+   des premiers octets) et l'attache au champ de l'objet porteur par
+   `save(update_fields=…)`, donc avec les signaux habituels. Un fichier
+   non conforme est supprimé du stockage.
+
+Deux signataires, choisis selon le stockage du champ :
+
+- `GoogleCloudStorage` (production, Firebase Storage) : session d'upload
+  reprenable GCS, dont l'URI sert d'autorisation, taille imposée ;
+- `FileSystemStorage` (développement, tests) : URL de l'endpoint
+  `televersement-direct-contenu`, jeton signé (`django.core.signing`), qui
+  reproduit le même protocole sur le disque.
+
+Le nom final reçoit toujours un suffixe aléatoire : le client écrit avant
+toute vérification, il ne doit pas pouvoir écraser le fichier d'une autre
+leçon (`GS_FILE_OVERWRITE` vaut vrai par défaut).
+"""
+
+import os
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.models import SessionTeleversement
+
+MIO = 1024 * 1024
+
+# (label du modèle, champ) → types acceptés et taille maximale.
+CHAMPS = {
+    ("formation.Lecon", "video"): {
+        "types": ("video/mp4", "video/quicktime", "video/webm"),
+        "taille_max": 2048 * MIO,
+    },
+    ("formation.Lecon", "fichier_pdf"): {
+        "types": ("application/pdf",),
+        "taille_max": 100 * MIO,
+    },
+}
+
+# Premiers octets attendus pour chaque type : le type annoncé n'est qu'un
+# en-tête choisi par le client.
+_BOITES_ISO = (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip")
+SIGNATURES = {
+    "application/pdf": lambda debut: debut.startswith(b"%PDF-"),
+    "video/mp4": lambda debut: debut[4:8] == b"ftyp",
+    "video/quicktime": lambda debut: debut[4:8] in _BOITES_ISO,
+    "video/webm": lambda debut: debut.startswith(b"\x1a\x45\xdf\xa3"),
+}
+OCTETS_SIGNATURE = 16
+
+SEL_JETON = "apps.core.televersement_direct"
+TAILLE_MORCEAU = 64 * 1024
+
+
+class TeleversementRefuse(Exception):
+    """Fichier reçu non conforme à la session (message pour le client)."""
+
+
+def duree() -> timedelta:
+    return timedelta(hours=settings.TELEVERSEMENT_DIRECT_DUREE_HEURES)
+
+
+# ── Signataires ─────────────────────────────────────────────────────────
+
+
+class _SignataireGCS:
+    """Session d'upload reprenable Google Cloud Storage (django-storages)."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def _blob(self, nom):
+        from storages.utils import clean_name
+
+        return self.storage.bucket.blob(self.storage._normalize_name(clean_name(nom)))
+
+    def instructions(self, session, request):
+        url = self._blob(session.nom_cible).create_resumable_upload_session(
+            content_type=session.type_contenu,
+            size=session.taille,
+            origin=request.headers.get("Origin"),
+        )
+        return {"url": url, "methode": "PUT", "entetes": {"Content-Type": session.type_contenu}}
+
+    def decrire(self, session):
+        blob = self._blob(session.nom_cible)
+        if not blob.exists():
+            return None
+        blob.reload()
+        return blob.size, blob.content_type
+
+    def debut(self, session, n):
+        return self._blob(session.nom_cible).download_as_bytes(start=0, end=n - 1)
+
+    def supprimer(self, session):
+        self.storage.delete(session.nom_cible)
+
+
+class _SignataireLocal:
+    """Endpoint Django signé, écriture sur le disque du `FileSystemStorage`."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def instructions(self, session, request):
+        jeton = signing.TimestampSigner(salt=SEL_JETON).sign(str(session.pk))
+        url = request.build_absolute_uri(reverse("televersement-direct-contenu", args=[jeton]))
+        return {"url": url, "methode": "PUT", "entetes": {"Content-Type": session.type_contenu}}
+
+    def decrire(self, session):
+        if not self.storage.exists(session.nom_cible):
+            return None
+        # Le type est imposé à la réception (`recevoir`), comme GCS le fige
+        # à l'ouverture de la session.
+        return self.storage.size(session.nom_cible), session.type_contenu
+
+    def debut(self, session, n):
+        with self.storage.open(session.nom_cible, "rb") as fichier:
+            return fichier.read(n)
+
+    def supprimer(self, session):
+        self.storage.delete(session.nom_cible)
+
+    def recus(self, session) -> int:
+        chemin = self.storage.path(session.nom_cible)
+        return os.path.getsize(chemin) if os.path.exists(chemin) else 0
+
+    def recevoir(self, session, flux, debut, longueur) -> int:
+        """Ajoute `longueur` octets de `flux` à partir de `debut`, qui doit
+        être la taille déjà reçue (sinon rien n'est écrit : le client
+        reprend d'après la plage renvoyée). Retourne la taille reçue."""
+        chemin = self.storage.path(session.nom_cible)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        recus = self.recus(session)
+        if debut == 0 and recus:
+            # Envoi repris depuis le début : on repart d'un fichier vide.
+            open(chemin, "wb").close()
+            recus = 0
+        if debut != recus:
+            return recus
+        with open(chemin, "ab") as destination:
+            reste = longueur
+            while reste > 0:
+                morceau = flux.read(min(TAILLE_MORCEAU, reste))
+                if not morceau:
+                    break
+                destination.write(morceau)
+                reste -= len(morceau)
+        return self.recus(session)
+
+
+_CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)")
+
+
+def plage(content_range, longueur_corps, taille):
+    """Morceau désigné par l'en-tête `Content-Range` d'un envoi vers
+    `_SignataireLocal` : (début, longueur), ou None pour une simple demande
+    d'état (`bytes */<taille>`). Sans en-tête, le corps est le fichier
+    entier. Lève ValueError pour une plage invalide ou hors de `taille`."""
+    if not content_range:
+        debut, fin = 0, longueur_corps - 1
+    else:
+        correspondance = _CONTENT_RANGE.fullmatch(content_range.strip())
+        if correspondance is None:
+            raise ValueError("En-tête Content-Range invalide.")
+        premier, dernier, total = correspondance.groups()
+        if total != "*" and int(total) != taille:
+            raise ValueError("La taille totale ne correspond pas à la taille annoncée.")
+        if premier is None:
+            return None
+        debut, fin = int(premier), int(dernier)
+    if fin < debut or fin >= taille or fin - debut + 1 != longueur_corps:
+        raise ValueError("Plage hors du fichier annoncé.")
+    return debut, fin - debut + 1
+
+
+def signataire(storage):
+    if type(storage).__module__.startswith("storages.backends.gcloud"):
+        return _SignataireGCS(storage)
+    if isinstance(storage, FileSystemStorage):
+        return _SignataireLocal(storage)
+    raise ImproperlyConfigured(f"Téléversement direct impossible vers {type(storage).__name__}.")
+
+
+def _champ(session):
+    return apps.get_model(session.modele)._meta.get_field(session.champ)
+
+
+def signataire_de(session):
+    return signataire(_champ(session).storage)
+
+
+def session_du_jeton(jeton):
+    """Session désignée par un jeton de `_SignataireLocal`, ou None si le
+    jeton est invalide ou expiré."""
+    try:
+        pk = signing.TimestampSigner(salt=SEL_JETON).unsign(jeton, max_age=duree().total_seconds())
+    except signing.BadSignature:
+        return None
+    return SessionTeleversement.objects.filter(pk=pk).first()
+
+
+# ── Cycle d'une session ─────────────────────────────────────────────────
+
+
+def ouvrir(instance, champ, nom_fichier, taille, type_contenu, request):
+    """Crée la session d'upload de `instance.champ`. Retourne
+    (session, instructions d'upload pour le client)."""
+    field = instance._meta.get_field(champ)
+    racine, extension = os.path.splitext(field.generate_filename(instance, nom_fichier))
+    session = SessionTeleversement.objects.create(
+        modele=instance._meta.label,
+        objet_id=instance.pk,
+        champ=champ,
+        nom_cible=field.storage.get_alternative_name(racine, extension.lower()),
+        taille=taille,
+        type_contenu=type_contenu,
+        cree_par=request.user,
+        expire_le=timezone.now() + duree(),
+    )
+    return session, signataire(field.storage).instructions(session, request)
+
+
+def _verifier(session, signe):
+    description = signe.decrire(session)
+    if description is None:
+        raise TeleversementRefuse("Aucun fichier reçu pour ce téléversement.")
+    taille, type_contenu = description
+    if taille != session.taille:
+        raise TeleversementRefuse(
+            f"Fichier incomplet ou trop long : {taille} octets reçus, {session.taille} annoncés."
+        )
+    if (type_contenu or "").split(";")[0].strip() != session.type_contenu:
+        raise TeleversementRefuse(
+            f"Type reçu « {type_contenu} », « {session.type_contenu} » annoncé."
+        )
+    if not SIGNATURES[session.type_contenu](signe.debut(session, OCTETS_SIGNATURE)):
+        raise TeleversementRefuse(
+            f"Le contenu du fichier ne correspond pas au type « {session.type_contenu} »."
+        )
+
+
+def finaliser(session):
+    """Vérifie le fichier reçu et l'attache à l'objet porteur, qui est
+    retourné. Lève `TeleversementRefuse` (fichier supprimé, session
+    `rejetee`) s'il n'est pas conforme."""
+    if session.statut != "ouverte":
+        raise TeleversementRefuse("Ce téléversement n'est plus ouvert.")
+    if session.expire_le <= timezone.now():
+        raise TeleversementRefuse("Ce téléversement a expiré.")
+    signe = signataire_de(session)
+    try:
+        _verifier(session, signe)
+    except TeleversementRefuse as exc:
+        signe.supprimer(session)
+        SessionTeleversement.objects.filter(pk=session.pk).update(statut="rejetee", erreur=str(exc))
+        raise
+
+    modele = apps.get_model(session.modele)
+    with transaction.atomic():
+        # Compare-and-set : une double finalisation n'attache qu'une fois.
+        if not SessionTeleversement.objects.filter(pk=session.pk, statut="ouverte").update(
+            statut="finalisee", finalise_le=timezone.now()
+        ):
+            raise TeleversementRefuse("Ce téléversement n'est plus ouvert.")
+        objet = modele._base_manager.select_for_update().get(pk=session.objet_id)
+        setattr(objet, session.champ, session.nom_cible)
+        objet.save(update_fields=[session.champ])
+    return objet
+
+
+def purger_expirees() -> int:
+    """Supprime du stockage les fichiers des sessions ouvertes expirées
+    (uploads abandonnés) et les marque `expiree`. Retourne leur nombre."""
+    expirees = list(
+        SessionTeleversement.objects.filter(statut="ouverte", expire_le__lte=timezone.now())
+    )
+    for session in expirees:
+        signataire_de(session).supprimer(session)
+    return SessionTeleversement.objects.filter(
+        pk__in=[s.pk for s in expirees], statut="ouverte"
+    ).update(statut="expiree")
@@ -0,0 +1,397 @@
+"""
+Jeu de données « réaliste » du harnais de budgets par endpoint
+(test_budgets_endpoints.py, voir docs/BUDGETS_ENDPOINTS.md).
+
+Volontairement plus gros que les fixtures de conftest.py : un N+1 ne se
+voit pas sur un département à un apprenant. Le volume est piloté par
+`YEKI_BUDGETS_ECHELLE` (nombre d'apprenants, 2000 par défaut) ; tout le
+reste en découle.
+
+Écriture par `bulk_create` (mots de passe inutilisables : pas de hachage
+PBKDF2 à payer des milliers de fois). Les comptes « acteurs » — un par
+rôle, ceux qui appellent les endpoints — sont créés comme dans
+conftest.py, avec un token DRF.
+"""
+
+import os
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import Profile
+from apps.core.models import AppVersion, HistoriqueActivite
+from apps.evaluation.models import (
+    Choix,
+    ChoixReponse,
+    ClassementOlympiade,
+    Devoir,
+    EvaluationExercice,
+    Exercice,
+    InscriptionOlympiade,
+    Olympiade,
+    Question,
+    QuestionDevoir,
+    RangApprenant,
+    SoumissionDevoir,
+)
+from apps.formation.models import Cours, Departement, Lecon, Module, Parcours, ProgressionLecon
+from apps.forum.models import QuestionForum, ReponseQuestion
+from apps.ia.models import YekiIAChatHistorique
+from apps.notifications.models import Notification
+from apps.paiement.models import AbonnementPremium, Paiement
+from apps.repetiteurs.models import Repetiteur
+
+ECHELLE_DEFAUT = 2000
+
+# Rôles des comptes acteurs, dans l'ordre où le mode enregistrement les
+# essaie pour un endpoint (le premier qui obtient un 2xx est retenu).
+ROLES = (
+    "apprenant",
+    "enseignant_principal",
+    "enseignant_cadre",
+    "enseignant_admin",
+    "admin",
+    "service_client",
+    "enseignant",
+)
+
+NB_COURS_PAR_DEPARTEMENT = 3
+NB_MODULES_PAR_COURS = 3
+NB_LECONS_PAR_MODULE = 3
+NB_QUESTIONS = 5
+NB_CHOIX = 4
+NB_SUJETS_FORUM = 50
+NB_REPONSES_PAR_SUJET = 5
+
+
+def echelle() -> int:
+    return int(os.environ.get("YEKI_BUDGETS_ECHELLE", ECHELLE_DEFAUT))
+
+
+class JeuDeDonnees:
+    """Identifiants utiles aux endpoints, remplis par `semer()`."""
+
+    def __init__(self):
+        self.acteurs = {}  # rôle → User
+        self.tokens = {}  # rôle → clé de token
+        self.ids = {}  # nom de paramètre d'URL → valeur
+
+
+def _acteur(jeu, role, departement=None):
+    user = User.objects.create_user(
+        username=f"budget_{role}", email=f"budget_{role}@yeki.test", password="Test1234!"
+    )
+    Profile.objects.create(
+        user=user,
+        user_type=role,
+        departement=departement,
+        cursus="Cursus Budget",
+        niveau="Terminale",
+        is_active=True,
+    )
+    jeu.acteurs[role] = user
+    jeu.tokens[role] = Token.objects.create(user=user).key
+    return user
+
+
+def _apprenants(nb, departement, prefixe):
+    mot_de_passe = make_password(None)
+    users = User.objects.bulk_create(
+        [
+            User(username=f"{prefixe}{i}", email=f"{prefixe}{i}@yeki.test", password=mot_de_passe)
+            for i in range(nb)
+        ]
+    )
+    Profile.objects.bulk_create(
+        [
+            Profile(
+                user=u,
+                user_type="apprenant",
+                departement=departement,
+                cursus="Cursus Budget",
+                niveau="Terminale",
+                is_active=True,
+            )
+            for u in users
+        ]
+    )
+    return users
+
+
+def _questions_exercice(exercice):
+    questions = Question.objects.bulk_create(
+        [
+            Question(
+                exercice=exercice,
+                text=f"Question {q}",
+                type_question="qcm",
+                bonne_reponse="Choix 0",
+            )
+            for q in range(NB_QUESTIONS)
+        ]
+    )
+    Choix.objects.bulk_create(
+        [
+            Choix(question=q, texte=f"Choix {c}", est_correct=c == 0, ordre=c)
+            for q in questions
+            for c in range(NB_CHOIX)
+        ]
+    )
+
+
+def _questions_devoir(devoir):
+    questions = QuestionDevoir.objects.bulk_create(
+        [
+            QuestionDevoir(devoir=devoir, enonce=f"Question {q}", type_question="qcm", ordre=q)
+            for q in range(NB_QUESTIONS)
+        ]
+    )
+    ChoixReponse.objects.bulk_create(
+        [
+            ChoixReponse(question=q, texte=f"Choix {c}", est_correct=c == 0, ordre=c)
+            for q in questions
+            for c in range(NB_CHOIX)
+        ]
+    )
+
+
+def semer() -> JeuDeDonnees:
+    jeu = JeuDeDonnees()
+    maintenant = timezone.now()
+    nb = echelle()
+
+    admin_parcours = _acteur(jeu, "enseignant_admin")
+    cadre = _acteur(jeu, "enseignant_cadre")
+    principal = _acteur(jeu, "enseignant_principal")
+    enseignant = _acteur(jeu, "enseignant")
+    # L'admin général est aussi `is_staff` (AdminVersionListView).
+    User.objects.filter(pk=_acteur(jeu, "admin").pk).update(is_staff=True)
+    _acteur(jeu, "service_client")
+
+    parcours = Parcours.objects.create(
+        nom="Cursus Budget", type_parcours="cursus", admin=admin_parcours.profile
+    )
+    departements = [
+        Departement.objects.create(nom=f"Département {d}", parcours=parcours, cadre=cadre.profile)
+        for d in range(2)
+    ]
+    departement = departements[0]
+    apprenant = _acteur(jeu, "apprenant", departement=departement)
+    AbonnementPremium.objects.create(
+        utilisateur=apprenant,
+        departement=departement,
+        type_abonnement="mensuel",
+        actif=True,
+        fin=maintenant + timedelta(days=30),
+    )
+
+    # Deux tiers des apprenants dans le département principal.
+    apprenants = _apprenants(nb * 2 // 3, departement, "budget_a")
+    _apprenants(nb - len(apprenants), departements[1], "budget_b")
+    echantillon = apprenants[: max(1, nb // 10)]
+
+    cours_tous, lecons, exercices, devoirs = [], [], [], []
+    for dep in departements:
+        for c in range(NB_COURS_PAR_DEPARTEMENT):
+            cours = Cours.objects.create(
+                titre=f"Cours {dep.nom} {c}",
+                niveau="Terminale",
+                departement=dep,
+                enseignant_principal=principal.profile,
+                matiere="Mathématiques",
+            )
+            cours.enseignants.add(enseignant.profile)
+            cours_tous.append(cours)
+            for m in range(NB_MODULES_PAR_COURS):
+                module = Module.objects.create(titre=f"Module {m}", cours=cours, ordre=m + 1)
+                lecons += Lecon.objects.bulk_create(
+                    [
+                        Lecon(
+                            titre=f"Leçon {m}.{i}",
+                            module=module,
+                            cours=cours,
+                            description="Contenu.",
+                            fichier_pdf=f"lecons/pdf/lecon-{m}-{i}.pdf",
+                            created_by=principal.profile,
+                        )
+                        for i in range(NB_LECONS_PAR_MODULE)
+                    ]
+                )
+                exercice = Exercice.objects.create(
+                    cours=cours,
+                    module=module,
+                    titre=f"Exercice {m}",
+                    enonce="Énoncé.",
+                    etoiles=1,
+                    nb_questions=NB_QUESTIONS,
+                )
+                _questions_exercice(exercice)
+                exercices.append(exercice)
+            for d in range(2):
+                devoir = Devoir.objects.create(
+                    titre=f"Devoir {d}",
+                    enonce="Énoncé du devoir.",
+                    date_debut=maintenant - timedelta(days=1),
+                    date_limite=maintenant + timedelta(days=7),
+                    cours_lie=cours,
+                    est_publie=True,
+                    cree_par=principal.profile,
+                )
+                _questions_devoir(devoir)
+                devoirs.append(devoir)
+
+    cours = cours_tous[0]
+    participants = [apprenant] + echantillon
+
+    # ── Activité des apprenants sur le cours principal ─────────────────
+    ProgressionLecon.objects.bulk_create(
+        [
+            ProgressionLecon(apprenant=u, lecon=lecon, cours=cours, pourcentage=100, terminee=True)
+            for u in participants
+            for lecon in lecons[: NB_MODULES_PAR_COURS * NB_LECONS_PAR_MODULE]
+        ]
+    )
+    EvaluationExercice.objects.bulk_create(
+        [
+            EvaluationExercice(user=u, exercice=e, score=3, total=NB_QUESTIONS)
+            for u in participants
+            for e in exercices[:NB_MODULES_PAR_COURS]
+        ]
+    )
+    SoumissionDevoir.objects.bulk_create(
+        [
+            SoumissionDevoir(
+                utilisateur=u, devoir=d, statut="corrige", soumis_le=maintenant, note=12
+            )
+            for u in participants
+            for d in devoirs[:2]
+        ]
+    )
+    RangApprenant.objects.bulk_create(
+        [
+            RangApprenant(apprenant=u, departement=departement, score=nb - i, rang=i + 1)
+            for i, u in enumerate([apprenant] + apprenants)
+        ]
+    )
+
+    # ── Olympiade terminée : inscriptions et classement publié ─────────
+    devoir_olympiade = Devoir.objects.create(
+        titre="Devoir olympiade",
+        enonce="Énoncé.",
+        type_devoir="olympiade",
+        date_limite=maintenant + timedelta(days=30),
+        est_publie=True,
+    )
+    _questions_devoir(devoir_olympiade)
+    olympiade = Olympiade.objects.create(
+        titre="Olympiade Budget",
+        date_ouverture_inscription=maintenant - timedelta(days=20),
+        date_cloture_inscription=maintenant - timedelta(days=10),
+        date_debut_olympiade=maintenant - timedelta(days=3),
+        date_fin_olympiade=maintenant - timedelta(days=2),
+        devoir=devoir_olympiade,
+        organisateur=cadre.profile,
+        cree_par=cadre,
+        est_validee=True,
+        prix_participation=0,
+    )
+    InscriptionOlympiade.objects.bulk_create(
+        [InscriptionOlympiade(olympiade=olympiade, apprenant=u) for u in participants]
+    )
+    ClassementOlympiade.objects.bulk_create(
+        [
+            ClassementOlympiade(olympiade=olympiade, apprenant=u, rang=i + 1, note=20 - i % 20)
+            for i, u in enumerate(participants)
+        ]
+    )
+
+    # ── Forum ───────────────────────────────────────────────────────────
+    sujets = QuestionForum.objects.bulk_create(
+        [
+            QuestionForum(
+                auteur=participants[i % len(participants)],
+                contenu=f"Question de forum {i}",
+                cours_id=cours.id,
+                cours_titre=cours.titre,
+            )
+            for i in range(NB_SUJETS_FORUM)
+        ]
+    )
+    ReponseQuestion.objects.bulk_create(
+        [
+            ReponseQuestion(
+                question=s, auteur=participants[r % len(participants)], contenu="Réponse"
+            )
+            for s in sujets
+            for r in range(NB_REPONSES_PAR_SUJET)
+        ]
+    )
+
+    # ── Paiements, notifications, journal, IA, versions, répétiteurs ────
+    Paiement.objects.bulk_create(
+        [
+            Paiement(
+                utilisateur=u,
+                type_paiement="abonnement_mensuel",
+                moyen="cinetpay",
+                montant=1000,
+                statut="succes",
+                reference=f"BUDGET-{i}",
+                departement=departement,
+            )
+            for i, u in enumerate(participants)
+        ]
+    )
+    Notification.objects.bulk_create(
+        [
+            Notification(utilisateur=u, titre="Nouveau devoir", contenu="Un devoir est publié.")
+            for u in participants
+            for _ in range(3)
+        ]
+    )
+    HistoriqueActivite.objects.bulk_create(
+        [
+            HistoriqueActivite(user=apprenant, action="connexion", description="Connexion")
+            for _ in range(200)
+        ]
+    )
+    YekiIAChatHistorique.objects.bulk_create(
+        [
+            YekiIAChatHistorique(apprenant=apprenant, cours=cours, role="user", contenu="Bonjour")
+            for _ in range(20)
+        ]
+    )
+    AppVersion.objects.create(
+        platform="android",
+        version_code=10,
+        version_name="v1.0.10",
+        download_url="https://yeki.test/yeki.apk",
+        checksum_sha256="0" * 64,
+    )
+    Profile.objects.filter(pk=enseignant.profile.pk).update(is_repetiteur=True)
+    Repetiteur.objects.create(
+        enseignant=enseignant.profile, cours=cours, ville="Douala", telephone="690000000"
+    )
+
+    jeu.ids = {
+        "parcours_id": parcours.id,
+        "departement_id": departement.id,
+        "cours_id": cours.id,
+        "module_id": lecons[0].module_id,
+        "lecon_id": lecons[0].id,
+        "champ": "fichier_pdf",
+        "exercice_id": exercices[0].id,
+        "devoir_id": devoirs[0].id,
+        "olympiade_id": olympiade.id,
+        "soumission_id": SoumissionDevoir.objects.get(utilisateur=apprenant, devoir=devoirs[0]).id,
+        "room": str(cours.id),
+        "periode_debut": maintenant.date().isoformat(),
+        # `<int:pk>` : résolu d'après le préfixe de la route (voir le test).
+        "pk_departement": departement.id,
+        "pk_question_forum": sujets[0].id,
+        "pk_enseignant_admin": admin_parcours.id,
+    }
+    return jeu
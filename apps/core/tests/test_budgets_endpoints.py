@@ -0,0 +1,265 @@
+"""
+Budgets de requêtes SQL et de temps de réponse, endpoint par endpoint
+(voir docs/BUDGETS_ENDPOINTS.md).
+
+Chaque route GET de `/api/` est appelée sur le jeu de données de
+donnees_budgets.py, avec le rôle consigné dans budgets_endpoints.json ;
+le test échoue si le nombre de requêtes dépasse le budget commité, ou
+passe dessous (budget à resserrer dans le commit de l'optimisation), si le
+temps dépasse le sien, ou si le statut HTTP change. Un N+1 réintroduit
+est ainsi refusé en CI au lieu d'être découvert en production.
+
+Variables d'environnement :
+- `YEKI_BUDGETS_ENREGISTRER=1` : réécrit budgets_endpoints.json à partir
+  des mesures (premier rôle obtenant un 2xx) au lieu de les vérifier ;
+- `YEKI_BUDGETS_RAPPORT=<chemin>` : écrit le rapport JSON des mesures
+  (requêtes, ms, statut, commit) pour comparer les commits entre eux ;
+- `YEKI_BUDGETS_ECHELLE=<n>` : nombre d'apprenants semés. Les budgets de
+  requêtes ne sont vérifiés qu'à l'échelle où ils ont été enregistrés ;
+- `YEKI_BUDGETS_TEMPS=1` : vérifie aussi les budgets de temps. Sinon le
+  temps est seulement mesuré (rapport) : il dépend de la machine.
+"""
+
+import json
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from django.urls.resolvers import URLResolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.tests.donnees_budgets import ROLES, echelle, semer
+
+FICHIER_BUDGETS = Path(__file__).with_name("budgets_endpoints.json")
+
+# Marge appliquée aux mesures lors de l'enregistrement : aucune sur les
+# requêtes (déterministes), large sur le temps (machines de CI variables).
+MARGE_TEMPS = 5
+PLANCHER_MS = 250
+
+# Routes GET volontairement hors harnais.
+EXCLUES = {
+    "api/schema/": "génération du schéma OpenAPI, pas un endpoint métier",
+    "api/docs/": "page Swagger UI",
+    "api/paiements/cinetpay/verifier/<str:reference>/": "appel réseau à l'API CinetPay",
+    "api/medias/<str:jeton>/<str:fichier>": (
+        "jeton signé émis par api/lecons/<id>/medias/<champ>/ ; aucune requête SQL, "
+        "vérifié par test_diffusion_medias.py"
+    ),
+}
+
+# `<int:pk>` n'a pas le même sens selon la ressource : résolu par préfixe.
+PK_PAR_PREFIXE = {
+    "api/departements/": "pk_departement",
+    "api/apprenant/departement/": "pk_departement",
+    "api/forum/questions/": "pk_question_forum",
+    "api/stats/enseignant-admin/": "pk_enseignant_admin",
+}
+
+# Paramètres de requête obligatoires (400 sans eux), formatés avec les ids
+# du jeu de données.
+PARAMETRES = {
+    "api/check-update/": "platform=android&current_version=1",
+    "api/app/version/": "plateforme=android&build=1",
+    "api/enseignants/liste/": "role=principal",
+    "api/principal/apprenants_cours/": "cours_id={cours_id}",
+    "api/principal/rendus_devoirs/": "devoir_id={devoir_id}",
+    "api/classement/departement/<int:departement_id>/historique/": "periode_debut={periode_debut}",
+    "api/abonnement/statut/": "cours_id={cours_id}",
+    "api/repetiteurs/search/": "cours_id={cours_id}&ville=douala",
+}
+
+
+def _parcourir(motifs, prefixe=""):
+    for motif in motifs:
+        if isinstance(motif, URLResolver):
+            yield from _parcourir(motif.url_patterns, prefixe + str(motif.pattern))
+        else:
+            yield prefixe + str(motif.pattern), motif
+
+
+def routes_get():
+    """Routes `/api/` dont la vue DRF accepte GET, dans l'ordre des urls.py."""
+    routes = {}
+    for route, motif in _parcourir(get_resolver().url_patterns):
+        vue = getattr(motif.callback, "cls", None)
+        if route.startswith("api/") and hasattr(vue, "get") and route not in EXCLUES:
+            routes.setdefault(route, motif)
+    return routes
+
+
+ROUTES = routes_get()
+
+
+def _url(route, ids):
+    """Chemin concret de la route : les motifs sans `name` ne sont pas
+    résolvables par `reverse()`, on substitue donc dans la route elle-même."""
+
+    def valeur(m):
+        nom = m.group(1)
+        if nom == "pk":
+            return str(ids[next(c for p, c in PK_PAR_PREFIXE.items() if route.startswith(p))])
+        return str(ids[nom])
+
+    url = "/" + re.sub(r"<(?:\w+:)?(\w+)>", valeur, route)
+    if route in PARAMETRES:
+        url += "?" + PARAMETRES[route].format(**ids)
+    return url
+
+
+def _charger_budgets():
+    if FICHIER_BUDGETS.exists():
+        return json.loads(FICHIER_BUDGETS.read_text(encoding="utf-8"))
+    return {"echelle": echelle(), "endpoints": {}}
+
+
+def _commit():
+    if os.environ.get("GITHUB_SHA"):
+        return os.environ["GITHUB_SHA"]
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+ENREGISTRER = os.environ.get("YEKI_BUDGETS_ENREGISTRER") == "1"
+VERIFIER_TEMPS = os.environ.get("YEKI_BUDGETS_TEMPS") == "1"
+BUDGETS = _charger_budgets()
+
+
+@pytest.fixture(scope="module")
+def jeu(django_db_setup, django_db_blocker):
+    """
+    Sème le jeu de données UNE fois pour tout le module (des milliers de
+    lignes), dans des transactions ouvertes comme celles d'un TestCase
+    Django : chaque test y pose son propre savepoint (fixture `db`), et tout
+    est annulé à la fin du module.
+    """
+    with django_db_blocker.unblock():
+        atomics = TestCase._enter_atomics()
+        try:
+            yield semer()
+        finally:
+            TestCase._rollback_atomics(atomics)
+
+
+@pytest.fixture(scope="module")
+def mesures():
+    """Mesures du module, écrites en fin de module (rapport, enregistrement)."""
+    resultats = {}
+    yield resultats
+
+    rapport = os.environ.get("YEKI_BUDGETS_RAPPORT")
+    if rapport:
+        Path(rapport).write_text(
+            json.dumps(
+                {
+                    "commit": _commit(),
+                    "date": timezone.now().isoformat(),
+                    "echelle": echelle(),
+                    "endpoints": resultats,
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+
+    if ENREGISTRER:
+        budgets = {
+            route: {
+                "role": m["role"],
+                "statut": m["statut"],
+                "requetes": m["requetes"],
+                "ms": max(PLANCHER_MS, round(m["ms"] * MARGE_TEMPS)),
+            }
+            for route, m in sorted(resultats.items())
+        }
+        FICHIER_BUDGETS.write_text(
+            json.dumps({"echelle": echelle(), "endpoints": budgets}, indent=2, ensure_ascii=False)
+            + "\n",
+            encoding="utf-8",
+        )
+
+
+def _mesurer(jeu, role, url):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {jeu.tokens[role]}")
+    # Cache vidé : on mesure le chemin froid, seul déterministe.
+    cache.clear()
+    with CaptureQueriesContext(connection) as requetes:
+        debut = time.perf_counter()
+        response = client.get(url)
+        duree_ms = (time.perf_counter() - debut) * 1000
+    return response.status_code, len(requetes), duree_ms
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("route", list(ROUTES))
+def test_budget_endpoint(jeu, mesures, route):
+    url = _url(route, jeu.ids)
+    budget = BUDGETS["endpoints"].get(route)
+
+    if ENREGISTRER:
+        for role in ROLES:
+            statut, nb_requetes, duree_ms = _mesurer(jeu, role, url)
+            if 200 <= statut < 300:
+                break
+        else:
+            role = budget["role"] if budget else ROLES[0]
+            statut, nb_requetes, duree_ms = _mesurer(jeu, role, url)
+    else:
+        assert budget is not None, (
+            f"{route} n'a pas de budget : relancer avec YEKI_BUDGETS_ENREGISTRER=1 "
+            "(voir docs/BUDGETS_ENDPOINTS.md)."
+        )
+        role = budget["role"]
+        statut, nb_requetes, duree_ms = _mesurer(jeu, role, url)
+
+    mesures[route] = {
+        "url": url,
+        "role": role,
+        "statut": statut,
+        "requetes": nb_requetes,
+        "ms": round(duree_ms, 1),
+    }
+    if ENREGISTRER:
+        return
+
+    assert (
+        statut == budget["statut"]
+    ), f"{url} ({role}) : statut {statut}, attendu {budget['statut']}"
+    if BUDGETS["echelle"] == echelle():
+        assert nb_requetes <= budget["requetes"], (
+            f"{url} ({role}) : {nb_requetes} requêtes SQL pour un budget de "
+            f"{budget['requetes']} — N+1 réintroduit ?"
+        )
+        # Requêtes déterministes : un budget trop large laisserait revenir
+        # une régression sans échec.
+        assert nb_requetes >= budget["requetes"], (
+            f"{url} ({role}) : {nb_requetes} requêtes SQL pour un budget de "
+            f"{budget['requetes']} — budget à resserrer (YEKI_BUDGETS_ENREGISTRER=1)."
+        )
+    if VERIFIER_TEMPS:
+        assert (
+            duree_ms <= budget["ms"]
+        ), f"{url} ({role}) : {duree_ms:.0f} ms pour un budget de {budget['ms']} ms"
+
+
+@pytest.mark.skipif(ENREGISTRER, reason="budgets en cours d'enregistrement")
+def test_chaque_route_get_a_un_budget():
+    """Un nouvel endpoint GET doit entrer dans le harnais (ou dans EXCLUES)."""
+    budgets = BUDGETS["endpoints"]
+    assert sorted(set(ROUTES) - set(budgets)) == []
+    assert sorted(set(budgets) - set(ROUTES)) == []
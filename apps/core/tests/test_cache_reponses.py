@@ -0,0 +1,112 @@
+"""
+Cache de réponses (apps/core/cache_reponses.py) : second appel servi sans
+requête SQL, clé par paramètres et format, invalidation par écriture sur
+un modèle déclaré (tout de suite et au commit), permissions toujours
+vérifiées, ETag revalidé, compteurs par endpoint.
+"""
+
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core import cache_reponses
+from apps.core.models import ParametreSysteme
+from apps.formation.models import Cours, Departement
+
+
+@pytest.mark.django_db
+def test_second_appel_sans_requete_sql(client_apprenant, cours, django_assert_num_queries):
+    premier = client_apprenant.get(reverse("liste-niveaux"))
+    assert premier.data == ["Terminale"]
+
+    with django_assert_num_queries(0):
+        second = client_apprenant.get(reverse("liste-niveaux"))
+    assert second.status_code == 200
+    assert second.json() == ["Terminale"]
+    assert second["Content-Type"] == premier["Content-Type"]
+
+
+@pytest.mark.django_db
+def test_permissions_verifiees_avant_le_cache(client_apprenant, cours):
+    assert client_apprenant.get(reverse("palette-couleurs-cours")).status_code == 200
+    assert APIClient().get(reverse("palette-couleurs-cours")).status_code == 401
+
+
+@pytest.mark.django_db
+def test_invalidation_par_ecriture(client_apprenant, cours, django_capture_on_commit_callbacks):
+    client_apprenant.get(reverse("liste-niveaux"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Cours.objects.create(titre="Physique", niveau="1ère C", departement=cours.departement)
+
+    assert client_apprenant.get(reverse("liste-niveaux")).json() == ["1ère C", "Terminale"]
+
+
+@pytest.mark.django_db
+def test_cle_par_parametres_et_format(departement, django_assert_num_queries):
+    Departement.objects.create(nom="Autre", parcours=departement.parcours)
+    client = APIClient()
+    url = reverse("departements-par-parcours", args=[departement.parcours_id])
+
+    page_1 = client.get(url, {"page_size": 1})
+    page_2 = client.get(url, {"page_size": 1, "page": 2})
+    assert page_1.json()["results"] != page_2.json()["results"]
+
+    api = client.get(url, {"page_size": 1}, HTTP_ACCEPT="text/html")
+    assert api["Content-Type"].startswith("text/html")
+    with django_assert_num_queries(0):
+        json_encore = client.get(url, {"page_size": 1})
+    assert json_encore["Content-Type"] == "application/json"
+    assert json_encore.json() == page_1.json()
+
+
+@pytest.mark.django_db
+def test_etag_revalide_et_invalidation_parametre(django_capture_on_commit_callbacks):
+    client = APIClient()
+    premier = client.get(reverse("parametres-publics"))
+    assert client.get(reverse("parametres-publics"))["ETag"] == premier["ETag"]
+    assert (
+        client.get(reverse("parametres-publics"), HTTP_IF_NONE_MATCH=premier["ETag"]).status_code
+        == 304
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ParametreSysteme.objects.update_or_create(
+            cle="nom_affiche_depot", defaults={"valeur": "YEKI SARL"}
+        )
+
+    a_jour = client.get(reverse("parametres-publics"))
+    assert a_jour.json()["nom_affiche_depot"] == "YEKI SARL"
+
+
+@pytest.mark.django_db
+def test_seules_les_reponses_200_sont_gardees():
+    client = APIClient()
+    assert client.get(reverse("departements-par-parcours", args=[999])).status_code == 404
+    assert client.get(reverse("departements-par-parcours", args=[999])).status_code == 404
+    ligne = next(
+        s for s in cache_reponses.statistiques() if s["endpoint"] == "departements_parcours"
+    )
+    assert (ligne["succes"], ligne["echecs"]) == (0, 2)
+
+
+@pytest.mark.django_db
+def test_statistiques_par_endpoint(client):
+    for _ in range(3):
+        assert client.get(reverse("landing")).status_code == 200
+
+    sortie = io.StringIO()
+    call_command("stats_cache_reponses", "--reinitialiser", stdout=sortie)
+
+    landing = next(s for s in cache_reponses.statistiques() if s["endpoint"] == "landing")
+    assert landing["succes"] == 0
+    ligne = next(x for x in sortie.getvalue().splitlines() if x.startswith("landing"))
+    assert ligne.split() == ["landing", "2", "1", "67%"]
+
+
+def test_endpoint_non_declare():
+    with pytest.raises(KeyError):
+        cache_reponses.reponse_en_cache("inconnu")
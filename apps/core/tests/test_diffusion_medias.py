@@ -0,0 +1,183 @@
+"""
+Diffusion des médias par URL signée (apps/core/diffusion_medias.py) :
+URL émise après contrôle d'accès, plages `Range`/206, ETag fort et
+requêtes conditionnelles, expiration du jeton, aucune requête SQL par
+morceau, lecture asynchrone par blocs sous ASGI, envoi délégué au serveur
+frontal, redirection GCS.
+"""
+
+import asyncio
+import time
+import warnings
+from unittest import mock
+
+import pytest
+from django.core.files.base import ContentFile
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+from storages.backends.gcloud import GoogleCloudStorage
+
+from apps.core import diffusion_medias
+from apps.formation.models import Lecon
+
+VIDEO = bytes(range(256)) * 40  # 10 240 octets
+
+
+@pytest.fixture(autouse=True)
+def _bucket(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "bucket"
+
+
+@pytest.fixture
+def lecon(cours):
+    lecon = Lecon.objects.create(titre="Leçon 1", description="Intro", cours=cours)
+    lecon.video.save("cours1.mp4", ContentFile(VIDEO))
+    lecon.fichier_pdf.save("support.pdf", ContentFile(b"%PDF-1.7\n"))
+    return lecon
+
+
+def _url(client, lecon, champ="video"):
+    response = client.get(reverse("lecon-media", args=[lecon.pk, champ]))
+    assert response.status_code == 200, response.data
+    return response.data["url"]
+
+
+def _lire(client, url, **entetes):
+    response = client.get(url, **entetes)
+    corps = b"".join(response.streaming_content) if response.streaming else response.content
+    return response, corps
+
+
+@pytest.mark.django_db
+def test_acces_verifie_a_l_emission(client_apprenant, client_apprenant_premium, lecon):
+    refus = client_apprenant.get(reverse("lecon-media", args=[lecon.pk, "video"]))
+    assert refus.status_code == 403
+    # Le PDF reste accessible au palier gratuit.
+    assert _url(client_apprenant, lecon, "fichier_pdf").endswith("/support.pdf")
+
+    url = _url(client_apprenant_premium, lecon)
+    assert url.endswith("/cours1.mp4")
+    inconnu = client_apprenant_premium.get(reverse("lecon-media", args=[lecon.pk, "audio"]))
+    assert inconnu.status_code == 404
+
+
+@pytest.mark.django_db
+def test_fichier_entier_puis_plages(client, client_apprenant_premium, lecon):
+    url = _url(client_apprenant_premium, lecon)
+
+    entier, corps = _lire(client, url)
+    assert entier.status_code == 200
+    assert corps == VIDEO
+    assert entier["Content-Length"] == str(len(VIDEO))
+    assert entier["Content-Type"] == "video/mp4"
+    assert entier["Accept-Ranges"] == "bytes"
+    assert entier["ETag"].startswith('"')
+
+    partiel, corps = _lire(client, url, HTTP_RANGE="bytes=1000-1999")
+    assert partiel.status_code == 206
+    assert corps == VIDEO[1000:2000]
+    assert partiel["Content-Range"] == f"bytes 1000-1999/{len(VIDEO)}"
+    assert partiel["Content-Length"] == "1000"
+    assert partiel["ETag"] == entier["ETag"]
+
+    suite, corps = _lire(client, url, HTTP_RANGE="bytes=10000-")
+    assert (suite.status_code, corps) == (206, VIDEO[10000:])
+    fin, corps = _lire(client, url, HTTP_RANGE="bytes=-100")
+    assert (fin.status_code, corps) == (206, VIDEO[-100:])
+
+    hors_fichier, _ = _lire(client, url, HTTP_RANGE="bytes=20000-")
+    assert hors_fichier.status_code == 416
+    assert hors_fichier["Content-Range"] == f"bytes */{len(VIDEO)}"
+
+
+@pytest.mark.django_db
+def test_requetes_conditionnelles(client, client_apprenant_premium, lecon):
+    url = _url(client_apprenant_premium, lecon)
+    etag = client.get(url)["ETag"]
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    # If-Range périmé : le fichier a changé, on renvoie tout.
+    perime, corps = _lire(client, url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"ancien"')
+    assert (perime.status_code, corps) == (200, VIDEO)
+    a_jour, corps = _lire(client, url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+    assert (a_jour.status_code, corps) == (206, VIDEO[:10])
+
+
+@pytest.mark.django_db
+def test_aucune_requete_sql_par_morceau(
+    client, client_apprenant_premium, lecon, django_assert_num_queries
+):
+    url = _url(client_apprenant_premium, lecon)
+    with django_assert_num_queries(0):
+        _, corps = _lire(client, url, HTTP_RANGE="bytes=0-4095")
+    assert corps == VIDEO[:4096]
+
+
+@pytest.mark.django_db
+def test_jeton_expire_ou_falsifie(client, client_apprenant_premium, lecon, settings):
+    url = _url(client_apprenant_premium, lecon)
+    falsifie = url.replace("/medias/", "/medias/x")
+    assert client.get(falsifie).status_code == 403
+
+    plus_tard = time.time() + settings.MEDIAS_URL_DUREE_SECONDES + 1
+    with mock.patch("django.core.signing.time.time", return_value=plus_tard):
+        assert client.get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_envoi_delegue_au_serveur_frontal(client, client_apprenant_premium, lecon, settings):
+    settings.MEDIAS_SENDFILE = "x-accel-redirect"
+    url = _url(client_apprenant_premium, lecon)
+
+    response = client.get(url, HTTP_RANGE="bytes=0-9")
+
+    # nginx gère lui-même la plage et le corps.
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response["X-Accel-Redirect"] == f"/media-interne/{lecon.video.name}"
+    assert response["ETag"]
+
+
+@pytest.mark.django_db
+def test_redirection_vers_url_signee_gcs(client, client_apprenant_premium, lecon):
+    url = _url(client_apprenant_premium, lecon)
+    storage = GoogleCloudStorage(bucket_name="yeki-test")
+    bucket = mock.MagicMock()
+    bucket.blob.return_value.generate_signed_url.return_value = "https://storage.googleapis.com/x"
+
+    with mock.patch.object(GoogleCloudStorage, "bucket", bucket), mock.patch.object(
+        Lecon._meta.get_field("video"), "storage", storage
+    ):
+        response = client.get(url, HTTP_RANGE="bytes=0-9")
+
+    assert (response.status_code, response["Location"]) == (302, "https://storage.googleapis.com/x")
+    bucket.blob.assert_called_once_with(lecon.video.name)
+    assert bucket.blob.return_value.generate_signed_url.call_args.kwargs["expiration"] == (
+        diffusion_medias.duree()
+    )
+
+
+@pytest.mark.django_db
+def test_asgi_lecture_par_blocs_asynchrones(client_apprenant_premium, lecon, monkeypatch):
+    monkeypatch.setattr(diffusion_medias, "TAILLE_BLOC", 1024)
+    url = _url(client_apprenant_premium, lecon)
+    jeton = url.split("/medias/")[1].split("/")[0]
+    storage, nom = diffusion_medias.lire_jeton(jeton)
+    request = AsyncRequestFactory().get(url, headers={"range": "bytes=1000-"})
+
+    response = diffusion_medias.reponse(request, storage, nom)
+
+    assert response.status_code == 206
+    assert response.is_async
+    assert response["Content-Length"] == str(len(VIDEO) - 1000)
+
+    async def lire():
+        return [bloc async for bloc in response]
+
+    with warnings.catch_warnings():
+        # Un itérateur synchrone déclencherait l'avertissement de Django
+        # (lecture intégrale avant envoi).
+        warnings.simplefilter("error")
+        blocs = asyncio.run(lire())
+    assert max(len(bloc) for bloc in blocs) == 1024
+    assert b"".join(blocs) == VIDEO[1000:]
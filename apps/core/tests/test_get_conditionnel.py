@@ -0,0 +1,101 @@
+"""
+GET conditionnels (apps/core/versions_contenu.py) : ETag calculé depuis la
+version du contenu, 304 sans corps ni sérialisation pour un client à jour,
+nouvel ETag dès qu'une écriture touche le contenu.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.core import versions_contenu
+from apps.core.models import ParametreSysteme, VersionContenu
+from apps.evaluation.models import Choix, Question
+from apps.formation.models import Cours, Lecon, Module
+
+
+def _revalider(client, url, reponse):
+    return client.get(url, HTTP_IF_NONE_MATCH=reponse["ETag"])
+
+
+@pytest.mark.django_db
+def test_modules_304_puis_nouvelle_version(client_apprenant, cours):
+    module = Module.objects.create(cours=cours, titre="M1", ordre=1)
+    url = f"/api/cours/{cours.id}/liste-modules/"
+
+    premiere = client_apprenant.get(url)
+    assert premiere.status_code == 200
+    assert "no-cache" in premiere["Cache-Control"]
+
+    with CaptureQueriesContext(connection) as requetes:
+        revalidee = _revalider(client_apprenant, url, premiere)
+    assert revalidee.status_code == 304
+    assert revalidee.content == b""
+    assert revalidee["ETag"] == premiere["ETag"]
+    assert not any("yeki_module" in q["sql"] for q in requetes.captured_queries)
+
+    Lecon.objects.create(titre="L1", cours=cours, module=module, description="")
+    apres = _revalider(client_apprenant, url, premiere)
+    assert apres.status_code == 200
+    assert apres["ETag"] != premiere["ETag"]
+
+
+@pytest.mark.django_db
+def test_exercices_variante_gratuit_premium_et_questions(
+    client_apprenant, client_apprenant_premium, exercice
+):
+    url = f"/api/cours/{exercice.cours_id}/exercices/"
+    gratuit = client_apprenant.get(url)
+    premium = client_apprenant_premium.get(url)
+    assert gratuit["ETag"] != premium["ETag"]
+    # Un ETag ne vaut que pour sa variante.
+    assert _revalider(client_apprenant, url, premium).status_code == 200
+
+    question = Question.objects.create(
+        exercice=exercice, text="2+2 ?", type_question="qcm", points=1
+    )
+    assert _revalider(client_apprenant_premium, url, premium).status_code == 200
+
+    premium = client_apprenant_premium.get(url)
+    Choix.objects.create(question=question, texte="4", est_correct=True)
+    assert _revalider(client_apprenant_premium, url, premium).status_code == 200
+
+
+@pytest.mark.django_db
+def test_departement_cours_et_niveaux(client_apprenant, api_client, departement, cours):
+    url_cours = f"/api/departements/{departement.id}/cours/"
+    url_niveaux = f"/api/departements/{departement.id}/niveaux/"
+    liste = client_apprenant.get(url_cours)
+    niveaux = api_client.get(url_niveaux)
+    assert _revalider(client_apprenant, url_cours, liste).status_code == 304
+    assert _revalider(api_client, url_niveaux, niveaux).status_code == 304
+
+    Cours.objects.create(titre="Nouveau", niveau="Première", departement=departement)
+
+    assert _revalider(client_apprenant, url_cours, liste).status_code == 200
+    apres = _revalider(api_client, url_niveaux, niveaux)
+    assert apres.status_code == 200
+    assert apres.json() == ["Première", "Terminale"]
+
+
+@pytest.mark.django_db
+def test_parametres_publics(api_client):
+    url = "/api/parametres/publics/"
+    premiere = api_client.get(url)
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=f'W/{premiere["ETag"]}').status_code == 304
+
+    ParametreSysteme.objects.update_or_create(cle="ussd_mtn_momo", defaults={"valeur": "*999#"})
+
+    apres = _revalider(api_client, url, premiere)
+    assert apres.status_code == 200
+    assert apres.json()["ussd_mtn_momo"] == "*999#"
+
+
+@pytest.mark.django_db
+def test_version_monotone(cours):
+    depart = VersionContenu.objects.get(type_objet="cours", objet_id=cours.id).version
+    versions_contenu.incrementer(versions_contenu.TYPE_COURS, [cours.id])
+    cours.titre = "Renommé"
+    cours.save()
+
+    assert VersionContenu.objects.get(type_objet="cours", objet_id=cours.id).version == depart + 2
@@ -0,0 +1,84 @@
+"""
+`HistoriqueStatsView` : une seule requête d'agrégation conditionnelle,
+cache par utilisateur invalidé à chaque écriture du journal.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.journal import tampon_activites
+from apps.core.models import HistoriqueActivite, enregistrer_activite
+from apps.core.services import _cle_stats_activite, stats_activite
+
+
+@pytest.mark.django_db
+def test_stats_identiques_au_calcul_requete_par_requete(client_apprenant, user_apprenant):
+    maintenant = timezone.now()
+    for action, age in [
+        ("course_created", timedelta(0)),
+        ("homework_graded", timedelta(days=3)),
+        ("module_deleted", timedelta(days=45)),
+    ]:
+        HistoriqueActivite.objects.create(
+            user=user_apprenant, action=action, timestamp=maintenant - age
+        )
+
+    reponse = client_apprenant.get("/api/historique/stats/")
+
+    assert reponse.status_code == 200
+    assert reponse.data["total"] == 3
+    assert reponse.data["cette_semaine"] == 2
+    assert reponse.data["categories"]["cours"] == 1
+    assert reponse.data["categories"]["modules"] == 1
+    # `homework_graded` compte à la fois dans devoirs ET corrections.
+    assert reponse.data["categories"]["devoirs"] == 1
+    assert reponse.data["categories"]["corrections"] == 1
+    assert reponse.data["derniere_activite"] == maintenant.isoformat()
+
+
+@pytest.mark.django_db
+def test_une_seule_requete_puis_cache(user_apprenant, django_assert_num_queries):
+    HistoriqueActivite.objects.create(user=user_apprenant, action="login")
+
+    with django_assert_num_queries(1):
+        stats_activite(user_apprenant)
+    with django_assert_num_queries(0):
+        assert stats_activite(user_apprenant)["total"] == 1
+
+
+@pytest.mark.django_db
+def test_cache_invalide_par_enregistrer_activite(user_apprenant):
+    assert stats_activite(user_apprenant)["total"] == 0
+
+    enregistrer_activite(user_apprenant, "course_created")
+    tampon_activites.vider()
+
+    stats = stats_activite(user_apprenant)
+    assert stats["total"] == 1
+    assert stats["categories"]["cours"] == 1
+
+
+@pytest.mark.django_db
+def test_cache_invalide_au_commit_d_une_transaction_metier(
+    user_apprenant, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            enregistrer_activite(user_apprenant, "course_created")
+            # Requête concurrente avant le commit : elle ne voit pas encore
+            # la ligne et met en cache des stats périmées.
+            cache.set(_cle_stats_activite(user_apprenant.pk), {"total": 0})
+
+    assert stats_activite(user_apprenant)["total"] == 1
+
+
+@pytest.mark.django_db
+def test_aucune_activite(user_apprenant):
+    stats = stats_activite(user_apprenant)
+
+    assert stats["total"] == 0
+    assert stats["derniere_activite"] is None
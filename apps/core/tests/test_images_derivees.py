@@ -0,0 +1,189 @@
+"""
+Images dérivées (apps/core/images.py) : largeurs fixes sans agrandissement,
+WebP + JPEG, orientation EXIF appliquée puis métadonnées retirées,
+remplacement et effacement, calcul hors requête avec transfert différé,
+fichier illisible, champs exposés par les serializers, commande de
+rattrapage.
+"""
+
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from apps.accounts.models import Profile
+from apps.core import images
+from apps.core.images import LARGEURS_AVATAR
+from apps.formation.models import Departement
+
+
+@pytest.fixture(autouse=True)
+def _medias(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _photo(largeur=800, hauteur=600, orientation=None, mode="RGB", format_pil="JPEG", nom="p.jpg"):
+    image = Image.new(
+        mode, (largeur, hauteur), (200, 30, 30, 0) if mode == "RGBA" else (200, 30, 30)
+    )
+    exif = Image.Exif()
+    exif[0x010F] = "Appareil"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    tampon = io.BytesIO()
+    options = {"exif": exif} if format_pil == "JPEG" else {}
+    image.save(tampon, format_pil, **options)
+    return SimpleUploadedFile(nom, tampon.getvalue(), content_type=f"image/{format_pil.lower()}")
+
+
+def _ouvrir(nom):
+    with default_storage.open(nom) as fichier:
+        image = Image.open(fichier)
+        image.load()
+    return image
+
+
+@pytest.mark.django_db
+def test_avatar_largeurs_formats_et_exif(user_apprenant):
+    profil = user_apprenant.profile
+    # Orientation 6 : photo prise en portrait, pixels stockés couchés.
+    profil.avatar = _photo(orientation=6)
+    profil.save()
+
+    profil.refresh_from_db()
+    derivees = profil.avatar_derivees
+    assert derivees["source"] == profil.avatar.name
+    assert set(derivees["largeurs"]) == {str(w) for w in LARGEURS_AVATAR}
+    for largeur, formats in derivees["largeurs"].items():
+        assert formats["webp"].startswith("avatars/") and formats["webp"].endswith(".webp")
+        for format_pil, nom in (("WEBP", formats["webp"]), ("JPEG", formats["jpeg"])):
+            image = _ouvrir(nom)
+            assert image.format == format_pil
+            # Redressée (portrait 600 × 800 → 3:4), sans EXIF conservé.
+            assert image.size == (int(largeur), int(largeur) * 4 // 3)
+            assert not image.getexif()
+
+
+@pytest.mark.django_db
+def test_pas_d_agrandissement_ni_doublon(cours):
+    departement = cours.departement
+    departement.image = _photo(largeur=500, hauteur=250)
+    departement.save()
+
+    largeurs = Departement.objects.get(pk=departement.pk).image_derivees["largeurs"]
+    assert largeurs["320"]["jpeg"].endswith("__w320.jpeg")
+    # 640 et 1280 dépassent l'original : une seule version à 500 px.
+    assert largeurs["640"] == largeurs["1280"]
+    assert _ouvrir(largeurs["1280"]["webp"]).size == (500, 250)
+
+
+@pytest.mark.django_db
+def test_transparence_sur_fond_blanc_en_jpeg(user_apprenant):
+    profil = user_apprenant.profile
+    profil.avatar = _photo(largeur=100, hauteur=100, mode="RGBA", format_pil="PNG", nom="a.png")
+    profil.save()
+
+    formats = Profile.objects.get(pk=profil.pk).avatar_derivees["largeurs"]["48"]
+    assert _ouvrir(formats["jpeg"]).getpixel((0, 0)) == (255, 255, 255)
+    assert _ouvrir(formats["webp"]).mode == "RGBA"
+
+
+@pytest.mark.django_db
+def test_remplacement_et_effacement(user_apprenant):
+    profil = user_apprenant.profile
+    profil.avatar = _photo()
+    profil.save()
+    anciennes = [n for f in profil.avatar_derivees["largeurs"].values() for n in f.values()]
+
+    profil.avatar = _photo(nom="autre.jpg")
+    profil.save()
+    assert not any(default_storage.exists(nom) for nom in anciennes)
+    assert profil.avatar_derivees["source"] == profil.avatar.name
+
+    profil.avatar = None
+    profil.save()
+    assert Profile.objects.get(pk=profil.pk).avatar_derivees == {}
+
+
+@pytest.mark.django_db
+def test_sauvegarde_sans_image_modifiee_ne_regenere_pas(user_apprenant):
+    profil = user_apprenant.profile
+    profil.avatar = _photo()
+    profil.save()
+    nom = profil.avatar_derivees["largeurs"]["48"]["webp"]
+    default_storage.delete(nom)
+
+    profil.bio = "Nouvelle bio"
+    profil.save()
+    assert not default_storage.exists(nom)
+
+
+@pytest.mark.django_db
+def test_hors_requete_avec_transfert_differe(
+    user_apprenant, settings, monkeypatch, django_capture_on_commit_callbacks
+):
+    settings.TRANSFERT_MEDIAS_DIFFERE = True
+    en_file = []
+    monkeypatch.setattr(images, "_mettre_en_file", lambda *cle: en_file.append(cle))
+    profil = user_apprenant.profile
+
+    with django_capture_on_commit_callbacks(execute=True):
+        profil.avatar = _photo()
+        profil.save()
+        profil.bio = "Nouvelle bio"
+        profil.save(update_fields=["bio"])
+
+    # Rien de calculé dans la requête : une seule mise en file, au commit.
+    assert Profile.objects.get(pk=profil.pk).avatar_derivees == {}
+    assert en_file == [("accounts.Profile", profil.pk, "avatar")]
+
+    assert images.deriver_objet(*en_file[0]) is True
+    derivees = Profile.objects.get(pk=profil.pk).avatar_derivees
+    assert derivees["source"] == profil.avatar.name
+    assert set(derivees["largeurs"]) == {str(w) for w in LARGEURS_AVATAR}
+
+
+@pytest.mark.django_db
+def test_fichier_illisible_marque_sans_derivee(user_apprenant, caplog):
+    profil = user_apprenant.profile
+    profil.avatar = SimpleUploadedFile("casse.jpg", b"pas une image", content_type="image/jpeg")
+    profil.save()
+
+    assert Profile.objects.get(pk=profil.pk).avatar_derivees == {
+        "source": profil.avatar.name,
+        "largeurs": {},
+    }
+    assert "Dérivées impossibles" in caplog.text
+
+
+@pytest.mark.django_db
+def test_urls_exposees(client_apprenant, user_apprenant):
+    profil = user_apprenant.profile
+    assert client_apprenant.get(reverse("profil-me")).data["avatar_derivees"] is None
+
+    profil.avatar = _photo()
+    profil.save()
+
+    derivees = client_apprenant.get(reverse("profil-me")).data["avatar_derivees"]
+    assert derivees["96"]["webp"].startswith("http://testserver/media/avatars/")
+    assert derivees["96"]["jpeg"].endswith("__w96.jpeg")
+
+
+@pytest.mark.django_db
+def test_commande_de_rattrapage(user_apprenant):
+    profil = user_apprenant.profile
+    nom = default_storage.save("avatars/ancien.jpg", _photo())
+    # Image antérieure au pipeline : `update()` ne déclenche aucun signal.
+    Profile.objects.filter(pk=profil.pk).update(avatar=nom)
+
+    call_command("generer_images_derivees", "--modele", "accounts.Profile")
+    derivees = Profile.objects.get(pk=profil.pk).avatar_derivees
+    assert derivees["source"] == nom and len(derivees["largeurs"]) == 3
+
+    sortie = io.StringIO()
+    call_command("generer_images_derivees", stdout=sortie)
+    assert "accounts.Profile.avatar : 0 image(s)" in sortie.getvalue()
@@ -0,0 +1,122 @@
+"""
+Plans d'exécution des filtres chauds : chaque requête doit atteindre sa
+table par un index (`SEARCH … USING INDEX`), jamais par un parcours
+séquentiel (`SCAN <table>`). Les plans sont ceux de SQLite (base de test) ;
+les index sont les mêmes sous PostgreSQL, voir docs/INDEX_FILTRES_CHAUDS.md.
+
+Deux niveaux : les requêtes réellement émises par les endpoints clés
+(capturées puis passées à `EXPLAIN QUERY PLAN`), et les filtres hors
+endpoint (`_deja_notifie`, envoi push, `AccesService.est_premium`, …)
+reconstruits à l'identique.
+"""
+
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.accounts.models import Profile
+from apps.core.management.commands.envoyer_rappels import _deja_notifie
+from apps.core.models import HistoriqueActivite
+from apps.evaluation.models import EvaluationExercice, SoumissionDevoir
+from apps.formation.models import ProgressionLecon
+from apps.notifications.models import DeviceToken, Notification
+from apps.paiement.models import AbonnementPremium
+
+TABLES_SURVEILLEES = (
+    "yeki_abonnementpremium",
+    "yeki_notification",
+    "yeki_soumissiondevoir",
+    "yeki_evaluationexercice",
+    "yeki_progressionlecon",
+    "yeki_profile",
+    "yeki_device_token",
+    "yeki_historiqueactivite",
+)
+
+
+def _plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [ligne[-1] for ligne in cursor.fetchall()]
+
+
+def _scans_sequentiels(plan):
+    return [
+        etape
+        for etape in plan
+        if re.match(r"SCAN (\w+)", etape)
+        and re.match(r"SCAN (\w+)", etape).group(1) in TABLES_SURVEILLEES
+    ]
+
+
+def _assert_recherche_indexee(queryset):
+    plan = queryset.explain().splitlines()
+    assert not _scans_sequentiels(plan), plan
+    assert any("USING" in etape and "INDEX" in etape for etape in plan), plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url", ["/api/notifications/", "/api/historique/", "/api/historique/stats/"]
+)
+def test_endpoints_utilisateur_sans_parcours_sequentiel(client_apprenant, user_apprenant, url):
+    HistoriqueActivite.objects.create(user=user_apprenant, action="login")
+    Notification.objects.create(utilisateur=user_apprenant, titre="t", contenu="c")
+
+    with CaptureQueriesContext(connection) as requetes:
+        assert client_apprenant.get(url).status_code == 200
+
+    for requete in requetes.captured_queries:
+        if requete["sql"].startswith("SELECT"):
+            assert not _scans_sequentiels(_plan(requete["sql"])), requete["sql"]
+
+
+@pytest.mark.django_db
+def test_stats_devoir_enseignant_sans_parcours_sequentiel(
+    client_enseignant_principal, user_enseignant_principal, devoir
+):
+    devoir.cours_lie.enseignant_principal = user_enseignant_principal.profile
+    devoir.cours_lie.save()
+
+    with CaptureQueriesContext(connection) as requetes:
+        reponse = client_enseignant_principal.get(f"/api/devoirs/{devoir.id}/stats/")
+    assert reponse.status_code == 200
+
+    for requete in requetes.captured_queries:
+        if requete["sql"].startswith("SELECT"):
+            assert not _scans_sequentiels(_plan(requete["sql"])), requete["sql"]
+
+
+@pytest.mark.django_db
+def test_deja_notifie_utilise_un_index(user_apprenant):
+    with CaptureQueriesContext(connection) as requetes:
+        _deja_notifie(user_apprenant, "Devoir à rendre dans 1 heure", 1, "Devoir")
+
+    assert not _scans_sequentiels(_plan(requetes.captured_queries[0]["sql"]))
+
+
+@pytest.mark.django_db
+def test_filtres_hors_endpoint_utilisent_un_index(user_apprenant, cours, exercice):
+    _assert_recherche_indexee(
+        AbonnementPremium.objects.filter(
+            utilisateur=user_apprenant, actif=True, fin__gt=timezone.now()
+        ).order_by()
+    )
+    _assert_recherche_indexee(DeviceToken.objects.filter(user=user_apprenant, actif=True))
+    _assert_recherche_indexee(
+        SoumissionDevoir.objects.filter(devoir_id=1, statut__in=["soumis", "en_retard"])
+    )
+    _assert_recherche_indexee(
+        EvaluationExercice.objects.filter(user=user_apprenant, exercice=exercice)
+    )
+    _assert_recherche_indexee(
+        ProgressionLecon.objects.filter(
+            apprenant=user_apprenant, cours=cours, terminee=True
+        ).order_by()
+    )
+    _assert_recherche_indexee(
+        Profile.objects.filter(user_type="apprenant", cursus="Cursus Test", is_active=True)
+    )
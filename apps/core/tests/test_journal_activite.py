@@ -0,0 +1,124 @@
+"""
+Écriture groupée du journal d'activité (apps/core/journal.py) et commande
+de rétention `archiver_historique_activite`.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.core.journal import tampon_activites
+from apps.core.models import HistoriqueActivite, HistoriqueActiviteArchive, enregistrer_activite
+
+
+@pytest.fixture(autouse=True)
+def _tampon_vide():
+    tampon_activites.vider()
+    yield
+    tampon_activites.vider()
+
+
+@pytest.mark.django_db
+def test_hors_transaction_l_activite_attend_le_vidage(user_apprenant):
+    assert enregistrer_activite(user_apprenant, "login") is True
+
+    assert HistoriqueActivite.objects.count() == 0
+    assert tampon_activites.vider() == 1
+    assert HistoriqueActivite.objects.filter(user=user_apprenant, action="login").count() == 1
+
+
+@pytest.mark.django_db
+def test_horodatage_pris_a_l_action_pas_au_vidage(user_apprenant):
+    enregistrer_activite(user_apprenant, "login")
+    avant_vidage = timezone.now()
+    tampon_activites.vider()
+
+    assert HistoriqueActivite.objects.get().timestamp <= avant_vidage
+
+
+@pytest.mark.django_db
+@override_settings(JOURNAL_ACTIVITE_TAILLE_LOT=3)
+def test_seuil_de_taille_declenche_un_seul_bulk_create(user_apprenant, django_assert_num_queries):
+    enregistrer_activite(user_apprenant, "login")
+    enregistrer_activite(user_apprenant, "logout")
+    # Savepoint + INSERT groupé + libération du savepoint.
+    with django_assert_num_queries(3):
+        enregistrer_activite(user_apprenant, "login")
+
+    assert HistoriqueActivite.objects.count() == 3
+    assert len(tampon_activites) == 0
+
+
+@pytest.mark.django_db
+@override_settings(JOURNAL_ACTIVITE_DELAI_SECONDES=0)
+def test_seuil_de_delai_vide_immediatement(user_apprenant):
+    enregistrer_activite(user_apprenant, "login")
+
+    assert HistoriqueActivite.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_dans_une_transaction_metier_ecriture_immediate_et_annulable(user_apprenant):
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            enregistrer_activite(user_apprenant, "login")
+            assert HistoriqueActivite.objects.count() == 1
+            raise RuntimeError("action métier annulée")
+
+    assert HistoriqueActivite.objects.count() == 0
+    assert len(tampon_activites) == 0
+
+
+@pytest.mark.django_db
+def test_echec_d_ecriture_ne_remonte_jamais(user_apprenant):
+    enregistrer_activite(user_apprenant, "login")
+
+    with patch.object(HistoriqueActivite.objects, "bulk_create", side_effect=Exception("db down")):
+        assert tampon_activites.vider() == 0
+
+    assert len(tampon_activites) == 0
+
+
+@pytest.mark.django_db
+def test_fin_de_requete_vide_le_tampon(client_apprenant, user_apprenant):
+    enregistrer_activite(user_apprenant, "login")
+
+    reponse = client_apprenant.get("/api/historique/")
+
+    # La requête elle-même lit avant son propre vidage de fin de requête.
+    assert reponse.data["count"] == 0
+    assert client_apprenant.get("/api/historique/").data["count"] == 1
+
+
+@pytest.mark.django_db
+def test_archivage_deplace_les_lignes_anciennes_sans_doublon(user_apprenant):
+    ancienne = HistoriqueActivite.objects.create(
+        user=user_apprenant, action="login", timestamp=timezone.now() - timedelta(days=200)
+    )
+    recente = HistoriqueActivite.objects.create(user=user_apprenant, action="logout")
+
+    call_command("archiver_historique_activite", "--jours", "90", "--lot", "1")
+    call_command("archiver_historique_activite", "--jours", "90")
+
+    assert list(HistoriqueActivite.objects.values_list("id", flat=True)) == [recente.id]
+    archive = HistoriqueActiviteArchive.objects.get()
+    assert (archive.id, archive.action) == (ancienne.id, "login")
+
+
+@pytest.mark.django_db
+def test_purge_des_archives(user_apprenant):
+    HistoriqueActiviteArchive.objects.create(
+        id=1, user=user_apprenant, action="login", timestamp=timezone.now() - timedelta(days=800)
+    )
+    HistoriqueActiviteArchive.objects.create(
+        id=2, user=user_apprenant, action="login", timestamp=timezone.now() - timedelta(days=100)
+    )
+
+    call_command("archiver_historique_activite", "--jours", "90", "--purger-archives-jours", "365")
+
+    assert list(HistoriqueActiviteArchive.objects.values_list("id", flat=True)) == [2]
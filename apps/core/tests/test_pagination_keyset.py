@@ -0,0 +1,96 @@
+"""
+Pagination keyset (YekiKeysetPagination) : enveloppe count/next/previous/
+results inchangée pour le client mobile, parcours par curseur stable sur
+(horodatage, id), repli page-numéro pour `?page=N` — voir
+docs/API_FOUNDATIONS.md §2.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from apps.core.models import HistoriqueActivite
+from apps.core.pagination import YekiKeysetPagination
+from apps.notifications.models import Notification
+
+
+def _activites(user, n):
+    """n activités, dont plusieurs au MÊME horodatage (départage par id)."""
+    base = timezone.now()
+    objets = HistoriqueActivite.objects.bulk_create(
+        HistoriqueActivite(user=user, action="login", description=str(i)) for i in range(n)
+    )
+    for i, a in enumerate(objets):
+        HistoriqueActivite.objects.filter(pk=a.pk).update(
+            timestamp=base - timedelta(minutes=i // 3)
+        )
+
+
+@pytest.mark.django_db
+def test_parcours_complet_par_curseur_sans_doublon_ni_trou(client_apprenant, user_apprenant):
+    _activites(user_apprenant, 25)
+    attendu = list(
+        HistoriqueActivite.objects.filter(user=user_apprenant)
+        .order_by("-timestamp", "-id")
+        .values_list("id", flat=True)
+    )
+
+    vus, url = [], "/api/historique/?page_size=4"
+    while url:
+        reponse = client_apprenant.get(url)
+        assert reponse.status_code == status.HTTP_200_OK
+        for cle in ("count", "next", "previous", "results"):
+            assert cle in reponse.data
+        assert reponse.data["count"] == 25
+        vus += [r["id"] for r in reponse.data["results"]]
+        url = reponse.data["next"]
+
+    assert vus == attendu
+
+
+@pytest.mark.django_db
+def test_lien_previous_revient_a_la_page_precedente(client_apprenant, user_apprenant):
+    _activites(user_apprenant, 10)
+
+    page1 = client_apprenant.get("/api/historique/", {"page_size": 3}).data
+    assert page1["previous"] is None
+    page2 = client_apprenant.get(page1["next"]).data
+    retour = client_apprenant.get(page2["previous"]).data
+
+    assert [r["id"] for r in retour["results"]] == [r["id"] for r in page1["results"]]
+    assert retour["previous"] is None
+
+
+@pytest.mark.django_db
+def test_page_numero_reste_supportee_pour_anciens_clients(client_apprenant, user_apprenant):
+    _activites(user_apprenant, 5)
+
+    reponse = client_apprenant.get("/api/historique/", {"page": 2, "page_size": 2})
+
+    assert reponse.status_code == status.HTTP_200_OK
+    assert len(reponse.data["results"]) == 2
+    assert "page=3" in reponse.data["next"]
+    assert "count_estime" not in reponse.data
+
+
+@pytest.mark.django_db
+def test_curseur_invalide_renvoie_404(client_apprenant, user_apprenant):
+    reponse = client_apprenant.get("/api/notifications/", {"cursor": "pas-un-curseur"})
+
+    assert reponse.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_count_plafonne_au_dela_du_seuil(client_apprenant, user_apprenant, monkeypatch):
+    monkeypatch.setattr(YekiKeysetPagination, "count_plafond", 3)
+    Notification.objects.bulk_create(
+        Notification(utilisateur=user_apprenant, titre=f"N{i}", contenu="x") for i in range(5)
+    )
+
+    reponse = client_apprenant.get("/api/notifications/")
+
+    assert reponse.data["count"] == 3
+    assert reponse.data["count_estime"] is True
+    assert len(reponse.data["results"]) == 5
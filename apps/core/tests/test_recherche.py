@@ -0,0 +1,114 @@
+"""
+Recherche textuelle indexée (apps/core/recherche.py) : normalisation sans
+accents, préfixes, tous les mots requis, ordre de pertinence, tenue à jour
+par signaux ; recherche d'enseignants de l'admin général et `q` du forum.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test.utils import override_settings
+
+from apps.accounts.models import Profile
+from apps.core.models import TermeRecherche
+from apps.core.recherche import TYPE_ENSEIGNANT, rechercher, termes
+from apps.forum.models import QuestionForum
+
+URL_ENSEIGNANTS = "/api/admin-general/enseignants/search/"
+
+
+def _enseignant(username, first_name="", last_name="", bio="", user_type="enseignant"):
+    user = User.objects.create_user(
+        username=username,
+        email=f"{username}@yeki.test",
+        first_name=first_name,
+        last_name=last_name,
+    )
+    return Profile.objects.create(user=user, user_type=user_type, bio=bio, is_active=True)
+
+
+def _ids_enseignants(client, q):
+    response = client.get(URL_ENSEIGNANTS, {"q": q})
+    assert response.status_code == 200
+    return [e["id"] for e in response.data["results"]]
+
+
+def test_normalisation():
+    assert termes("L'Élève de Mathématiques, cœur 2") == ["eleve", "mathematiques", "coeur", "2"]
+    assert termes("de la") == []
+
+
+@pytest.mark.django_db
+def test_prefixes_accents_et_tous_les_mots(client_admin):
+    awa = _enseignant("awa_d", "Awa", "Ndiaye", bio="Professeure de mathématiques")
+    eric = _enseignant("eric", "Éric", "Mballa", bio="Physique-chimie")
+    _enseignant("apprenant1", "Awa", "Ndiaye", user_type="apprenant")
+
+    assert _ids_enseignants(client_admin, "awa") == [awa.id]
+    assert _ids_enseignants(client_admin, "ERIC") == [eric.id]
+    assert _ids_enseignants(client_admin, "mathé") == [awa.id]
+    assert _ids_enseignants(client_admin, "awa phys") == []
+    assert _ids_enseignants(client_admin, "la de") == []
+
+
+@pytest.mark.django_db
+def test_ordre_de_pertinence_puis_filtres(client_admin):
+    # « physique » dans le nom pèse plus que dans la bio.
+    dans_bio = _enseignant("jean", "Jean", bio="Cours de physique")
+    dans_nom = _enseignant("physique_pro", "Paul", user_type="enseignant_principal")
+
+    assert _ids_enseignants(client_admin, "physique") == [dans_nom.id, dans_bio.id]
+    response = client_admin.get(URL_ENSEIGNANTS, {"q": "physique", "user_type": "enseignant"})
+    assert [e["id"] for e in response.data["results"]] == [dans_bio.id]
+
+
+@pytest.mark.django_db
+def test_signaux_user_profil_et_limite(client_admin):
+    profil = _enseignant("marie", "Marie")
+    user = profil.user
+
+    user.last_name = "Étoundi"
+    user.save()
+    assert _ids_enseignants(client_admin, "etoundi") == [profil.id]
+
+    profil.user_type = "apprenant"
+    profil.save(update_fields=["user_type"])
+    assert _ids_enseignants(client_admin, "marie") == []
+
+    profil.user_type = "enseignant_cadre"
+    profil.save()
+    for i in range(3):
+        _enseignant(f"marie{i}", "Marie")
+    with override_settings(RECHERCHE_LIMITE_RESULTATS=2):
+        assert len(rechercher(TYPE_ENSEIGNANT, "marie")) == 2
+
+    user.delete()
+    assert not TermeRecherche.objects.filter(objet_id=profil.id, type_objet="enseignant").exists()
+
+
+@pytest.mark.django_db
+def test_reconstruction_apres_ecriture_en_masse():
+    profil = _enseignant("nadia", "Nadia")
+    Profile.objects.filter(pk=profil.pk).update(bio="Spécialiste en géographie")
+    TermeRecherche.objects.all().delete()
+
+    call_command("reconstruire_index_recherche", stdout=None)
+
+    assert rechercher(TYPE_ENSEIGNANT, "geographie") == [profil.id]
+
+
+@pytest.mark.django_db
+def test_forum_filtre_q(client_apprenant_premium, user_apprenant_premium):
+    def question(contenu, **liens):
+        return QuestionForum.objects.create(auteur=user_apprenant_premium, contenu=contenu, **liens)
+
+    integrale = question("Comment calculer une intégrale ?", cours_titre="Analyse")
+    titre = question("Je ne comprends pas", lecon_titre="Intégrales par parties")
+    question("Question sur la photosynthèse")
+
+    response = client_apprenant_premium.get("/api/forum/questions/", {"q": "integral"})
+
+    assert response.status_code == 200
+    # Titre rattaché (poids secondaire) avant contenu.
+    assert [q["id"] for q in response.data["results"]] == [titre.id, integrale.id]
+    assert response.data["results"][0]["nb_reponses"] == 0
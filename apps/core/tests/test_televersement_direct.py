@@ -0,0 +1,227 @@
+"""
+Téléversement direct de la vidéo et du PDF d'une leçon
+(apps/core/televersement_direct.py), avec le signataire local
+(`FileSystemStorage` dans un répertoire temporaire) : ouverture, envoi
+reprenable par morceaux, finalisation vérifiée, refus, droits, purge ;
+et ouverture d'une session GCS (bucket simulé).
+"""
+
+import io
+import os
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from storages.backends.gcloud import GoogleCloudStorage
+
+from apps.core import televersement_direct
+from apps.core.models import SessionTeleversement
+from apps.formation.models import Lecon
+
+MP4 = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 988
+PDF = b"%PDF-1.7\n" + b"x" * 491
+
+
+@pytest.fixture(autouse=True)
+def _bucket(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "bucket"
+
+
+@pytest.fixture
+def lecon(cours, user_enseignant_principal):
+    cours.enseignant_principal = user_enseignant_principal.profile
+    cours.save()
+    return Lecon.objects.create(titre="Leçon 1", description="Intro", cours=cours)
+
+
+def _ouvrir(client, lecon, **champs):
+    donnees = {
+        "champ": "video",
+        "nom_fichier": "Cours1.MP4",
+        "taille": len(MP4),
+        "type_contenu": "video/mp4",
+        **champs,
+    }
+    return client.post(reverse("lecon-televersement-ouvrir", args=[lecon.pk]), donnees)
+
+
+def _envoyer(client, url, contenu, type_contenu="video/mp4", **entetes):
+    return client.put(url, data=contenu, content_type=type_contenu, **entetes)
+
+
+def _finaliser(client, session_id):
+    return client.post(reverse("lecon-televersement-finaliser", args=[session_id]))
+
+
+@pytest.mark.django_db
+def test_envoi_par_morceaux_puis_finalisation(client_enseignant_principal, lecon):
+    ouverture = _ouvrir(client_enseignant_principal, lecon)
+    assert ouverture.status_code == 201
+    assert ouverture.data["methode"] == "PUT"
+    assert ouverture.data["entetes"] == {"Content-Type": "video/mp4"}
+    assert ouverture.data["nom_cible"].startswith("lecons/video/Cours1_")
+    assert ouverture.data["nom_cible"].endswith(".mp4")
+    url = ouverture.data["url"]
+
+    premier = _envoyer(
+        client_enseignant_principal, url, MP4[:600], HTTP_CONTENT_RANGE="bytes 0-599/1000"
+    )
+    assert premier.status_code == 308
+    assert premier["Range"] == "bytes=0-599"
+
+    etat = _envoyer(client_enseignant_principal, url, b"", HTTP_CONTENT_RANGE="bytes */1000")
+    assert (etat.status_code, etat["Range"]) == (308, "bytes=0-599")
+
+    second = _envoyer(
+        client_enseignant_principal, url, MP4[600:], HTTP_CONTENT_RANGE="bytes 600-999/1000"
+    )
+    assert second.status_code == 200
+
+    finalisation = _finaliser(client_enseignant_principal, ouverture.data["id"])
+    assert finalisation.status_code == 200
+    assert finalisation.data["video"].endswith(ouverture.data["nom_cible"])
+    lecon.refresh_from_db()
+    assert lecon.video.name == ouverture.data["nom_cible"]
+    assert lecon.video.read() == MP4
+    assert SessionTeleversement.objects.get().statut == "finalisee"
+
+    # Une session finalisée ne reçoit plus rien et ne se finalise qu'une fois.
+    assert _envoyer(client_enseignant_principal, url, MP4).status_code == 410
+    assert _finaliser(client_enseignant_principal, ouverture.data["id"]).status_code == 400
+
+
+@pytest.mark.django_db
+def test_morceau_decale_non_ecrit(client_enseignant_principal, lecon):
+    url = _ouvrir(client_enseignant_principal, lecon).data["url"]
+    _envoyer(client_enseignant_principal, url, MP4[:400], HTTP_CONTENT_RANGE="bytes 0-399/1000")
+
+    # Le client croit avoir tout envoyé jusqu'à 500 : rien n'est écrit, la
+    # plage renvoyée lui indique où reprendre.
+    decale = _envoyer(
+        client_enseignant_principal, url, MP4[500:], HTTP_CONTENT_RANGE="bytes 500-999/1000"
+    )
+    assert (decale.status_code, decale["Range"]) == (308, "bytes=0-399")
+
+    trop_long = _envoyer(
+        client_enseignant_principal, url, MP4 + b"x", HTTP_CONTENT_RANGE="bytes 0-1000/1001"
+    )
+    assert trop_long.status_code == 400
+    mauvais_type = _envoyer(client_enseignant_principal, url, MP4, type_contenu="video/webm")
+    assert mauvais_type.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "contenu, message",
+    [(MP4[:999], "incomplet"), (PDF + b"x" * 500, "ne correspond pas au type")],
+    ids=["tronque", "pdf_annonce_video"],
+)
+def test_fichier_non_conforme_refuse(client_enseignant_principal, lecon, contenu, message):
+    ouverture = _ouvrir(client_enseignant_principal, lecon)
+    session = SessionTeleversement.objects.get()
+    default_storage.save(session.nom_cible, io.BytesIO(contenu))
+
+    refus = _finaliser(client_enseignant_principal, ouverture.data["id"])
+
+    assert refus.status_code == 400
+    assert message in refus.data["detail"]
+    assert not default_storage.exists(session.nom_cible)
+    session.refresh_from_db()
+    assert session.statut == "rejetee"
+    lecon.refresh_from_db()
+    assert not lecon.video
+
+
+@pytest.mark.django_db
+def test_pdf_sans_fichier_recu(client_enseignant_principal, lecon):
+    ouverture = _ouvrir(
+        client_enseignant_principal,
+        lecon,
+        champ="fichier_pdf",
+        nom_fichier="support.pdf",
+        taille=len(PDF),
+        type_contenu="application/pdf",
+    )
+    assert ouverture.data["nom_cible"].startswith("lecons/pdf/support_")
+
+    refus = _finaliser(client_enseignant_principal, ouverture.data["id"])
+    assert refus.status_code == 400
+    assert "Aucun fichier reçu" in refus.data["detail"]
+
+
+@pytest.mark.django_db
+def test_annonce_validee(client_enseignant_principal, lecon):
+    avi = _ouvrir(client_enseignant_principal, lecon, type_contenu="video/x-msvideo")
+    assert "type_contenu" in avi.data["error"]["fields"]
+    trop_grande = _ouvrir(
+        client_enseignant_principal,
+        lecon,
+        taille=televersement_direct.CHAMPS[("formation.Lecon", "video")]["taille_max"] + 1,
+    )
+    assert "taille" in trop_grande.data["error"]["fields"]
+    pdf_mal_nomme = _ouvrir(
+        client_enseignant_principal,
+        lecon,
+        champ="fichier_pdf",
+        nom_fichier="support.docx",
+        type_contenu="application/pdf",
+    )
+    assert "nom_fichier" in pdf_mal_nomme.data["error"]["fields"]
+    assert not SessionTeleversement.objects.exists()
+
+
+@pytest.mark.django_db
+def test_droits(client_enseignant_principal, client_apprenant, lecon):
+    assert _ouvrir(client_apprenant, lecon).status_code == 403
+
+    ouverture = _ouvrir(client_enseignant_principal, lecon)
+    # Session d'un autre utilisateur : introuvable.
+    assert _finaliser(client_apprenant, ouverture.data["id"]).status_code == 404
+
+    jeton_falsifie = ouverture.data["url"].replace("/contenu/", "x/contenu/")
+    assert _envoyer(client_apprenant, jeton_falsifie, MP4).status_code == 403
+
+
+@pytest.mark.django_db
+def test_purge_des_sessions_expirees(client_enseignant_principal, lecon):
+    url = _ouvrir(client_enseignant_principal, lecon).data["url"]
+    _envoyer(client_enseignant_principal, url, MP4[:100], HTTP_CONTENT_RANGE="bytes 0-99/1000")
+    session = SessionTeleversement.objects.get()
+    chemin = default_storage.path(session.nom_cible)
+    assert os.path.exists(chemin)
+
+    SessionTeleversement.objects.update(expire_le=timezone.now() - timedelta(minutes=1))
+    sortie = io.StringIO()
+    call_command("purger_televersements_expires", stdout=sortie)
+
+    assert "1 téléversement(s) expiré(s) purgé(s)" in sortie.getvalue()
+    assert not os.path.exists(chemin)
+    assert SessionTeleversement.objects.get().statut == "expiree"
+
+
+@pytest.mark.django_db
+def test_session_gcs_reprenable(rf, user_enseignant_principal, lecon):
+    storage = GoogleCloudStorage(bucket_name="yeki-test")
+    bucket = mock.MagicMock()
+    bucket.blob.return_value.create_resumable_upload_session.return_value = (
+        "https://storage.googleapis.com/upload/storage/v1/b/yeki-test/o?upload_id=abc"
+    )
+    request = rf.post("/", HTTP_ORIGIN="https://app.yeki.example")
+    request.user = user_enseignant_principal
+
+    with mock.patch.object(GoogleCloudStorage, "bucket", bucket), mock.patch.object(
+        Lecon._meta.get_field("video"), "storage", storage
+    ):
+        session, instructions = televersement_direct.ouvrir(
+            lecon, "video", "cours.mp4", 1000, "video/mp4", request
+        )
+
+    assert instructions["url"].endswith("upload_id=abc")
+    bucket.blob.assert_called_once_with(session.nom_cible)
+    bucket.blob.return_value.create_resumable_upload_session.assert_called_once_with(
+        content_type="video/mp4", size=1000, origin="https://app.yeki.example"
+    )
@@ -0,0 +1,101 @@
+"""
+Throttling à fenêtre glissante (apps/core/throttling.py) : multiplicateur
+"3/10min", estimation pondérée par la fenêtre précédente, requêtes
+refusées non comptées, délai Retry-After, magasin partagé.
+"""
+
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.core.throttling import YekiScopedRateThrottle
+
+TAUX = {"otp": "3/10min", "essai": "4/min"}
+
+
+class _Vue(APIView):
+    throttle_scope = "essai"
+
+
+def _appels(instants, scope="essai", ip="10.0.0.1"):
+    """Réponse de throttles neufs (un par requête, comme DRF) à chaque instant."""
+    requete = APIRequestFactory().get("/", REMOTE_ADDR=ip)
+    requete.user = AnonymousUser()
+    vue = _Vue()
+    vue.throttle_scope = scope
+    resultats = []
+    for instant in instants:
+        throttle = YekiScopedRateThrottle()
+        with mock.patch.object(YekiScopedRateThrottle, "timer", return_value=instant):
+            autorise = throttle.allow_request(requete, vue)
+        resultats.append((autorise, None if autorise else throttle.wait()))
+    return resultats
+
+
+@pytest.fixture(autouse=True)
+def _taux():
+    with mock.patch.object(YekiScopedRateThrottle, "THROTTLE_RATES", TAUX):
+        yield
+
+
+def test_multiplicateur():
+    assert YekiScopedRateThrottle().parse_rate("3/10min") == (3, 600)
+    assert YekiScopedRateThrottle().parse_rate("120/min") == (120, 60)
+    assert YekiScopedRateThrottle().parse_rate("5/hour") == (5, 3600)
+
+
+def test_limite_et_delai_dans_la_fenetre():
+    resultats = _appels([6000 + i for i in range(5)])
+
+    assert [autorise for autorise, _ in resultats] == [True] * 4 + [False]
+    # Fenêtre [6000, 6060) pleine : attendre la suivante, où 4 requêtes
+    # précédentes pèsent encore 4 × (1 − f) ; une 5e passe à f = 1/4.
+    assert resultats[-1][1] == pytest.approx(56 + 15)
+
+
+def test_fenetre_precedente_ponderee():
+    _appels([6000, 6001, 6002, 6003])
+
+    # À mi-fenêtre suivante : 4 × 0,5 = 2 requêtes estimées, 2 places.
+    assert [a for a, _ in _appels([6090, 6091, 6092])] == [True, True, False]
+    # Requêtes refusées non comptées : la fin de fenêtre libère encore.
+    assert _appels([6119])[0][0] is True
+
+
+def test_clients_et_scopes_independants():
+    _appels([6000] * 4)
+
+    assert _appels([6000], ip="10.0.0.2")[0][0] is True
+    assert [a for a, _ in _appels([6000] * 4, scope="otp")] == [True, True, True, False]
+
+
+def test_memoire_fixe():
+    _appels([6000 + i for i in range(120)])
+
+    # Deux entiers par client et par scope, quelle que soit la cadence.
+    compteurs = cache.get_many([f"throttle_essai_10.0.0.1:{f}" for f in (99, 100, 101)])
+    assert set(compteurs) == {"throttle_essai_10.0.0.1:100", "throttle_essai_10.0.0.1:101"}
+    assert all(isinstance(v, int) and v <= 4 for v in compteurs.values())
+
+
+@override_settings(THROTTLE_CACHE="partage")
+def test_magasin_configurable():
+    with override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "partage": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "throttle-test",
+            },
+        }
+    ):
+        from django.core.cache import caches
+
+        _appels([6000])
+        assert caches["partage"].get(f"throttle_essai_10.0.0.1:{6000 // 60}") == 1
+        caches["partage"].clear()
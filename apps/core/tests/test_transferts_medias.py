@@ -0,0 +1,201 @@
+"""
+Transfert différé des uploads (apps/core/transferts.py), avec un
+`FileSystemStorage` dans un répertoire temporaire pour bucket : copie
+locale et réponse immédiate, écriture sur le stockage par les workers,
+statut sur l'objet porteur, nouvel essai espacé, échec définitif, objet
+supprimé, machine propriétaire de la copie.
+"""
+
+import io
+import os
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from apps.core import transferts
+from apps.core.models import TransfertMedia
+from apps.formation.models import Lecon
+from apps.forum.models import QuestionForum
+
+
+@pytest.fixture(autouse=True)
+def _transfert_differe(settings, tmp_path):
+    settings.TRANSFERT_MEDIAS_DIFFERE = True
+    settings.TRANSFERT_MEDIAS_SPOOL = str(tmp_path / "spool")
+    settings.MEDIA_ROOT = tmp_path / "bucket"
+
+
+def _png(nom="photo.png"):
+    tampon = io.BytesIO()
+    Image.new("RGB", (400, 300), (10, 120, 200)).save(tampon, "PNG")
+    return SimpleUploadedFile(nom, tampon.getvalue(), content_type="image/png")
+
+
+def _poser_question(client, **fichiers):
+    return client.post(
+        "/api/forum/questions/", {"contenu": "Question avec pièce jointe", **fichiers}
+    )
+
+
+@pytest.mark.django_db
+def test_upload_acquitte_puis_transfere(
+    client_apprenant_premium, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks() as rappels:
+        response = _poser_question(client_apprenant_premium, image=_png())
+
+    assert response.status_code == 201
+    assert response.data["transfert_statut"] == "en_attente"
+    assert response.data["image_url"] is None
+    transfert = TransfertMedia.objects.get()
+    assert os.path.exists(transfert.chemin_local)
+    assert transfert.nom_cible == "forum/questions/images/photo.png"
+    assert not default_storage.exists(transfert.nom_cible)
+    assert transferts.demarrer_workers in rappels
+
+    assert transferts.drainer() == (1, 0)
+
+    question = QuestionForum.objects.get(pk=response.data["id"])
+    assert question.transfert_statut == "pret"
+    assert question.image.name == "forum/questions/images/photo.png"
+    assert default_storage.exists(question.image.name)
+    assert not os.path.exists(transfert.chemin_local)
+    # Les signaux habituels s'appliquent à l'attachement (images dérivées).
+    assert question.image_derivees["source"] == question.image.name
+
+
+@pytest.mark.django_db
+def test_objet_pret_apres_tous_ses_fichiers(client_apprenant_premium):
+    audio = SimpleUploadedFile("note.m4a", b"\x00" * 64, content_type="audio/mp4")
+    response = _poser_question(client_apprenant_premium, image=_png(), audio=audio)
+    question = QuestionForum.objects.get(pk=response.data["id"])
+
+    transferts.drainer(limite=1)
+    question.refresh_from_db()
+    assert question.transfert_statut == "en_attente"
+
+    transferts.drainer()
+    question.refresh_from_db()
+    assert question.transfert_statut == "pret"
+    assert question.image and question.audio
+
+
+@pytest.mark.django_db
+def test_nouvel_essai_espace_puis_succes(client_apprenant_premium):
+    response = _poser_question(client_apprenant_premium, image=_png())
+
+    with mock.patch.object(FileSystemStorage, "save", side_effect=OSError("GCS 503")):
+        assert transferts.drainer() == (0, 1)
+
+    transfert = TransfertMedia.objects.get()
+    assert (transfert.statut, transfert.tentatives, transfert.erreur) == (
+        "en_attente",
+        1,
+        "GCS 503",
+    )
+    assert transfert.reessayer_apres > timezone.now()
+    # Pas avant l'échéance du nouvel essai.
+    assert transferts.drainer() == (0, 0)
+
+    TransfertMedia.objects.update(reessayer_apres=timezone.now())
+    assert transferts.drainer() == (1, 0)
+    assert QuestionForum.objects.get(pk=response.data["id"]).transfert_statut == "pret"
+
+
+@pytest.mark.django_db
+def test_echec_definitif_puis_reprise(client_apprenant_premium):
+    response = _poser_question(client_apprenant_premium, image=_png())
+    TransfertMedia.objects.update(tentatives=transferts.TENTATIVES_MAX - 1)
+
+    with mock.patch.object(FileSystemStorage, "save", side_effect=OSError("GCS 503")):
+        transferts.drainer()
+
+    assert TransfertMedia.objects.get().statut == "echec"
+    assert QuestionForum.objects.get(pk=response.data["id"]).transfert_statut == "echec"
+
+    sortie = io.StringIO()
+    call_command("transferer_medias_en_attente", "--reessayer-echecs", stdout=sortie)
+    assert "1 échec(s) remis en file" in sortie.getvalue()
+    assert "1 fichier(s) transféré(s)" in sortie.getvalue()
+    assert QuestionForum.objects.get(pk=response.data["id"]).transfert_statut == "pret"
+
+
+@pytest.mark.django_db
+def test_copie_locale_perdue(client_apprenant_premium):
+    response = _poser_question(client_apprenant_premium, image=_png())
+    os.remove(TransfertMedia.objects.get().chemin_local)
+
+    transferts.drainer()
+
+    assert TransfertMedia.objects.get().statut == "echec"
+    assert QuestionForum.objects.get(pk=response.data["id"]).transfert_statut == "echec"
+
+
+@pytest.mark.django_db
+def test_objet_supprime_et_autre_machine(client_apprenant_premium):
+    QuestionForum.objects.filter(
+        pk=_poser_question(client_apprenant_premium, image=_png()).data["id"]
+    ).delete()
+    _poser_question(client_apprenant_premium, image=_png("autre.png"))
+    TransfertMedia.objects.filter(nom_cible__endswith="autre.png").update(hote="autre-machine")
+
+    assert transferts.drainer() == (1, 0)
+
+    statuts = dict(TransfertMedia.objects.values_list("hote", "statut"))
+    assert statuts == {transferts.hote(): "abandonne", "autre-machine": "en_attente"}
+    abandonne = TransfertMedia.objects.get(statut="abandonne")
+    assert not os.path.exists(abandonne.chemin_local)
+
+
+@pytest.mark.django_db
+def test_video_de_lecon(client_enseignant_principal, user_enseignant_principal, cours):
+    cours.enseignant_principal = user_enseignant_principal.profile
+    cours.save()
+    video = SimpleUploadedFile("cours1.mp4", b"\x00" * 2048, content_type="video/mp4")
+
+    response = client_enseignant_principal.post(
+        reverse("ajouter-lecon", args=[cours.pk]),
+        {"titre": "Leçon 1", "description": "Intro", "video": video},
+    )
+
+    assert response.status_code == 201
+    assert response.data["transfert_statut"] == "en_attente"
+    lecon = Lecon.objects.get(titre="Leçon 1")
+    assert not lecon.video
+
+    transferts.drainer()
+    lecon.refresh_from_db()
+    assert lecon.transfert_statut == "pret"
+    assert lecon.video.name == "lecons/video/cours1.mp4"
+    assert lecon.video.size == 2048
+
+
+@pytest.mark.django_db
+def test_sans_transfert_differe_ecriture_dans_la_requete(settings, client_apprenant_premium):
+    settings.TRANSFERT_MEDIAS_DIFFERE = False
+
+    response = _poser_question(client_apprenant_premium, image=_png())
+
+    assert response.data["transfert_statut"] == "pret"
+    assert response.data["image_url"].endswith("/media/forum/questions/images/photo.png")
+    assert not TransfertMedia.objects.exists()
+
+
+def test_reserve_ne_prend_que_les_echeances(db):
+    TransfertMedia.objects.create(
+        modele="forum.QuestionForum",
+        objet_id=1,
+        champ="image",
+        nom_cible="x.png",
+        chemin_local="/nulle/part.png",
+        hote=transferts.hote(),
+        reessayer_apres=timezone.now() + timedelta(minutes=1),
+    )
+    assert transferts._reserver() is None
@@ -0,0 +1,145 @@
+"""
+Fiches « dernière version » (apps/core/versions_app.py) : vérification de
+version au démarrage sans requête SQL, ETag/304, recalcul après
+publication par l'API admin, la commande ou une suppression.
+"""
+
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core import versions_app
+from apps.core.models import AppVersion
+
+
+def _version(version_code, **champs):
+    return AppVersion.objects.create(
+        **{
+            "platform": "android",
+            "canal": "stable",
+            "version_code": version_code,
+            "version_name": f"v1.0.{version_code}",
+            "download_url": "https://cdn.yeki.cm/app.apk",
+            "min_version_code": 1,
+            "is_active": True,
+            **champs,
+        }
+    )
+
+
+DEMARRAGE = [
+    ("latest-version", {"platform": "android", "current_version": 1}),
+    ("check-update", {"platform": "android", "current_version": 1}),
+    ("app-version-check", {"plateforme": "android", "build": 1}),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("nom, params", DEMARRAGE, ids=[nom for nom, _ in DEMARRAGE])
+def test_demarrage_sans_requete_sql(nom, params, django_assert_num_queries):
+    _version(5)
+    client = APIClient()
+    client.get(reverse(nom), params)
+
+    with django_assert_num_queries(0):
+        response = client.get(reverse(nom), params)
+    assert response.status_code == 200
+
+    with django_assert_num_queries(0):
+        revalidation = client.get(reverse(nom), params, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert revalidation.status_code == 304
+
+
+@pytest.mark.django_db
+def test_etag_depend_du_build_envoye():
+    _version(5)
+    client = APIClient()
+    ancien = client.get(reverse("app-version-check"), {"plateforme": "android", "build": 4})
+    a_jour = client.get(
+        reverse("app-version-check"),
+        {"plateforme": "android", "build": 5},
+        HTTP_IF_NONE_MATCH=ancien["ETag"],
+    )
+    assert a_jour.status_code == 200
+    assert a_jour.data["mise_a_jour_disponible"] is False
+
+
+@pytest.mark.django_db
+def test_publication_admin_recalcule_la_fiche(
+    user_admin, client_admin, django_capture_on_commit_callbacks
+):
+    user_admin.is_staff = True
+    user_admin.save(update_fields=["is_staff"])
+    _version(5)
+    client = APIClient()
+    avant = client.get(reverse("app-version-check"), {"plateforme": "android", "build": 5})
+    assert avant.data["mise_a_jour_disponible"] is False
+
+    with django_capture_on_commit_callbacks(execute=True):
+        creation = client_admin.post(
+            reverse("admin-version-create"),
+            {
+                "platform": "android",
+                "version_code": 6,
+                "version_name": "v1.0.6",
+                "download_url": "https://cdn.yeki.cm/app-6.apk",
+                "min_version_code": 6,
+            },
+            format="json",
+        )
+    assert creation.status_code == 201
+
+    apres = client.get(
+        reverse("app-version-check"),
+        {"plateforme": "android", "build": 5},
+        HTTP_IF_NONE_MATCH=avant["ETag"],
+    )
+    assert apres.status_code == 200
+    assert apres.data["obligatoire"] is True
+    assert apres.data["version_code"] == 6
+
+
+@pytest.mark.django_db
+def test_fiches_precalculees_apres_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        version = _version(5)
+    # Fiches déjà en cache : la lecture suivante ne touche pas la base.
+    with mock.patch.object(versions_app, "calculer") as calculer:
+        assert versions_app.fiche("android", "stable")["version"]["version_code"] == 5
+        assert versions_app.fiche("ios", "beta")["version"] is None
+    calculer.assert_not_called()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        version.delete()
+    assert versions_app.fiche("android", "stable")["version"] is None
+
+
+@pytest.mark.django_db
+def test_commande_publier_version_android_invalide(django_capture_on_commit_callbacks, tmp_path):
+    client = APIClient()
+    vide = client.get(reverse("app-version-check"), {"plateforme": "android", "build": 1})
+    assert vide.data["mise_a_jour_disponible"] is False
+
+    apk = tmp_path / "static" / "app" / "yeki-v.1.0.3.apk"
+    apk.parent.mkdir(parents=True)
+    apk.write_bytes(b"apk")
+    config = mock.Mock(path=str(tmp_path))
+    with mock.patch(
+        "apps.core.management.commands.publier_version_android.django_apps.get_app_config",
+        return_value=config,
+    ), django_capture_on_commit_callbacks(execute=True):
+        call_command("publier_version_android", stdout=mock.Mock())
+
+    publiee = client.get(reverse("app-version-check"), {"plateforme": "android", "build": 1})
+    assert publiee.data["mise_a_jour_disponible"] is True
+    assert publiee.data["file_size"] == 3
+
+
+@pytest.mark.django_db
+def test_plateforme_inconnue_sans_requete(django_assert_num_queries):
+    with django_assert_num_queries(0):
+        response = APIClient().get(reverse("latest-version"), {"platform": "symbian"})
+    assert response.data["version_name"] == "v1.0.0"
@@ -10,29 +10,125 @@ premier chiffre du multiplicateur ("1" de "10min") au lieu d'une unité, et
 lève un `KeyError` non rattrapé — chaque appel à un endpoint avec ce scope
 échouait donc en 500, jamais détecté faute de test avant P5.5 (voir
 docs/ecarts/forgot_password.md).
+
+Algorithme : compteur à fenêtre glissante, à la place de la liste
+d'horodatages de DRF (relue, filtrée et réécrite en entier à chaque
+requête, jusqu'à `num_requests` entrées par client). Deux compteurs
+entiers par client et par scope, la fenêtre fixe courante et la
+précédente ; le nombre de requêtes sur la dernière `duration` est estimé
+par `précédente × (part de la fenêtre précédente encore couverte) +
+courante`. Mémoire fixe, deux opérations de cache par requête (`get` de
+la précédente, `incr` atomique de la courante), aucune réécriture.
+
+Magasin : l'alias de cache `THROTTLE_CACHE` — Redis en production
+(partagé entre process Daphne : sans lui, chaque process comptait de son
+côté et les limites étaient multipliées par le nombre de workers), le
+cache local en développement et en tests.
 """
 
 import re
 
-from rest_framework.throttling import ScopedRateThrottle
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
 
 _DUREES_PAR_UNITE = {"s": 1, "m": 60, "h": 3600, "d": 86400}
 
 _RATE_AVEC_MULTIPLICATEUR = re.compile(r"^(\d*)([a-zA-Z]+)$")
 
 
-class YekiScopedRateThrottle(ScopedRateThrottle):
-    """`ScopedRateThrottle` tolérant un multiplicateur devant l'unité de
-    durée (`"3/10min"` → 3 requêtes / 600 secondes)."""
+def parser_taux(rate):
+    """`"3/10min"` → `(3, 600)` ; `None` si la période n'a pas la forme
+    `[multiplicateur]unité`."""
+    num, period = rate.split("/")
+    match = _RATE_AVEC_MULTIPLICATEUR.match(period)
+    if not match:
+        return None
+    multiplicateur = int(match.group(1)) if match.group(1) else 1
+    return (int(num), _DUREES_PAR_UNITE[match.group(2)[0].lower()] * multiplicateur)
+
+
+def magasin():
+    return caches[getattr(settings, "THROTTLE_CACHE", "default")]
+
+
+class FenetreGlissanteThrottle(SimpleRateThrottle):
+    """Remplace l'historique d'horodatages de `SimpleRateThrottle` par un
+    compteur à fenêtre glissante ; accepte un multiplicateur devant l'unité
+    de durée (`"3/10min"` → 3 requêtes / 600 secondes).
+
+    Placée après la classe DRF dans les bases : `ScopedRateThrottle`
+    résout d'abord le scope de la vue, puis délègue ici par `super()`."""
 
     def parse_rate(self, rate):
         if rate is None:
             return (None, None)
-        num, period = rate.split("/")
-        num_requests = int(num)
-        match = _RATE_AVEC_MULTIPLICATEUR.match(period)
-        if not match:
-            return super().parse_rate(rate)
-        multiplicateur = int(match.group(1)) if match.group(1) else 1
-        duration = _DUREES_PAR_UNITE[match.group(2)[0].lower()] * multiplicateur
-        return (num_requests, duration)
+        return parser_taux(rate) or super().parse_rate(rate)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        fenetre = int(self.now // self.duration)
+        self._part_ecoulee = (self.now - fenetre * self.duration) / self.duration
+        cle_courante = f"{self.key}:{fenetre}"
+        cle_precedente = f"{self.key}:{fenetre - 1}"
+        store = magasin()
+
+        self._precedente = store.get(cle_precedente, 0)
+        try:
+            courante = store.incr(cle_courante)
+        except ValueError:  # première requête de la fenêtre
+            courante = self._creer(store, cle_courante)
+
+        if self._estimation(courante) > self.num_requests:
+            # Une requête refusée ne compte pas (même règle que DRF).
+            store.decr(cle_courante)
+            self._courante = courante - 1
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def _creer(self, store, cle):
+        # Deux fenêtres de vie : la courante sert encore de « précédente ».
+        if store.add(cle, 1, timeout=2 * self.duration):
+            return 1
+        return store.incr(cle)
+
+    def _estimation(self, courante):
+        return self._precedente * (1 - self._part_ecoulee) + courante
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Secondes avant que la prochaine requête passe sous la limite."""
+        n, courante, precedente = self.num_requests, self._courante, self._precedente
+        restant = 1 - self._part_ecoulee
+        if courante + 1 <= n:
+            # Dans cette fenêtre, dès que la part de la précédente a décru.
+            part = max(0.0, 1 - (n - courante - 1) / precedente) if precedente else 0.0
+            return max(0.0, (part - self._part_ecoulee) * self.duration)
+        # Fenêtre suivante : la courante y devient la précédente.
+        part = max(0.0, 1 - (n - 1) / courante) if courante else 0.0
+        return (restant + part) * self.duration
+
+
+class YekiAnonRateThrottle(AnonRateThrottle, FenetreGlissanteThrottle):
+    pass
+
+
+class YekiUserRateThrottle(UserRateThrottle, FenetreGlissanteThrottle):
+    pass
+
+
+class YekiScopedRateThrottle(ScopedRateThrottle, FenetreGlissanteThrottle):
+    """`ScopedRateThrottle` à fenêtre glissante, multiplicateur toléré."""
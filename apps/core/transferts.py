@@ -0,0 +1,293 @@
+"""
+Transfert différé des fichiers uploadés vers le stockage.
+
+En production, `STORAGES["default"]` est Firebase Storage (django-storages,
+GCS) : chaque upload (copie PDF d'un devoir, PDF/vidéo de leçon, image ou
+audio du forum et du chat Yéki IA) était réécrit vers le bucket DANS la
+requête, et une écriture GCS lente immobilisait un worker Daphne pendant
+toute sa durée.
+
+Avec `TRANSFERT_MEDIAS_DIFFERE` (production), la vue :
+
+1. retire les fichiers des données à enregistrer (`extraire`) ;
+2. enregistre l'objet sans eux, puis `differer()` copie chaque fichier dans
+   `TRANSFERT_MEDIAS_SPOOL` (disque local), crée un `TransfertMedia` et
+   passe `transfert_statut` de l'objet à `en_attente` ;
+3. répond tout de suite.
+
+Des workers (threads démons, même modèle que apps/evaluation/afflux.py :
+aucune file de tâches dans ce projet), au plus `TRANSFERT_MEDIAS_WORKERS`
+par processus, écrivent ensuite chaque fichier sur le stockage sous le nom
+calculé par l'`upload_to` du champ, puis renseignent le champ par
+`save(update_fields=…)` (les signaux habituels — images dérivées, versions
+de contenu — s'appliquent) et `transfert_statut` : `pret`, ou `echec`
+après `TENTATIVES_MAX` essais espacés (`DELAI_NOUVEL_ESSAI` × 2^n).
+
+La copie locale n'existe que sur la machine qui a reçu l'upload : une
+entrée n'est prise que par les workers de son `hote`, et la commande
+`transferer_medias_en_attente` reprend la file de la machine après un
+redémarrage. Une copie locale disparue (conteneur recréé sans volume) est
+un échec immédiat, signalé sur l'objet.
+
+Sans `TRANSFERT_MEDIAS_DIFFERE` (développement, tests, `FileSystemStorage`
+où l'écriture est déjà locale), `extraire()` ne retire rien : le fichier
+est enregistré dans la requête, comme avant.
+"""
+
+import logging
+import os
+import shutil
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.core.models import TransfertMedia
+
+logger = logging.getLogger(__name__)
+
+TENTATIVES_MAX = 5
+DELAI_NOUVEL_ESSAI = timedelta(seconds=30)
+DELAI_REPRISE = timedelta(minutes=15)
+LOT = 20
+
+EN_COURS = ("en_attente", "en_cours")
+
+
+def actif() -> bool:
+    return getattr(settings, "TRANSFERT_MEDIAS_DIFFERE", False)
+
+
+def hote() -> str:
+    return socket.gethostname()
+
+
+def extraire(donnees, champs) -> dict:
+    """Retire de `donnees` (`validated_data`, kwargs de `create`) les
+    fichiers uploadés de `champs` et les retourne, pour `differer()` une
+    fois l'objet enregistré. `{}` sans transfert différé."""
+    if not actif():
+        return {}
+    return {
+        champ: donnees.pop(champ)
+        for champ in champs
+        if isinstance(donnees.get(champ), UploadedFile)
+    }
+
+
+def _copier_localement(fichier, chemin):
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    if hasattr(fichier, "temporary_file_path"):
+        # Gros upload déjà écrit sur disque par Django : déplacé, pas recopié.
+        shutil.move(fichier.temporary_file_path(), chemin)
+        return
+    with open(chemin, "wb") as destination:
+        for morceau in fichier.chunks():
+            destination.write(morceau)
+
+
+def differer(instance, fichiers) -> None:
+    """Met en file les `fichiers` (`{champ: UploadedFile}`) de `instance`,
+    déjà enregistrée. Les workers démarrent au commit."""
+    if not fichiers:
+        return
+    racine = Path(settings.TRANSFERT_MEDIAS_SPOOL)
+    for champ, fichier in fichiers.items():
+        chemin = racine / f"{uuid.uuid4().hex}{os.path.splitext(fichier.name)[1].lower()}"
+        _copier_localement(fichier, chemin)
+        TransfertMedia.objects.create(
+            modele=instance._meta.label,
+            objet_id=instance.pk,
+            champ=champ,
+            nom_cible=instance._meta.get_field(champ).generate_filename(instance, fichier.name),
+            chemin_local=str(chemin),
+            hote=hote(),
+            taille=fichier.size or 0,
+        )
+    type(instance)._base_manager.filter(pk=instance.pk).update(transfert_statut="en_attente")
+    instance.transfert_statut = "en_attente"
+    transaction.on_commit(demarrer_workers)
+
+
+def _reserver():
+    """Réserve le plus ancien transfert disponible de cette machine
+    (compare-and-set, comme `afflux._reserver`). Retourne son pk ou None."""
+    maintenant = timezone.now()
+    disponibles = (
+        TransfertMedia.objects.filter(
+            Q(statut="en_attente", reessayer_apres__lte=maintenant)
+            | Q(statut="en_cours", pris_le__lt=maintenant - DELAI_REPRISE),
+            hote=hote(),
+        )
+        .order_by("reessayer_apres", "pk")
+        .values_list("pk", "statut", "pris_le")[:LOT]
+    )
+    for pk, statut, pris_le in disponibles:
+        if TransfertMedia.objects.filter(pk=pk, statut=statut, pris_le=pris_le).update(
+            statut="en_cours", pris_le=maintenant, tentatives=F("tentatives") + 1
+        ):
+            return pk
+    return None
+
+
+def _statut_objet(transfert):
+    """Statut de l'objet porteur d'après TOUS ses transferts."""
+    autres = TransfertMedia.objects.filter(modele=transfert.modele, objet_id=transfert.objet_id)
+    if autres.filter(statut__in=EN_COURS).exists():
+        return "en_attente"
+    if autres.filter(statut="echec").exists():
+        return "echec"
+    return "pret"
+
+
+def _supprimer_copie(transfert):
+    try:
+        os.remove(transfert.chemin_local)
+    except FileNotFoundError:
+        pass
+
+
+def traiter(pk) -> bool:
+    """Écrit un transfert réservé sur le stockage et l'attache à son objet.
+    En cas d'erreur, nouvel essai plus tard, ou `echec` au bout de
+    `TENTATIVES_MAX` (copie locale conservée pour `--reessayer-echecs`)."""
+    transfert = TransfertMedia.objects.get(pk=pk)
+    modele = apps.get_model(transfert.modele)
+    objet = modele._base_manager.filter(pk=transfert.objet_id).first()
+    if objet is None:
+        _supprimer_copie(transfert)
+        TransfertMedia.objects.filter(pk=pk).update(statut="abandonne", pris_le=None)
+        return True
+
+    champ = modele._meta.get_field(transfert.champ)
+    try:
+        with open(transfert.chemin_local, "rb") as copie:
+            nom = champ.storage.save(transfert.nom_cible, File(copie), max_length=champ.max_length)
+    except Exception as exc:
+        # Copie locale disparue : aucun nouvel essai ne la fera revenir.
+        definitif = (
+            not os.path.exists(transfert.chemin_local) or transfert.tentatives >= TENTATIVES_MAX
+        )
+        logger.exception("Échec du transfert de média #%s (%s)", pk, transfert.nom_cible)
+        TransfertMedia.objects.filter(pk=pk).update(
+            statut="echec" if definitif else "en_attente",
+            pris_le=None,
+            reessayer_apres=timezone.now()
+            + DELAI_NOUVEL_ESSAI * 2 ** max(0, transfert.tentatives - 1),
+            erreur=str(exc)[:2000],
+        )
+        if definitif:
+            objet.transfert_statut = _statut_objet(transfert)
+            objet.save(update_fields=["transfert_statut"])
+        return False
+
+    with transaction.atomic():
+        TransfertMedia.objects.filter(pk=pk).update(
+            statut="transfere", pris_le=None, transfere_le=timezone.now(), erreur=""
+        )
+        setattr(objet, transfert.champ, nom)
+        objet.transfert_statut = _statut_objet(transfert)
+        objet.save(update_fields=[transfert.champ, "transfert_statut"])
+    _supprimer_copie(transfert)
+    return True
+
+
+def drainer(limite=None):
+    """Transfère les fichiers disponibles de cette machine, plus anciens
+    d'abord, jusqu'à épuisement (ou `limite`). Retourne (transférés, échecs)."""
+    transferes = echecs = 0
+    while limite is None or transferes + echecs < limite:
+        pk = _reserver()
+        if pk is None:
+            break
+        if traiter(pk):
+            transferes += 1
+        else:
+            echecs += 1
+    return transferes, echecs
+
+
+def reessayer_echecs() -> int:
+    """Remet en file les échecs de cette machine dont la copie locale existe."""
+    ids = [
+        pk
+        for pk, chemin in TransfertMedia.objects.filter(statut="echec", hote=hote()).values_list(
+            "pk", "chemin_local"
+        )
+        if os.path.exists(chemin)
+    ]
+    return TransfertMedia.objects.filter(pk__in=ids).update(
+        statut="en_attente", tentatives=0, reessayer_apres=timezone.now(), erreur=""
+    )
+
+
+# ── Workers en arrière-plan ─────────────────────────────────────────────
+
+_verrou = threading.Lock()
+_workers_actifs = 0
+_travail_signale = False
+_reveil = None
+
+
+def _programmer_reveil():
+    """Relance le pool à l'échéance du prochain nouvel essai de cette
+    machine (un seul minuteur à la fois)."""
+    global _reveil
+    prochain = (
+        TransfertMedia.objects.filter(hote=hote(), statut="en_attente")
+        .order_by("reessayer_apres")
+        .values_list("reessayer_apres", flat=True)
+        .first()
+    )
+    if prochain is None:
+        return
+    with _verrou:
+        if _reveil is not None and _reveil.is_alive():
+            return
+        delai = max(0.0, (prochain - timezone.now()).total_seconds())
+        _reveil = threading.Timer(delai, demarrer_workers)
+        _reveil.daemon = True
+        _reveil.start()
+
+
+def _boucle_worker():
+    global _workers_actifs, _travail_signale
+    try:
+        while True:
+            with _verrou:
+                _travail_signale = False
+            try:
+                drainer()
+            except Exception:
+                logger.exception("Worker de transfert de médias interrompu")
+            with _verrou:
+                # Un transfert mis en file pendant le drain a levé le
+                # signal : on repasse plutôt que de le laisser orphelin.
+                if not _travail_signale:
+                    _workers_actifs -= 1
+                    break
+        _programmer_reveil()
+    finally:
+        connection.close()
+
+
+def demarrer_workers() -> None:
+    """Signale du travail et lance un worker si le pool n'est pas plein
+    (`TRANSFERT_MEDIAS_WORKERS`). Appelé au commit de chaque mise en file
+    et à l'échéance des nouveaux essais ; ne bloque jamais l'appelant."""
+    global _workers_actifs, _travail_signale
+    with _verrou:
+        _travail_signale = True
+        if _workers_actifs >= settings.TRANSFERT_MEDIAS_WORKERS:
+            return
+        _workers_actifs += 1
+    threading.Thread(target=_boucle_worker, daemon=True).start()
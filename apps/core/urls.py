@@ -10,6 +10,8 @@ from apps.core.views import (
     AdminVersionCreateView,
     AdminVersionListView,
     ParametresPubliquesView,
+    TeleversementDirectContenuView,
+    MediaSigneView,
 )
 
 urlpatterns = [
@@ -22,4 +24,10 @@ urlpatterns = [
     path("admin/versions/", AdminVersionCreateView.as_view(), name="admin-version-create"),
     path("admin/versions/list/", AdminVersionListView.as_view(), name="admin-version-list"),
     path("parametres/publics/", ParametresPubliquesView.as_view(), name="parametres-publics"),
+    path(
+        "televersements/<str:jeton>/contenu/",
+        TeleversementDirectContenuView.as_view(),
+        name="televersement-direct-contenu",
+    ),
+    path("medias/<str:jeton>/<str:fichier>", MediaSigneView.as_view(), name="media-signe"),
 ]
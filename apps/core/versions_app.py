@@ -0,0 +1,96 @@
+"""
+Dernière version publiée de l'application, par plateforme et canal, servie
+depuis le cache.
+
+`LatestVersionView`, `CheckUpdateView` et `AppVersionCheckView` sont
+appelées à chaque ouverture de l'application, sans authentification :
+la requête la plus fréquente du service. Elles lisaient `AppVersion` à
+chaque fois, alors que la table ne change qu'à une publication.
+
+Chaque couple (plateforme, canal) a une fiche : données
+`AppVersionSerializer` de la dernière version active (avec le build
+minimum supporté, `min_version_code`), ou None, et une empreinte qui sert
+d'ETag. Les fiches sont dans le cache `CACHE_PARTAGE` (Redis en
+production, partagé par tous les process). Toute écriture sur
+`AppVersion` les recalcule après le commit :
+
+- signal post_save/post_delete (apps/core/signals.py) : admin Django,
+  `AdminVersionCreateView`, commande `publier_version_android` ;
+- appel explicite après un `QuerySet.update()`, qui n'émet pas de signal
+  (désactivation des anciennes versions dans `AdminVersionCreateView`).
+
+Une fiche absente (cache vidé, première requête) est calculée à la
+lecture. Elle est posée par `cache.add`, pour ne pas écraser une fiche
+recalculée entre-temps par une publication.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from apps.core.models import AppVersion
+
+PLATEFORMES = [code for code, _ in AppVersion.PLATFORM_CHOICES]
+CANAUX = [code for code, _ in AppVersion.CANAL_CHOICES]
+
+# Filet de sécurité : une fiche vit au plus une journée sans publication.
+DUREE_CACHE = 24 * 3600
+
+
+def _cache():
+    return caches[settings.CACHE_PARTAGE]
+
+
+def _cle(platform, canal) -> str:
+    return f"version_app:{platform}:{canal}"
+
+
+def _empreinte(donnees) -> str:
+    brut = json.dumps(donnees, sort_keys=True, default=str)
+    return hashlib.sha1(brut.encode()).hexdigest()[:20]
+
+
+FICHE_VIDE = {"version": None, "empreinte": _empreinte(None)}
+
+
+def calculer(platform, canal) -> dict:
+    from apps.core.serializers import AppVersionSerializer
+
+    version = (
+        AppVersion.objects.filter(platform=platform, canal=canal, is_active=True)
+        .order_by("-version_code")
+        .first()
+    )
+    donnees = AppVersionSerializer(version).data if version is not None else None
+    return {"version": donnees, "empreinte": _empreinte(donnees)}
+
+
+def fiche(platform, canal) -> dict:
+    """Fiche de (plateforme, canal) : `version` (dict ou None) et
+    `empreinte`. Plateforme ou canal inconnus : `FICHE_VIDE`, sans requête
+    ni entrée de cache."""
+    if platform not in PLATEFORMES or canal not in CANAUX:
+        return FICHE_VIDE
+    cle = _cle(platform, canal)
+    valeur = _cache().get(cle)
+    if valeur is None:
+        valeur = calculer(platform, canal)
+        _cache().add(cle, valeur, DUREE_CACHE)
+    return valeur
+
+
+def precalculer() -> None:
+    """Recalcule et met en cache toutes les fiches."""
+    _cache().set_many(
+        {_cle(p, c): calculer(p, c) for p in PLATEFORMES for c in CANAUX}, DUREE_CACHE
+    )
+
+
+def invalider() -> None:
+    """À appeler après toute écriture sur `AppVersion` : fiches retirées
+    tout de suite, puis recalculées au commit."""
+    _cache().delete_many([_cle(p, c) for p in PLATEFORMES for c in CANAUX])
+    transaction.on_commit(precalculer)
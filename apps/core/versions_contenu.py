@@ -0,0 +1,129 @@
+"""
+GET conditionnels (ETag / If-None-Match) pour les contenus que l'application
+mobile recharge à chaque ouverture d'écran : arbre d'un cours (modules,
+leçons, exercices), cours et niveaux d'un département, paramètres publics.
+
+Chaque contenu porte une version monotone (`VersionContenu`) incrémentée
+par signaux à chaque écriture (apps/formation/signals.py, apps/evaluation/
+signals.py, apps/core/signals.py). L'ETag d'une réponse se calcule depuis
+cette version — une sous-requête sur la ligne déjà lue par la vue, ou le
+cache pour les paramètres publics — sans relire les données : un client
+à jour reçoit un 304 vide avant toute sérialisation.
+
+L'ETag inclut aussi la « variante » de la réponse pour l'utilisateur
+(seuil d'étoiles visible, vidéo masquée pour un gratuit), le format de
+rendu négocié et `REVISION_FORMAT`, à incrémenter quand la forme d'une de
+ces réponses change (un client à jour ne doit pas garder l'ancienne).
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.core.models import VersionContenu
+
+TYPE_COURS = "cours"
+TYPE_DEPARTEMENT = "departement"
+TYPE_PARAMETRES_PUBLICS = "parametres_publics"
+
+REVISION_FORMAT = 1
+
+# Lecture de `version()` par le cache : borne la fenêtre où une lecture
+# concurrente d'une écriture remettrait en cache l'ancienne version.
+VERSION_TTL = 60
+
+
+def _cle_cache(type_objet, objet_id) -> str:
+    return f"version_contenu:{type_objet}:{objet_id}"
+
+
+def incrementer(type_objet, ids=(0,)) -> None:
+    """Incrémente la version de chaque objet, créée à 1 si absente. À
+    appeler dans la transaction de l'écriture (signal post_save/post_delete)."""
+    ids = {i for i in ids if i is not None}
+    for objet_id in ids:
+        lignes = VersionContenu.objects.filter(type_objet=type_objet, objet_id=objet_id)
+        if lignes.update(version=F("version") + 1):
+            continue
+        try:
+            with transaction.atomic():
+                VersionContenu.objects.create(type_objet=type_objet, objet_id=objet_id, version=1)
+        except IntegrityError:
+            # Créée entre-temps par une écriture concurrente.
+            lignes.update(version=F("version") + 1)
+
+    cles = [_cle_cache(type_objet, objet_id) for objet_id in ids]
+    if cles:
+        cache.delete_many(cles)
+        transaction.on_commit(lambda: cache.delete_many(cles))
+
+
+def version(type_objet, objet_id=0) -> int:
+    """Version courante (0 si jamais écrit), lue par le cache."""
+    cle = _cle_cache(type_objet, objet_id)
+    valeur = cache.get(cle)
+    if valeur is None:
+        valeur = (
+            VersionContenu.objects.filter(type_objet=type_objet, objet_id=objet_id)
+            .values_list("version", flat=True)
+            .first()
+        ) or 0
+        cache.set(cle, valeur, VERSION_TTL)
+    return valeur
+
+
+def annoter_version(queryset, type_objet):
+    """Ajoute `version_contenu` aux lignes de `queryset` (sous-requête sur
+    la clé primaire) : la version arrive avec l'objet, sans requête de plus."""
+    return queryset.annotate(
+        version_contenu=Coalesce(
+            Subquery(
+                VersionContenu.objects.filter(
+                    type_objet=type_objet, objet_id=OuterRef("pk")
+                ).values("version")[:1]
+            ),
+            0,
+        )
+    )
+
+
+def etag(request, *elements) -> str:
+    """ETag fort d'une réponse : versions et variante utilisateur fournies
+    par la vue, plus le format de rendu négocié."""
+    rendu = getattr(getattr(request, "accepted_renderer", None), "format", "")
+    brut = ":".join(str(e) for e in (REVISION_FORMAT, rendu, *elements))
+    return '"%s"' % hashlib.sha1(brut.encode()).hexdigest()[:20]
+
+
+def _entetes(response, request, valeur):
+    response["ETag"] = valeur
+    # Toujours revalider ; pas de cache partagé pour une réponse authentifiée.
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def reponse_non_modifiee(request, valeur):
+    """Réponse 304 si `If-None-Match` contient `valeur` (comparaison faible,
+    RFC 9110 §13.1.2), sinon None."""
+    entete = request.headers.get("If-None-Match")
+    if not entete:
+        return None
+    candidats = parse_etags(entete)
+    if "*" not in candidats and valeur not in {c.removeprefix("W/") for c in candidats}:
+        return None
+    return _entetes(Response(status=status.HTTP_304_NOT_MODIFIED), request, valeur)
+
+
+def avec_etag(response, request, valeur):
+    """Pose l'ETag (et `Cache-Control`) sur une réponse 200."""
+    return _entetes(response, request, valeur)
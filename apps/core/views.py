@@ -13,8 +13,11 @@ from drf_spectacular.utils import (
 )
 from drf_spectacular.types import OpenApiTypes
 
+from apps.core import diffusion_medias, televersement_direct, versions_app, versions_contenu
+from apps.core.cache_reponses import reponse_en_cache
 from apps.core.models import HistoriqueActivite, AppVersion, ParametreSysteme
-from apps.core.pagination import PaginatedListMixin
+from apps.core.pagination import PaginatedListMixin, YekiKeysetPagination
+from apps.core.services import stats_activite
 from apps.core.serializers import (
     HistoriqueActiviteSerializer,
     AppVersionSerializer,
@@ -24,10 +27,13 @@ from apps.core.schema_examples import (
     ERREURS_COURANTES,
     ERREURS_ECRITURE,
     EXEMPLE_PAGINATION,
+    PARAMS_GET_CONDITIONNEL,
     PARAMS_PAGINATION,
+    PARAMS_PAGINATION_KEYSET,
 )
 
 
+@reponse_en_cache("landing")
 def landing(request):
     return render(request, "landing-page.html")
 
@@ -45,7 +51,7 @@ def landing(request):
         ),
         tags=["core"],
         parameters=[
-            *PARAMS_PAGINATION,
+            *PARAMS_PAGINATION_KEYSET,
             OpenApiParameter(
                 "action",
                 OpenApiTypes.STR,
@@ -77,6 +83,8 @@ def landing(request):
 )
 class HistoriqueActiviteView(PaginatedListMixin, APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = YekiKeysetPagination
+    keyset_champ = "timestamp"
 
     CATEGORIES = {
         "cours": ["course_created", "course_modified", "course_deleted"],
@@ -176,57 +184,7 @@ class HistoriqueStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from django.utils import timezone
-        from datetime import timedelta
-
-        now = timezone.now()
-        total = HistoriqueActivite.objects.filter(user=request.user).count()
-
-        semaine_debut = now - timedelta(days=7)
-        cette_semaine = HistoriqueActivite.objects.filter(
-            user=request.user, timestamp__gte=semaine_debut
-        ).count()
-
-        mois_debut = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        ce_mois = HistoriqueActivite.objects.filter(
-            user=request.user, timestamp__gte=mois_debut
-        ).count()
-
-        category_map = {
-            "cours": ["course_created", "course_modified", "course_deleted"],
-            "modules": ["module_created", "module_modified", "module_deleted"],
-            "lecons": ["lesson_created", "lesson_modified", "lesson_deleted"],
-            "devoirs": ["homework_created", "homework_modified", "homework_graded"],
-            "exercices": ["exercise_created", "question_added"],
-            "olympiades": ["olympiad_created", "olympiad_closed", "ranking_computed"],
-            "enseignants": [
-                "teacher_assigned",
-                "teacher_changed",
-                "secondary_added",
-                "secondary_removed",
-            ],
-            "corrections": ["submission_graded", "homework_graded"],
-        }
-        categories_count = {}
-        for cat, actions in category_map.items():
-            categories_count[cat] = HistoriqueActivite.objects.filter(
-                user=request.user, action__in=actions
-            ).count()
-
-        derniere = (
-            HistoriqueActivite.objects.filter(user=request.user).order_by("-timestamp").first()
-        )
-
-        return Response(
-            {
-                "total": total,
-                "cette_semaine": cette_semaine,
-                "ce_mois": ce_mois,
-                "categories": categories_count,
-                "derniere_activite": derniere.timestamp.isoformat() if derniere else None,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return Response(stats_activite(request.user), status=status.HTTP_200_OK)
 
 
 @extend_schema_view(
@@ -256,6 +214,7 @@ class HistoriqueStatsView(APIView):
                 required=False,
                 description="Code de version actuellement installé, pour calculer is_update_available.",
             ),
+            *PARAMS_GET_CONDITIONNEL,
         ],
         responses={200: OpenApiTypes.OBJECT},
         examples=[
@@ -317,44 +276,44 @@ class LatestVersionView(APIView):
         canal = request.query_params.get("canal", "stable")
         current_version = request.query_params.get("current_version")
 
-        try:
-            # Récupérer la dernière version active de ce canal — sans ce
-            # filtre, une version beta plus récente serait proposée à un
-            # client stable dès que son version_code dépasse le sien (P12.1).
-            version = AppVersion.objects.filter(
-                platform=platform, canal=canal, is_active=True
-            ).latest("version_code")
-
+        # Dernière version active de ce canal — sans ce filtre, une version
+        # beta plus récente serait proposée à un client stable dès que son
+        # version_code dépasse le sien (P12.1). Lue depuis le cache.
+        fiche = versions_app.fiche(platform, canal)
+        etag = versions_contenu.etag(request, fiche["empreinte"], platform, current_version)
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
+
+        version = fiche["version"]
+        if version is None:
+            # Version par défaut si rien n'existe
+            data = {
+                "platform": platform,
+                "version_code": 1,
+                "version_name": "v1.0.0",
+                "download_url": "",
+                "changelog": "Version initiale",
+                "min_version_code": 1,
+                "force_update": False,
+                "is_active": True,
+                "is_update_available": False,
+            }
+        else:
             # Si current_version est fourni, vérifier si une mise à jour est nécessaire
             is_update_available = False
             if current_version:
                 try:
                     current = int(current_version)
-                    is_update_available = version.version_code > current
+                    is_update_available = version["version_code"] > current
                 except (ValueError, TypeError):
                     is_update_available = True
 
-            data = AppVersionSerializer(version).data
-            data["is_update_available"] = is_update_available
+            data = {**version, "is_update_available": is_update_available}
 
-            return Response(data, status=status.HTTP_200_OK)
-
-        except AppVersion.DoesNotExist:
-            # Version par défaut si rien n'existe
-            return Response(
-                {
-                    "platform": platform,
-                    "version_code": 1,
-                    "version_name": "v1.0.0",
-                    "download_url": "",
-                    "changelog": "Version initiale",
-                    "min_version_code": 1,
-                    "force_update": False,
-                    "is_active": True,
-                    "is_update_available": False,
-                },
-                status=status.HTTP_200_OK,
-            )
+        return versions_contenu.avec_etag(
+            Response(data, status=status.HTTP_200_OK), request, etag
+        )
 
 
 @extend_schema_view(
@@ -393,6 +352,8 @@ class AdminVersionCreateView(APIView):
         # Désactiver les anciennes versions de la même plateforme
         platform = serializer.validated_data["platform"]
         AppVersion.objects.filter(platform=platform, is_active=True).update(is_active=False)
+        # `update()` n'émet pas post_save : invalidation explicite.
+        versions_app.invalider()
 
         version = serializer.save()
         return Response(AppVersionSerializer(version).data, status=status.HTTP_201_CREATED)
@@ -456,6 +417,7 @@ class AdminVersionListView(PaginatedListMixin, APIView):
                 required=True,
                 description="Code de version actuellement installé.",
             ),
+            *PARAMS_GET_CONDITIONNEL,
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
         examples=[
@@ -519,38 +481,32 @@ class CheckUpdateView(APIView):
 
         try:
             current = int(current_version)
-            version = AppVersion.objects.filter(
-                platform=platform, canal=canal, is_active=True
-            ).latest("version_code")
-
-            if version.version_code > current:
-                return Response(
-                    {
-                        "update_available": True,
-                        "version": AppVersionSerializer(version).data,
-                    },
-                    status=status.HTTP_200_OK,
-                )
-            else:
-                return Response(
-                    {
-                        "update_available": False,
-                        "message": "Vous utilisez déjà la dernière version.",
-                    },
-                    status=status.HTTP_200_OK,
-                )
-
-        except AppVersion.DoesNotExist:
-            return Response(
-                {"update_available": False, "message": "Version non trouvée."},
-                status=status.HTTP_200_OK,
-            )
         except ValueError:
             return Response(
                 {"detail": "current_version doit être un entier"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        fiche = versions_app.fiche(platform, canal)
+        etag = versions_contenu.etag(request, fiche["empreinte"], current)
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
+
+        version = fiche["version"]
+        if version is None:
+            data = {"update_available": False, "message": "Version non trouvée."}
+        elif version["version_code"] > current:
+            data = {"update_available": True, "version": version}
+        else:
+            data = {
+                "update_available": False,
+                "message": "Vous utilisez déjà la dernière version.",
+            }
+        return versions_contenu.avec_etag(
+            Response(data, status=status.HTTP_200_OK), request, etag
+        )
+
 
 @extend_schema_view(
     get=extend_schema(
@@ -585,6 +541,7 @@ class CheckUpdateView(APIView):
                 required=True,
                 description="Numéro de build (version_code) actuellement installé.",
             ),
+            *PARAMS_GET_CONDITIONNEL,
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
     ),
@@ -614,42 +571,53 @@ class AppVersionCheckView(APIView):
                 {"detail": "build doit être un entier"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            version = AppVersion.objects.filter(
-                platform=plateforme, canal=canal, is_active=True
-            ).latest("version_code")
-        except AppVersion.DoesNotExist:
-            return Response(
-                {
-                    "obligatoire": False,
-                    "message": "Aucune version publiée pour cette plateforme.",
-                    "mise_a_jour_disponible": False,
-                },
-                status=status.HTTP_200_OK,
+        fiche = versions_app.fiche(plateforme, canal)
+        etag = versions_contenu.etag(request, fiche["empreinte"], build_actuel)
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
+
+        version = fiche["version"]
+        if version is None:
+            return versions_contenu.avec_etag(
+                Response(
+                    {
+                        "obligatoire": False,
+                        "message": "Aucune version publiée pour cette plateforme.",
+                        "mise_a_jour_disponible": False,
+                    },
+                    status=status.HTTP_200_OK,
+                ),
+                request,
+                etag,
             )
 
-        obligatoire = build_actuel < version.min_version_code
-        mise_a_jour_disponible = build_actuel < version.version_code
+        obligatoire = build_actuel < version["min_version_code"]
+        mise_a_jour_disponible = build_actuel < version["version_code"]
 
         data = {
             "obligatoire": obligatoire,
             "message": (
                 "Une mise à jour est requise pour continuer."
                 if obligatoire
-                else "Une mise à jour est disponible."
-                if mise_a_jour_disponible
-                else "Vous utilisez déjà la dernière version."
+                else (
+                    "Une mise à jour est disponible."
+                    if mise_a_jour_disponible
+                    else "Vous utilisez déjà la dernière version."
+                )
             ),
             "mise_a_jour_disponible": mise_a_jour_disponible,
-            "version_code": version.version_code,
-            "version_name": version.version_name,
-            "download_url": version.download_url,
-            "file_size": version.file_size,
-            "checksum_sha256": version.checksum_sha256,
-            "canal": version.canal,
-            "changelog": version.changelog,
+            "version_code": version["version_code"],
+            "version_name": version["version_name"],
+            "download_url": version["download_url"],
+            "file_size": version["file_size"],
+            "checksum_sha256": version["checksum_sha256"],
+            "canal": version["canal"],
+            "changelog": version["changelog"],
         }
-        return Response(data, status=status.HTTP_200_OK)
+        return versions_contenu.avec_etag(
+            Response(data, status=status.HTTP_200_OK), request, etag
+        )
 
 
 @extend_schema_view(
@@ -664,6 +632,7 @@ class AppVersionCheckView(APIView):
             "son parcours."
         ),
         tags=["paiement"],
+        parameters=PARAMS_GET_CONDITIONNEL,
         responses={200: OpenApiTypes.OBJECT},
         examples=[
             OpenApiExample(
@@ -697,8 +666,15 @@ class ParametresPubliquesView(APIView):
 
     permission_classes = [AllowAny]
 
+    @reponse_en_cache("parametres_publics")
     def get(self, request):
-        return Response(
+        etag = versions_contenu.etag(
+            request, versions_contenu.version(versions_contenu.TYPE_PARAMETRES_PUBLICS)
+        )
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
+        reponse = Response(
             {
                 "ussd_orange_money": ParametreSysteme.get("ussd_orange_money", default=""),
                 "ussd_mtn_momo": ParametreSysteme.get("ussd_mtn_momo", default=""),
@@ -716,3 +692,116 @@ class ParametresPubliquesView(APIView):
                 "mode_paiement": ParametreSysteme.get("mode_paiement", default="manuel"),
             }
         )
+        return versions_contenu.avec_etag(reponse, request, etag)
+
+
+@extend_schema_view(
+    put=extend_schema(
+        summary="Envoyer un fichier en téléversement direct (stockage local)",
+        description=(
+            "Cible des URLs de téléversement direct quand les médias sont sur le "
+            "disque (développement, tests) ; en production, l'URL pointe vers "
+            "Google Cloud Storage. Même protocole que l'upload reprenable GCS : "
+            "corps brut, morceaux `Content-Range: bytes <début>-<fin>/<taille>`, "
+            "`bytes */<taille>` pour connaître la taille reçue. Réponse 308 avec "
+            "l'en-tête `Range` tant que le fichier est incomplet, 200 ensuite. "
+            "Authentifié par le jeton signé de l'URL."
+        ),
+        tags=["core"],
+        request={"application/octet-stream": OpenApiTypes.BINARY},
+        responses={200: OpenApiTypes.OBJECT, 308: None},
+        examples=[*ERREURS_ECRITURE],
+    ),
+)
+class TeleversementDirectContenuView(APIView):
+    """
+    PUT /api/televersements/<jeton>/contenu/
+    Reçoit le fichier d'une session de téléversement direct vers un
+    `FileSystemStorage` (voir apps/core/televersement_direct.py).
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def put(self, request, jeton):
+        session = televersement_direct.session_du_jeton(jeton)
+        if session is None:
+            return Response(
+                {"detail": "Lien de téléversement invalide ou expiré."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if session.statut != "ouverte":
+            return Response(
+                {"detail": "Ce téléversement n'est plus ouvert."}, status=status.HTTP_410_GONE
+            )
+        type_recu = request.content_type.split(";")[0].strip()
+        if type_recu != session.type_contenu:
+            return Response(
+                {"detail": f"Type « {type_recu} » reçu, « {session.type_contenu} » annoncé."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            morceau = televersement_direct.plage(
+                request.headers.get("Content-Range"),
+                int(request.headers.get("Content-Length") or 0),
+                session.taille,
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        signe = televersement_direct.signataire_de(session)
+        if morceau is None:
+            recus = signe.recus(session)
+        else:
+            recus = signe.recevoir(session, request.stream, *morceau)
+        if recus == session.taille:
+            return Response({"taille": recus}, status=status.HTTP_200_OK)
+        # 308 « Resume Incomplete » : le client reprend après la plage reçue.
+        response = Response(status=status.HTTP_308_PERMANENT_REDIRECT)
+        if recus:
+            response["Range"] = f"bytes=0-{recus - 1}"
+        return response
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Lire un média par URL signée",
+        description=(
+            "Cible des URLs signées de médias (par exemple "
+            "`/api/lecons/<id>/medias/video/`), à passer telle quelle au lecteur. "
+            "Gère `Range` (réponse 206, une plage par requête), `If-Range`, "
+            "`If-None-Match` (ETag fort). Aucune authentification : le jeton "
+            "signé de l'URL, valable quelques heures, tient lieu d'autorisation. "
+            "Jeton invalide ou expiré : 403, redemander une URL. Sur Firebase "
+            "Storage, redirection vers une URL signée du bucket."
+        ),
+        tags=["core"],
+        responses={
+            (200, "application/octet-stream"): OpenApiTypes.BINARY,
+            (206, "application/octet-stream"): OpenApiTypes.BINARY,
+            302: None,
+            304: None,
+            403: None,
+            416: None,
+        },
+    ),
+)
+class MediaSigneView(APIView):
+    """
+    GET /api/medias/<jeton>/<fichier>
+    Diffuse le fichier désigné par le jeton (voir apps/core/diffusion_medias.py).
+    Le nom `fichier` ne sert qu'aux lecteurs qui déduisent le format de l'URL.
+    """
+
+    # Une requête par morceau lu : ni session, ni jeton d'API, ni quota.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    def get(self, request, jeton, fichier):
+        cible = diffusion_medias.lire_jeton(jeton)
+        if cible is None:
+            return Response(
+                {"detail": "Lien de média invalide ou expiré."}, status=status.HTTP_403_FORBIDDEN
+            )
+        return diffusion_medias.reponse(request, *cible)
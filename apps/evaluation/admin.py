@@ -1,9 +1,17 @@
 from django.contrib import admin
 
-from apps.evaluation.models import ParametreClassement
+from apps.evaluation.models import ParametreClassement, SoumissionEnAttente
 
 
 @admin.register(ParametreClassement)
 class ParametreClassementAdmin(admin.ModelAdmin):
     list_display = ["source", "poids"]
     ordering = ["source"]
+
+
+@admin.register(SoumissionEnAttente)
+class SoumissionEnAttenteAdmin(admin.ModelAdmin):
+    list_display = ["id", "type", "statut", "recu_le", "tentatives", "traitee_le"]
+    list_filter = ["type", "statut"]
+    ordering = ["-recu_le"]
+    readonly_fields = ["recu_le", "pris_le", "traitee_le", "erreur"]
@@ -0,0 +1,215 @@
+"""
+Absorbeur d'afflux de soumissions (devoirs et olympiades).
+
+À l'échéance d'un devoir ou à la fin d'une olympiade, des centaines
+d'apprenants soumettent dans la même minute ; corriger chaque soumission
+dans la requête (lecture du corrigé, écriture des réponses, note) fait
+s'empiler les requêtes HTTP derrière les transactions d'écriture.
+
+En MODE AFFLUX (`ParametreSysteme` `soumissions_mode_afflux` = true,
+basculé par l'administrateur avant une échéance chargée), la vue de
+soumission se contente de :
+
+1. figer la soumission (`statut`/`soumis` et horodatage SERVEUR de
+   réception) — plus de double soumission possible ;
+2. écrire les réponses brutes dans `SoumissionEnAttente` ;
+3. répondre 202 immédiatement.
+
+Des correcteurs (threads démons, même choix que apps/notifications/fcm.py :
+aucune file de tâches dans ce projet) vident ensuite la table et
+renseignent `note`/`statut` avec EXACTEMENT la correction du chemin
+synchrone, en passant l'heure de réception comme heure de soumission :
+`est_en_retard` est jugé sur l'instant où la copie est arrivée, jamais
+sur celui où elle a été corrigée.
+
+La table est durable : une entrée prise par un correcteur mort (redémarrage
+du processus) est reprise après `DELAI_REPRISE`, et la commande
+`traiter_soumissions_en_attente` peut vider la file hors du serveur web.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.core.models import ParametreSysteme
+from apps.evaluation.models import SoumissionEnAttente
+
+logger = logging.getLogger(__name__)
+
+TENTATIVES_MAX = 3
+DELAI_REPRISE = timedelta(minutes=5)
+LOT = 20
+
+
+def mode_afflux_actif() -> bool:
+    valeur = ParametreSysteme.get("soumissions_mode_afflux", default="false")
+    return str(valeur).lower() in ("true", "1", "yes")
+
+
+def nb_correcteurs() -> int:
+    return int(ParametreSysteme.get("soumissions_afflux_correcteurs", default=4))
+
+
+def mettre_en_attente_devoir(soum, reponses):
+    """`soum.soumis_le` (déjà figé par la vue) devient l'heure de réception."""
+    entree, _ = SoumissionEnAttente.objects.update_or_create(
+        soumission_devoir=soum,
+        defaults={
+            "type": "devoir",
+            "reponses": reponses,
+            "recu_le": soum.soumis_le,
+            "statut": "en_attente",
+            "tentatives": 0,
+            "pris_le": None,
+            "erreur": "",
+        },
+    )
+    transaction.on_commit(demarrer_correcteurs)
+    return entree
+
+
+def mettre_en_attente_olympiade(inscription, reponses):
+    """`inscription.heure_fin_compo` (déjà figée par la vue) devient l'heure
+    de réception."""
+    entree = SoumissionEnAttente.objects.create(
+        type="olympiade",
+        inscription=inscription,
+        reponses=reponses,
+        soumis_automatique=inscription.soumis_automatique,
+        recu_le=inscription.heure_fin_compo,
+    )
+    transaction.on_commit(demarrer_correcteurs)
+    return entree
+
+
+def _reserver(filtres):
+    """Réserve la plus ancienne entrée disponible (compare-and-set : un seul
+    correcteur gagne une entrée donnée, y compris sous SQLite). Retourne
+    son pk, ou None si la file est vide."""
+    maintenant = timezone.now()
+    disponibles = (
+        SoumissionEnAttente.objects.filter(
+            Q(statut="en_attente") | Q(statut="en_cours", pris_le__lt=maintenant - DELAI_REPRISE),
+            **filtres,
+        )
+        .order_by("recu_le", "pk")
+        .values_list("pk", "statut", "pris_le")[:LOT]
+    )
+    for pk, statut, pris_le in disponibles:
+        if SoumissionEnAttente.objects.filter(pk=pk, statut=statut, pris_le=pris_le).update(
+            statut="en_cours", pris_le=maintenant, tentatives=F("tentatives") + 1
+        ):
+            return pk
+    return None
+
+
+def _corriger(entree):
+    # Imports différés : les vues importent ce module.
+    if entree.type == "devoir":
+        from apps.evaluation.views.devoirs import _corriger_et_soumettre_devoir
+
+        soum = entree.soumission_devoir
+        _corriger_et_soumettre_devoir(soum.devoir, soum, entree.reponses, soumis_le=entree.recu_le)
+    else:
+        from apps.evaluation.views.olympiades import _corriger_et_soumettre_olympiade
+
+        inscription = entree.inscription
+        _corriger_et_soumettre_olympiade(
+            inscription.olympiade,
+            inscription,
+            entree.reponses,
+            auto=entree.soumis_automatique,
+            soumis_le=entree.recu_le,
+        )
+
+
+def traiter(pk) -> bool:
+    """Corrige une entrée réservée. En cas d'erreur, l'entrée retourne en
+    file (ou passe en `echec` après `TENTATIVES_MAX` essais) ; la
+    soumission reste figée, seule la note manque."""
+    entree = SoumissionEnAttente.objects.select_related(
+        "soumission_devoir__devoir", "inscription__olympiade__devoir"
+    ).get(pk=pk)
+    try:
+        with transaction.atomic():
+            _corriger(entree)
+            SoumissionEnAttente.objects.filter(pk=pk).update(
+                statut="traitee", traitee_le=timezone.now(), erreur=""
+            )
+    except Exception as exc:
+        logger.exception("Échec de correction de la soumission en attente #%s", pk)
+        SoumissionEnAttente.objects.filter(pk=pk).update(
+            statut="echec" if entree.tentatives >= TENTATIVES_MAX else "en_attente",
+            pris_le=None,
+            erreur=str(exc)[:2000],
+        )
+        return False
+    return True
+
+
+def drainer(limite=None, **filtres):
+    """Corrige les entrées disponibles, plus anciennes d'abord, jusqu'à
+    épuisement (ou `limite`). `filtres` restreint la file (ex.
+    `inscription__olympiade=olympiade`). Retourne (traitées, échecs)."""
+    traitees = echecs = 0
+    while limite is None or traitees + echecs < limite:
+        pk = _reserver(filtres)
+        if pk is None:
+            break
+        if traiter(pk):
+            traitees += 1
+        else:
+            echecs += 1
+    return traitees, echecs
+
+
+def en_file(**filtres) -> int:
+    """Entrées pas encore corrigées (en attente, ou réservées par un
+    correcteur qui travaille encore dessus). Les `echec` n'y sont pas."""
+    return SoumissionEnAttente.objects.filter(
+        statut__in=["en_attente", "en_cours"], **filtres
+    ).count()
+
+
+# ── Correcteurs en arrière-plan ─────────────────────────────────────────
+
+_verrou = threading.Lock()
+_correcteurs_actifs = 0
+_travail_signale = False
+
+
+def _boucle_correcteur():
+    global _correcteurs_actifs, _travail_signale
+    try:
+        while True:
+            with _verrou:
+                _travail_signale = False
+            try:
+                drainer()
+            except Exception:
+                logger.exception("Correcteur de soumissions interrompu")
+            with _verrou:
+                # Une entrée mise en file pendant le drain a levé le
+                # signal : on repasse plutôt que de la laisser orpheline.
+                if not _travail_signale:
+                    _correcteurs_actifs -= 1
+                    return
+    finally:
+        connection.close()
+
+
+def demarrer_correcteurs() -> None:
+    """Signale du travail et lance un correcteur si le pool n'est pas plein
+    (`soumissions_afflux_correcteurs`, 4 par défaut). Appelé au commit de
+    chaque mise en file ; ne bloque jamais l'appelant."""
+    global _correcteurs_actifs, _travail_signale
+    with _verrou:
+        _travail_signale = True
+        if _correcteurs_actifs >= nb_correcteurs():
+            return
+        _correcteurs_actifs += 1
+    threading.Thread(target=_boucle_correcteur, daemon=True).start()
@@ -0,0 +1,288 @@
+"""
+Classement PROVISOIRE en direct d'une olympiade en cours.
+
+`ClassementOlympiadeView` ne sert que le classement figé par
+`CalculerClassementView` ; pendant l'épreuve, les organisateurs
+retriaient `InscriptionOlympiade` à chaque rafraîchissement. Ici, chaque
+copie notée (`_corriger_et_soumettre_olympiade`, synchrone ou mode afflux)
+met à jour une structure TRIÉE par olympiade :
+
+- Redis (`CLASSEMENT_DIRECT_REDIS_URL`, le Redis du channel layer en
+  production) : un ZSET par olympiade, partagé entre process ;
+- sinon, une liste triée en mémoire du process (`bisect`), rechargée
+  depuis la base toutes les `RECHARGE_LOCALE` secondes pour voir les
+  copies notées par les autres process.
+
+Top-N et « ma position » s'y lisent en O(log n), sans requête SQL (hors
+noms d'utilisateur du top). Ordre : note décroissante, puis à note égale
+la copie rendue la première — même règle que le classement final.
+
+Chaque mise à jour est diffusée aux abonnés WebSocket (groupe Channels
+`classement_olympiade_<id>`, `apps/evaluation/consumers.py`), au plus une
+fois par `INTERVALLE_DIFFUSION` seconde par olympiade et par process : les
+mises à jour d'une rafale sont fusionnées en une diffusion différée.
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+
+from apps.evaluation.models import InscriptionOlympiade
+
+logger = logging.getLogger(__name__)
+
+TOP_PAR_DEFAUT = 10
+TOP_MAX = 100
+INTERVALLE_DIFFUSION = 1.0
+RECHARGE_LOCALE = 30
+DUREE_REDIS = 3 * 24 * 3600
+
+
+def groupe(olympiade_id) -> str:
+    return f"classement_olympiade_{olympiade_id}"
+
+
+def _copies_notees(olympiade_id):
+    return InscriptionOlympiade.objects.filter(
+        olympiade_id=olympiade_id, soumis=True, note__isnull=False
+    ).values_list("apprenant_id", "note", "heure_fin_compo")
+
+
+def _horodatage(soumis_le) -> float:
+    return soumis_le.timestamp() if soumis_le else float("inf")
+
+
+# ── Structure en mémoire du process ─────────────────────────────────────
+
+
+class _ClassementLocal:
+    def __init__(self):
+        self._verrou = threading.Lock()
+        # olympiade_id → (clés triées, clé par apprenant, chargé le)
+        self._olympiades = {}
+
+    def _structure(self, olympiade_id):
+        structure = self._olympiades.get(olympiade_id)
+        if structure is None or time.monotonic() - structure[2] > RECHARGE_LOCALE:
+            cles, par_apprenant = [], {}
+            for apprenant_id, note, soumis_le in _copies_notees(olympiade_id):
+                cle = (-note, _horodatage(soumis_le), apprenant_id)
+                cles.append(cle)
+                par_apprenant[apprenant_id] = cle
+            cles.sort()
+            structure = self._olympiades[olympiade_id] = (cles, par_apprenant, time.monotonic())
+        return structure
+
+    def enregistrer(self, olympiade_id, apprenant_id, note, soumis_le):
+        with self._verrou:
+            cles, par_apprenant, _ = self._structure(olympiade_id)
+            ancienne = par_apprenant.get(apprenant_id)
+            if ancienne is not None:
+                del cles[bisect.bisect_left(cles, ancienne)]
+            cle = (-note, _horodatage(soumis_le), apprenant_id)
+            bisect.insort(cles, cle)
+            par_apprenant[apprenant_id] = cle
+
+    def top(self, olympiade_id, n):
+        with self._verrou:
+            cles = self._structure(olympiade_id)[0]
+            return [(cle[2], -cle[0]) for cle in cles[:n]]
+
+    def position(self, olympiade_id, apprenant_id):
+        with self._verrou:
+            cles, par_apprenant, _ = self._structure(olympiade_id)
+            cle = par_apprenant.get(apprenant_id)
+            if cle is None:
+                return None
+            return bisect.bisect_left(cles, cle) + 1, -cle[0]
+
+    def taille(self, olympiade_id):
+        with self._verrou:
+            return len(self._structure(olympiade_id)[0])
+
+    def oublier(self, olympiade_id):
+        with self._verrou:
+            self._olympiades.pop(olympiade_id, None)
+
+
+# ── ZSET Redis partagé ──────────────────────────────────────────────────
+
+
+class _ClassementRedis:
+    """ZSET `classement_direct:<id>` : score = -note, membre =
+    `<horodatage à largeur fixe>:<apprenant_id>` (à score égal, Redis trie
+    les membres lexicographiquement, donc par heure de remise). Le hash
+    `classement_direct:<id>:membres` retrouve le membre d'un apprenant."""
+
+    def __init__(self, url):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    @staticmethod
+    def _cles(olympiade_id):
+        base = f"classement_direct:{olympiade_id}"
+        return base, f"{base}:membres", f"{base}:charge"
+
+    @staticmethod
+    def _membre(apprenant_id, soumis_le):
+        horodatage = _horodatage(soumis_le)
+        prefixe = "9" * 17 if horodatage == float("inf") else f"{horodatage:017.6f}"
+        return f"{prefixe}:{apprenant_id}"
+
+    def _charger(self, olympiade_id):
+        zset, membres, charge = self._cles(olympiade_id)
+        if self._redis.exists(charge):
+            return
+        pipe = self._redis.pipeline()
+        pipe.delete(zset, membres)
+        for apprenant_id, note, soumis_le in _copies_notees(olympiade_id):
+            membre = self._membre(apprenant_id, soumis_le)
+            pipe.zadd(zset, {membre: -note})
+            pipe.hset(membres, apprenant_id, membre)
+        pipe.set(charge, 1, ex=DUREE_REDIS)
+        pipe.expire(zset, DUREE_REDIS)
+        pipe.expire(membres, DUREE_REDIS)
+        pipe.execute()
+
+    def enregistrer(self, olympiade_id, apprenant_id, note, soumis_le):
+        self._charger(olympiade_id)
+        zset, membres, _ = self._cles(olympiade_id)
+        ancien = self._redis.hget(membres, apprenant_id)
+        membre = self._membre(apprenant_id, soumis_le)
+        pipe = self._redis.pipeline()
+        if ancien is not None:
+            pipe.zrem(zset, ancien)
+        pipe.zadd(zset, {membre: -note})
+        pipe.hset(membres, apprenant_id, membre)
+        pipe.execute()
+
+    def top(self, olympiade_id, n):
+        self._charger(olympiade_id)
+        zset = self._cles(olympiade_id)[0]
+        return [
+            (int(membre.rsplit(b":", 1)[1]), -score)
+            for membre, score in self._redis.zrange(zset, 0, n - 1, withscores=True)
+        ]
+
+    def position(self, olympiade_id, apprenant_id):
+        self._charger(olympiade_id)
+        zset, membres, _ = self._cles(olympiade_id)
+        membre = self._redis.hget(membres, apprenant_id)
+        if membre is None:
+            return None
+        pipe = self._redis.pipeline()
+        pipe.zrank(zset, membre)
+        pipe.zscore(zset, membre)
+        rang, score = pipe.execute()
+        if rang is None:
+            return None
+        return rang + 1, -score
+
+    def taille(self, olympiade_id):
+        self._charger(olympiade_id)
+        return self._redis.zcard(self._cles(olympiade_id)[0])
+
+    def oublier(self, olympiade_id):
+        self._redis.delete(*self._cles(olympiade_id))
+
+
+_classement = None
+_classement_verrou = threading.Lock()
+
+
+def classement():
+    """Structure du process (Redis si configuré, sinon mémoire)."""
+    global _classement
+    if _classement is None:
+        with _classement_verrou:
+            if _classement is None:
+                url = getattr(settings, "CLASSEMENT_DIRECT_REDIS_URL", "")
+                _classement = _ClassementRedis(url) if url else _ClassementLocal()
+    return _classement
+
+
+def instantane(olympiade_id, apprenant_id=None, n=TOP_PAR_DEFAUT) -> dict:
+    """Top-N (avec noms, une requête) et position de `apprenant_id`."""
+    structure = classement()
+    top = structure.top(olympiade_id, n)
+    noms = dict(User.objects.filter(pk__in=[a for a, _ in top]).values_list("pk", "username"))
+    position = structure.position(olympiade_id, apprenant_id) if apprenant_id else None
+    return {
+        "olympiade_id": olympiade_id,
+        "provisoire": True,
+        "participants": structure.taille(olympiade_id),
+        "top": [
+            {"rang": rang, "apprenant_id": a, "username": noms.get(a, ""), "note": note}
+            for rang, (a, note) in enumerate(top, start=1)
+        ],
+        "ma_position": {"rang": position[0], "note": position[1]} if position else None,
+    }
+
+
+# ── Diffusion fusionnée ─────────────────────────────────────────────────
+
+_diffusion_verrou = threading.Lock()
+_derniere_diffusion = {}
+_diffusions_programmees = set()
+
+
+def _diffuser(olympiade_id, differee=False):
+    layer = get_channel_layer()
+    try:
+        evenement = instantane(olympiade_id)
+        evenement["type"] = "classement.maj"
+        async_to_sync(layer.group_send)(groupe(olympiade_id), evenement)
+    except Exception:
+        logger.exception("Échec de diffusion du classement direct (olympiade %s)", olympiade_id)
+    finally:
+        if differee:
+            connection.close()
+
+
+def _diffusion_differee(olympiade_id):
+    with _diffusion_verrou:
+        _diffusions_programmees.discard(olympiade_id)
+        _derniere_diffusion[olympiade_id] = time.monotonic()
+    _diffuser(olympiade_id, differee=True)
+
+
+def signaler(olympiade_id) -> None:
+    """Diffuse tout de suite si la dernière diffusion date de plus
+    d'`INTERVALLE_DIFFUSION`, sinon programme UNE diffusion à l'échéance
+    (qui portera l'état le plus récent)."""
+    if get_channel_layer() is None:
+        return
+    with _diffusion_verrou:
+        if olympiade_id in _diffusions_programmees:
+            return
+        delai = (
+            _derniere_diffusion.get(olympiade_id, float("-inf"))
+            + INTERVALLE_DIFFUSION
+            - time.monotonic()
+        )
+        if delai > 0:
+            _diffusions_programmees.add(olympiade_id)
+            minuteur = threading.Timer(delai, _diffusion_differee, args=(olympiade_id,))
+            minuteur.daemon = True
+            minuteur.start()
+            return
+        _derniere_diffusion[olympiade_id] = time.monotonic()
+    _diffuser(olympiade_id)
+
+
+def copie_notee(olympiade_id, apprenant_id, note, soumis_le) -> None:
+    """Point d'entrée après commit d'une copie notée. Ne lève jamais : le
+    classement direct est un accessoire de la soumission."""
+    try:
+        classement().enregistrer(olympiade_id, apprenant_id, note, soumis_le)
+        signaler(olympiade_id)
+    except Exception:
+        logger.exception("Échec de mise à jour du classement direct (olympiade %s)", olympiade_id)
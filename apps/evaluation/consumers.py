@@ -0,0 +1,75 @@
+"""
+WebSocket du classement provisoire en direct d'une olympiade
+(apps/evaluation/classement_direct.py).
+
+`ws/olympiades/<id>/classement/` — authentification par session
+(`AuthMiddlewareStack`) ou `?token=<jeton DRF>` (client mobile). À la
+connexion : un instantané complet ; ensuite, à chaque diffusion du groupe
+(au plus une par seconde), le top-N et la position de l'abonné, lue en
+O(log n) dans la structure triée.
+"""
+
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from apps.evaluation import classement_direct
+
+
+@database_sync_to_async
+def _utilisateur_par_jeton(cle):
+    # Même résolution que l'API (cache, expiration des jetons).
+    from rest_framework.exceptions import AuthenticationFailed
+
+    from apps.accounts.authentication import YekiTokenAuthentication
+
+    try:
+        user, _token = YekiTokenAuthentication().authenticate_credentials(cle)
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+@database_sync_to_async
+def _peut_suivre(user, olympiade_id):
+    from apps.evaluation.models import Olympiade
+    from apps.evaluation.views.olympiades import peut_suivre_classement_direct
+
+    olympiade = Olympiade.objects.filter(pk=olympiade_id).first()
+    return olympiade is not None and peut_suivre_classement_direct(user, olympiade)
+
+
+class ClassementDirectConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or user.is_anonymous:
+            jeton = parse_qs(self.scope.get("query_string", b"").decode()).get("token")
+            user = await _utilisateur_par_jeton(jeton[0]) if jeton else None
+
+        self.olympiade_id = int(self.scope["url_route"]["kwargs"]["olympiade_id"])
+        if user is None or not await _peut_suivre(user, self.olympiade_id):
+            await self.close()
+            return
+
+        self.user = user
+        self.groupe = classement_direct.groupe(self.olympiade_id)
+        await self.channel_layer.group_add(self.groupe, self.channel_name)
+        await self.accept()
+        await self.send_json(
+            await database_sync_to_async(classement_direct.instantane)(
+                self.olympiade_id, self.user.id
+            )
+        )
+
+    async def disconnect(self, code):
+        if hasattr(self, "groupe"):
+            await self.channel_layer.group_discard(self.groupe, self.channel_name)
+
+    async def classement_maj(self, event):
+        position = await database_sync_to_async(classement_direct.classement().position)(
+            self.olympiade_id, self.user.id
+        )
+        message = {cle: valeur for cle, valeur in event.items() if cle != "type"}
+        message["ma_position"] = {"rang": position[0], "note": position[1]} if position else None
+        await self.send_json(message)
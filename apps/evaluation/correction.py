@@ -0,0 +1,219 @@
+"""
+Moteur de correction automatique des exercices.
+
+Avant : `_corriger_reponses_exercice` faisait, pour CHAQUE question QCM,
+un `question.choix.filter(texte__iexact=...)` puis un `question.choix.all()`
+pour le snapshot — deux requêtes par question, multipliées par les
+composants d'une épreuve.
+
+Désormais le CORRIGÉ d'un exercice (questions, choix, textes normalisés)
+est chargé en UNE requête (jointure questions ⟕ choix), compilé en
+structure Python pure, et mis en cache par VERSION d'exercice : toute
+écriture sur `Question`/`Choix` (signaux, apps/evaluation/signals.py)
+fait changer la version, donc la clé — un corrigé périmé n'est jamais
+relu, il expire simplement. Corrigés et versions sont dans le cache
+`CACHE_PARTAGE` (Redis en production) : le correcteur lancé à part
+(`traiter_soumissions_en_attente --continu`) voit la nouvelle version
+dès l'écriture faite par un process web. Une soumission entière est ensuite corrigée
+en mémoire, sans aucune requête.
+
+Le snapshot produit (`ExerciceTentative.reponses["questions"]`) est
+strictement identique à l'ancien : mêmes clés, même ordre, mêmes types.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Sum
+
+from apps.evaluation.models import EvaluationExercice, Question
+
+CORRIGE_EXERCICE_TTL = 60 * 60
+
+
+def _cache():
+    return caches[settings.CACHE_PARTAGE]
+
+
+def _cle_version(exercice_id) -> str:
+    return f"corrige_exercice_version:{exercice_id}"
+
+
+def version_corrige(exercice_id) -> str:
+    """Version courante du corrigé ; une version absente du cache (jamais
+    lue, ou évincée) en reçoit une nouvelle — jamais l'ancienne, donc
+    jamais un corrigé compilé avant la dernière modification."""
+    cle = _cle_version(exercice_id)
+    version = _cache().get(cle)
+    if version is None:
+        _cache().add(cle, uuid.uuid4().hex, None)
+        version = _cache().get(cle)
+    return version
+
+
+def invalider_corrige(exercice_id) -> None:
+    """Change la version tout de suite ET au commit : une correction
+    concurrente qui aurait recompilé entre-temps depuis l'état pas encore
+    commité ne survit pas au second changement."""
+
+    def changer_version():
+        _cache().set(_cle_version(exercice_id), uuid.uuid4().hex, None)
+
+    changer_version()
+    transaction.on_commit(changer_version)
+
+
+def _normaliser(texte: str) -> str:
+    # Même comparaison que `texte__iexact` sous PostgreSQL
+    # (`UPPER(a) = UPPER(b)`).
+    return texte.upper()
+
+
+def _compiler(exercice_id) -> list[dict]:
+    lignes = (
+        Question.objects.filter(exercice_id=exercice_id)
+        .order_by("id", "choix__ordre", "choix__id")
+        .values(
+            "id",
+            "text",
+            "type_question",
+            "bonne_reponse",
+            "points",
+            "explication",
+            "choix__id",
+            "choix__texte",
+            "choix__est_correct",
+        )
+    )
+    questions = {}
+    for ligne in lignes:
+        question = questions.get(ligne["id"])
+        if question is None:
+            question = questions[ligne["id"]] = {
+                "id": ligne["id"],
+                "text": ligne["text"],
+                "type": ligne["type_question"],
+                "bonne_reponse": ligne["bonne_reponse"],
+                "bonne_reponse_normalisee": ligne["bonne_reponse"].strip().lower(),
+                "points": ligne["points"],
+                "explication": ligne["explication"],
+                "choix_snapshot": [],
+                # texte normalisé → est_correct du PREMIER choix (par
+                # `ordre`) portant ce texte, comme `.filter(...).first()`.
+                "choix_par_texte": {},
+            }
+        if ligne["choix__id"] is None or question["type"] != "qcm":
+            continue
+        question["choix_snapshot"].append(
+            {
+                "id": ligne["choix__id"],
+                "texte": ligne["choix__texte"],
+                "est_correct": ligne["choix__est_correct"],
+            }
+        )
+        question["choix_par_texte"].setdefault(
+            _normaliser(ligne["choix__texte"]), ligne["choix__est_correct"]
+        )
+    return list(questions.values())
+
+
+def corrige_exercice(exercice_id) -> list[dict]:
+    """Corrigé compilé de l'exercice (cache, sinon une requête)."""
+    cle = f"corrige_exercice:{exercice_id}:{version_corrige(exercice_id)}"
+    corrige = _cache().get(cle)
+    if corrige is None:
+        corrige = _compiler(exercice_id)
+        _cache().set(cle, corrige, CORRIGE_EXERCICE_TTL)
+    return corrige
+
+
+def corriger_reponses(corrige, reponses):
+    """Corrige une soumission en mémoire ; retourne (score, total, details)
+    au format snapshot de `_corriger_reponses_exercice`."""
+    score = 0.0
+    total = 0.0
+    details = []
+    for question in corrige:
+        points = question["points"]
+        total += points
+
+        user_rep = reponses.get(str(question["id"]), "").strip().lower()
+
+        # P2.2 : pour un QCM, la correction se fait via Choix.est_correct
+        # (source de vérité), pas via une comparaison texte-à-texte contre
+        # bonne_reponse (fragile — casse/espaces/accents).
+        if question["type"] == "qcm":
+            is_correct = bool(question["choix_par_texte"].get(_normaliser(user_rep)))
+        else:
+            is_correct = user_rep == question["bonne_reponse_normalisee"]
+
+        points_obtenus = points if is_correct else 0
+
+        if is_correct:
+            score += points
+
+        details.append(
+            {
+                "question_id": question["id"],
+                "enonce_snapshot": question["text"],
+                "type": question["type"],
+                "choix_snapshot": question["choix_snapshot"],
+                "reponse_apprenant": user_rep,
+                "bonne_reponse": question["bonne_reponse"],
+                "est_correct": is_correct,
+                "points_obtenus": points_obtenus,
+                "points_max": points,
+                "explication": question["explication"],
+            }
+        )
+    return score, total, details
+
+
+def choix_par_texte(question, texte):
+    """Devoirs et olympiades (`QuestionDevoir`) : premier choix (par
+    `ordre`) de texte exactement `texte`, lu dans les choix PRÉCHARGÉS
+    (`prefetch_related("choix")`) — équivalent de
+    `question.choix.filter(texte=texte).first()`, sans requête."""
+    return next((c for c in question.choix.all() if c.texte == texte), None)
+
+
+def corriger_epreuve(exercice, user):
+    """Trois requêtes quel que soit le nombre de composants : composants
+    (dans l'ordre historique de `exercices_composes.all()`), totaux de
+    points, notes officielles de l'apprenant."""
+    composants = list(exercice.exercices_composes.all())
+    totaux = dict(
+        Question.objects.filter(exercice__in=composants)
+        .values("exercice_id")
+        .annotate(total=Sum("points"))
+        .values_list("exercice_id", "total")
+    )
+    # `.first()` historique = plus petit pk : l'ordre décroissant fait
+    # gagner celui-là à la construction du dict.
+    scores = dict(
+        EvaluationExercice.objects.filter(user=user, exercice__in=composants)
+        .order_by("-pk")
+        .values_list("exercice_id", "score")
+    )
+
+    score = 0.0
+    total = 0.0
+    details = []
+    for composant in composants:
+        total_composant = totaux.get(composant.id) or 0.0
+        score_composant = scores.get(composant.id, 0.0)
+
+        score += score_composant
+        total += total_composant
+
+        details.append(
+            {
+                "exercice_id": composant.id,
+                "titre": composant.titre,
+                "score": score_composant,
+                "total": total_composant,
+            }
+        )
+    return score, total, details
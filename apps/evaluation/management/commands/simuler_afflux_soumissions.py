@@ -0,0 +1,207 @@
+"""
+Test de charge d'une échéance : N apprenants synthétiques soumettent le
+même devoir (ou la même olympiade) en même temps au serveur LOCAL, par
+HTTP — mesure ce que l'apprenant subit (latence, statuts) avec et sans le
+mode afflux (apps/evaluation/afflux.py).
+
+Usage (serveur lancé dans un autre terminal) :
+    python manage.py simuler_afflux_soumissions --devoir 12 --apprenants 300
+    python manage.py simuler_afflux_soumissions --olympiade 3 --concurrence 100 --attendre
+
+Les apprenants synthétiques (`afflux-<horodatage>-<n>`), leurs jetons et leurs copies
+sont supprimés à la fin, sauf `--garder`. La commande écrit dans la base
+des settings courants : refusée hors DEBUG, sauf `--force`.
+"""
+
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import Profile
+from apps.evaluation.models import (
+    Devoir,
+    InscriptionOlympiade,
+    Olympiade,
+    SoumissionDevoir,
+    SoumissionEnAttente,
+)
+from apps.formation.models import Departement
+from apps.paiement.models import AbonnementPremium
+
+PREFIXE = "afflux-"
+
+
+def _centile(valeurs, centile):
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * centile / 100))]
+
+
+class Command(BaseCommand):
+    help = "Simule N apprenants soumettant en même temps un devoir ou une olympiade."
+
+    def add_arguments(self, parser):
+        cible = parser.add_mutually_exclusive_group(required=True)
+        cible.add_argument("--devoir", type=int, help="ID du devoir (publié) à soumettre")
+        cible.add_argument("--olympiade", type=int, help="ID de l'olympiade à soumettre")
+        parser.add_argument("--apprenants", type=int, default=200)
+        parser.add_argument(
+            "--concurrence", type=int, default=50, help="Requêtes simultanées au maximum"
+        )
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Serveur ciblé")
+        parser.add_argument(
+            "--attendre",
+            action="store_true",
+            help="Attend que la file du mode afflux soit vidée et mesure sa durée",
+        )
+        parser.add_argument("--garder", action="store_true", help="Ne supprime pas les données")
+        parser.add_argument("--force", action="store_true", help="Autorise l'exécution hors DEBUG")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("Crée et supprime des comptes : refusé hors DEBUG (voir --force).")
+
+        if options["devoir"]:
+            devoir = Devoir.objects.filter(pk=options["devoir"], est_publie=True).first()
+            if devoir is None:
+                raise CommandError(f"Devoir publié {options['devoir']} introuvable.")
+            url = f"{options['url'].rstrip('/')}/api/devoirs/{devoir.id}/soumettre/"
+        else:
+            olympiade = Olympiade.objects.filter(pk=options["olympiade"]).first()
+            if olympiade is None or olympiade.devoir is None:
+                raise CommandError(f"Olympiade {options['olympiade']} introuvable ou sans épreuve.")
+            devoir = olympiade.devoir
+            url = f"{options['url'].rstrip('/')}/api/olympiades/{olympiade.id}/soumettre/"
+
+        users = self._creer_apprenants(options["apprenants"], devoir)
+        try:
+            if options["devoir"]:
+                SoumissionDevoir.objects.bulk_create(
+                    [SoumissionDevoir(utilisateur=u, devoir=devoir) for u in users]
+                )
+            else:
+                InscriptionOlympiade.objects.bulk_create(
+                    [
+                        InscriptionOlympiade(
+                            olympiade=olympiade,
+                            apprenant=u,
+                            statut="confirme",
+                            session_demarree=True,
+                            heure_debut_compo=timezone.now(),
+                        )
+                        for u in users
+                    ]
+                )
+            self._tirer(url, users, devoir, options)
+            if options["attendre"]:
+                self._attendre_file(users)
+        finally:
+            if not options["garder"]:
+                User.objects.filter(pk__in=[u.pk for u in users]).delete()
+
+    def _creer_apprenants(self, nombre, devoir):
+        departement = (
+            devoir.cours_lie.departement if devoir.cours_lie_id else Departement.objects.first()
+        )
+        lot = int(time.time())
+        noms = [f"{PREFIXE}{lot}-{i}" for i in range(nombre)]
+        mot_de_passe = make_password(None)
+        User.objects.bulk_create([User(username=nom, password=mot_de_passe) for nom in noms])
+        users = list(User.objects.filter(username__in=noms))
+
+        Profile.objects.bulk_create(
+            [
+                Profile(user=u, user_type="apprenant", departement=departement, is_active=True)
+                for u in users
+            ]
+        )
+        # Premium : la matrice d'accès ne doit pas transformer le test de
+        # charge en test de 403.
+        if departement is not None:
+            AbonnementPremium.objects.bulk_create(
+                [
+                    AbonnementPremium(
+                        utilisateur=u,
+                        departement=departement,
+                        type_abonnement="mensuel",
+                        actif=True,
+                        fin=timezone.now() + timedelta(days=1),
+                    )
+                    for u in users
+                ]
+            )
+        Token.objects.bulk_create([Token(user=u, key=Token.generate_key()) for u in users])
+        return users
+
+    def _tirer(self, url, users, devoir, options):
+        questions = list(devoir.questions.prefetch_related("choix"))
+        jetons = dict(Token.objects.filter(user__in=users).values_list("user_id", "key"))
+
+        def copie():
+            reponses = {}
+            for question in questions:
+                choix = [c.texte for c in question.choix.all()]
+                reponses[str(question.id)] = random.choice(choix) if choix else ""
+            return json.dumps({"reponses": reponses}).encode()
+
+        def soumettre(user):
+            requete = urllib.request.Request(
+                url,
+                data=copie(),
+                method="POST",
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Token {jetons[user.pk]}",
+                },
+            )
+            debut = time.perf_counter()
+            try:
+                with urllib.request.urlopen(requete, timeout=120) as reponse:
+                    statut = reponse.status
+            except urllib.error.HTTPError as exc:
+                statut = exc.code
+            except (urllib.error.URLError, OSError):
+                statut = "erreur réseau"
+            return statut, (time.perf_counter() - debut) * 1000
+
+        self.stdout.write(f"{len(users)} soumissions vers {url} ({options['concurrence']} max)…")
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrence"]) as pool:
+            resultats = list(pool.map(soumettre, users))
+        duree = time.perf_counter() - debut
+
+        statuts = {}
+        for statut, _ in resultats:
+            statuts[statut] = statuts.get(statut, 0) + 1
+        latences = [ms for _, ms in resultats]
+        self.stdout.write(f"Statuts : {statuts}")
+        self.stdout.write(
+            f"Latence (ms) : p50 {_centile(latences, 50):.0f}, p95 {_centile(latences, 95):.0f}, "
+            f"p99 {_centile(latences, 99):.0f}, max {max(latences):.0f}"
+        )
+        self.stdout.write(f"Débit : {len(resultats) / duree:.1f} soumissions/s sur {duree:.1f} s")
+
+    def _attendre_file(self, users):
+        file = SoumissionEnAttente.objects.filter(
+            Q(soumission_devoir__utilisateur__in=users) | Q(inscription__apprenant__in=users),
+            statut__in=["en_attente", "en_cours"],
+        )
+        debut = time.perf_counter()
+        while file.exists():
+            if time.perf_counter() - debut > 600:
+                raise CommandError("File toujours non vide après 10 min : correcteurs arrêtés ?")
+            time.sleep(0.5)
+        self.stdout.write(f"File vidée en {time.perf_counter() - debut:.1f} s.")
@@ -0,0 +1,73 @@
+"""
+Vide la file des soumissions en attente (mode afflux, voir
+apps/evaluation/afflux.py) hors du serveur web : après un redémarrage qui
+a coupé les correcteurs en arrière-plan, ou comme correcteur dédié pendant
+une échéance chargée.
+
+Usage :
+    python manage.py traiter_soumissions_en_attente
+    python manage.py traiter_soumissions_en_attente --correcteurs 8 --continu
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.evaluation.afflux import drainer
+from apps.evaluation.models import SoumissionEnAttente
+
+
+class Command(BaseCommand):
+    help = "Corrige les soumissions mises en file par le mode afflux."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--correcteurs", type=int, default=1, help="Nombre de correcteurs parallèles"
+        )
+        parser.add_argument(
+            "--continu",
+            action="store_true",
+            help="Ne s'arrête pas quand la file est vide (Ctrl+C pour quitter)",
+        )
+        parser.add_argument(
+            "--intervalle", type=float, default=2.0, help="Secondes entre deux passes (--continu)"
+        )
+
+    def handle(self, *args, **options):
+        total_traitees = total_echecs = 0
+        while True:
+            traitees, echecs = self._passe(options["correcteurs"])
+            total_traitees += traitees
+            total_echecs += echecs
+            if not options["continu"]:
+                break
+            if not traitees and not echecs:
+                time.sleep(options["intervalle"])
+
+        restantes = SoumissionEnAttente.objects.filter(statut="en_attente").count()
+        en_echec = SoumissionEnAttente.objects.filter(statut="echec").count()
+        self.stdout.write(
+            f"{total_traitees} soumission(s) corrigée(s), {total_echecs} erreur(s) ; "
+            f"{restantes} en attente, {en_echec} en échec."
+        )
+
+    def _passe(self, nb_correcteurs):
+        if nb_correcteurs <= 1:
+            return drainer()
+
+        resultats = []
+
+        def correcteur():
+            try:
+                resultats.append(drainer())
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=correcteur) for _ in range(nb_correcteurs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(r[0] for r in resultats), sum(r[1] for r in resultats)
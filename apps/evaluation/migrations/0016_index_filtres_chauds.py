@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0015_alter_choix_texte_alter_choixreponse_texte"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="evaluationexercice",
+            index=models.Index(fields=["user", "exercice"], name="yeki_evalua_user_id_5940b9_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="soumissiondevoir",
+            index=models.Index(fields=["devoir", "statut"], name="yeki_soumis_devoir__2f3004_idx"),
+        ),
+    ]
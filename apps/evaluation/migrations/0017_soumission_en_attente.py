@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0016_index_filtres_chauds"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SoumissionEnAttente",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("devoir", "Devoir"), ("olympiade", "Olympiade")], max_length=10
+                    ),
+                ),
+                ("reponses", models.JSONField(default=dict)),
+                ("soumis_automatique", models.BooleanField(default=False)),
+                ("recu_le", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "statut",
+                    models.CharField(
+                        choices=[
+                            ("en_attente", "En attente"),
+                            ("en_cours", "En cours de correction"),
+                            ("traitee", "Traitée"),
+                            ("echec", "Échec"),
+                        ],
+                        default="en_attente",
+                        max_length=15,
+                    ),
+                ),
+                ("tentatives", models.PositiveIntegerField(default=0)),
+                ("pris_le", models.DateTimeField(blank=True, null=True)),
+                ("traitee_le", models.DateTimeField(blank=True, null=True)),
+                ("erreur", models.TextField(blank=True)),
+                (
+                    "inscription",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="en_attente",
+                        to="evaluation.inscriptionolympiade",
+                    ),
+                ),
+                (
+                    "soumission_devoir",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="en_attente",
+                        to="evaluation.soumissiondevoir",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Soumission en attente de correction",
+                "verbose_name_plural": "Soumissions en attente de correction",
+                "db_table": "yeki_soumission_en_attente",
+                "indexes": [
+                    models.Index(fields=["statut", "recu_le"], name="yeki_soumis_statut_c7447a_idx")
+                ],
+            },
+        ),
+    ]
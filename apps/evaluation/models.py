@@ -4,6 +4,7 @@ from django.core.validators import MinValueValidator
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from apps.core.models import STATUTS_TRANSFERT
 from apps.evaluation.validators import valider_pas_de_0_25
 from apps.formation.models import Cours, Module, Lecon, Departement
 
@@ -70,6 +71,9 @@ class Exercice(models.Model):
         blank=True,
         help_text="@deprecated — image insérée inline dans `enonce` désormais.",
     )
+    enonce_image_derivees = models.JSONField(
+        default=dict, blank=True, editable=False, help_text="Versions réduites (apps/core/images.py)"
+    )
 
     class Meta:
         db_table = "yeki_exercice"
@@ -259,6 +263,7 @@ class EvaluationExercice(models.Model):
 
     class Meta:
         db_table = "yeki_evaluationexercice"
+        indexes = [models.Index(fields=["user", "exercice"])]
 
     def __str__(self):
         return f"{self.user.username} - {self.exercice.titre} ({self.score}/{self.total})"
@@ -541,6 +546,12 @@ class SoumissionDevoir(models.Model):
         blank=True,
         help_text="Fichier PDF soumis par l'apprenant (correction manuelle)",
     )
+    transfert_statut = models.CharField(
+        max_length=12,
+        choices=STATUTS_TRANSFERT,
+        default="pret",
+        help_text="Écriture de `fichier_soumis` sur le stockage (apps/core/transferts.py)",
+    )
 
     # ── Anti-triche ──────────────────────────────────────────────
     nb_focus_perdu = models.PositiveIntegerField(
@@ -556,6 +567,9 @@ class SoumissionDevoir(models.Model):
     class Meta:
         db_table = "yeki_soumissiondevoir"
         unique_together = ("utilisateur", "devoir")
+        # L'unicité (utilisateur, devoir) ne sert pas les vues enseignant,
+        # qui filtrent par devoir puis par statut (corrigés, en attente).
+        indexes = [models.Index(fields=["devoir", "statut"])]
 
     def __str__(self):
         return f"{self.utilisateur.username} → {self.devoir.titre} [{self.statut}]"
@@ -847,6 +861,61 @@ class ClassementOlympiade(models.Model):
         unique_together = ("olympiade", "apprenant")
 
 
+class SoumissionEnAttente(models.Model):
+    """
+    Soumission brute mise en file en mode afflux (apps/evaluation/afflux.py) :
+    réponses telles que reçues et horodatage SERVEUR de réception, corrigées
+    plus tard par les correcteurs. `recu_le` fait foi pour le retard
+    (`SoumissionDevoir.est_en_retard`), jamais l'heure de correction.
+    """
+
+    TYPE_CHOICES = [
+        ("devoir", "Devoir"),
+        ("olympiade", "Olympiade"),
+    ]
+    STATUT_CHOICES = [
+        ("en_attente", "En attente"),
+        ("en_cours", "En cours de correction"),
+        ("traitee", "Traitée"),
+        ("echec", "Échec"),
+    ]
+
+    type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    soumission_devoir = models.OneToOneField(
+        SoumissionDevoir,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="en_attente",
+    )
+    inscription = models.OneToOneField(
+        InscriptionOlympiade,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="en_attente",
+    )
+    reponses = models.JSONField(default=dict)
+    soumis_automatique = models.BooleanField(default=False)
+    recu_le = models.DateTimeField(default=timezone.now)
+
+    statut = models.CharField(max_length=15, choices=STATUT_CHOICES, default="en_attente")
+    tentatives = models.PositiveIntegerField(default=0)
+    pris_le = models.DateTimeField(null=True, blank=True)
+    traitee_le = models.DateTimeField(null=True, blank=True)
+    erreur = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "yeki_soumission_en_attente"
+        verbose_name = "Soumission en attente de correction"
+        verbose_name_plural = "Soumissions en attente de correction"
+        # Les correcteurs prennent les plus anciennes d'abord.
+        indexes = [models.Index(fields=["statut", "recu_le"])]
+
+    def __str__(self):
+        return f"{self.type} #{self.pk} [{self.statut}]"
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # SYSTÈME DE RANG DES APPRENANTS PAR DÉPARTEMENT
 # ═══════════════════════════════════════════════════════════════════════════
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
 
+from apps.core.serializers import ImagesDeriveesField
 from apps.evaluation.validators import valider_pas_de_0_25, valider_pas_de_cycle_epreuve
 from apps.evaluation.models import (
     Exercice,
@@ -161,6 +162,7 @@ class ExerciceSerializer(serializers.ModelSerializer):
     module_nom = serializers.CharField(source="module.titre", read_only=True, allow_null=True)
     lecon_nom = serializers.CharField(source="lecon.titre", read_only=True, allow_null=True)
     enonce_image_url = serializers.SerializerMethodField()
+    enonce_image_derivees = ImagesDeriveesField("enonce_image")
     exercices_composes_details = serializers.SerializerMethodField()
     est_epreuve = serializers.BooleanField(read_only=True)
     nb_questions = serializers.SerializerMethodField()
@@ -184,6 +186,7 @@ class ExerciceSerializer(serializers.ModelSerializer):
             "exercices_composes",
             "exercices_composes_details",
             "enonce_image_url",
+            "enonce_image_derivees",
             "nb_questions",
         ]
 
@@ -497,16 +500,23 @@ class DevoirListSerializer(serializers.ModelSerializer):
             "sorties_max",
         ]
 
-    def get_statut_apprenant(self, obj):
+    def _soumission(self, obj):
+        # Les listes passent `soumissions` (voir `soumissions_par_devoir`) :
+        # une requête pour toute la page au lieu de trois par devoir.
+        soumissions = self.context.get("soumissions")
+        if soumissions is not None:
+            return soumissions.get(obj.id)
         user = self.context["request"].user
-        soum = SoumissionDevoir.objects.filter(utilisateur=user, devoir=obj).first()
+        return SoumissionDevoir.objects.filter(utilisateur=user, devoir=obj).first()
+
+    def get_statut_apprenant(self, obj):
+        soum = self._soumission(obj)
         if not soum:
             return "non_commence"
         return soum.statut
 
     def get_note_apprenant(self, obj):
-        user = self.context["request"].user
-        soum = SoumissionDevoir.objects.filter(utilisateur=user, devoir=obj).first()
+        soum = self._soumission(obj)
         if soum and soum.note is not None:
             return soum.note
         return None
@@ -516,13 +526,23 @@ class DevoirListSerializer(serializers.ModelSerializer):
         return max(0, delta.days)
 
     def get_nb_sorties(self, obj):
-        user = self.context["request"].user
-        soum = SoumissionDevoir.objects.filter(utilisateur=user, devoir=obj).first()
+        soum = self._soumission(obj)
         if soum:
             return soum.sorties
         return 0
 
 
+def soumissions_par_devoir(devoirs, user) -> dict:
+    """{devoir_id: SoumissionDevoir} de `user` pour une page de devoirs, en
+    une requête (une soumission au plus par couple utilisateur/devoir)."""
+    return {
+        soum.devoir_id: soum
+        for soum in SoumissionDevoir.objects.filter(
+            utilisateur=user, devoir_id__in=[d.id for d in devoirs]
+        )
+    }
+
+
 class EnonceDevoirSerializer(serializers.ModelSerializer):
     """
     P2.3 : un énoncé de devoir avec ses propres questions (remplace
@@ -121,6 +121,24 @@ class ClassementService:
             qs = qs.filter(exercice__cours__departement__in=departements)
         return qs.aggregate(total=Sum("score"))["total"] or 0.0
 
+    @staticmethod
+    def scores_totaux_exercices_enseignants(enseignant_ids, departements=None) -> dict:
+        """
+        Variante groupée de `score_total_exercices_enseignant` pour
+        plusieurs enseignants : `{enseignant_id: total}` en une requête
+        (dashboard cadre). Un enseignant sans évaluation est absent.
+        """
+        qs = EvaluationExercice.objects.filter(
+            exercice__cours__enseignant_principal_id__in=enseignant_ids
+        )
+        if departements is not None:
+            qs = qs.filter(exercice__cours__departement__in=departements)
+        return dict(
+            qs.values("exercice__cours__enseignant_principal_id")
+            .annotate(total=Sum("score"))
+            .values_list("exercice__cours__enseignant_principal_id", "total")
+        )
+
     @classmethod
     def calculer_classement_departement(cls, departement: Departement, limit=None) -> list[dict]:
         """
@@ -17,16 +17,43 @@ partir d'un `departement_id` de requête ou d'un service externe
 (`ClassementService`). Les convertir en signal exigerait d'ajouter un champ
 `Olympiade.departement` (changement de schéma métier hors périmètre de ce
 ticket) plutôt que de forcer une abstraction bancale.
+
+Invalidation du corrigé compilé des exercices (apps/evaluation/
+correction.py) : toute écriture sur `Question` ou `Choix` change la
+version du corrigé de l'exercice concerné.
+
+Invalidation des dashboards enseignants (apps/formation/tableaux_de_bord.py)
+à chaque écriture sur `Devoir` ou `SoumissionDevoir`.
+
+Version de contenu du cours (ETag de `ListeExercicesCoursView`, apps/core/
+versions_contenu.py) à chaque écriture sur `Exercice`, `Question`, `Choix`
+ou la composition d'une épreuve.
+
+Versions réduites de `Exercice.enonce_image` (apps/core/images.py).
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from apps.accounts.models import Profile
-from apps.evaluation.models import Devoir, SoumissionDevoir
+from apps.core import versions_contenu
+from apps.core.images import deriver_apres_commit
+from apps.evaluation.correction import invalider_corrige
+from apps.evaluation.models import Choix, Devoir, Exercice, Question, SoumissionDevoir
+from apps.formation import tableaux_de_bord
 from apps.notifications.models import creer_notification
 
 
+# ── Images dérivées (apps/core/images.py) ───────────────────────────────────
+# Connecté avant les invalidations de cache ci-dessous : les réponses
+# recalculées après elles voient déjà `enonce_image_derivees` à jour.
+
+
+@receiver(post_save, sender=Exercice)
+def _deriver_enonce_image(sender, instance, update_fields, **kwargs):
+    deriver_apres_commit(instance, "enonce_image", update_fields=update_fields)
+
+
 @receiver(pre_save, sender=Devoir)
 def _memoriser_ancien_est_publie(sender, instance, **kwargs):
     if instance.pk:
@@ -92,3 +119,80 @@ def _notifier_devoir_corrige(sender, instance, created, **kwargs):
         objet_type="Devoir",
         action_route=f"/devoirs/{instance.devoir.id}/resultat",
     )
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def _invalider_corrige_question(sender, instance, **kwargs):
+    invalider_corrige(instance.exercice_id)
+
+
+@receiver(post_save, sender=Choix)
+@receiver(post_delete, sender=Choix)
+def _invalider_corrige_choix(sender, instance, **kwargs):
+    # Suppression en cascade d'une question : elle a déjà disparu, mais son
+    # propre post_delete invalide le même exercice.
+    if Choix.question.is_cached(instance):
+        exercice_id = instance.question.exercice_id
+    else:
+        exercice_id = (
+            Question.objects.filter(pk=instance.question_id)
+            .values_list("exercice_id", flat=True)
+            .first()
+        )
+    if exercice_id is not None:
+        invalider_corrige(exercice_id)
+
+
+@receiver(post_save, sender=Devoir)
+@receiver(post_delete, sender=Devoir)
+def _invalider_tableaux_de_bord_devoir(sender, instance, **kwargs):
+    if instance.cours_lie_id is not None:
+        tableaux_de_bord.invalider_cours([instance.cours_lie_id])
+
+
+@receiver(post_save, sender=SoumissionDevoir)
+@receiver(post_delete, sender=SoumissionDevoir)
+def _invalider_tableaux_de_bord_soumission(sender, instance, **kwargs):
+    tableaux_de_bord.invalider_cours(
+        Devoir.objects.filter(pk=instance.devoir_id, cours_lie__isnull=False).values_list(
+            "cours_lie_id", flat=True
+        )
+    )
+
+
+def _incrementer_version_cours_exercices(exercice_ids):
+    versions_contenu.incrementer(
+        versions_contenu.TYPE_COURS,
+        Exercice.objects.filter(pk__in=exercice_ids).values_list("cours_id", flat=True),
+    )
+
+
+@receiver(post_save, sender=Exercice)
+@receiver(post_delete, sender=Exercice)
+def _incrementer_version_cours_exercice(sender, instance, **kwargs):
+    versions_contenu.incrementer(versions_contenu.TYPE_COURS, [instance.cours_id])
+
+
+@receiver(m2m_changed, sender=Exercice.exercices_composes.through)
+def _incrementer_version_cours_epreuve(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    versions_contenu.incrementer(versions_contenu.TYPE_COURS, [instance.cours_id])
+    if reverse and pk_set:
+        # `instance` est un exercice composant : les épreuves sont dans pk_set.
+        _incrementer_version_cours_exercices(pk_set)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def _incrementer_version_cours_question(sender, instance, **kwargs):
+    _incrementer_version_cours_exercices([instance.exercice_id])
+
+
+@receiver(post_save, sender=Choix)
+@receiver(post_delete, sender=Choix)
+def _incrementer_version_cours_choix(sender, instance, **kwargs):
+    _incrementer_version_cours_exercices(
+        Question.objects.filter(pk=instance.question_id).values("exercice_id")
+    )
@@ -0,0 +1,173 @@
+"""
+Classement provisoire en direct (apps/evaluation/classement_direct.py) :
+structure triée (égalités à l'heure de remise), mise à jour à chaque copie
+notée, lecture top-N / « ma position », diffusion WebSocket fusionnée.
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from apps.evaluation import classement_direct
+from apps.evaluation.models import ChoixReponse, InscriptionOlympiade, Olympiade, QuestionDevoir
+from yeki.routing import websocket_urlpatterns
+
+COUCHE_MEMOIRE = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+@pytest.fixture(autouse=True)
+def structure_neuve():
+    classement_direct._classement = None
+    classement_direct._derniere_diffusion.clear()
+    classement_direct._diffusions_programmees.clear()
+    yield
+    classement_direct._classement = None
+
+
+@pytest.fixture
+def olympiade_en_cours(db, devoir):
+    maintenant = timezone.now()
+    devoir.type_devoir = "olympiade"
+    devoir.save()
+    question = QuestionDevoir.objects.create(
+        devoir=devoir, enonce="Q", type_question="qcm", ordre=1
+    )
+    ChoixReponse.objects.create(question=question, texte="Bonne", est_correct=True, ordre=1)
+    ChoixReponse.objects.create(question=question, texte="Mauvaise", est_correct=False, ordre=2)
+    return Olympiade.objects.create(
+        titre="O",
+        date_ouverture_inscription=maintenant - timedelta(days=3),
+        date_cloture_inscription=maintenant - timedelta(days=2),
+        date_debut_olympiade=maintenant - timedelta(hours=1),
+        date_fin_olympiade=maintenant + timedelta(hours=2),
+        devoir=devoir,
+    )
+
+
+def _copie(olympiade, nom, note, minutes):
+    user = User.objects.create_user(username=nom)
+    InscriptionOlympiade.objects.create(
+        olympiade=olympiade,
+        apprenant=user,
+        soumis=True,
+        note=note,
+        heure_fin_compo=olympiade.date_debut_olympiade + timedelta(minutes=minutes),
+    )
+    return user
+
+
+@pytest.mark.django_db
+def test_ordre_note_puis_heure_de_remise(olympiade_en_cours):
+    lent = _copie(olympiade_en_cours, "lent", 14.0, minutes=50)
+    rapide = _copie(olympiade_en_cours, "rapide", 14.0, minutes=20)
+    premier = _copie(olympiade_en_cours, "premier", 18.0, minutes=55)
+    _copie(olympiade_en_cours, "dernier", 2.0, minutes=5)
+
+    structure = classement_direct.classement()
+    assert structure.top(olympiade_en_cours.id, 3) == [
+        (premier.id, 18.0),
+        (rapide.id, 14.0),
+        (lent.id, 14.0),
+    ]
+    assert structure.position(olympiade_en_cours.id, lent.id) == (3, 14.0)
+    assert structure.taille(olympiade_en_cours.id) == 4
+
+    # Une copie recorrigée remplace l'ancienne entrée, jamais ne s'ajoute.
+    structure.enregistrer(
+        olympiade_en_cours.id, lent.id, 19.0, olympiade_en_cours.date_debut_olympiade
+    )
+    assert structure.position(olympiade_en_cours.id, lent.id) == (1, 19.0)
+    assert structure.position(olympiade_en_cours.id, premier.id) == (2, 18.0)
+    assert structure.taille(olympiade_en_cours.id) == 4
+
+
+@pytest.mark.django_db
+def test_copie_notee_visible_dans_le_classement_direct(
+    olympiade_en_cours, client_apprenant, user_apprenant, django_capture_on_commit_callbacks
+):
+    _copie(olympiade_en_cours, "devant", 20.0, minutes=1)
+    InscriptionOlympiade.objects.create(
+        olympiade=olympiade_en_cours,
+        apprenant=user_apprenant,
+        session_demarree=True,
+        heure_debut_compo=timezone.now(),
+    )
+    question = olympiade_en_cours.devoir.questions.get()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client_apprenant.post(
+            reverse("soumettre-olympiade", args=[olympiade_en_cours.id]),
+            {"reponses": {str(question.id): "Mauvaise"}},
+            format="json",
+        )
+
+    response = client_apprenant.get(
+        reverse("classement-direct-olympiade", args=[olympiade_en_cours.id]), {"n": 1}
+    )
+
+    assert response.status_code == 200
+    assert response.data["participants"] == 2
+    assert [(e["username"], e["rang"]) for e in response.data["top"]] == [("devant", 1)]
+    assert response.data["ma_position"] == {"rang": 2, "note": 0.0}
+
+
+@pytest.mark.django_db
+def test_reserve_aux_participants(olympiade_en_cours, client_apprenant):
+    response = client_apprenant.get(
+        reverse("classement-direct-olympiade", args=[olympiade_en_cours.id])
+    )
+    assert response.status_code == 403
+
+
+@override_settings(CHANNEL_LAYERS=COUCHE_MEMOIRE)
+def test_diffusions_fusionnees_au_plus_une_par_seconde(monkeypatch):
+    diffusions = []
+    monkeypatch.setattr(
+        classement_direct,
+        "_diffuser",
+        lambda olympiade_id, differee=False: diffusions.append((olympiade_id, differee)),
+    )
+
+    for _ in range(20):
+        classement_direct.signaler(7)
+    assert diffusions == [(7, False)]
+
+    time.sleep(classement_direct.INTERVALLE_DIFFUSION + 0.3)
+    assert diffusions == [(7, False), (7, True)]
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(CHANNEL_LAYERS=COUCHE_MEMOIRE)
+def test_websocket_instantane_puis_mise_a_jour(olympiade_en_cours, user_apprenant):
+    InscriptionOlympiade.objects.create(olympiade=olympiade_en_cours, apprenant=user_apprenant)
+    rival = _copie(olympiade_en_cours, "rival", 12.0, minutes=3)
+    jeton = Token.objects.create(user=user_apprenant).key
+    chemin = f"/ws/olympiades/{olympiade_en_cours.id}/classement/?token={jeton}"
+
+    async def scenario():
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), chemin)
+        connecte, _ = await communicator.connect()
+        assert connecte
+        initial = await communicator.receive_json_from()
+        assert [e["apprenant_id"] for e in initial["top"]] == [rival.id]
+        assert initial["ma_position"] is None
+
+        await database_sync_to_async(classement_direct.copie_notee)(
+            olympiade_en_cours.id, user_apprenant.id, 15.0, timezone.now()
+        )
+        maj = await communicator.receive_json_from(timeout=2)
+        assert [e["apprenant_id"] for e in maj["top"]] == [user_apprenant.id, rival.id]
+        assert maj["ma_position"] == {"rang": 1, "note": 15.0}
+        await communicator.disconnect()
+
+    async_to_sync(scenario)()
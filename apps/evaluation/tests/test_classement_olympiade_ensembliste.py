@@ -0,0 +1,123 @@
+"""
+Classement final d'olympiade calculé en ensemble (`_classer_olympiade`) :
+rangs par fonction de fenêtre, égalités départagées par l'heure de remise,
+nombre de requêtes indépendant du nombre de participants.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.evaluation.models import ClassementOlympiade, InscriptionOlympiade, Olympiade
+from apps.notifications.models import Notification
+
+
+@pytest.fixture
+def olympiade_terminee(user_enseignant_cadre):
+    now = timezone.now()
+    return Olympiade.objects.create(
+        titre="Olympiade Terminée",
+        date_ouverture_inscription=now - timedelta(days=10),
+        date_cloture_inscription=now - timedelta(days=8),
+        date_debut_olympiade=now - timedelta(days=7),
+        date_fin_olympiade=now - timedelta(days=6),
+        organisateur=user_enseignant_cadre.profile,
+    )
+
+
+def _participants(olympiade, notes):
+    """Une inscription soumise par note ; la i-ème copie est rendue à
+    début + i minutes."""
+    debut = olympiade.date_debut_olympiade
+    inscriptions = []
+    for i, note in enumerate(notes):
+        user = User.objects.create_user(username=f"p{olympiade.id}-{i}")
+        inscriptions.append(
+            InscriptionOlympiade.objects.create(
+                olympiade=olympiade,
+                apprenant=user,
+                soumis=True,
+                note=note,
+                heure_fin_compo=debut + timedelta(minutes=len(notes) - i),
+            )
+        )
+    return inscriptions
+
+
+def _calculer(client, olympiade):
+    return client.post(reverse("calculer-classement", args=[olympiade.id]))
+
+
+@pytest.mark.django_db
+def test_egalites_departagees_par_l_heure_de_remise(client_enseignant_cadre, olympiade_terminee):
+    # Copies rendues dans l'ordre inverse de création : la dernière créée
+    # est la première rendue.
+    a, b, c, d = _participants(olympiade_terminee, [12.0, 15.0, 12.0, None])
+
+    response = _calculer(client_enseignant_cadre, olympiade_terminee)
+
+    assert response.data["nb"] == 4
+    rangs = dict(
+        ClassementOlympiade.objects.filter(olympiade=olympiade_terminee).values_list(
+            "apprenant_id", "rang"
+        )
+    )
+    # 15 d'abord ; à 12 égalité, c (rendue avant a) passe devant ; sans
+    # note = 0, dernier.
+    assert rangs == {b.apprenant_id: 1, c.apprenant_id: 2, a.apprenant_id: 3, d.apprenant_id: 4}
+    assert list(
+        ClassementOlympiade.objects.filter(olympiade=olympiade_terminee).values_list(
+            "mention", "note"
+        )
+    ) == [("Or 🥇", 15.0), ("Argent 🥈", 12.0), ("Bronze 🥉", 12.0), ("Participant", 0.0)]
+    for inscription in (a, b, c, d):
+        inscription.refresh_from_db()
+        assert inscription.classement == rangs[inscription.apprenant_id]
+
+
+@pytest.mark.django_db
+def test_requetes_independantes_du_nombre_de_participants(
+    client_enseignant_cadre, user_enseignant_cadre, olympiade_terminee
+):
+    _participants(olympiade_terminee, [10.0, 11.0])
+    client_enseignant_cadre.get(reverse("profil-me"))  # cache d'authentification chaud
+    with CaptureQueriesContext(connection) as petit:
+        _calculer(client_enseignant_cadre, olympiade_terminee)
+
+    grande = Olympiade.objects.create(
+        titre="Grande",
+        date_ouverture_inscription=olympiade_terminee.date_ouverture_inscription,
+        date_cloture_inscription=olympiade_terminee.date_cloture_inscription,
+        date_debut_olympiade=olympiade_terminee.date_debut_olympiade,
+        date_fin_olympiade=olympiade_terminee.date_fin_olympiade,
+        organisateur=user_enseignant_cadre.profile,
+    )
+    _participants(grande, [float(i % 20) for i in range(40)])
+    with CaptureQueriesContext(connection) as grand:
+        _calculer(client_enseignant_cadre, grande)
+
+    assert len(grand) == len(petit)
+    assert Notification.objects.filter(type="classement", objet_id=grande.id).count() == 40
+    assert sorted(
+        ClassementOlympiade.objects.filter(olympiade=grande).values_list("rang", flat=True)
+    ) == list(range(1, 41))
+
+
+@pytest.mark.django_db
+def test_recalcul_remplace_le_classement(client_enseignant_cadre, olympiade_terminee):
+    a, b = _participants(olympiade_terminee, [10.0, 11.0])
+    _calculer(client_enseignant_cadre, olympiade_terminee)
+
+    InscriptionOlympiade.objects.filter(pk=a.pk).update(note=19.0)
+    _calculer(client_enseignant_cadre, olympiade_terminee)
+
+    assert list(
+        ClassementOlympiade.objects.filter(olympiade=olympiade_terminee).values_list(
+            "apprenant_id", "rang"
+        )
+    ) == [(a.apprenant_id, 1), (b.apprenant_id, 2)]
@@ -0,0 +1,162 @@
+"""
+Moteur de correction (apps/evaluation/correction.py) : snapshot identique à
+l'ancienne correction question par question, nombre de requêtes constant,
+corrigé mis en cache par version et invalidé à chaque écriture.
+"""
+
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.evaluation.models import Choix, EvaluationExercice, Exercice, Question
+from apps.evaluation.views.exercices import (
+    _corriger_epreuve_composee,
+    _corriger_reponses_exercice,
+)
+
+
+def _correction_historique(exercice, reponses):
+    """L'ancienne implémentation (deux requêtes par question QCM), gardée
+    ici comme référence du format de snapshot."""
+    score, total, details = 0.0, 0.0, []
+    for question in exercice.questions.order_by("id"):
+        points = question.points
+        total += points
+        user_rep = reponses.get(str(question.id), "").strip().lower()
+        if question.type_question == "qcm":
+            choix_selectionne = question.choix.filter(texte__iexact=user_rep).first()
+            is_correct = bool(choix_selectionne and choix_selectionne.est_correct)
+        else:
+            is_correct = user_rep == question.bonne_reponse.strip().lower()
+        if is_correct:
+            score += points
+        details.append(
+            {
+                "question_id": question.id,
+                "enonce_snapshot": question.text,
+                "type": question.type_question,
+                "choix_snapshot": (
+                    [
+                        {"id": c.id, "texte": c.texte, "est_correct": c.est_correct}
+                        for c in question.choix.all()
+                    ]
+                    if question.type_question == "qcm"
+                    else []
+                ),
+                "reponse_apprenant": user_rep,
+                "bonne_reponse": question.bonne_reponse,
+                "est_correct": is_correct,
+                "points_obtenus": points if is_correct else 0,
+                "points_max": points,
+                "explication": question.explication,
+            }
+        )
+    return score, total, details
+
+
+def _qcm(exercice, texte, choix, points=1.0):
+    question = Question.objects.create(
+        exercice=exercice, text=texte, type_question="qcm", bonne_reponse="", points=points
+    )
+    for ordre, (texte_choix, correct) in enumerate(choix, start=1):
+        Choix.objects.create(question=question, texte=texte_choix, est_correct=correct, ordre=ordre)
+    return question
+
+
+@pytest.fixture
+def exercice_varie(cours):
+    exercice = Exercice.objects.create(cours=cours, titre="Ex", enonce="E", etoiles=1)
+    questions = [
+        _qcm(exercice, "Capitale ?", [("Londres", False), ("Paris", True)], points=2.0),
+        # Même texte deux fois : c'est le PREMIER choix (par ordre) qui
+        # décide, comme `.filter(...).first()`.
+        _qcm(exercice, "Doublon ?", [("Oui", False), ("oui", True)]),
+        _qcm(exercice, "Sans réponse ?", [("A", True), ("B", False)], points=0.5),
+        Question.objects.create(
+            exercice=exercice,
+            text="Texte libre",
+            type_question="texte",
+            bonne_reponse="  Photosynthèse ",
+            explication="Voir leçon 3.",
+        ),
+        Question.objects.create(
+            exercice=exercice, text="QCM vide", type_question="qcm", bonne_reponse=""
+        ),
+    ]
+    return exercice, questions
+
+
+@pytest.mark.django_db
+def test_snapshot_identique_a_l_ancienne_correction(exercice_varie):
+    exercice, questions = exercice_varie
+    for reponses in (
+        {},
+        {str(questions[0].id): " PARIS ", str(questions[1].id): "OUI"},
+        {str(questions[0].id): "londres", str(questions[3].id): "photosynthèse"},
+        {str(q.id): "x" for q in questions},
+    ):
+        attendu = _correction_historique(exercice, reponses)
+        obtenu = _corriger_reponses_exercice(exercice, reponses)
+        assert json.dumps(obtenu) == json.dumps(attendu)
+
+
+@pytest.mark.django_db
+def test_une_requete_a_froid_aucune_a_chaud(exercice_varie):
+    exercice, questions = exercice_varie
+    reponses = {str(q.id): "paris" for q in questions}
+
+    with CaptureQueriesContext(connection) as froid:
+        _corriger_reponses_exercice(exercice, reponses)
+    assert len(froid) == 1
+
+    with CaptureQueriesContext(connection) as chaud:
+        _corriger_reponses_exercice(exercice, reponses)
+    assert len(chaud) == 0
+
+
+@pytest.mark.django_db
+def test_modification_du_corrige_invalide_le_cache(exercice_varie):
+    exercice, questions = exercice_varie
+    reponses = {str(questions[0].id): "londres"}
+    assert _corriger_reponses_exercice(exercice, reponses)[0] == 0.0
+
+    for choix in questions[0].choix.all():
+        choix.est_correct = choix.texte == "Londres"
+        choix.save(update_fields=["est_correct"])
+    assert _corriger_reponses_exercice(exercice, reponses)[0] == 2.0
+
+    supprimee = questions[0].id
+    questions[0].delete()
+    _, total, details = _corriger_reponses_exercice(exercice, reponses)
+    assert supprimee not in {d["question_id"] for d in details}
+    assert total == 3.5
+
+
+@pytest.mark.django_db
+def test_epreuve_requetes_constantes(cours, user_apprenant):
+    epreuve = Exercice.objects.create(
+        cours=cours, titre="Épreuve", enonce="E", etoiles=1, est_epreuve=True
+    )
+    composants = []
+    for i in range(6):
+        composant = Exercice.objects.create(cours=cours, titre=f"C{i}", enonce="E", etoiles=1)
+        _qcm(composant, "Q", [("A", True)], points=float(i + 1))
+        composants.append(composant)
+    epreuve.exercices_composes.set(composants)
+    EvaluationExercice.objects.create(user=user_apprenant, exercice=composants[2], score=3.0)
+
+    with CaptureQueriesContext(connection) as requetes:
+        score, total, details = _corriger_epreuve_composee(epreuve, user_apprenant)
+
+    assert len(requetes) == 3
+    assert score == 3.0
+    assert total == 21.0
+    assert [d["exercice_id"] for d in details] == [c.id for c in composants]
+    assert details[2] == {
+        "exercice_id": composants[2].id,
+        "titre": "C2",
+        "score": 3.0,
+        "total": 3.0,
+    }
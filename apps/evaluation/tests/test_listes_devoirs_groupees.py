@@ -0,0 +1,122 @@
+"""
+Listes de devoirs sérialisées en lot (`ListeDevoirsView`,
+`DevoirsCoursView`, `CadreDevoirsView`) : `nb_questions` annoté,
+soumissions de l'utilisateur et statistiques enseignant chargées pour
+toute la page — nombre de requêtes indépendant de la taille de la page.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.evaluation.models import Devoir, Olympiade, QuestionDevoir, SoumissionDevoir
+
+
+def _devoirs(n, nb_questions=2, **kwargs):
+    devoirs = []
+    for i in range(n):
+        valeurs = dict(
+            titre=f"D{i}",
+            enonce="Énoncé",
+            date_debut=timezone.now() - timedelta(days=1),
+            date_limite=timezone.now() + timedelta(days=7),
+            est_publie=True,
+        )
+        valeurs.update(kwargs)
+        devoir = Devoir.objects.create(**valeurs)
+        for ordre in range(1, nb_questions + 1):
+            QuestionDevoir.objects.create(
+                devoir=devoir, enonce=f"Q{ordre}", type_question="texte", ordre=ordre
+            )
+        devoirs.append(devoir)
+    return devoirs
+
+
+def _nb_requetes(client, url):
+    with CaptureQueriesContext(connection) as requetes:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(requetes), response
+
+
+@pytest.mark.django_db
+def test_liste_devoirs_requetes_constantes(client_apprenant_premium, user_apprenant_premium):
+    premier, *_ = _devoirs(2)
+    SoumissionDevoir.objects.create(
+        utilisateur=user_apprenant_premium, devoir=premier, statut="corrige", note=14.0, sorties=1
+    )
+    url = reverse("liste-devoirs")
+    client_apprenant_premium.get(reverse("profil-me"))  # cache d'authentification chaud
+    petit, _ = _nb_requetes(client_apprenant_premium, url)
+
+    _devoirs(8)
+    grand, response = _nb_requetes(client_apprenant_premium, url)
+
+    assert grand == petit
+    ligne = next(d for d in response.data["results"] if d["id"] == premier.id)
+    assert (ligne["statut_apprenant"], ligne["note_apprenant"], ligne["nb_sorties"]) == (
+        "corrige",
+        14.0,
+        1,
+    )
+    assert sum(d["statut_apprenant"] == "non_commence" for d in response.data["results"]) == 9
+
+
+@pytest.mark.django_db
+def test_devoirs_cours_enseignant_requetes_constantes(
+    client_enseignant_cadre, user_apprenant, user_enseignant_cadre, cours
+):
+    premier, second = _devoirs(2, nb_questions=3, cours_lie=cours)
+    SoumissionDevoir.objects.create(
+        utilisateur=user_apprenant, devoir=premier, statut="corrige", note=12.0
+    )
+    SoumissionDevoir.objects.create(
+        utilisateur=user_enseignant_cadre, devoir=premier, statut="soumis", note=15.5
+    )
+    url = reverse("devoirs-cours", args=[cours.id])
+    client_enseignant_cadre.get(reverse("profil-me"))  # cache d'authentification chaud
+    petit, _ = _nb_requetes(client_enseignant_cadre, url)
+
+    _devoirs(8, cours_lie=cours)
+    grand, response = _nb_requetes(client_enseignant_cadre, url)
+
+    assert grand == petit
+    par_id = {d["id"]: d for d in response.data["results"]}
+    assert par_id[premier.id]["nb_questions"] == 3
+    assert par_id[premier.id]["stats"] == {"nb_soumissions": 2, "nb_corriges": 1, "moyenne": 13.75}
+    assert par_id[premier.id]["ma_soumission"]["statut"] == "soumis"
+    assert par_id[second.id]["stats"] == {"nb_soumissions": 0, "nb_corriges": 0, "moyenne": 0.0}
+    assert par_id[second.id]["ma_soumission"] is None
+
+
+@pytest.mark.django_db
+def test_devoirs_cadre_requetes_constantes(client_enseignant_cadre, user_enseignant_cadre):
+    profil = user_enseignant_cadre.profile
+    lie, _ = _devoirs(2, cree_par=profil)
+    maintenant = timezone.now()
+    Olympiade.objects.create(
+        titre="O",
+        date_ouverture_inscription=maintenant,
+        date_cloture_inscription=maintenant + timedelta(days=1),
+        date_debut_olympiade=maintenant + timedelta(days=2),
+        date_fin_olympiade=maintenant + timedelta(days=3),
+        devoir=lie,
+    )
+    url = reverse("cadre-devoirs")
+    client_enseignant_cadre.get(reverse("profil-me"))  # cache d'authentification chaud
+    petit, _ = _nb_requetes(client_enseignant_cadre, url)
+
+    _devoirs(8, nb_questions=1, cree_par=profil)
+    grand, response = _nb_requetes(client_enseignant_cadre, url)
+
+    assert grand == petit
+    par_id = {d["id"]: d for d in response.data["results"]}
+    assert par_id[lie.id]["nb_questions"] == 2
+    assert par_id[lie.id]["est_lie_olympiade"] is True
+    assert sum(d["est_lie_olympiade"] for d in response.data["results"]) == 1
+    assert "matiere" not in par_id[lie.id]
+    assert {d["nb_questions"] for d in response.data["results"]} == {1, 2}
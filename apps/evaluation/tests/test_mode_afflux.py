@@ -0,0 +1,290 @@
+"""
+Mode afflux (apps/evaluation/afflux.py) : soumission figée et mise en file
+(202), correction différée identique au chemin synchrone, retard jugé sur
+l'heure de réception, reprise après erreur, classement refusé tant que
+des copies sont en file.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.models import ParametreSysteme
+from apps.evaluation import afflux
+from apps.evaluation.models import (
+    ChoixReponse,
+    ClassementOlympiade,
+    InscriptionOlympiade,
+    Olympiade,
+    QuestionDevoir,
+    ReponseDevoir,
+    SoumissionDevoir,
+    SoumissionEnAttente,
+)
+from apps.notifications.models import Notification
+
+
+@pytest.fixture
+def mode_afflux(db):
+    ParametreSysteme.objects.create(cle="soumissions_mode_afflux", valeur="true", type="bool")
+
+
+def _qcm(devoir, ordre=1):
+    question = QuestionDevoir.objects.create(
+        devoir=devoir, enonce=f"Q{ordre}", type_question="qcm", ordre=ordre
+    )
+    ChoixReponse.objects.create(question=question, texte="Bonne", est_correct=True, ordre=1)
+    ChoixReponse.objects.create(question=question, texte="Mauvaise", est_correct=False, ordre=2)
+    return question
+
+
+def _soumettre_devoir(client, devoir, reponses):
+    return client.post(
+        reverse("soumettre-devoir", args=[devoir.id]), {"reponses": reponses}, format="json"
+    )
+
+
+@pytest.mark.django_db
+def test_devoir_mis_en_file_puis_corrige(
+    mode_afflux, client_apprenant_premium, user_apprenant_premium, devoir
+):
+    devoir.type_correction = "auto"
+    devoir.save()
+    q1, q2 = _qcm(devoir, 1), _qcm(devoir, 2)
+    soum = SoumissionDevoir.objects.create(utilisateur=user_apprenant_premium, devoir=devoir)
+
+    response = _soumettre_devoir(
+        client_apprenant_premium, devoir, {str(q1.id): "Bonne", str(q2.id): "Mauvaise"}
+    )
+
+    assert response.status_code == 202
+    assert response.data["note"] is None
+    soum.refresh_from_db()
+    assert soum.statut == "soumis"
+    assert soum.note is None
+    assert not ReponseDevoir.objects.filter(soumission=soum).exists()
+    # Copie figée : une seconde soumission est refusée comme d'habitude.
+    assert _soumettre_devoir(client_apprenant_premium, devoir, {}).status_code == 400
+
+    assert afflux.drainer() == (1, 0)
+
+    soum.refresh_from_db()
+    entree = SoumissionEnAttente.objects.get(soumission_devoir=soum)
+    assert (soum.statut, soum.note) == ("corrige", 10.0)
+    assert soum.soumis_le == entree.recu_le
+    assert entree.statut == "traitee"
+    assert ReponseDevoir.objects.filter(soumission=soum, est_correct=True).count() == 1
+
+
+@pytest.mark.django_db
+def test_retard_juge_sur_l_heure_de_reception(
+    mode_afflux, client_apprenant_premium, user_apprenant_premium, devoir
+):
+    devoir.type_correction = "manuel"
+    devoir.save()
+    _qcm(devoir)
+    soum = SoumissionDevoir.objects.create(utilisateur=user_apprenant_premium, devoir=devoir)
+    assert _soumettre_devoir(client_apprenant_premium, devoir, {}).status_code == 202
+
+    # L'échéance tombe entre la réception et la correction.
+    soum.refresh_from_db()
+    devoir.date_limite = soum.soumis_le + timedelta(seconds=1)
+    devoir.save()
+    SoumissionEnAttente.objects.filter(soumission_devoir=soum).update(recu_le=soum.soumis_le)
+    assert afflux.drainer() == (1, 0)
+
+    soum.refresh_from_db()
+    assert soum.statut == "soumis"
+    assert soum.est_en_retard is False
+
+
+@pytest.mark.django_db
+def test_copie_arrivee_apres_l_echeance_reste_en_retard(
+    mode_afflux, client_apprenant_premium, user_apprenant_premium, devoir
+):
+    devoir.type_correction = "manuel"
+    devoir.date_limite = timezone.now() - timedelta(minutes=1)
+    devoir.save()
+    _qcm(devoir)
+    soum = SoumissionDevoir.objects.create(utilisateur=user_apprenant_premium, devoir=devoir)
+
+    response = _soumettre_devoir(client_apprenant_premium, devoir, {})
+    assert (response.status_code, response.data["en_retard"]) == (202, True)
+    # En file, sans note : pas encore un résultat.
+    resultat = reverse("resultat-devoir", args=[devoir.id])
+    assert client_apprenant_premium.get(resultat).status_code == 202
+
+    afflux.drainer()
+    soum.refresh_from_db()
+    assert soum.statut == "en_retard"
+
+
+@pytest.mark.django_db
+def test_copie_en_retard_notee_apres_la_file(
+    mode_afflux, client_apprenant_premium, user_apprenant_premium, devoir
+):
+    devoir.type_correction = "auto"
+    devoir.date_limite = timezone.now() - timedelta(minutes=1)
+    devoir.save()
+    q = _qcm(devoir)
+    SoumissionDevoir.objects.create(utilisateur=user_apprenant_premium, devoir=devoir)
+    _soumettre_devoir(client_apprenant_premium, devoir, {str(q.id): "Bonne"})
+    resultat = reverse("resultat-devoir", args=[devoir.id])
+    assert client_apprenant_premium.get(resultat).status_code == 202
+
+    afflux.drainer()
+
+    response = client_apprenant_premium.get(resultat)
+    assert response.status_code == 200
+    assert response.data["note"] is not None
+
+
+@pytest.mark.django_db
+def test_olympiade_mise_en_file_puis_notee(mode_afflux, client_apprenant, user_apprenant, devoir):
+    maintenant = timezone.now()
+    devoir.type_devoir = "olympiade"
+    devoir.save()
+    q1, q2 = _qcm(devoir, 1), _qcm(devoir, 2)
+    olympiade = Olympiade.objects.create(
+        titre="O",
+        date_ouverture_inscription=maintenant - timedelta(days=3),
+        date_cloture_inscription=maintenant - timedelta(days=2),
+        date_debut_olympiade=maintenant - timedelta(hours=1),
+        date_fin_olympiade=maintenant + timedelta(hours=2),
+        devoir=devoir,
+    )
+    inscription = InscriptionOlympiade.objects.create(
+        olympiade=olympiade,
+        apprenant=user_apprenant,
+        session_demarree=True,
+        heure_debut_compo=maintenant,
+    )
+
+    response = client_apprenant.post(
+        reverse("soumettre-olympiade", args=[olympiade.id]),
+        {"reponses": {str(q1.id): "Bonne", str(q2.id): "Bonne"}},
+        format="json",
+    )
+
+    assert response.status_code == 202
+    inscription.refresh_from_db()
+    assert inscription.soumis is True
+    assert inscription.note is None
+    recu_le = inscription.heure_fin_compo
+
+    call_command("traiter_soumissions_en_attente", stdout=StringIO())
+
+    inscription.refresh_from_db()
+    assert inscription.note == olympiade.note_sur
+    assert inscription.heure_fin_compo == recu_le
+
+
+@pytest.mark.django_db
+def test_erreur_de_correction_reessayee_puis_en_echec(
+    mode_afflux, client_apprenant_premium, user_apprenant_premium, devoir, monkeypatch
+):
+    _qcm(devoir)
+    SoumissionDevoir.objects.create(utilisateur=user_apprenant_premium, devoir=devoir)
+    assert _soumettre_devoir(client_apprenant_premium, devoir, {}).status_code == 202
+
+    def en_panne(entree):
+        raise RuntimeError("base indisponible")
+
+    monkeypatch.setattr(afflux, "_corriger", en_panne)
+    assert afflux.drainer(limite=1) == (0, 1)
+    entree = SoumissionEnAttente.objects.get()
+    assert (entree.statut, entree.tentatives) == ("en_attente", 1)
+    assert "base indisponible" in entree.erreur
+
+    assert afflux.drainer() == (0, afflux.TENTATIVES_MAX - 1)
+    entree.refresh_from_db()
+    assert (entree.statut, entree.tentatives) == ("echec", afflux.TENTATIVES_MAX)
+
+
+@pytest.mark.django_db
+def test_entree_abandonnee_par_un_correcteur_est_reprise(
+    mode_afflux, client_apprenant_premium, user_apprenant_premium, devoir
+):
+    _qcm(devoir)
+    soum = SoumissionDevoir.objects.create(utilisateur=user_apprenant_premium, devoir=devoir)
+    _soumettre_devoir(client_apprenant_premium, devoir, {})
+    entree = SoumissionEnAttente.objects.get()
+
+    SoumissionEnAttente.objects.filter(pk=entree.pk).update(
+        statut="en_cours", pris_le=timezone.now()
+    )
+    assert afflux.drainer() == (0, 0)
+
+    SoumissionEnAttente.objects.filter(pk=entree.pk).update(
+        pris_le=timezone.now() - afflux.DELAI_REPRISE - timedelta(seconds=1)
+    )
+    assert afflux.drainer() == (1, 0)
+    soum.refresh_from_db()
+    assert soum.statut == "corrige"
+
+
+@pytest.mark.django_db
+def test_hors_mode_afflux_correction_immediate(
+    client_apprenant_premium, user_apprenant_premium, devoir
+):
+    _qcm(devoir)
+    SoumissionDevoir.objects.create(utilisateur=user_apprenant_premium, devoir=devoir)
+
+    response = _soumettre_devoir(client_apprenant_premium, devoir, {})
+
+    assert response.status_code == 200
+    assert not SoumissionEnAttente.objects.exists()
+
+
+@pytest.mark.django_db
+def test_classement_refuse_tant_qu_une_copie_est_chez_un_correcteur(
+    mode_afflux, client_admin, user_apprenant, devoir
+):
+    maintenant = timezone.now()
+    devoir.type_devoir = "olympiade"
+    devoir.save()
+    olympiade = Olympiade.objects.create(
+        titre="O",
+        date_ouverture_inscription=maintenant - timedelta(days=3),
+        date_cloture_inscription=maintenant - timedelta(days=2),
+        date_debut_olympiade=maintenant - timedelta(hours=3),
+        date_fin_olympiade=maintenant - timedelta(minutes=1),
+        devoir=devoir,
+    )
+    inscription = InscriptionOlympiade.objects.create(
+        olympiade=olympiade,
+        apprenant=user_apprenant,
+        session_demarree=True,
+        soumis=True,
+        heure_debut_compo=maintenant - timedelta(hours=1),
+        heure_fin_compo=maintenant - timedelta(minutes=2),
+    )
+    # Copie réservée à l'instant par un correcteur d'un autre process :
+    # `drainer` ne la reprend pas.
+    entree = SoumissionEnAttente.objects.create(
+        type="olympiade",
+        inscription=inscription,
+        reponses={},
+        recu_le=inscription.heure_fin_compo,
+        statut="en_cours",
+        pris_le=maintenant,
+    )
+    url = reverse("calculer-classement", args=[olympiade.id])
+
+    refus = client_admin.post(url)
+
+    assert refus.status_code == 409
+    assert "1 copie(s)" in refus.data["detail"]
+    assert not ClassementOlympiade.objects.filter(olympiade=olympiade).exists()
+    assert not Notification.objects.filter(type="classement").exists()
+
+    # Correcteur disparu : l'entrée est reprise par le drainage, puis classée.
+    SoumissionEnAttente.objects.filter(pk=entree.pk).update(
+        pris_le=maintenant - afflux.DELAI_REPRISE - timedelta(seconds=1)
+    )
+    assert client_admin.post(url).status_code == 200
+    assert ClassementOlympiade.objects.filter(olympiade=olympiade).count() == 1
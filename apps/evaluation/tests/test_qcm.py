@@ -115,3 +115,38 @@ def test_correction_qcm_utilise_est_correct(exercice):
     score, total, details = _corriger_reponses_exercice(exercice, {str(question.id): "Paris"})
     assert score == 1
     assert details[0]["est_correct"] is True
+
+
+@pytest.mark.django_db
+def test_corrige_dans_le_cache_partage(exercice):
+    """Corrigé compilé et version sont dans `CACHE_PARTAGE` : un correcteur
+    lancé dans un autre process voit la modification d'un choix."""
+    from django.core.cache import caches
+    from django.test.utils import override_settings
+
+    from apps.evaluation.correction import corrige_exercice, version_corrige
+
+    question = Question.objects.create(
+        exercice=exercice, text="Capitale ?", type_question="qcm", bonne_reponse="x", points=1
+    )
+    choix = Choix.objects.create(question=question, texte="Paris", est_correct=True)
+    with override_settings(
+        CACHE_PARTAGE="partage",
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "partage": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "corrige-test",
+            },
+        },
+    ):
+        caches["default"].clear()
+        corrige_exercice(exercice.id)
+        version = version_corrige(exercice.id)
+        assert caches["partage"].get(f"corrige_exercice:{exercice.id}:{version}") is not None
+        assert caches["default"].get(f"corrige_exercice_version:{exercice.id}") is None
+
+        choix.est_correct = False
+        choix.save()
+        assert version_corrige(exercice.id) != version
+        caches["partage"].clear()
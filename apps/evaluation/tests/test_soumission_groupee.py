@@ -0,0 +1,139 @@
+"""
+Persistance groupée des réponses de devoir et d'olympiade : correction en
+mémoire contre les choix préchargés, une seule écriture `bulk_create`
+(upsert) par soumission — nombre de requêtes indépendant du nombre de
+questions.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.evaluation.models import (
+    ChoixReponse,
+    Devoir,
+    InscriptionOlympiade,
+    Olympiade,
+    QuestionDevoir,
+    ReponseDevoir,
+    ReponseOlympiade,
+    SoumissionDevoir,
+)
+from apps.evaluation.views.devoirs import _corriger_et_soumettre_devoir
+
+
+def _devoir(nb_qcm, nb_texte=0, **kwargs):
+    devoir = Devoir.objects.create(
+        titre="D",
+        enonce="E",
+        date_limite=timezone.now() + timedelta(days=1),
+        est_publie=True,
+        type_correction="auto",
+        **kwargs,
+    )
+    for ordre in range(1, nb_qcm + 1):
+        q = QuestionDevoir.objects.create(
+            devoir=devoir, enonce=f"Q{ordre}", type_question="qcm", ordre=ordre
+        )
+        ChoixReponse.objects.create(question=q, texte="Bonne", est_correct=True, ordre=1)
+        ChoixReponse.objects.create(question=q, texte="Mauvaise", est_correct=False, ordre=2)
+    for ordre in range(nb_qcm + 1, nb_qcm + nb_texte + 1):
+        QuestionDevoir.objects.create(
+            devoir=devoir,
+            enonce=f"Q{ordre}",
+            type_question="texte",
+            reponse_attendue="Paris",
+            ordre=ordre,
+        )
+    return devoir
+
+
+def _reponses(devoir):
+    return {
+        str(q.id): "Bonne" if q.type_question == "qcm" else "paris." for q in devoir.questions.all()
+    }
+
+
+def _requetes_devoir(user, devoir):
+    soum = SoumissionDevoir.objects.create(utilisateur=user, devoir=devoir)
+    reponses = _reponses(devoir)
+    devoir = Devoir.objects.get(pk=devoir.pk)
+    with CaptureQueriesContext(connection) as requetes:
+        _corriger_et_soumettre_devoir(devoir, soum, reponses)
+    return soum, len(requetes)
+
+
+@pytest.mark.django_db
+def test_devoir_requetes_independantes_du_nombre_de_questions(user_apprenant):
+    _, petit = _requetes_devoir(user_apprenant, _devoir(nb_qcm=2, nb_texte=1))
+    soum, grand = _requetes_devoir(user_apprenant, _devoir(nb_qcm=12, nb_texte=6))
+
+    assert petit == grand
+    soum.refresh_from_db()
+    assert soum.statut == "corrige"
+    assert soum.note == 20.0
+    reponses = ReponseDevoir.objects.filter(soumission=soum)
+    assert reponses.count() == 18
+    assert all(r.est_correct for r in reponses)
+    assert {r.choix.texte for r in reponses if r.choix} == {"Bonne"}
+
+
+@pytest.mark.django_db
+def test_devoir_resoumission_met_a_jour_sans_dupliquer(user_apprenant):
+    devoir = _devoir(nb_qcm=2)
+    soum = SoumissionDevoir.objects.create(utilisateur=user_apprenant, devoir=devoir)
+    q1, q2 = devoir.questions.all()
+
+    _corriger_et_soumettre_devoir(devoir, soum, {str(q1.id): "Bonne", str(q2.id): "Bonne"})
+    _corriger_et_soumettre_devoir(devoir, soum, {str(q1.id): "Mauvaise"})
+
+    assert ReponseDevoir.objects.filter(soumission=soum).count() == 2
+    r1 = ReponseDevoir.objects.get(soumission=soum, question=q1)
+    assert (r1.reponse, r1.est_correct, r1.points_obtenus) == ("Mauvaise", False, 0)
+    r2 = ReponseDevoir.objects.get(soumission=soum, question=q2)
+    assert (r2.reponse, r2.choix, r2.est_correct) == ("", None, False)
+
+
+def _requetes_olympiade(client, user, nb_qcm):
+    maintenant = timezone.now()
+    devoir = _devoir(nb_qcm=nb_qcm, nb_texte=1, type_devoir="olympiade")
+    olympiade = Olympiade.objects.create(
+        titre="O",
+        date_ouverture_inscription=maintenant - timedelta(days=3),
+        date_cloture_inscription=maintenant - timedelta(days=2),
+        date_debut_olympiade=maintenant - timedelta(hours=1),
+        date_fin_olympiade=maintenant + timedelta(hours=2),
+        devoir=devoir,
+    )
+    inscription = InscriptionOlympiade.objects.create(
+        olympiade=olympiade, apprenant=user, session_demarree=True, heure_debut_compo=maintenant
+    )
+    with CaptureQueriesContext(connection) as requetes:
+        response = client.post(
+            reverse("soumettre-olympiade", args=[olympiade.id]),
+            {"reponses": _reponses(devoir)},
+            format="json",
+        )
+    assert response.status_code == 200
+    return inscription, len(requetes)
+
+
+@pytest.mark.django_db
+def test_olympiade_requetes_independantes_du_nombre_de_questions(client_apprenant, user_apprenant):
+    client_apprenant.get(reverse("profil-me"))  # cache d'authentification chaud
+    _, petit = _requetes_olympiade(client_apprenant, user_apprenant, nb_qcm=2)
+    inscription, grand = _requetes_olympiade(client_apprenant, user_apprenant, nb_qcm=15)
+
+    assert petit == grand
+    inscription.refresh_from_db()
+    assert inscription.soumis is True
+    assert inscription.note == round(15 / 16 * 20, 2)
+    reponses = ReponseOlympiade.objects.filter(inscription=inscription)
+    assert reponses.count() == 16
+    assert reponses.filter(est_correct=True).count() == 15
+    # Question texte : ligne créée, jamais corrigée automatiquement.
+    assert reponses.get(question__type_question="texte").est_correct is None
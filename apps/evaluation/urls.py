@@ -48,6 +48,7 @@ from apps.evaluation.views import (
     SoumettreOlympiadeView,
     FocusPeduOlympiadeView,
     ClassementOlympiadeView,
+    ClassementDirectOlympiadeView,
     CalculerClassementView,
     MonInscriptionOlympiadeView,
     OlympiadesPourMoiView,
@@ -231,6 +232,11 @@ urlpatterns = [
         ClassementOlympiadeView.as_view(),
         name="classement-olympiade",
     ),
+    path(
+        "olympiades/<int:olympiade_id>/classement-direct/",
+        ClassementDirectOlympiadeView.as_view(),
+        name="classement-direct-olympiade",
+    ),
     path(
         "olympiades/<int:olympiade_id>/calculer-classement/",
         CalculerClassementView.as_view(),
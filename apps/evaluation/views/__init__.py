@@ -52,6 +52,7 @@ from apps.evaluation.views.olympiades import (  # noqa: F401
     SoumettreOlympiadeView,
     FocusPeduOlympiadeView,
     ClassementOlympiadeView,
+    ClassementDirectOlympiadeView,
     CalculerClassementView,
     MonInscriptionOlympiadeView,
     CreerOlympiadeParCadreView,
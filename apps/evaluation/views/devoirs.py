@@ -3,6 +3,7 @@ import unicodedata
 from datetime import timedelta
 
 from django.db import transaction
+from django.db.models import Avg, Count, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -16,18 +17,22 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
 from drf_spectacular.types import OpenApiTypes
 
 from apps.accounts.models import Profile
+from apps.core import transferts
 from apps.core.exceptions import ConflictError
 from apps.core.models import enregistrer_activite
-from apps.core.pagination import PaginatedListMixin
+from apps.core.pagination import PaginatedListMixin, YekiKeysetPagination
 from apps.core.schema_examples import (
     ERREURS_COURANTES,
     ERREURS_ECRITURE,
     EXEMPLE_PAGINATION,
     PARAMS_PAGINATION,
+    PARAMS_PAGINATION_KEYSET,
 )
 from apps.core.permissions import AccesMatricePermission
 from apps.core.services import _get_client_ip
 from apps.formation.models import Cours
+from apps.evaluation.afflux import mettre_en_attente_devoir, mode_afflux_actif
+from apps.evaluation.correction import choix_par_texte
 from apps.evaluation.models import (
     Devoir,
     EnonceDevoir,
@@ -48,6 +53,7 @@ from apps.evaluation.serializers import (
     SoumissionResultatSerializer,
     QuestionDevoirCreateUpdateSerializer,
     QuestionDevoirAdminSerializer,
+    soumissions_par_devoir,
 )
 
 
@@ -152,7 +158,11 @@ class ListeDevoirsView(PaginatedListMixin, APIView):
                 qs = qs.filter(id__in=ids)
 
         page = self.paginate_queryset(qs)
-        serializer = DevoirListSerializer(page, many=True, context={"request": request})
+        serializer = DevoirListSerializer(
+            page,
+            many=True,
+            context={"request": request, "soumissions": soumissions_par_devoir(page, request.user)},
+        )
         return self.get_paginated_response(serializer.data)
 
 
@@ -363,7 +373,7 @@ def _normaliser_texte(texte) -> str:
     return texte
 
 
-def _corriger_et_soumettre_devoir(devoir, soum, reponses):
+def _corriger_et_soumettre_devoir(devoir, soum, reponses, soumis_le=None):
     """
     Corrige les réponses (QCM via `Choix.est_correct`, texte via
     `_normaliser_texte` en correction auto) et finalise la soumission
@@ -372,19 +382,26 @@ def _corriger_et_soumettre_devoir(devoir, soum, reponses):
     (sortie forcée par épuisement des tentatives, P7.3) — aucune logique
     dupliquée entre les deux vues, même patron que
     `_corriger_reponses_exercice` (apps/evaluation/views/exercices.py).
+
+    `soumis_le` : heure de réception d'une soumission corrigée en différé
+    (mode afflux, apps/evaluation/afflux.py) — c'est elle, pas l'heure de
+    correction, qui décide du retard.
     """
     score = 0.0
     total = 0.0
+    lignes = []
 
+    # Corrigé chargé une fois (questions + choix préchargés), correction en
+    # mémoire, puis UNE écriture groupée : nombre de requêtes constant quel
+    # que soit le nombre de questions.
     for question in devoir.questions.prefetch_related("choix").all():
         total += question.points
         user_rep = reponses.get(str(question.id), "").strip()
 
-        repobj, _ = ReponseDevoir.objects.get_or_create(soumission=soum, question=question)
+        repobj = ReponseDevoir(soumission=soum, question=question, reponse=user_rep)
 
         if question.type_question == "qcm":
-            choix_selectionne = question.choix.filter(texte=user_rep).first()
-            repobj.reponse = user_rep
+            choix_selectionne = choix_par_texte(question, user_rep)
             repobj.choix = choix_selectionne
             if choix_selectionne and choix_selectionne.est_correct:
                 repobj.est_correct = True
@@ -394,7 +411,6 @@ def _corriger_et_soumettre_devoir(devoir, soum, reponses):
                 repobj.est_correct = False
                 repobj.points_obtenus = 0
         else:
-            repobj.reponse = user_rep
             # P7.3 : comparaison normalisée (casse/accents/ponctuation
             # finale/espaces multiples) — auparavant un simple
             # `.strip().lower()`, cause probable de plaintes légitimes.
@@ -408,10 +424,17 @@ def _corriger_et_soumettre_devoir(devoir, soum, reponses):
             else:
                 repobj.est_correct = None  # correction manuelle
 
-        repobj.save()
+        lignes.append(repobj)
+
+    ReponseDevoir.objects.bulk_create(
+        lignes,
+        update_conflicts=True,
+        unique_fields=["soumission", "question"],
+        update_fields=["reponse", "choix", "est_correct", "points_obtenus"],
+    )
 
     now = timezone.now()
-    soum.soumis_le = now
+    soum.soumis_le = soumis_le or now
     soum.statut = "en_retard" if soum.est_en_retard else "soumis"
 
     if devoir.type_correction == "auto":
@@ -436,11 +459,12 @@ def _corriger_et_soumettre_devoir(devoir, soum, reponses):
             "fournies, corrige automatiquement les QCM (et les questions texte si le "
             "devoir est en correction automatique), puis calcule la note si applicable. "
             "Si le temps imparti est écoulé, le devoir est auto-soumis sans correction "
-            "immédiate."
+            "immédiate. En mode afflux, la copie est enregistrée telle quelle et la "
+            "réponse est 202 : la note est calculée en différé."
         ),
         tags=["evaluation"],
         request=ReponseSubmitSerializer,
-        responses={200: OpenApiTypes.OBJECT},
+        responses={200: OpenApiTypes.OBJECT, 202: OpenApiTypes.OBJECT},
         examples=[*ERREURS_ECRITURE],
     ),
 )
@@ -473,6 +497,23 @@ class SoumettreDevoirView(APIView):
         serializer_in.is_valid(raise_exception=True)
         reponses = serializer_in.validated_data["reponses"]
 
+        if mode_afflux_actif():
+            # Copie figée à l'heure de réception, corrigée en différé.
+            soum.soumis_le = timezone.now()
+            soum.statut = "en_retard" if soum.est_en_retard else "soumis"
+            soum.save(update_fields=["soumis_le", "statut"])
+            mettre_en_attente_devoir(soum, reponses)
+            return Response(
+                {
+                    "statut": soum.statut,
+                    "note": None,
+                    "note_sur": devoir.note_sur,
+                    "en_retard": soum.est_en_retard,
+                    "message": "Devoir reçu. La note sera disponible après correction.",
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
         _corriger_et_soumettre_devoir(devoir, soum, reponses)
 
         return Response(
@@ -517,7 +558,9 @@ class ResultatDevoirView(APIView):
                 {"detail": "Devoir encore en cours de composition."},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        if soum.statut == "soumis":
+        # Copie en retard pas encore notée : en file de correction (mode
+        # afflux) ou en attente de l'enseignant, comme une copie `soumis`.
+        if soum.statut == "soumis" or (soum.statut == "en_retard" and soum.note is None):
             return Response(
                 {"detail": "Résultat en attente de correction par l'enseignant."},
                 status=status.HTTP_202_ACCEPTED,
@@ -987,7 +1030,7 @@ class SignalerFocusDevoirView(APIView):
             "l'apprenant connecté, triées par date de début décroissante."
         ),
         tags=["evaluation"],
-        parameters=[*PARAMS_PAGINATION],
+        parameters=[*PARAMS_PAGINATION_KEYSET],
         responses={200: SoumissionDetailSerializer(many=True)},
         examples=[EXEMPLE_PAGINATION, *ERREURS_COURANTES],
     ),
@@ -996,6 +1039,8 @@ class MesSoumissionsView(PaginatedListMixin, APIView):
     """GET /api/devoirs/mes-soumissions/"""
 
     permission_classes = [IsAuthenticated]
+    pagination_class = YekiKeysetPagination
+    keyset_champ = "debut"
 
     def get(self, request):
         soumissions = (
@@ -1063,15 +1108,13 @@ class DevoirsCoursView(PaginatedListMixin, APIView):
                 "-date_creation"
             )
 
-        page = self.paginate_queryset(devoirs)
+        page = self.paginate_queryset(avec_nb_questions(devoirs))
+        soumissions = soumissions_par_devoir(page, request.user)
+        stats_par_devoir = _stats_soumissions(page) if is_enseignant else {}
 
         result = []
         for devoir in page:
-            # Chercher la soumission de l'utilisateur
-            soumission = SoumissionDevoir.objects.filter(
-                devoir=devoir,
-                utilisateur=request.user,
-            ).first()
+            soumission = soumissions.get(devoir.id)
 
             soumission_data = None
             if soumission:
@@ -1084,25 +1127,12 @@ class DevoirsCoursView(PaginatedListMixin, APIView):
                     "commentaire": soumission.commentaire or "",
                 }
 
-            # Pour l'enseignant: compter le nombre de soumissions
+            # Pour l'enseignant : nombre de soumissions, corrigés, moyenne
             stats = None
             if is_enseignant:
-                nb_soumissions = SoumissionDevoir.objects.filter(devoir=devoir).count()
-                nb_corriges = SoumissionDevoir.objects.filter(
-                    devoir=devoir, statut="corrige"
-                ).count()
-
-                # Moyenne des notes
-                notes = SoumissionDevoir.objects.filter(
-                    devoir=devoir, note__isnull=False
-                ).values_list("note", flat=True)
-                moyenne = sum(notes) / len(notes) if notes else 0.0
-
-                stats = {
-                    "nb_soumissions": nb_soumissions,
-                    "nb_corriges": nb_corriges,
-                    "moyenne": round(moyenne, 2),
-                }
+                stats = stats_par_devoir.get(
+                    devoir.id, {"nb_soumissions": 0, "nb_corriges": 0, "moyenne": 0.0}
+                )
 
             # P7.4 : `coefficient`/`fichier_correction_url` manquaient —
             # sans eux l'écran de gestion enseignant devrait refaire un
@@ -1120,7 +1150,7 @@ class DevoirsCoursView(PaginatedListMixin, APIView):
                     "date_limite": devoir.date_limite.isoformat() if devoir.date_limite else None,
                     "est_ouvert": devoir.est_ouvert,
                     "est_expire": devoir.est_expire,
-                    "nb_questions": devoir.questions.count(),
+                    "nb_questions": devoir.nb_questions,
                     "note_sur": float(devoir.note_sur),
                     "coefficient": float(devoir.coefficient),
                     "duree_minutes": devoir.duree_minutes,
@@ -1332,13 +1362,17 @@ class SoumettreDevoirFichierView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Stocker le fichier dans la soumission
-        soum.fichier_soumis = fichier
+        # Stocker le fichier dans la soumission (écrit sur le stockage hors
+        # requête en production, voir apps/core/transferts.py)
+        fichiers = transferts.extraire({"fichier_soumis": fichier}, ["fichier_soumis"])
+        if not fichiers:
+            soum.fichier_soumis = fichier
 
         now = timezone.now()
         soum.statut = "en_retard" if soum.est_en_retard else "soumis"
         soum.soumis_le = now
         soum.save()
+        transferts.differer(soum, fichiers)
 
         return Response(
             {
@@ -1346,6 +1380,7 @@ class SoumettreDevoirFichierView(APIView):
                 "message": "Fichier soumis avec succès. En attente de correction.",
                 "soumis_le": soum.soumis_le.isoformat(),
                 "devoir_titre": devoir.titre,
+                "transfert_statut": soum.transfert_statut,
             }
         )
 
@@ -1868,6 +1903,7 @@ class DetailSoumissionEnseignantView(APIView):
                 "nb_focus_perdu": soum.nb_focus_perdu,
                 "reponses": reponses,
                 "fichier_soumis": fichier_url,
+                "fichier_transfert_statut": soum.transfert_statut,
             }
         )
 
@@ -1930,34 +1966,31 @@ class StatsDevoirEnseignantView(APIView):
         )
 
 
-def _devoir_to_dict(devoir, user=None):
-    """Sérialise un Devoir en dictionnaire pour les réponses API."""
-    soumission_data = None
-    if user:
-        soum = SoumissionDevoir.objects.filter(devoir=devoir, utilisateur=user).first()
-        if soum:
-            soumission_data = {
-                "id": soum.id,
-                "statut": soum.statut,
-                "note": float(soum.note) if soum.note is not None else None,
-                "soumis_le": soum.soumis_le.isoformat() if soum.soumis_le else None,
-            }
+def avec_nb_questions(devoirs):
+    """Annote `nb_questions` (COUNT groupé) pour ne pas compter les
+    questions devoir par devoir lors de la sérialisation d'une page."""
+    return devoirs.annotate(nb_questions=Count("questions"))
+
 
+def _stats_soumissions(devoirs) -> dict:
+    """{devoir_id: stats} des soumissions d'une page de devoirs en une
+    requête groupée (vue enseignant de `DevoirsCoursView`)."""
+    lignes = (
+        SoumissionDevoir.objects.filter(devoir_id__in=[d.id for d in devoirs])
+        .values("devoir_id")
+        .annotate(
+            nb_soumissions=Count("id"),
+            nb_corriges=Count("id", filter=Q(statut="corrige")),
+            moyenne=Avg("note"),
+        )
+    )
     return {
-        "id": devoir.id,
-        "titre": devoir.titre,
-        "description": devoir.description,
-        "date_debut": devoir.date_debut.isoformat() if devoir.date_debut else None,
-        "date_limite": devoir.date_limite.isoformat() if devoir.date_limite else None,
-        "est_ouvert": devoir.est_ouvert,
-        "est_expire": devoir.est_expire,
-        "nb_questions": devoir.questions.count(),
-        "note_sur": float(devoir.note_sur) if hasattr(devoir, "note_sur") else 20,
-        "duree_minutes": devoir.duree_minutes,
-        "tentatives_max": devoir.tentatives_max,
-        "est_publie": devoir.est_publie,
-        "type_correction": getattr(devoir, "type_correction", "auto"),
-        "ma_soumission": soumission_data,
+        ligne["devoir_id"]: {
+            "nb_soumissions": ligne["nb_soumissions"],
+            "nb_corriges": ligne["nb_corriges"],
+            "moyenne": round(ligne["moyenne"] or 0.0, 2),
+        }
+        for ligne in lignes
     }
 
 
@@ -1992,9 +2025,13 @@ class CadreDevoirsView(PaginatedListMixin, APIView):
         if profile.user_type != "enseignant_cadre":
             return Response({"detail": "Accès réservé aux enseignants cadres."}, status=403)
 
-        devoirs = Devoir.objects.filter(cree_par=profile).order_by("-date_creation")
+        devoirs = (
+            Devoir.objects.filter(cree_par=profile)
+            .select_related("olympiade_config")
+            .order_by("-date_creation")
+        )
 
-        page = self.paginate_queryset(devoirs)
+        page = self.paginate_queryset(avec_nb_questions(devoirs))
 
         data = []
         for d in page:
@@ -2004,12 +2041,10 @@ class CadreDevoirsView(PaginatedListMixin, APIView):
                     "titre": d.titre,
                     "description": d.description,
                     "type_devoir": d.type_devoir,
-                    "matiere": d.matiere,
-                    "niveau": d.niveau,
                     "date_debut": d.date_debut.isoformat(),
                     "date_limite": d.date_limite.isoformat(),
                     "est_publie": d.est_publie,
-                    "nb_questions": d.questions.count(),
+                    "nb_questions": d.nb_questions,
                     "note_sur": d.note_sur,
                     "est_lie_olympiade": hasattr(d, "olympiade_config")
                     and d.olympiade_config is not None,
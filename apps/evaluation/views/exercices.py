@@ -1,5 +1,5 @@
 from django.db import transaction
-from django.db.models import Q, Sum
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -13,6 +13,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
 from drf_spectacular.types import OpenApiTypes
 
 from apps.accounts.models import Profile
+from apps.core import versions_contenu
 from apps.core.models import enregistrer_activite
 from apps.core.pagination import PaginatedListMixin
 from apps.core.permissions import AccesMatricePermission
@@ -22,6 +23,7 @@ from apps.core.schema_examples import (
     ERREURS_COURANTES,
     ERREURS_ECRITURE,
     EXEMPLE_PAGINATION,
+    PARAMS_GET_CONDITIONNEL,
     PARAMS_PAGINATION,
 )
 from apps.formation.models import Cours, Module
@@ -32,6 +34,7 @@ from apps.evaluation.models import (
     ExerciceTentative,
     EvaluationExercice,
 )
+from apps.evaluation.correction import corrige_exercice, corriger_epreuve, corriger_reponses
 from apps.evaluation.services import ClassementService
 from apps.evaluation.serializers import (
     ExerciceSerializer,
@@ -81,6 +84,7 @@ from apps.evaluation.serializers import (
                 description="Si 'true', inclut aussi les épreuves dans les résultats.",
             ),
             *PARAMS_PAGINATION,
+            *PARAMS_GET_CONDITIONNEL,
         ],
         responses={200: ExerciceSerializer(many=True)},
         examples=[EXEMPLE_PAGINATION, *ERREURS_COURANTES],
@@ -98,7 +102,23 @@ class ListeExercicesCoursView(PaginatedListMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, cours_id):
-        cours = get_object_or_404(Cours, pk=cours_id)
+        cours = get_object_or_404(
+            versions_contenu.annoter_version(
+                Cours.objects.select_related("departement"), versions_contenu.TYPE_COURS
+            ),
+            pk=cours_id,
+        )
+
+        # P9.1 : matrice d'accès Gratuit/Premium — un gratuit voit les
+        # exercices 1★/2★ (vitrine), pas au-delà. Filtrage de queryset
+        # (pas la permission_class, qui est tout-ou-rien) : voir
+        # AccesService.etoiles_max_visibles.
+        seuil = AccesService.etoiles_max_visibles(request.user, cours.departement)
+
+        etag = versions_contenu.etag(request, cours.version_contenu, seuil)
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
 
         # Base queryset
         exercices = Exercice.objects.filter(cours=cours)
@@ -110,9 +130,7 @@ class ListeExercicesCoursView(PaginatedListMixin, APIView):
             # apparaître (pas seulement ceux rattachés directement au
             # module) — sinon « cliquer sur un module » masquait les
             # exercices liés à ses leçons.
-            exercices = exercices.filter(
-                Q(module_id=module_id) | Q(lecon__module_id=module_id)
-            )
+            exercices = exercices.filter(Q(module_id=module_id) | Q(lecon__module_id=module_id))
 
         lecon_id = request.query_params.get("lecon_id")
         if lecon_id:
@@ -129,17 +147,14 @@ class ListeExercicesCoursView(PaginatedListMixin, APIView):
         # CORRECTION : Ne pas annoter avec nb_questions, le serializer le calcule
         exercices = exercices.order_by("-id")
 
-        # P9.1 : matrice d'accès Gratuit/Premium — un gratuit voit les
-        # exercices 1★/2★ (vitrine), pas au-delà. Filtrage de queryset
-        # (pas la permission_class, qui est tout-ou-rien) : voir
-        # AccesService.etoiles_max_visibles.
-        seuil = AccesService.etoiles_max_visibles(request.user, cours.departement)
         if seuil is not None:
             exercices = exercices.filter(etoiles__lte=seuil)
 
         page = self.paginate_queryset(exercices)
         serializer = ExerciceSerializer(page, many=True, context={"request": request})
-        return self.get_paginated_response(serializer.data)
+        return versions_contenu.avec_etag(
+            self.get_paginated_response(serializer.data), request, etag
+        )
 
 
 @extend_schema_view(
@@ -226,55 +241,11 @@ def _corriger_reponses_exercice(exercice, reponses):
     quelle dans `ExerciceTentative.reponses["questions"]`.
     Factorisé pour être appelé identiquement depuis SoumettreEvaluationView
     et SortirExerciceView (aucune logique dupliquée entre les deux vues).
+    Le corrigé de l'exercice est chargé en une requête et mis en cache
+    par version (apps/evaluation/correction.py) : la soumission est
+    corrigée en mémoire.
     """
-    score = 0.0
-    total = 0.0
-    details = []
-    for question in exercice.questions.all():
-        points = question.points
-        total += points
-
-        user_rep = reponses.get(str(question.id), "").strip().lower()
-
-        # P2.2 : pour un QCM, la correction se fait via Choix.est_correct
-        # (source de vérité), pas via une comparaison texte-à-texte contre
-        # bonne_reponse (fragile — casse/espaces/accents). Même convention
-        # que SoumettreDevoirView (apps/evaluation/views/devoirs.py).
-        if question.type_question == "qcm":
-            choix_selectionne = question.choix.filter(texte__iexact=user_rep).first()
-            is_correct = bool(choix_selectionne and choix_selectionne.est_correct)
-        else:
-            is_correct = user_rep == question.bonne_reponse.strip().lower()
-
-        points_obtenus = points if is_correct else 0
-
-        if is_correct:
-            score += points
-
-        choix_snapshot = (
-            [
-                {"id": c.id, "texte": c.texte, "est_correct": c.est_correct}
-                for c in question.choix.all()
-            ]
-            if question.type_question == "qcm"
-            else []
-        )
-
-        details.append(
-            {
-                "question_id": question.id,
-                "enonce_snapshot": question.text,
-                "type": question.type_question,
-                "choix_snapshot": choix_snapshot,
-                "reponse_apprenant": user_rep,
-                "bonne_reponse": question.bonne_reponse,
-                "est_correct": is_correct,
-                "points_obtenus": points_obtenus,
-                "points_max": points,
-                "explication": question.explication,
-            }
-        )
-    return score, total, details
+    return corriger_reponses(corrige_exercice(exercice.id), reponses)
 
 
 def _detail_soumission(d):
@@ -327,27 +298,9 @@ def _corriger_epreuve_composee(exercice, user):
     Retourne (score, total, details) où `details` est
     `[{"exercice_id", "titre", "score", "total"}, ...]` — pas de detail
     par question, une épreuve n'a pas de réponses propres à corriger.
+    Nombre de requêtes constant, quel que soit le nombre de composants.
     """
-    score = 0.0
-    total = 0.0
-    details = []
-    for composant in exercice.exercices_composes.all():
-        total_composant = composant.questions.aggregate(total=Sum("points"))["total"] or 0.0
-        evaluation = EvaluationExercice.objects.filter(user=user, exercice=composant).first()
-        score_composant = evaluation.score if evaluation else 0.0
-
-        score += score_composant
-        total += total_composant
-
-        details.append(
-            {
-                "exercice_id": composant.id,
-                "titre": composant.titre,
-                "score": score_composant,
-                "total": total_composant,
-            }
-        )
-    return score, total, details
+    return corriger_epreuve(exercice, user)
 
 
 def _detail_tentative_pour_lecture(tentative_reponses, adapter):
@@ -465,7 +418,7 @@ class SortirExerciceView(APIView):
             reponses_brutes = request.data.get("reponses", {})
             score, total, details = _corriger_reponses_exercice(exercice, reponses_brutes)
             snapshot_key = "questions"
-            est_terminee = len(reponses_brutes) >= exercice.questions.count()
+            est_terminee = len(reponses_brutes) >= len(details)
             detail_http = [_detail_soumission(d) for d in details]
 
         tentative = ExerciceTentative.objects.create(
@@ -839,7 +792,7 @@ class SoumettreEvaluationView(APIView):
             reponses_brutes = request.data.get("reponses", {})
             score, total, details = _corriger_reponses_exercice(exercice, reponses_brutes)
             snapshot_key = "questions"
-            est_terminee = len(reponses_brutes) >= exercice.questions.count()
+            est_terminee = len(reponses_brutes) >= len(details)
             detail_http = [_detail_soumission(d) for d in details]
 
         tentative = ExerciceTentative.objects.create(
@@ -1,6 +1,8 @@
 import json
 
 from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from datetime import timedelta
@@ -30,8 +32,16 @@ from apps.core.schema_examples import (
 )
 from apps.core.services import _get_client_ip
 from apps.formation.models import Departement
-from apps.notifications.models import creer_notification
+from apps.notifications.models import creer_notification, creer_notifications
 from apps.paiement.models import PaiementOlympiade, YekiWallet, Paiement
+from apps.evaluation import classement_direct
+from apps.evaluation.afflux import (
+    drainer,
+    en_file,
+    mettre_en_attente_olympiade,
+    mode_afflux_actif,
+)
+from apps.evaluation.correction import choix_par_texte
 from apps.evaluation.models import (
     Olympiade,
     InscriptionOlympiade,
@@ -430,6 +440,77 @@ class DemarrerOlympiadeView(APIView):
         )
 
 
+def peut_suivre_classement_direct(user, olympiade) -> bool:
+    """Inscrits, organisateur et administrateurs (même règle que
+    `CalculerClassementView` pour les deux derniers)."""
+    profile = _get_profile(user)
+    if profile is not None and (
+        profile.user_type in ["admin", "enseignant_admin"] or olympiade.organisateur_id == profile.pk
+    ):
+        return True
+    return InscriptionOlympiade.objects.filter(olympiade=olympiade, apprenant=user).exists()
+
+
+def _corriger_et_soumettre_olympiade(olympiade, inscription, reponses, auto, soumis_le=None):
+    """
+    Corrige les QCM de la composition, enregistre les réponses et finalise
+    l'inscription ; retourne la note. Appelée par `SoumettreOlympiadeView`
+    et, en mode afflux, par les correcteurs (apps/evaluation/afflux.py)
+    avec `soumis_le` = heure de réception de la copie.
+    """
+    score = 0.0
+    total = 0.0
+
+    if olympiade.devoir:
+        questions = olympiade.devoir.questions.prefetch_related("choix").all()
+        lignes = []
+
+        # Correction en mémoire contre les choix préchargés, puis une
+        # seule écriture groupée : à la clôture d'une olympiade, des
+        # centaines de soumissions arrivent en même temps.
+        for question in questions:
+            total += question.points
+            user_rep = reponses.get(str(question.id), "").strip()
+
+            repobj = ReponseOlympiade(inscription=inscription, question=question)
+
+            if question.type_question == "qcm":
+                choix_sel = choix_par_texte(question, user_rep)
+                repobj.choix = choix_sel
+                repobj.reponse_texte = user_rep
+                if choix_sel and choix_sel.est_correct:
+                    repobj.est_correct = True
+                    repobj.points_obtenus = question.points
+                    score += question.points
+                else:
+                    repobj.est_correct = False
+                    repobj.points_obtenus = 0
+
+            lignes.append(repobj)
+
+        ReponseOlympiade.objects.bulk_create(
+            lignes,
+            update_conflicts=True,
+            unique_fields=["inscription", "question"],
+            update_fields=["choix", "reponse_texte", "est_correct", "points_obtenus"],
+        )
+
+    note = round((score / total) * olympiade.note_sur, 2) if total > 0 else 0
+
+    inscription.soumis = True
+    inscription.soumis_automatique = auto
+    inscription.heure_fin_compo = soumis_le or timezone.now()
+    inscription.note = note
+    inscription.save()
+
+    transaction.on_commit(
+        lambda: classement_direct.copie_notee(
+            olympiade.id, inscription.apprenant_id, note, inscription.heure_fin_compo
+        )
+    )
+    return note
+
+
 class SoumettreOlympiadeView(APIView):
     """POST /api/olympiades/<id>/soumettre/"""
 
@@ -437,10 +518,14 @@ class SoumettreOlympiadeView(APIView):
 
     @extend_schema(
         summary="Soumettre sa composition",
-        description="Enregistre les réponses de l'apprenant, corrige automatiquement les QCM et calcule la note.",
+        description=(
+            "Enregistre les réponses de l'apprenant, corrige automatiquement les QCM et "
+            "calcule la note. En mode afflux, la copie est enregistrée telle quelle et la "
+            "réponse est 202 : la note est calculée en différé."
+        ),
         tags=["evaluation"],
         request=OpenApiTypes.OBJECT,
-        responses={200: OpenApiTypes.OBJECT},
+        responses={200: OpenApiTypes.OBJECT, 202: OpenApiTypes.OBJECT},
         examples=[*ERREURS_ECRITURE],
     )
     @transaction.atomic
@@ -460,43 +545,24 @@ class SoumettreOlympiadeView(APIView):
 
         reponses = request.data.get("reponses", {})
 
-        # ── Enregistrer les réponses ─────────────────────────────
-        score = 0.0
-        total = 0.0
-
-        if olympiade.devoir:
-            questions = olympiade.devoir.questions.prefetch_related("choix").all()
-
-            for question in questions:
-                total += question.points
-                user_rep = reponses.get(str(question.id), "").strip()
-
-                repobj, _ = ReponseOlympiade.objects.get_or_create(
-                    inscription=inscription, question=question
-                )
-
-                if question.type_question == "qcm":
-                    choix_sel = question.choix.filter(texte=user_rep).first()
-                    repobj.choix = choix_sel
-                    repobj.reponse_texte = user_rep
-                    if choix_sel and choix_sel.est_correct:
-                        repobj.est_correct = True
-                        repobj.points_obtenus = question.points
-                        score += question.points
-                    else:
-                        repobj.est_correct = False
-                        repobj.points_obtenus = 0
-                    repobj.save()
-
-        # ── Finaliser inscription ────────────────────────────────
-        note = round((score / total) * olympiade.note_sur, 2) if total > 0 else 0
-        now = timezone.now()
+        if mode_afflux_actif():
+            # Copie figée à l'heure de réception, corrigée en différé.
+            inscription.soumis = True
+            inscription.soumis_automatique = auto
+            inscription.heure_fin_compo = timezone.now()
+            inscription.save(update_fields=["soumis", "soumis_automatique", "heure_fin_compo"])
+            mettre_en_attente_olympiade(inscription, reponses)
+            return Response(
+                {
+                    "message": "Composition reçue. La note sera disponible après correction.",
+                    "note": None,
+                    "note_sur": olympiade.note_sur,
+                    "auto_soumis": auto,
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
 
-        inscription.soumis = True
-        inscription.soumis_automatique = auto
-        inscription.heure_fin_compo = now
-        inscription.note = note
-        inscription.save()
+        note = _corriger_et_soumettre_olympiade(olympiade, inscription, reponses, auto)
 
         return Response(
             {
@@ -604,6 +670,107 @@ class ClassementOlympiadeView(PaginatedListMixin, APIView):
         return self.get_paginated_response(serializer.data)
 
 
+@extend_schema_view(
+    get=extend_schema(
+        summary="Classement provisoire en direct",
+        description=(
+            "Pendant l'olympiade : top-N provisoire (note décroissante, puis copie rendue "
+            "la première) et position de l'apprenant connecté, mis à jour à chaque copie "
+            "notée. Réservé aux inscrits, à l'organisateur et aux administrateurs. Les "
+            "mêmes données sont poussées en WebSocket sur "
+            "`ws/olympiades/<id>/classement/` (au plus une diffusion par seconde)."
+        ),
+        tags=["evaluation"],
+        parameters=[
+            OpenApiParameter(
+                "n",
+                int,
+                description=f"Taille du top (défaut {classement_direct.TOP_PAR_DEFAUT}, "
+                f"max {classement_direct.TOP_MAX})",
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+        examples=[*ERREURS_COURANTES],
+    ),
+)
+class ClassementDirectOlympiadeView(APIView):
+    """GET /api/olympiades/<id>/classement-direct/"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, olympiade_id):
+        olympiade = get_object_or_404(Olympiade, pk=olympiade_id)
+
+        if not peut_suivre_classement_direct(request.user, olympiade):
+            return Response(
+                {"detail": "Classement réservé aux participants et à l'organisateur."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            n = int(request.query_params.get("n", classement_direct.TOP_PAR_DEFAUT))
+        except ValueError:
+            return Response({"detail": "n doit être un entier."}, status=400)
+        n = max(1, min(n, classement_direct.TOP_MAX))
+
+        return Response(classement_direct.instantane(olympiade.id, request.user.id, n))
+
+
+MENTIONS_OLYMPIADE = {1: "Or 🥇", 2: "Argent 🥈", 3: "Bronze 🥉"}
+
+
+def _classer_olympiade(olympiade):
+    """
+    Classement final en trois requêtes, quel que soit le nombre de
+    participants : rangs calculés par la base (`ROW_NUMBER()`), écriture
+    groupée des `ClassementOlympiade`, puis report des rangs sur les
+    inscriptions en un seul UPDATE. Retourne [(apprenant_id, rang)].
+
+    Ordre : note décroissante (sans note = 0), puis à note égale la copie
+    rendue la PREMIÈRE (`heure_fin_compo`), puis l'inscription la plus
+    ancienne — jamais l'ordre arbitraire de la base.
+    """
+    note = Coalesce("note", Value(0.0))
+    lignes = list(
+        InscriptionOlympiade.objects.filter(olympiade=olympiade, soumis=True)
+        .annotate(
+            note_classee=note,
+            rang=Window(
+                RowNumber(),
+                order_by=[
+                    note.desc(),
+                    F("heure_fin_compo").asc(nulls_last=True),
+                    F("pk").asc(),
+                ],
+            ),
+        )
+        .values_list("apprenant_id", "note_classee", "rang")
+    )
+
+    ClassementOlympiade.objects.filter(olympiade=olympiade).delete()
+    ClassementOlympiade.objects.bulk_create(
+        [
+            ClassementOlympiade(
+                olympiade=olympiade,
+                apprenant_id=apprenant_id,
+                rang=rang,
+                note=note_classee,
+                mention=MENTIONS_OLYMPIADE.get(rang, "Participant"),
+            )
+            for apprenant_id, note_classee, rang in lignes
+        ],
+        batch_size=1000,
+    )
+    InscriptionOlympiade.objects.filter(olympiade=olympiade, soumis=True).update(
+        classement=Subquery(
+            ClassementOlympiade.objects.filter(
+                olympiade=olympiade, apprenant=OuterRef("apprenant")
+            ).values("rang")[:1]
+        )
+    )
+    return [(apprenant_id, rang) for apprenant_id, _, rang in lignes]
+
+
 class CalculerClassementView(APIView):
     """
     POST /api/olympiades/<id>/calculer-classement/
@@ -614,9 +781,9 @@ class CalculerClassementView(APIView):
 
     @extend_schema(
         summary="Calculer le classement final",
-        description="Réservé à l'organisateur/admin : calcule et sauvegarde le classement final une fois l'olympiade terminée.",
+        description="Réservé à l'organisateur/admin : calcule et sauvegarde le classement final une fois l'olympiade terminée. 409 tant que des copies sont encore en cours de correction (mode afflux) : réessayer.",
         tags=["evaluation"],
-        responses={200: OpenApiTypes.OBJECT},
+        responses={200: OpenApiTypes.OBJECT, 409: OpenApiTypes.OBJECT},
         examples=[*ERREURS_ECRITURE],
     )
     @transaction.atomic
@@ -638,54 +805,53 @@ class CalculerClassementView(APIView):
         if olympiade.statut_auto not in ["terminee"]:
             return Response({"detail": "L'olympiade n'est pas encore terminée."}, status=400)
 
-        # Récupérer toutes les soumissions non-suspectes triées par note
-        inscriptions = InscriptionOlympiade.objects.filter(
-            olympiade=olympiade,
-            soumis=True,
-        ).order_by("-note")
-
-        ClassementOlympiade.objects.filter(olympiade=olympiade).delete()
-
-        MENTIONS = {1: "Or 🥇", 2: "Argent 🥈", 3: "Bronze 🥉"}
-
-        for rang, insc in enumerate(inscriptions, start=1):
-            mention = MENTIONS.get(rang, "Participant")
-            ClassementOlympiade.objects.create(
-                olympiade=olympiade,
-                apprenant=insc.apprenant,
-                rang=rang,
-                note=insc.note or 0,
-                mention=mention,
+        # Mode afflux : les copies encore en file sont corrigées maintenant,
+        # sinon elles seraient classées sans note.
+        drainer(inscription__olympiade=olympiade)
+        # Copies réservées par un correcteur en arrière-plan (ou arrivées
+        # pendant le drainage) : pas de classement incomplet, ni de
+        # notification « classement disponible » prématurée. Réponse et non
+        # exception, pour garder les corrections déjà faites ci-dessus.
+        restantes = en_file(inscription__olympiade=olympiade)
+        if restantes:
+            return Response(
+                {
+                    "detail": (
+                        f"{restantes} copie(s) encore en cours de correction. "
+                        "Réessayez dans quelques instants."
+                    )
+                },
+                status=status.HTTP_409_CONFLICT,
             )
-            insc.classement = rang
-            insc.save(update_fields=["classement"])
+
+        rangs = _classer_olympiade(olympiade)
+        nb = len(rangs)
 
         # Notifier chaque participant — P8.3 : jusqu'ici, calculer le
         # classement ne notifiait PERSONNE (seul `enregistrer_activite`
         # ci-dessous, un journal d'audit, pas une notification visible par
-        # l'apprenant). Même patron que la notification de création
-        # ci-dessus (P8.1, ligne ~908).
-        for insc in inscriptions:
-            creer_notification(
-                utilisateur=insc.apprenant,
-                # "classement" (pas "olympiade", générique) — type dédié
-                # existant pour ce cas exact (« changement de rang »,
-                # apps/notifications/models.py).
-                type_notif="classement",
-                titre=f"Classement disponible : {olympiade.titre}",
-                contenu=f"Le classement de l'olympiade « {olympiade.titre} » est disponible.",
-                objet_id=olympiade.id,
-                objet_type="Olympiade",
-                action_route=f"/olympiades/{olympiade.id}/classement",
-            )
+        # l'apprenant). Une seule diffusion groupée, plus un INSERT par
+        # participant.
+        creer_notifications(
+            [apprenant_id for apprenant_id, _ in rangs],
+            # "classement" (pas "olympiade", générique) — type dédié
+            # existant pour ce cas exact (« changement de rang »,
+            # apps/notifications/models.py).
+            type_notif="classement",
+            titre=f"Classement disponible : {olympiade.titre}",
+            contenu=f"Le classement de l'olympiade « {olympiade.titre} » est disponible.",
+            objet_id=olympiade.id,
+            objet_type="Olympiade",
+            action_route=f"/olympiades/{olympiade.id}/classement",
+        )
 
         enregistrer_activite(
             user=request.user,
             action="ranking_computed",
-            description=f"Classement calculé pour l'olympiade « {olympiade.titre} » ({inscriptions.count()} participants)",
+            description=f"Classement calculé pour l'olympiade « {olympiade.titre} » ({nb} participants)",
             data={
                 "olympiade": olympiade.titre,
-                "participants": inscriptions.count(),
+                "participants": nb,
             },
             objet_id=olympiade.id,
             objet_type="Olympiade",
@@ -693,8 +859,8 @@ class CalculerClassementView(APIView):
 
         return Response(
             {
-                "detail": f"Classement calculé pour {inscriptions.count()} participants.",
-                "nb": inscriptions.count(),
+                "detail": f"Classement calculé pour {nb} participants.",
+                "nb": nb,
             }
         )
 
@@ -0,0 +1,156 @@
+"""
+Catalogue des cours d'un cursus pour `ApprenantCursusAPIView`, en deux
+parties :
+
+- une liste PARTAGÉE par cohorte (cursus, niveau), pré-rendue et mise en
+  cache : tous les apprenants d'un même cursus et d'un même niveau voient
+  les mêmes cours, les mêmes enseignants, les mêmes compteurs ;
+- une SURCOUCHE par apprenant, calculée à la réponse pour la seule page
+  servie : progression (compteurs `CompteurProgressionCours`, une requête)
+  et accès aux départements restreints (une requête, seulement si la page
+  en contient).
+
+Invalidation : le catalogue d'un cursus porte une version (même mécanisme
+que le corrigé des exercices, apps/evaluation/correction.py), changée à
+chaque écriture sur un `Cours`, un `Departement` ou un `Parcours` de ce
+cursus (apps/formation/signals.py). `CATALOGUE_TTL` couvre le reste (nom ou
+avatar d'un enseignant).
+"""
+
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.formation.models import Cours, Departement, Parcours
+from apps.formation.services import progression_par_cours
+
+CATALOGUE_TTL = 10 * 60
+
+
+def _empreinte(*parties) -> str:
+    """Noms de cursus et de niveau hachés : clés de cache sans espaces ni
+    accents, portables vers tout backend (memcached compris)."""
+    return hashlib.sha1("\x00".join(str(p) for p in parties).encode()).hexdigest()
+
+
+def _cle_version(cursus) -> str:
+    return f"catalogue_cursus_version:{_empreinte(cursus)}"
+
+
+def version_catalogue(cursus) -> str:
+    """Version courante ; une version absente du cache en reçoit une
+    nouvelle, jamais l'ancienne."""
+    cle = _cle_version(cursus)
+    version = cache.get(cle)
+    if version is None:
+        cache.add(cle, uuid.uuid4().hex, None)
+        version = cache.get(cle)
+    return version
+
+
+def invalider_catalogue(cursus_noms) -> None:
+    """Change la version tout de suite ET au commit (une lecture concurrente
+    qui aurait reconstruit depuis l'état pas encore commité ne survit pas)."""
+    cles = [_cle_version(nom) for nom in set(cursus_noms) if nom]
+    if not cles:
+        return
+
+    def changer_versions():
+        cache.set_many({cle: uuid.uuid4().hex for cle in cles}, None)
+
+    changer_versions()
+    transaction.on_commit(changer_versions)
+
+
+def _construire(cursus, niveau):
+    try:
+        parcours = Parcours.objects.get(nom=cursus, type_parcours="cursus")
+    except Parcours.DoesNotExist:
+        return None
+
+    depts = Departement.objects.filter(parcours=parcours, est_actif=True)
+    # Cours du niveau EXACT de l'apprenant (pas inférieur, pas supérieur)
+    cours_qs = (
+        Cours.objects.filter(departement__in=depts, niveau=niveau)
+        .select_related("enseignant_principal__user", "departement")
+        .order_by("id")
+    )
+
+    cours = []
+    restreints = set()
+    for c in cours_qs:
+        ep_nom = "—"
+        ep_avatar = None
+        if c.enseignant_principal:
+            ep = c.enseignant_principal
+            ep_nom = f"{ep.user.first_name} {ep.user.last_name}".strip() or ep.user.username
+            ep_avatar = ep.avatar.url if ep.avatar else None
+        if c.departement.acces_restreint:
+            restreints.add(c.departement_id)
+
+        # Ordre des clés = réponse finale ; `progression`/`est_accessible`
+        # sont remplacés par la surcouche de l'apprenant.
+        cours.append(
+            {
+                "id": c.id,
+                "title": c.titre,
+                "description": c.description_brief or "",
+                "enseignant_principal": ep_nom,
+                "enseignant_principal_avatar_url": ep_avatar,
+                "lessons": c.nb_lecons,
+                "assignments": c.nb_devoirs,
+                "icon": c.icon_name or "school",
+                "color": c.color_code or "#2884A0",
+                "progression": 0.0,
+                "niveau": c.niveau,
+                "departement_id": c.departement_id,
+                "est_accessible": True,
+            }
+        )
+    return {"cours": cours, "departements_restreints": sorted(restreints)}
+
+
+def catalogue_cohorte(cursus, niveau):
+    """Partie partagée du catalogue (cursus, niveau), ou None si le cursus
+    n'existe pas. Les URL d'avatar y sont relatives."""
+    cle = f"catalogue_cursus:{_empreinte(cursus, niveau)}:{version_catalogue(cursus)}"
+    catalogue = cache.get(cle)
+    if catalogue is None:
+        catalogue = _construire(cursus, niveau)
+        cache.set(cle, catalogue or {}, CATALOGUE_TTL)
+    return catalogue or None
+
+
+def appliquer_surcouche(lignes, catalogue, request) -> list:
+    """Complète une page du catalogue partagé pour `request.user` :
+    progression, accès aux départements restreints, URL absolues."""
+    user = request.user
+    progression = progression_par_cours(user, {ligne["id"]: ligne["lessons"] for ligne in lignes})
+
+    restreints = {ligne["departement_id"] for ligne in lignes} & set(
+        catalogue["departements_restreints"]
+    )
+    autorises = set()
+    if restreints:
+        # Même critère que `ApprenantDepartementDetailSerializer.get_est_accessible`.
+        autorises = set(
+            Departement.objects.filter(pk__in=restreints, apprenants_autorises=user).values_list(
+                "id", flat=True
+            )
+        )
+
+    resultat = []
+    for ligne in lignes:
+        ligne = dict(ligne)
+        avatar = ligne["enseignant_principal_avatar_url"]
+        ligne["enseignant_principal_avatar_url"] = (
+            request.build_absolute_uri(avatar) if avatar else None
+        )
+        ligne["progression"] = progression.get(ligne["id"], 0.0)
+        ligne["est_accessible"] = (
+            ligne["departement_id"] not in restreints or ligne["departement_id"] in autorises
+        )
+        resultat.append(ligne)
+    return resultat
@@ -0,0 +1,74 @@
+"""
+Reconstruit `CompteurProgressionCours` depuis `ProgressionLecon` (leçons
+terminées groupées par apprenant et cours), et, avec `--lecons`, resynchronise
+`Cours.nb_lecons` sur le nombre réel de leçons.
+
+Les compteurs sont tenus à jour par signaux (apps/formation/signals.py) ;
+cette commande sert après un import en masse (`bulk_create`/`update()` ne
+déclenchent aucun signal), à la mise en place de la table, ou pour corriger
+une dérive. Idempotente.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from apps.formation.models import CompteurProgressionCours, Cours, Lecon, ProgressionLecon
+
+LOT = 1000
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les compteurs de leçons terminées par (apprenant, cours)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cours_id", type=int, help="Limiter à ce cours.")
+        parser.add_argument(
+            "--lecons",
+            action="store_true",
+            help="Recalculer aussi Cours.nb_lecons depuis les leçons existantes.",
+        )
+
+    def handle(self, *args, **options):
+        cours_id = options["cours_id"]
+        progressions = ProgressionLecon.objects.filter(terminee=True)
+        compteurs = CompteurProgressionCours.objects.all()
+        if cours_id:
+            progressions = progressions.filter(cours_id=cours_id)
+            compteurs = compteurs.filter(cours_id=cours_id)
+
+        lignes = (
+            progressions.values("apprenant_id", "cours_id")
+            .annotate(n=Count("id"))
+            .values_list("apprenant_id", "cours_id", "n")
+        )
+        with transaction.atomic():
+            compteurs.delete()
+            crees = CompteurProgressionCours.objects.bulk_create(
+                (
+                    CompteurProgressionCours(
+                        apprenant_id=apprenant_id, cours_id=c_id, lecons_terminees=n
+                    )
+                    for apprenant_id, c_id, n in lignes.iterator()
+                ),
+                batch_size=LOT,
+            )
+        self.stdout.write(f"{len(crees)} compteur(s) de progression reconstruit(s).")
+
+        if options["lecons"]:
+            cours = Cours.objects.all()
+            if cours_id:
+                cours = cours.filter(pk=cours_id)
+            reels = dict(
+                Lecon.objects.filter(cours__in=cours)
+                .values("cours_id")
+                .annotate(n=Count("id"))
+                .values_list("cours_id", "n")
+            )
+            corriges = []
+            for c in cours.only("id", "nb_lecons"):
+                if c.nb_lecons != reels.get(c.id, 0):
+                    c.nb_lecons = reels.get(c.id, 0)
+                    corriges.append(c)
+            Cours.objects.bulk_update(corriges, ["nb_lecons"], batch_size=LOT)
+            self.stdout.write(f"{len(corriges)} cours avec nb_lecons corrigé.")
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formation", "0005_alter_cours_color_code"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="progressionlecon",
+            index=models.Index(
+                fields=["apprenant", "cours", "terminee"], name="yeki_progre_apprena_c83b5f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remplir_compteurs(apps, schema_editor):
+    """Compteurs initiaux depuis les progressions existantes (même calcul
+    que `manage.py reconstruire_compteurs_progression`)."""
+    ProgressionLecon = apps.get_model("formation", "ProgressionLecon")
+    CompteurProgressionCours = apps.get_model("formation", "CompteurProgressionCours")
+    lignes = (
+        ProgressionLecon.objects.filter(terminee=True)
+        .values("apprenant_id", "cours_id")
+        .annotate(n=Count("id"))
+        .values_list("apprenant_id", "cours_id", "n")
+    )
+    CompteurProgressionCours.objects.bulk_create(
+        [
+            CompteurProgressionCours(apprenant_id=a, cours_id=c, lecons_terminees=n)
+            for a, c, n in lignes
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formation", "0006_index_filtres_chauds"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompteurProgressionCours",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("lecons_terminees", models.PositiveIntegerField(default=0)),
+                (
+                    "apprenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="compteurs_progression",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "cours",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="compteurs_progression",
+                        to="formation.cours",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "yeki_compteur_progression_cours",
+                "unique_together": {("apprenant", "cours")},
+            },
+        ),
+        migrations.RunPython(remplir_compteurs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formation", "0007_compteur_progression_cours"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="departement",
+            name="image_derivees",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Versions réduites (apps/core/images.py)",
+            ),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 
 from apps.accounts.models import Profile
+from apps.core.models import STATUTS_TRANSFERT
 
 
 # --- NIVEAU 1 ---
@@ -89,6 +90,12 @@ class Departement(models.Model):
         blank=True,
         help_text="Image de couverture du département",
     )
+    image_derivees = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Versions réduites (apps/core/images.py)",
+    )
     couleur = models.CharField(
         max_length=7, default="#2884A0", help_text="Couleur principale #RRGGBB"
     )
@@ -577,6 +584,12 @@ class Lecon(models.Model):
     )
 
     video = models.FileField(upload_to="lecons/video/", blank=True, null=True)
+    transfert_statut = models.CharField(
+        max_length=12,
+        choices=STATUTS_TRANSFERT,
+        default="pret",
+        help_text="Écriture de la vidéo et du PDF sur le stockage (apps/core/transferts.py)",
+    )
 
     cours = models.ForeignKey(Cours, on_delete=models.CASCADE, related_name="lecons")
 
@@ -661,11 +674,37 @@ class ProgressionLecon(models.Model):
         db_table = "yeki_progressionlecon"
         unique_together = ("apprenant", "lecon")
         ordering = ["-derniere_vue"]
+        # (apprenant, lecon) est déjà couvert par l'unicité ; les calculs de
+        # complétion filtrent, eux, par (apprenant, cours, terminee).
+        indexes = [models.Index(fields=["apprenant", "cours", "terminee"])]
 
     def __str__(self):
         return f"{self.apprenant.username} → {self.lecon.titre} ({self.pourcentage}%)"
 
 
+class CompteurProgressionCours(models.Model):
+    """
+    Nombre de leçons terminées par (apprenant, cours), tenu à jour à chaque
+    écriture de `ProgressionLecon` (apps/formation/signals.py) : la
+    complétion d'un cours se lit en O(1) (`lecons_terminees /
+    Cours.nb_lecons`) au lieu de compter les progressions. Reconstructible
+    depuis `ProgressionLecon` : `manage.py reconstruire_compteurs_progression`.
+    """
+
+    apprenant = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="compteurs_progression"
+    )
+    cours = models.ForeignKey(Cours, on_delete=models.CASCADE, related_name="compteurs_progression")
+    lecons_terminees = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "yeki_compteur_progression_cours"
+        unique_together = ("apprenant", "cours")
+
+    def __str__(self):
+        return f"{self.apprenant_id} → cours {self.cours_id} : {self.lecons_terminees}"
+
+
 class LeconLike(models.Model):
     """Like d'une leçon par un apprenant"""
 
@@ -1,16 +1,19 @@
+from django.db.models import Sum
 from rest_framework import serializers
 
 from apps.accounts.serializers import EnseignantSerializer, EnseignantCadreLightSerializer
 from apps.accounts.models import Profile
+from apps.core import televersement_direct
+from apps.core.serializers import ImagesDeriveesField
 from apps.core.services import AccesService
 from apps.formation.models import (
+    CompteurProgressionCours,
     Parcours,
     Departement,
     DemandeAccesFormation,
     Cours,
     Module,
     Lecon,
-    ProgressionLecon,
     SupplementCours,
 )
 from apps.formation.services import codes_niveaux_formation_disponibles
@@ -31,11 +34,13 @@ class LeconSerializer(serializers.ModelSerializer):
             "fichier_pdf",
             "video",
             "video_verrouille",
+            "transfert_statut",
             "module",
             "created_by",
             "cours",
             "created_at",
         ]
+        read_only_fields = ["transfert_statut"]
 
     def get_fichier_pdf(self, obj):
         if obj.fichier_pdf:
@@ -74,7 +79,9 @@ class LeconCreateSerializer(serializers.ModelSerializer):
             "fichier_pdf",
             "video",
             "module",
+            "transfert_statut",
         ]
+        read_only_fields = ["transfert_statut"]
 
     def validate_fichier_pdf(self, value):
         if not value.name.endswith(".pdf"):
@@ -228,6 +235,7 @@ class ModuleListSerializer(serializers.ModelSerializer):
 
 class DepartementSerializer(serializers.ModelSerializer):
     cadre = EnseignantCadreLightSerializer(read_only=True)
+    image_derivees = ImagesDeriveesField("image")
     cours = CoursSerializer(many=True, read_only=True)
     niveaux_accessibles = serializers.SerializerMethodField()
     demandes_acces = serializers.SerializerMethodField()
@@ -255,6 +263,7 @@ class DepartementSerializer(serializers.ModelSerializer):
             "niveaux_cibles",
             "description",
             "image",
+            "image_derivees",
             "couleur",
             "est_actif",
             "prix",
@@ -315,7 +324,12 @@ class DepartementSerializer(serializers.ModelSerializer):
         total_possible = sum(c.nb_lecons * c.nb_apprenants for c in cours_qs)
         if total_possible == 0:
             return 0.0
-        total_realise = ProgressionLecon.objects.filter(cours__departement=obj, terminee=True).count()
+        total_realise = (
+            CompteurProgressionCours.objects.filter(cours__departement=obj).aggregate(
+                total=Sum("lecons_terminees")
+            )["total"]
+            or 0
+        )
         return round((total_realise / total_possible) * 100, 1)
 
     def get_label_catalogue(self, obj):
@@ -593,6 +607,7 @@ class DepartementCreateSerializer(serializers.ModelSerializer):
 
 class ApprenantDepartementDetailSerializer(serializers.ModelSerializer):
     est_accessible = serializers.SerializerMethodField()
+    image_derivees = ImagesDeriveesField("image")
     demande_statut = serializers.SerializerMethodField()
     label_catalogue = serializers.SerializerMethodField()
 
@@ -603,6 +618,7 @@ class ApprenantDepartementDetailSerializer(serializers.ModelSerializer):
             "nom",
             "description",
             "image",
+            "image_derivees",
             "couleur",
             "prix",
             "prix_presentiel",
@@ -746,6 +762,47 @@ class ModuleUpdateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class TeleversementLeconSerializer(serializers.Serializer):
+    """Fichier annoncé pour un téléversement direct de la vidéo ou du PDF
+    d'une leçon (apps/core/televersement_direct.py)."""
+
+    champ = serializers.ChoiceField(choices=["video", "fichier_pdf"])
+    nom_fichier = serializers.CharField(max_length=200)
+    taille = serializers.IntegerField(min_value=1)
+    type_contenu = serializers.CharField(max_length=100)
+
+    def validate(self, attrs):
+        regle = televersement_direct.CHAMPS[("formation.Lecon", attrs["champ"])]
+        if attrs["type_contenu"] not in regle["types"]:
+            raise serializers.ValidationError(
+                {"type_contenu": f"Types acceptés : {', '.join(regle['types'])}."}
+            )
+        if attrs["taille"] > regle["taille_max"]:
+            raise serializers.ValidationError(
+                {"taille": f"Taille maximale : {regle['taille_max'] // televersement_direct.MIO} Mo."}
+            )
+        if attrs["champ"] == "fichier_pdf" and not attrs["nom_fichier"].lower().endswith(".pdf"):
+            raise serializers.ValidationError(
+                {"nom_fichier": "Seuls les fichiers PDF sont autorisés."}
+            )
+        return attrs
+
+
+class SessionTeleversementSerializer(serializers.Serializer):
+    """Réponse à l'ouverture d'un téléversement direct : où et comment
+    envoyer le fichier."""
+
+    id = serializers.IntegerField()
+    champ = serializers.CharField()
+    nom_cible = serializers.CharField()
+    taille = serializers.IntegerField()
+    type_contenu = serializers.CharField()
+    expire_le = serializers.DateTimeField()
+    url = serializers.CharField()
+    methode = serializers.CharField()
+    entetes = serializers.DictField(child=serializers.CharField())
+
+
 class LeconUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lecon
@@ -1,6 +1,8 @@
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
 
 from apps.core.models import ParametreSysteme
-from apps.formation.models import Lecon, Cours, ProgressionLecon
+from apps.formation.models import CompteurProgressionCours, Cours, Lecon
 
 # Valeur par défaut si `ParametreSysteme` ne contient pas encore la clé —
 # mêmes 3 niveaux que l'ancien `choices=` figé sur `Departement.
@@ -47,23 +49,59 @@ def niveaux_distincts(departement_id=None):
 
 
 def _progression_cours(user, cours_qs):
-    """Calcule le % de progression par cours pour cet apprenant."""
-    progressions = ProgressionLecon.objects.filter(
-        apprenant=user,
-        cours__in=cours_qs,
-    ).values("cours_id", "terminee")
+    """Calcule le % de progression par cours pour cet apprenant (voir
+    `progression_par_cours`)."""
+    return progression_par_cours(user, {c.id: c.nb_lecons for c in cours_qs})
+
+
+def progression_par_cours(user, nb_lecons_par_cours) -> dict:
+    """
+    `{cours_id: %}` : compteurs `CompteurProgressionCours` (une requête pour
+    tous les cours) rapportés à `Cours.nb_lecons` (`nb_lecons_par_cours`).
+    Les cours dont `nb_lecons` vaut 0 (leçons créées hors des vues)
+    retombent sur un comptage réel des leçons, groupé.
+    """
+    terminees = dict(
+        CompteurProgressionCours.objects.filter(
+            apprenant=user, cours_id__in=list(nb_lecons_par_cours)
+        ).values_list("cours_id", "lecons_terminees")
+    )
+    sans_total = [cours_id for cours_id, total in nb_lecons_par_cours.items() if not total]
+    totaux_reels = {}
+    if sans_total:
+        totaux_reels = dict(
+            Lecon.objects.filter(cours_id__in=sans_total)
+            .values("cours_id")
+            .annotate(n=Count("id"))
+            .values_list("cours_id", "n")
+        )
 
     prog_map = {}
-    for c in cours_qs:
-        total = c.nb_lecons or Lecon.objects.filter(cours=c).count()
+    for cours_id, nb_lecons in nb_lecons_par_cours.items():
+        total = nb_lecons or totaux_reels.get(cours_id, 0)
         if total == 0:
-            prog_map[c.id] = 0.0
+            prog_map[cours_id] = 0.0
             continue
-        terminees = sum(1 for p in progressions if p["cours_id"] == c.id and p["terminee"])
-        prog_map[c.id] = round((terminees / total) * 100, 1)
+        prog_map[cours_id] = round((terminees.get(cours_id, 0) / total) * 100, 1)
     return prog_map
 
 
+def ajuster_compteur_progression(apprenant_id, cours_id, delta) -> None:
+    """Ajoute `delta` (±1) au compteur de leçons terminées, sans lecture
+    préalable (UPDATE atomique, jamais sous zéro)."""
+    if not delta:
+        return
+    lignes = CompteurProgressionCours.objects.filter(apprenant_id=apprenant_id, cours_id=cours_id)
+    if lignes.update(lecons_terminees=Greatest(F("lecons_terminees") + delta, 0)) or delta < 0:
+        return
+    _, cree = CompteurProgressionCours.objects.get_or_create(
+        apprenant_id=apprenant_id, cours_id=cours_id, defaults={"lecons_terminees": delta}
+    )
+    if not cree:
+        # Créé entre-temps par une écriture concurrente.
+        lignes.update(lecons_terminees=F("lecons_terminees") + delta)
+
+
 def _serialise_cours(c, prog_map):
     """Sérialise un Cours au format attendu par Flutter."""
     ep_nom = "—"
@@ -1,22 +1,46 @@
 """
-Signaux Departement (P2.4) + notifications formation (P10.3). Connectés
-depuis FormationConfig.ready().
+Signaux Departement (P2.4) + notifications formation (P10.3) +
+invalidation des dashboards enseignants (apps/formation/tableaux_de_bord.py)
+et du catalogue des cursus (apps/formation/catalogue.py) + compteurs de
+progression par cours (`CompteurProgressionCours`) + versions de contenu
+des cours et départements (ETag, apps/core/versions_contenu.py) +
+versions réduites de `Departement.image` (apps/core/images.py).
+Connectés depuis FormationConfig.ready().
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from apps.accounts.models import Profile
+from apps.core import versions_contenu
+from apps.core.images import deriver_apres_commit
 from apps.formation.models import (
     CHAMPS_PRIX_HISTORISES,
     Cours,
     DemandeAccesFormation,
     Departement,
     HistoriquePrixDepartement,
+    Lecon,
+    Module,
+    Parcours,
+    ProgressionLecon,
 )
+from apps.formation import tableaux_de_bord
+from apps.formation.catalogue import invalider_catalogue
+from apps.formation.services import ajuster_compteur_progression
 from apps.notifications.models import creer_notification
 
 
+# ── Images dérivées (apps/core/images.py) ───────────────────────────────────
+# Connecté avant les invalidations de cache ci-dessous : les réponses
+# recalculées après elles voient déjà `image_derivees` à jour.
+
+
+@receiver(post_save, sender=Departement)
+def _deriver_image(sender, instance, update_fields, **kwargs):
+    deriver_apres_commit(instance, "image", update_fields=update_fields)
+
+
 @receiver(pre_save, sender=Departement)
 def _memoriser_anciens_prix(sender, instance, **kwargs):
     """
@@ -136,3 +160,181 @@ def _notifier_demande_acces_formation(sender, instance, created, **kwargs):
         objet_type="Departement",
         action_route=f"/formations/{instance.departement.id}",
     )
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Compteurs de leçons terminées par (apprenant, cours)
+# ─────────────────────────────────────────────────────────────────────────
+# Toute écriture passe par ici (`MarquerLeconVueView`, admin, suppression
+# en cascade d'une leçon, d'un module ou d'un compte) : le compteur suit
+# les transitions de `terminee`, jamais un recomptage.
+
+
+@receiver(pre_save, sender=ProgressionLecon)
+def _memoriser_ancienne_progression(sender, instance, **kwargs):
+    instance._ancienne_progression = (
+        ProgressionLecon.objects.filter(pk=instance.pk).values("terminee", "cours_id").first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=ProgressionLecon)
+def _compter_progression(sender, instance, **kwargs):
+    ancienne = getattr(instance, "_ancienne_progression", None) or {}
+    etait_terminee = ancienne.get("terminee", False)
+    if etait_terminee == instance.terminee and ancienne.get("cours_id") == instance.cours_id:
+        return
+    if etait_terminee:
+        ajuster_compteur_progression(instance.apprenant_id, ancienne["cours_id"], -1)
+    if instance.terminee:
+        ajuster_compteur_progression(instance.apprenant_id, instance.cours_id, 1)
+
+
+@receiver(post_delete, sender=ProgressionLecon)
+def _decompter_progression(sender, instance, **kwargs):
+    if instance.terminee:
+        ajuster_compteur_progression(instance.apprenant_id, instance.cours_id, -1)
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Invalidation des instantanés de dashboard (cadre / principal)
+# ─────────────────────────────────────────────────────────────────────────
+
+
+# Pas de ProgressionLecon ici : écrite à chaque leçon suivie par chaque
+# apprenant, elle coûterait une requête par écriture pour des taux de
+# complétion que le TTL des instantanés rafraîchit assez vite.
+@receiver(post_save, sender=Lecon)
+@receiver(post_delete, sender=Lecon)
+def _invalider_tableaux_de_bord_lecon(sender, instance, **kwargs):
+    tableaux_de_bord.invalider_cours([instance.cours_id])
+
+
+@receiver(post_save, sender=Cours)
+@receiver(post_delete, sender=Cours)
+def _invalider_tableaux_de_bord_cours(sender, instance, **kwargs):
+    # Depuis l'instance : après suppression, le cours n'est plus en base.
+    tableaux_de_bord.invalider([instance.enseignant_principal_id])
+    tableaux_de_bord.invalider_departements([instance.departement_id])
+
+
+@receiver(post_save, sender=Departement)
+@receiver(post_delete, sender=Departement)
+def _invalider_tableaux_de_bord_departement(sender, instance, **kwargs):
+    tableaux_de_bord.invalider([instance.cadre_id])
+    tableaux_de_bord.invalider_departements([instance.pk])
+
+
+@receiver(post_save, sender=DemandeAccesFormation)
+@receiver(post_delete, sender=DemandeAccesFormation)
+def _invalider_tableaux_de_bord_demande_acces(sender, instance, **kwargs):
+    tableaux_de_bord.invalider_departements([instance.departement_id])
+
+
+@receiver(post_save, sender=Profile)
+def _invalider_tableaux_de_bord_inscription(sender, instance, created, update_fields, **kwargs):
+    """Un apprenant qui rejoint (ou quitte) un cursus change le nombre
+    d'apprenants des départements de ce cursus. L'ancien cursus d'un
+    apprenant qui en change n'est pas relu : le TTL le couvre."""
+    if update_fields is not None and not {"cursus", "is_active", "user_type"} & set(update_fields):
+        return
+    if instance.user_type == "apprenant" or getattr(instance, "_ancien_user_type", None) == (
+        "apprenant"
+    ):
+        tableaux_de_bord.invalider_cursus(instance.cursus)
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Invalidation du catalogue partagé des cursus
+# ─────────────────────────────────────────────────────────────────────────
+
+
+# Un objet déplacé (cours vers un département d'un autre parcours,
+# département vers un autre parcours) ou un parcours renommé quitte aussi
+# l'ancien catalogue : l'ancienne valeur est relue avant l'écriture
+# (`_ancien_departement_id` de Cours, mémorisé plus bas pour les versions
+# de contenu).
+
+
+@receiver(post_save, sender=Cours)
+@receiver(post_delete, sender=Cours)
+def _invalider_catalogue_cours(sender, instance, **kwargs):
+    departements = {instance.departement_id, getattr(instance, "_ancien_departement_id", None)}
+    invalider_catalogue(
+        Parcours.objects.filter(departements__id__in=departements - {None}).values_list(
+            "nom", flat=True
+        )
+    )
+
+
+@receiver(pre_save, sender=Departement)
+def _memoriser_ancien_parcours(sender, instance, **kwargs):
+    instance._ancien_parcours_id = (
+        Departement.objects.filter(pk=instance.pk).values_list("parcours_id", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Departement)
+@receiver(post_delete, sender=Departement)
+def _invalider_catalogue_departement(sender, instance, **kwargs):
+    parcours = {instance.parcours_id, getattr(instance, "_ancien_parcours_id", None)}
+    invalider_catalogue(
+        Parcours.objects.filter(pk__in=parcours - {None}).values_list("nom", flat=True)
+    )
+
+
+@receiver(pre_save, sender=Parcours)
+def _memoriser_ancien_nom_parcours(sender, instance, **kwargs):
+    instance._ancien_nom = (
+        Parcours.objects.filter(pk=instance.pk).values_list("nom", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Parcours)
+@receiver(post_delete, sender=Parcours)
+def _invalider_catalogue_parcours(sender, instance, **kwargs):
+    invalider_catalogue([instance.nom, getattr(instance, "_ancien_nom", None)])
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Versions de contenu (ETag des GET conditionnels)
+# ─────────────────────────────────────────────────────────────────────────
+
+
+@receiver(pre_save, sender=Cours)
+def _memoriser_ancien_departement(sender, instance, **kwargs):
+    instance._ancien_departement_id = (
+        Cours.objects.filter(pk=instance.pk).values_list("departement_id", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Cours)
+@receiver(post_delete, sender=Cours)
+def _incrementer_version_cours(sender, instance, **kwargs):
+    versions_contenu.incrementer(versions_contenu.TYPE_COURS, [instance.pk])
+    # Un cours déplacé change aussi la liste de son ancien département.
+    versions_contenu.incrementer(
+        versions_contenu.TYPE_DEPARTEMENT,
+        [instance.departement_id, getattr(instance, "_ancien_departement_id", None)],
+    )
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=Lecon)
+@receiver(post_delete, sender=Lecon)
+def _incrementer_version_cours_contenu(sender, instance, **kwargs):
+    versions_contenu.incrementer(versions_contenu.TYPE_COURS, [instance.cours_id])
+
+
+@receiver(post_save, sender=Departement)
+@receiver(post_delete, sender=Departement)
+def _incrementer_version_departement(sender, instance, **kwargs):
+    versions_contenu.incrementer(versions_contenu.TYPE_DEPARTEMENT, [instance.pk])
@@ -0,0 +1,544 @@
+"""
+Instantanés des dashboards enseignant cadre (`EnseignantCadreDashboardView`)
+et enseignant principal (`PrincipalDashboardAPIView`).
+
+Le dashboard cadre comptait leçons et progressions cours par cours, les
+apprenants département par département et relisait chaque enseignant
+principal : sa latence croissait avec le nombre de cours. Ici, chaque
+indicateur est calculé pour TOUS les départements du cadre par une requête
+groupée (nombre de requêtes constant), puis l'instantané est mis en cache
+par profil pendant `TABLEAU_DE_BORD_TTL` secondes.
+
+Invalidation (apps/formation/signals.py, apps/evaluation/signals.py) :
+leçon, cours, département, demande d'accès, inscription d'un apprenant à
+un cursus (`Profile.cursus`), devoir et soumission de devoir. Le TTL
+couvre le reste : progression des apprenants (taux de complétion, écrite
+trop souvent pour invalider à chaque leçon suivie), score d'exercices des
+enseignants, nom/avatar, jour qui change pour la tendance des rendus.
+
+Les URL de fichiers sont mises en cache relatives ; la vue les rend
+absolues pour la requête courante (`urls_absolues_cadre`).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.accounts.models import Profile
+from apps.evaluation.models import Devoir, SoumissionDevoir
+from apps.evaluation.services import ClassementService
+from apps.formation.models import (
+    Cours,
+    DemandeAccesFormation,
+    Departement,
+    Lecon,
+)
+from apps.formation.services import _progression_cours
+
+logger = logging.getLogger(__name__)
+
+TABLEAU_DE_BORD_TTL = 120
+
+STATUTS_RENDUS = ("soumis", "corrige", "en_retard")
+
+
+def _cle(profile_id):
+    return f"tableau_de_bord:{profile_id}"
+
+
+def _nom(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+# ── Invalidation ────────────────────────────────────────────────────────
+
+
+def invalider(profile_ids) -> None:
+    """Supprime les instantanés des profils donnés (cadres ou principaux)."""
+    cles = [_cle(pk) for pk in set(profile_ids) if pk]
+    if cles:
+        cache.delete_many(cles)
+
+
+def invalider_departements(departement_ids) -> None:
+    """Cadres de ces départements et principaux de leurs cours."""
+    lignes = Departement.objects.filter(pk__in=departement_ids).values_list(
+        "cadre_id", "cours__enseignant_principal_id"
+    )
+    invalider(pk for ligne in lignes for pk in ligne)
+
+
+def invalider_cours(cours_ids) -> None:
+    """Cadre du département et principal de chacun de ces cours."""
+    lignes = Cours.objects.filter(pk__in=cours_ids).values_list(
+        "departement__cadre_id", "enseignant_principal_id"
+    )
+    invalider(pk for ligne in lignes for pk in ligne)
+
+
+def invalider_cursus(cursus) -> None:
+    """Dashboards qui comptent les apprenants du cursus `cursus`."""
+    if cursus:
+        invalider_departements(
+            Departement.objects.filter(parcours__nom=cursus).values_list("pk", flat=True)
+        )
+
+
+def _mettre_en_cache(profile, calculer):
+    cle = _cle(profile.pk)
+    instantane = cache.get(cle)
+    if instantane is None:
+        instantane = calculer(profile)
+        cache.set(cle, instantane, timeout=TABLEAU_DE_BORD_TTL)
+    return instantane
+
+
+# ── Dashboard cadre ─────────────────────────────────────────────────────
+
+
+def _url(fichier):
+    return fichier.url if fichier else None
+
+
+def urls_absolues_cadre(instantane, request) -> dict:
+    """Rend absolues les URL (relatives en cache) d'un instantané cadre."""
+
+    def absolue(url):
+        return request.build_absolute_uri(url) if url else None
+
+    for dept in instantane["departements"]:
+        dept["image_url"] = absolue(dept["image_url"])
+        for c in dept["cours"]:
+            if c["enseignant_principal"]:
+                c["enseignant_principal"]["photo"] = absolue(c["enseignant_principal"]["photo"])
+    for ep in instantane.get("enseignants_principaux", []):
+        ep["photo"] = absolue(ep["photo"])
+    return instantane
+
+
+def _calculer_cadre(profile) -> dict:
+    departements = list(
+        Departement.objects.filter(cadre=profile, est_actif=True).select_related("parcours")
+    )
+    nom_complet = _nom(profile.user)
+
+    # Si aucun département, retourner une structure vide
+    if not departements:
+        return {
+            "nom": nom_complet,
+            "departements": [],
+            "stats": {
+                "nb_departements": 0,
+                "nb_cours": 0,
+                "nb_apprenants": 0,
+                "nb_enseignants": 0,
+                "taux_moyen": 0,
+            },
+        }
+
+    dept_ids = [d.id for d in departements]
+
+    # Une requête par indicateur, pour tous les départements à la fois.
+    cours_par_dept = {}
+    for c in (
+        Cours.objects.filter(departement_id__in=dept_ids)
+        .select_related("enseignant_principal__user")
+        .order_by("id")
+    ):
+        cours_par_dept.setdefault(c.departement_id, []).append(c)
+
+    # Taux de complétion de l'utilisateur connecté (le cadre), comme
+    # l'ancien `_calculer_taux_completion_cours(cours, request.user)` : lu
+    # dans les compteurs `CompteurProgressionCours`.
+    taux_par_cours = _progression_cours(
+        profile.user, [c for cours in cours_par_dept.values() for c in cours]
+    )
+
+    parcours_noms = {d.parcours.nom if d.parcours else "" for d in departements}
+    apprenants_par_cursus = dict(
+        Profile.objects.filter(user_type="apprenant", cursus__in=parcours_noms, is_active=True)
+        .values("cursus")
+        .annotate(n=Count("id"))
+        .values_list("cursus", "n")
+    )
+
+    demandes_par_dept = {}
+    for d in DemandeAccesFormation.objects.filter(
+        departement_id__in=dept_ids, statut="en_attente"
+    ).select_related("apprenant"):
+        demandes_par_dept.setdefault(d.departement_id, []).append(
+            {
+                "id": d.id,
+                "apprenant_id": d.apprenant.id,
+                "apprenant_nom": _nom(d.apprenant),
+                "apprenant_username": d.apprenant.username,
+                "message": d.message,
+                "cree_le": d.cree_le.isoformat(),
+            }
+        )
+
+    # ── Construire les données pour chaque département ──
+    departements_data = []
+    stats_globales = {
+        "nb_departements": len(departements),
+        "nb_cours": 0,
+        "nb_apprenants": 0,
+        "nb_enseignants": 0,
+        "taux_moyen": 0,
+    }
+
+    # Pour éviter les doublons d'enseignants
+    enseignants_ids = set()
+    enseignants = {}
+    total_taux = 0
+
+    for dept in departements:
+        cours_dept = cours_par_dept.get(dept.id, [])
+
+        cours_data = []
+        total_taux_dept = 0
+        for c in cours_dept:
+            ep_data = None
+            if c.enseignant_principal:
+                ep = c.enseignant_principal
+                ep_data = {
+                    "id": ep.id,
+                    "nom": _nom(ep.user),
+                    "username": ep.user.username,
+                    "photo": _url(ep.avatar),
+                }
+                enseignants_ids.add(ep.id)
+                enseignants[ep.id] = ep
+
+            taux_completion = taux_par_cours[c.id]
+
+            cours_data.append(
+                {
+                    "id": c.id,
+                    "titre": c.titre,
+                    "niveau": c.niveau,
+                    "nb_apprenants": c.nb_apprenants,
+                    "taux_completion": taux_completion,
+                    "color_code": c.color_code,
+                    "icon_name": c.icon_name,
+                    "enseignant_principal": ep_data,
+                    "nb_lecons": c.nb_lecons,
+                    "nb_devoirs": c.nb_devoirs,
+                }
+            )
+
+            stats_globales["nb_cours"] += 1
+            total_taux += taux_completion
+            total_taux_dept += taux_completion
+
+        # Apprenants du parcours (calcul dynamique)
+        parcours_nom = dept.parcours.nom if dept.parcours else ""
+        nb_apprenants = apprenants_par_cursus.get(parcours_nom, 0)
+        stats_globales["nb_apprenants"] += nb_apprenants
+
+        departements_data.append(
+            {
+                "id": dept.id,
+                "nom": dept.nom,
+                "description": getattr(dept, "description", ""),
+                "parcours": parcours_nom,
+                "parcours_id": dept.parcours.id if dept.parcours else None,
+                "couleur": dept.couleur,
+                "prix": dept.prix,
+                "est_actif": dept.est_actif,
+                "type_departement": dept.type_departement,
+                "image_url": _url(dept.image),
+                # Champs spécifiques
+                "est_prepa_concours": dept.est_prepa_concours,
+                "nom_concours": dept.nom_concours,
+                "organisme_concours": dept.organisme_concours,
+                "date_limite_inscription": dept.date_limite_inscription,
+                "date_examen": dept.date_examen,
+                "arrete_ministeriel": dept.arrete_ministeriel,
+                "places_disponibles": dept.places_disponibles,
+                "debouches": dept.debouches,
+                "est_formation_metier": dept.est_formation_metier,
+                "est_formation_classique": dept.est_formation_classique,
+                "duree_formation": dept.duree_formation,
+                "mode": dept.mode,
+                "certificat_delivre": dept.certificat_delivre,
+                "prerequis": dept.prerequis,
+                "objectifs": dept.objectifs,
+                "ville": dept.ville,
+                "domaine": dept.domaine,
+                "est_certifiante": dept.est_certifiante,
+                "niveau_formation": dept.niveau_formation,
+                # Bug corrigé (modification par un cadre) : ces champs
+                # étaient absents de ce dict — `departement_form_sheet.dart`
+                # les initialisait alors à des valeurs par défaut et les
+                # renvoyait quand même à chaque sauvegarde, écrasant
+                # silencieusement les vraies valeurs en base.
+                "acces_restreint": dept.acces_restreint,
+                "niveaux_accessibles": dept.get_niveaux_accessibles_list(),
+                "periode": dept.periode,
+                "prix_presentiel": dept.prix_presentiel,
+                "prix_mensuel": dept.prix_mensuel,
+                "prix_annuel": dept.prix_annuel,
+                "prix_presentiel_mensuel": dept.prix_presentiel_mensuel,
+                "prix_presentiel_annuel": dept.prix_presentiel_annuel,
+                "demandes_acces": demandes_par_dept.get(dept.id, []),
+                # Statistiques
+                "nb_cours": len(cours_dept),
+                "nb_apprenants": nb_apprenants,
+                "taux_moyen": (round(total_taux_dept / len(cours_dept), 1) if cours_dept else 0.0),
+                "cours": cours_data,
+            }
+        )
+
+    # ── Enseignants principaux distincts ──
+    scores = ClassementService.scores_totaux_exercices_enseignants(
+        enseignants_ids, departements=dept_ids
+    )
+    tous_les_cours = [c for cours in cours_par_dept.values() for c in cours]
+    enseignants_data = []
+    for ep_id in enseignants_ids:
+        ep = enseignants[ep_id]
+        cours_ep = [c for c in tous_les_cours if c.enseignant_principal_id == ep_id]
+        enseignants_data.append(
+            {
+                "id": ep.id,
+                "nom": _nom(ep.user),
+                "username": ep.user.username,
+                "email": ep.user.email,
+                "photo": _url(ep.avatar),
+                "nb_cours": len(cours_ep),
+                "nb_apprenants": sum(c.nb_apprenants for c in cours_ep),
+                # Somme brute des points d'exercices (pas de moyenne, P6.1) ;
+                # clé `score_moyen` conservée pour le frontend.
+                "score_moyen": round(scores.get(ep_id) or 0.0, 1),
+            }
+        )
+
+    # Calcul des moyennes globales
+    if stats_globales["nb_cours"] > 0:
+        stats_globales["taux_moyen"] = round(total_taux / stats_globales["nb_cours"], 1)
+    stats_globales["nb_enseignants"] = len(enseignants_data)
+
+    return {
+        "nom": nom_complet,
+        "departements": departements_data,
+        "enseignants_principaux": enseignants_data,
+        "stats": stats_globales,
+    }
+
+
+def instantane_cadre(profile) -> dict:
+    """Dashboard cadre (URL relatives), depuis le cache si possible."""
+    return _mettre_en_cache(profile, _calculer_cadre)
+
+
+# ── Dashboard principal ─────────────────────────────────────────────────
+
+
+def _devoirs_du_cours(c, devoirs, rendus_par_devoir_id, apprenants_par_parcours) -> dict:
+    nb_devoirs_cours = len(devoirs)
+    parcours_nom_cours = (
+        c.departement.parcours.nom if c.departement and c.departement.parcours else ""
+    )
+    apprenants_cours = apprenants_par_parcours.get(parcours_nom_cours, 0)
+
+    total_rendus_cours = sum(len(rendus_par_devoir_id.get(d.id, [])) for d in devoirs)
+    total_attendu_cours = nb_devoirs_cours * apprenants_cours if apprenants_cours > 0 else 1
+    taux_cours = (total_rendus_cours / total_attendu_cours * 100) if total_attendu_cours > 0 else 0
+
+    details_devoirs = []
+    for devoir in devoirs:
+        rendus_devoir = rendus_par_devoir_id.get(devoir.id, [])
+        nb_retards = 0
+        if devoir.date_limite:
+            nb_retards = sum(
+                1 for s in rendus_devoir if s["soumis_le"] and s["soumis_le"] > devoir.date_limite
+            )
+        notes_devoir = [s["note"] for s in rendus_devoir if s["note"] is not None]
+        note_moyenne = (sum(notes_devoir) / len(notes_devoir)) if notes_devoir else 0
+        details_devoirs.append(
+            {
+                "id": devoir.id,
+                "titre": devoir.titre,
+                "date_limite": devoir.date_limite.isoformat() if devoir.date_limite else None,
+                "nb_rendus": len(rendus_devoir),
+                "nb_retards": nb_retards,
+                "taux_rendu": (
+                    (len(rendus_devoir) / apprenants_cours * 100) if apprenants_cours > 0 else 0
+                ),
+                "note_moyenne": round(note_moyenne, 1) if note_moyenne else 0,
+                "type_correction": devoir.type_correction,
+            }
+        )
+
+    return {
+        "cours_id": c.id,
+        "cours_titre": c.titre,
+        "nb_devoirs": nb_devoirs_cours,
+        "taux_rendu": round(taux_cours, 1),
+        "details_devoirs": details_devoirs,
+    }
+
+
+def _calculer_principal(profile) -> dict:
+    nom = _nom(profile.user)
+    cours_list = list(
+        Cours.objects.filter(enseignant_principal=profile).select_related("departement__parcours")
+    )
+    cours_ids = [c.id for c in cours_list]
+
+    # Si pas de cours, retourner des données vides
+    if not cours_ids:
+        return {
+            "nom": nom,
+            "stats": {
+                "nb_cours": 0,
+                "nb_lecons": 0,
+                "nb_devoirs": 0,
+                "nb_apprenants": 0,
+                "taux_rendu_global": 0,
+                "moyenne_globale": 0,
+                "nb_retards": 0,
+            },
+            "devoirs_par_cours": [],
+            "apprenants_risque": [],
+            "tendance_rendus": [],
+        }
+
+    nb_cours = len(cours_ids)
+    nb_lecons = Lecon.objects.filter(cours_id__in=cours_ids).count()
+    devoirs_tous = list(Devoir.objects.filter(cours_lie_id__in=cours_ids).order_by("id"))
+    nb_devoirs = len(devoirs_tous)
+
+    # Apprenants des parcours des cours du principal
+    parcours_noms = list(
+        Departement.objects.filter(cours__in=cours_ids)
+        .values_list("parcours__nom", flat=True)
+        .distinct()
+    )
+    apprenants_list = list(
+        Profile.objects.filter(user_type="apprenant", cursus__in=parcours_noms, is_active=True)
+        .select_related("user")
+        .distinct()
+    )
+    apprenants = len(apprenants_list)
+    apprenants_par_parcours = {}
+    for p in apprenants_list:
+        apprenants_par_parcours[p.cursus] = apprenants_par_parcours.get(p.cursus, 0) + 1
+
+    # Taux de rendu global / moyenne / retards — une requête agrégée.
+    agg = SoumissionDevoir.objects.filter(devoir__cours_lie_id__in=cours_ids).aggregate(
+        total_rendus=Count("id", filter=Q(statut__in=STATUTS_RENDUS)),
+        moyenne_globale=Avg("note", filter=Q(note__isnull=False)),
+        retards=Count("id", filter=Q(soumis_le__gt=F("devoir__date_limite"))),
+    )
+    total_rendus = agg["total_rendus"] or 0
+    moyenne_globale = agg["moyenne_globale"] or 0
+    retards = agg["retards"] or 0
+    total_attendu = nb_devoirs * apprenants if apprenants > 0 else 1
+    taux_rendu = (total_rendus / total_attendu * 100) if total_attendu > 0 else 0
+
+    # Toutes les soumissions du périmètre en UNE requête, regroupées en
+    # Python par apprenant et par devoir.
+    soumissions = list(
+        SoumissionDevoir.objects.filter(devoir__cours_lie_id__in=cours_ids).values(
+            "utilisateur_id", "devoir_id", "statut", "soumis_le", "note"
+        )
+    )
+
+    # ── Apprenants à risque (taux de rendu < 50 %) ───────────────────
+    apprenants_risque = []
+    if nb_devoirs > 0 and apprenants_list:
+        soumissions_par_user = {}
+        for s in soumissions:
+            soumissions_par_user.setdefault(s["utilisateur_id"], []).append(s)
+
+        for p in apprenants_list:
+            soums = soumissions_par_user.get(p.user_id, [])
+            nb_rendus_p = sum(1 for s in soums if s["statut"] in STATUTS_RENDUS)
+            taux = nb_rendus_p / nb_devoirs * 100
+            if taux < 50:
+                notes = [s["note"] for s in soums if s["note"] is not None]
+                moyenne = (sum(notes) / len(notes)) if notes else 0
+                raison = "Taux de rendu faible" if taux < 30 else "Taux de rendu moyen"
+                apprenants_risque.append(
+                    {
+                        "id": p.id,
+                        "nom": p.user.last_name or "",
+                        "prenom": p.user.first_name or "",
+                        "email": p.user.email or "",
+                        "taux_rendu": round(taux, 1),
+                        "moyenne": round(moyenne, 1),
+                        "raison": raison,
+                    }
+                )
+
+    # ── Devoirs par cours ────────────────────────────────────────────
+    devoirs_par_cours_id = {}
+    for d in devoirs_tous:
+        devoirs_par_cours_id.setdefault(d.cours_lie_id, []).append(d)
+    rendus_par_devoir_id = {}
+    for s in soumissions:
+        if s["statut"] in STATUTS_RENDUS:
+            rendus_par_devoir_id.setdefault(s["devoir_id"], []).append(s)
+
+    devoirs_par_cours = []
+    for c in cours_list:
+        try:
+            devoirs_par_cours.append(
+                _devoirs_du_cours(
+                    c,
+                    devoirs_par_cours_id.get(c.id, []),
+                    rendus_par_devoir_id,
+                    apprenants_par_parcours,
+                )
+            )
+        except Exception:
+            # Volontairement large : un cours défectueux ne doit pas faire
+            # tomber tout le dashboard, seulement être ignoré.
+            logger.exception("Erreur traitement cours %s (dashboard principal)", c.id)
+
+    # ── Tendance des rendus (7 derniers jours), une requête groupée ──
+    # TruncDate (comme `soumis_le__date`) tronque dans le fuseau courant :
+    # une soumission entre 23h et minuit heure locale tombe le bon jour.
+    aujourd_hui = timezone.localtime(timezone.now()).date()
+    jours = [aujourd_hui - timedelta(days=i) for i in range(6, -1, -1)]
+    rendus_par_jour = dict(
+        SoumissionDevoir.objects.filter(
+            devoir__cours_lie_id__in=cours_ids,
+            soumis_le__date__gte=jours[0],
+            statut__in=STATUTS_RENDUS,
+        )
+        .annotate(jour=TruncDate("soumis_le"))
+        .values("jour")
+        .annotate(n=Count("id"))
+        .values_list("jour", "n")
+    )
+    tendance_rendus = [
+        {"date": jour.isoformat(), "nb_rendus": rendus_par_jour.get(jour, 0)} for jour in jours
+    ]
+
+    return {
+        "nom": nom,
+        "stats": {
+            "nb_cours": nb_cours,
+            "nb_lecons": nb_lecons,
+            "nb_devoirs": nb_devoirs,
+            "nb_apprenants": apprenants,
+            "taux_rendu_global": round(taux_rendu, 1),
+            "moyenne_globale": round(moyenne_globale, 1) if moyenne_globale else 0,
+            "nb_retards": retards,
+        },
+        "devoirs_par_cours": devoirs_par_cours,
+        "apprenants_risque": apprenants_risque,
+        "tendance_rendus": tendance_rendus,
+    }
+
+
+def instantane_principal(profile) -> dict:
+    """Dashboard enseignant principal, depuis le cache si possible."""
+    return _mettre_en_cache(profile, _calculer_principal)
@@ -0,0 +1,117 @@
+"""
+Catalogue des cours d'un cursus (`ApprenantCursusAPIView`) : la liste de la
+cohorte (cursus, niveau) est construite une fois et partagée, seules la
+progression et l'accès aux départements restreints sont calculés par
+apprenant ; toute écriture sur un cours du cursus invalide la liste, y
+compris un déplacement vers un autre cursus ou un renommage.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.formation.models import Cours, Departement, Lecon, Parcours, ProgressionLecon
+
+
+@pytest.fixture
+def cohorte(user_apprenant, user_apprenant_premium, parcours):
+    for user in (user_apprenant, user_apprenant_premium):
+        user.profile.cursus = parcours.nom
+        user.profile.save(update_fields=["cursus"])
+    return user_apprenant, user_apprenant_premium
+
+
+def _resultats(client):
+    response = client.get(reverse("apprenant-cursus"))
+    assert response.status_code == 200
+    return {ligne["id"]: ligne for ligne in response.json()["results"]}
+
+
+@pytest.mark.django_db
+def test_liste_partagee_surcouche_par_apprenant(
+    client_apprenant, client_apprenant_premium, cohorte, cours
+):
+    user_apprenant, _ = cohorte
+    lecon, _ = (Lecon.objects.create(titre=f"L{i}", cours=cours, description="") for i in range(2))
+    ProgressionLecon.objects.create(
+        apprenant=user_apprenant, lecon=lecon, cours=cours, terminee=True
+    )
+
+    with CaptureQueriesContext(connection) as premiere:
+        moi = _resultats(client_apprenant)
+    with CaptureQueriesContext(connection) as seconde:
+        autre = _resultats(client_apprenant_premium)
+
+    assert len(seconde) < len(premiere)
+    assert moi[cours.id]["progression"] == 50.0
+    assert autre[cours.id]["progression"] == 0.0
+    assert moi[cours.id]["title"] == autre[cours.id]["title"] == "Cours Test"
+
+
+@pytest.mark.django_db
+def test_acces_restreint_calcule_par_apprenant(
+    client_apprenant, client_apprenant_premium, cohorte, parcours, cours
+):
+    _, user_premium = cohorte
+    restreint = Departement.objects.create(nom="Restreint", parcours=parcours, acces_restreint=True)
+    restreint.apprenants_autorises.add(user_premium)
+    ferme = Cours.objects.create(titre="Fermé", niveau="Terminale", departement=restreint)
+
+    moi = _resultats(client_apprenant)
+    autre = _resultats(client_apprenant_premium)
+
+    assert moi[cours.id]["est_accessible"] is True
+    assert moi[ferme.id]["est_accessible"] is False
+    assert autre[ferme.id]["est_accessible"] is True
+
+
+@pytest.mark.django_db
+def test_ecriture_sur_un_cours_invalide_le_catalogue(client_apprenant, cohorte, departement, cours):
+    assert list(_resultats(client_apprenant)) == [cours.id]
+
+    nouveau = Cours.objects.create(titre="Nouveau", niveau="Terminale", departement=departement)
+    cours.titre = "Renommé"
+    cours.save(update_fields=["titre"])
+
+    resultats = _resultats(client_apprenant)
+    assert list(resultats) == [cours.id, nouveau.id]
+    assert resultats[cours.id]["title"] == "Renommé"
+
+
+@pytest.mark.django_db
+def test_departement_desactive_retire_ses_cours(client_apprenant, cohorte, departement, cours):
+    assert cours.id in _resultats(client_apprenant)
+
+    departement.est_actif = False
+    departement.save(update_fields=["est_actif"])
+
+    assert _resultats(client_apprenant) == {}
+
+
+@pytest.mark.django_db
+def test_deplacements_et_renommage_invalident_l_ancien_cursus(
+    client_apprenant, cohorte, parcours, departement, cours
+):
+    autre_cursus = Parcours.objects.create(nom="Autre Cursus", type_parcours="cursus")
+    ailleurs = Departement.objects.create(nom="Ailleurs", parcours=autre_cursus)
+    second = Cours.objects.create(titre="Second", niveau="Terminale", departement=departement)
+    assert list(_resultats(client_apprenant)) == [cours.id, second.id]
+
+    # Cours déplacé vers un département d'un autre cursus.
+    cours.departement = ailleurs
+    cours.save(update_fields=["departement"])
+    assert list(_resultats(client_apprenant)) == [second.id]
+
+    # Département entier déplacé vers un autre cursus.
+    departement.parcours = autre_cursus
+    departement.save(update_fields=["parcours"])
+    assert _resultats(client_apprenant) == {}
+
+    # Renommage : l'ancien nom (cursus des apprenants) ne liste plus rien.
+    departement.parcours = parcours
+    departement.save(update_fields=["parcours"])
+    assert list(_resultats(client_apprenant)) == [second.id]
+    parcours.nom = "Cursus Renommé"
+    parcours.save(update_fields=["nom"])
+    assert _resultats(client_apprenant) == {}
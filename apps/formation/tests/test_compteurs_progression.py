@@ -0,0 +1,94 @@
+"""
+Compteurs de leçons terminées par (apprenant, cours) : tenus à jour par
+`MarquerLeconVueView` et la suppression de leçons, lus par
+`_progression_cours` sans compter les progressions, reconstructibles par
+`manage.py reconstruire_compteurs_progression`.
+"""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.formation.models import CompteurProgressionCours, Cours, Lecon, ProgressionLecon
+from apps.formation.services import _progression_cours
+
+
+@pytest.fixture
+def lecons(cours):
+    cours.nb_lecons = 4
+    cours.save(update_fields=["nb_lecons"])
+    return [Lecon.objects.create(titre=f"L{i}", cours=cours, description="") for i in range(4)]
+
+
+def _terminees(user, cours):
+    compteur = CompteurProgressionCours.objects.filter(apprenant=user, cours=cours).first()
+    return compteur.lecons_terminees if compteur else 0
+
+
+def _marquer(client, lecon, pourcentage):
+    response = client.post(
+        reverse("marquer-lecon"), {"lecon_id": lecon.id, "pourcentage": pourcentage}, format="json"
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_marquer_lecon_suit_les_transitions(client_apprenant, user_apprenant, cours, lecons):
+    _marquer(client_apprenant, lecons[0], 95)
+    _marquer(client_apprenant, lecons[0], 100)  # déjà terminée : pas de double compte
+    _marquer(client_apprenant, lecons[1], 40)
+    assert _terminees(user_apprenant, cours) == 1
+
+    _marquer(client_apprenant, lecons[1], 90)
+    assert _progression_cours(user_apprenant, [cours]) == {cours.id: 50.0}
+
+    _marquer(client_apprenant, lecons[0], 10)  # retour en arrière
+    assert _terminees(user_apprenant, cours) == 1
+
+
+@pytest.mark.django_db
+def test_suppression_de_lecon_decompte(client_apprenant, user_apprenant, cours, lecons):
+    _marquer(client_apprenant, lecons[0], 100)
+    _marquer(client_apprenant, lecons[1], 100)
+
+    lecons[0].delete()
+
+    assert _terminees(user_apprenant, cours) == 1
+
+
+@pytest.mark.django_db
+def test_lecture_en_une_requete(user_apprenant, departement, lecons, cours):
+    autres = [
+        Cours.objects.create(
+            titre=f"C{i}", niveau="Terminale", departement=departement, nb_lecons=2
+        )
+        for i in range(5)
+    ]
+    ProgressionLecon.objects.create(
+        apprenant=user_apprenant, lecon=lecons[0], cours=cours, terminee=True
+    )
+
+    with CaptureQueriesContext(connection) as requetes:
+        progression = _progression_cours(user_apprenant, [cours, *autres])
+
+    assert len(requetes) == 1
+    assert progression[cours.id] == 25.0
+    assert progression[autres[0].id] == 0.0
+
+
+@pytest.mark.django_db
+def test_reconstruction(user_apprenant, cours, lecons):
+    for lecon in lecons[:3]:
+        ProgressionLecon.objects.create(
+            apprenant=user_apprenant, lecon=lecon, cours=cours, terminee=True
+        )
+    CompteurProgressionCours.objects.filter(cours=cours).update(lecons_terminees=9)
+    Cours.objects.filter(pk=cours.pk).update(nb_lecons=1)
+
+    call_command("reconstruire_compteurs_progression", "--lecons", stdout=None)
+
+    assert _terminees(user_apprenant, cours) == 3
+    cours.refresh_from_db()
+    assert cours.nb_lecons == 4
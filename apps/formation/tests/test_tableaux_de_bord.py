@@ -0,0 +1,120 @@
+"""
+Instantanés des dashboards cadre/principal (apps/formation/tableaux_de_bord.py) :
+requêtes groupées (nombre constant quel que soit le nombre de cours), cache
+par profil, progression rafraîchie par le TTL, invalidation par inscription
+à un cursus.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import Profile
+from apps.formation import tableaux_de_bord
+from apps.formation.models import Cours, Departement, Lecon, ProgressionLecon
+
+
+def _creer_utilisateur(username, user_type):
+    user = User.objects.create_user(username=username)
+    Profile.objects.create(user=user, user_type=user_type, is_active=True)
+    return user
+
+
+def _cours_avec_lecons(departement, principal, titre, nb_lecons=2):
+    cours = Cours.objects.create(
+        titre=titre,
+        niveau="Terminale",
+        departement=departement,
+        enseignant_principal=principal.profile,
+    )
+    lecons = [
+        Lecon.objects.create(cours=cours, titre=f"{titre} L{i}") for i in range(1, nb_lecons + 1)
+    ]
+    return cours, lecons
+
+
+def _dashboard_cadre(client):
+    with CaptureQueriesContext(connection) as requetes:
+        response = client.get(reverse("enseignant-cadre-dashboard"))
+    assert response.status_code == 200
+    return len(requetes), response.json()
+
+
+@pytest.mark.django_db
+def test_dashboard_cadre_requetes_constantes(
+    client_enseignant_cadre, user_enseignant_cadre, parcours
+):
+    cadre = user_enseignant_cadre.profile
+    dept = Departement.objects.create(nom="D1", parcours=parcours, cadre=cadre)
+    principal = _creer_utilisateur("principal_1", "enseignant_principal")
+    cours, lecons = _cours_avec_lecons(dept, principal, "C1")
+    ProgressionLecon.objects.create(
+        apprenant=user_enseignant_cadre, lecon=lecons[0], cours=cours, terminee=True
+    )
+    petit, _ = _dashboard_cadre(client_enseignant_cadre)
+
+    autre = Departement.objects.create(nom="D2", parcours=parcours, cadre=cadre)
+    for i in range(4):
+        enseignant = _creer_utilisateur(f"principal_{i + 2}", "enseignant_principal")
+        _cours_avec_lecons(autre, enseignant, f"C{i + 2}", nb_lecons=3)
+    cache.clear()
+    grand, data = _dashboard_cadre(client_enseignant_cadre)
+
+    assert grand == petit
+    assert data["stats"]["nb_departements"] == 2
+    assert data["stats"]["nb_cours"] == 5
+    assert data["stats"]["nb_enseignants"] == 5
+    d1 = next(d for d in data["departements"] if d["nom"] == "D1")
+    assert d1["cours"][0]["taux_completion"] == 50.0
+    assert d1["taux_moyen"] == 50.0
+    assert data["stats"]["taux_moyen"] == 10.0
+
+
+@pytest.mark.django_db
+def test_dashboard_cadre_en_cache_progression_au_ttl(
+    client_enseignant_cadre, user_enseignant_cadre, parcours
+):
+    dept = Departement.objects.create(
+        nom="D1", parcours=parcours, cadre=user_enseignant_cadre.profile
+    )
+    principal = _creer_utilisateur("principal_1", "enseignant_principal")
+    cours, lecons = _cours_avec_lecons(dept, principal, "C1")
+    premier, _ = _dashboard_cadre(client_enseignant_cadre)
+
+    en_cache, data = _dashboard_cadre(client_enseignant_cadre)
+    assert en_cache < premier
+    assert data["departements"][0]["cours"][0]["taux_completion"] == 0.0
+
+    # Une progression n'invalide pas (ni requête, ni instantané perdu) :
+    # le taux suit à l'expiration de l'instantané.
+    with CaptureQueriesContext(connection) as requetes:
+        ProgressionLecon.objects.create(
+            apprenant=user_enseignant_cadre, lecon=lecons[1], cours=cours, terminee=True
+        )
+    assert not any("formation_cours" in q["sql"] for q in requetes.captured_queries)
+    _, data = _dashboard_cadre(client_enseignant_cadre)
+    assert data["departements"][0]["cours"][0]["taux_completion"] == 0.0
+
+    cache.delete(tableaux_de_bord._cle(user_enseignant_cadre.profile.pk))
+    _, data = _dashboard_cadre(client_enseignant_cadre)
+    assert data["departements"][0]["cours"][0]["taux_completion"] == 50.0
+
+
+@pytest.mark.django_db
+def test_dashboard_principal_invalide_par_inscription_au_cursus(
+    client_enseignant_principal, user_enseignant_principal, departement
+):
+    _cours_avec_lecons(departement, user_enseignant_principal, "C1")
+    url = reverse("principal-dashboard-stats")
+    assert client_enseignant_principal.get(url).json()["stats"]["nb_apprenants"] == 0
+
+    apprenant = _creer_utilisateur("nouvel_apprenant", "apprenant").profile
+    apprenant.cursus = departement.parcours.nom
+    apprenant.save(update_fields=["cursus"])
+
+    data = client_enseignant_principal.get(url).json()
+    assert data["stats"]["nb_apprenants"] == 1
+    assert len(data["tendance_rendus"]) == 7
@@ -32,6 +32,9 @@ from apps.formation.views import (
     LeconUpdateView,
     LeconDeleteView,
     LeconLikeView,
+    LeconMediaView,
+    OuvrirTeleversementLeconView,
+    FinaliserTeleversementLeconView,
     ModuleCreateView,
     ModuleListByCoursView,
     ModuleUpdateView,
@@ -156,6 +159,17 @@ urlpatterns = [
     path("lecons/<int:lecon_id>/modifier/", LeconUpdateView.as_view(), name="lecon-modifier"),
     path("lecons/<int:lecon_id>/supprimer/", LeconDeleteView.as_view(), name="lecon-supprimer"),
     path("apprenant/lecon/<int:lecon_id>/like/", LeconLikeView.as_view(), name="lecon-like"),
+    path("lecons/<int:lecon_id>/medias/<str:champ>/", LeconMediaView.as_view(), name="lecon-media"),
+    path(
+        "lecons/<int:lecon_id>/televersements/",
+        OuvrirTeleversementLeconView.as_view(),
+        name="lecon-televersement-ouvrir",
+    ),
+    path(
+        "lecons/televersements/<int:session_id>/finaliser/",
+        FinaliserTeleversementLeconView.as_view(),
+        name="lecon-televersement-finaliser",
+    ),
     # ── MODULES ───────────────────────────────────────────────────
     path("cours/<int:cours_id>/modules/", ModuleCreateView.as_view(), name="module-create"),
     path(
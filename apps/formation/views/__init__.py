@@ -19,6 +19,7 @@ from apps.formation.views.cours import (  # noqa: F401
     LeconUpdateView,
     LeconDeleteView,
     LeconLikeView,
+    LeconMediaView,
     ChangerEnseignantPrincipalView,
     ModifierCoursParCadreView,
     CoursParDepartementView,
@@ -62,3 +63,7 @@ from apps.formation.views.supplements import (  # noqa: F401
     CreerSupplementCoursView,
     SupprimerSupplementCoursView,
 )
+from apps.formation.views.televersements import (  # noqa: F401
+    OuvrirTeleversementLeconView,
+    FinaliserTeleversementLeconView,
+)
@@ -14,17 +14,21 @@ from drf_spectacular.types import OpenApiTypes
 
 from apps.accounts.models import Profile
 from apps.accounts.services import _get_profile
+from apps.core import diffusion_medias, transferts, versions_contenu
+from apps.core.cache_reponses import reponse_en_cache
 from apps.core.models import enregistrer_activite
 from apps.core.pagination import PaginatedListMixin, YekiPageNumberPagination
+from apps.core.serializers import UrlMediaSigneeSerializer
+from apps.core.services import AccesService
 from apps.core.schema_examples import (
     ERREURS_COURANTES,
     ERREURS_ECRITURE,
     EXEMPLE_NOT_FOUND,
     EXEMPLE_PAGINATION,
+    PARAMS_GET_CONDITIONNEL,
     PARAMS_PAGINATION,
 )
 from apps.formation.models import (
-    Parcours,
     Departement,
     Cours,
     Module,
@@ -43,7 +47,8 @@ from apps.formation.serializers import (
     LeconUpdateSerializer,
     LeconSerializer,
 )
-from apps.formation.services import _progression_cours, niveaux_distincts, niveaux_formation_disponibles
+from apps.formation.catalogue import appliquer_surcouche, catalogue_cohorte
+from apps.formation.services import niveaux_distincts, niveaux_formation_disponibles
 
 
 @extend_schema_view(
@@ -67,6 +72,7 @@ class ListeNiveauxView(APIView):
 
     permission_classes = [IsAuthenticated]
 
+    @reponse_en_cache("niveaux")
     def get(self, request):
         return Response(niveaux_distincts())
 
@@ -92,6 +98,7 @@ class ListeNiveauxFormationView(APIView):
 
     permission_classes = [IsAuthenticated]
 
+    @reponse_en_cache("niveaux_formation")
     def get(self, request):
         return Response(niveaux_formation_disponibles())
 
@@ -121,6 +128,7 @@ class PaletteCouleursCoursView(APIView):
 
     permission_classes = [IsAuthenticated]
 
+    @reponse_en_cache("palette_couleurs")
     def get(self, request):
         return Response(COURSE_COLOR_PALETTE)
 
@@ -265,73 +273,15 @@ class ApprenantCursusAPIView(PaginatedListMixin, APIView):
         if not profile.cursus:
             return self.get_paginated_response(self.paginate_queryset([]))
 
-        # Récupérer le parcours du cursus
-        try:
-            parcours = Parcours.objects.get(nom=profile.cursus, type_parcours="cursus")
-        except Parcours.DoesNotExist:
+        # Partie partagée par la cohorte (cursus, niveau exact de
+        # l'apprenant), en cache ; surcouche propre à l'apprenant
+        # (progression, accès) calculée pour la seule page servie.
+        catalogue = catalogue_cohorte(profile.cursus, profile.niveau or "")
+        if catalogue is None:
             return self.get_paginated_response(self.paginate_queryset([]))
 
-        # Utiliser le niveau enregistré dans le profil
-        niveau_apprenant = profile.niveau or ""
-
-        # Récupérer les départements du cursus
-        depts = Departement.objects.filter(parcours=parcours, est_actif=True)
-
-        # Récupérer les cours du niveau EXACT de l'apprenant (pas inférieur, pas supérieur)
-        cours_qs = Cours.objects.filter(
-            departement__in=depts, niveau=niveau_apprenant  # ← Filtre exact sur le niveau
-        ).select_related("enseignant_principal__user", "departement")
-
-        page = self.paginate_queryset(cours_qs)
-
-        # Calculer les progressions (uniquement pour la page retournée)
-        prog_map = _progression_cours(request.user, page)
-
-        # Accès réel par département — même critère que
-        # `ApprenantDepartementDetailSerializer.get_est_accessible`
-        # (jamais réellement exposé par aucune vue routée jusqu'ici,
-        # confirmé par exploration — corrigé ici pour le Cursus). Un
-        # département cursus non restreint (`acces_restreint=False`,
-        # le cas de tous les départements observés jusqu'ici, rien
-        # n'empêche un admin d'activer ce champ un jour) reste toujours
-        # accessible. Un seul appel groupé, pas une requête par cours.
-        depts_restreints_autorises = set(
-            depts.filter(acces_restreint=True, apprenants_autorises=request.user).values_list(
-                "id", flat=True
-            )
-        )
-
-        def _est_accessible(departement):
-            return (not departement.acces_restreint) or (departement.id in depts_restreints_autorises)
-
-        result = []
-        for c in page:
-            ep_nom = "—"
-            ep_avatar_url = None
-            if c.enseignant_principal:
-                ep = c.enseignant_principal
-                ep_nom = f"{ep.user.first_name} {ep.user.last_name}".strip() or ep.user.username
-                if ep.avatar:
-                    ep_avatar_url = request.build_absolute_uri(ep.avatar.url)
-
-            result.append(
-                {
-                    "id": c.id,
-                    "title": c.titre,
-                    "description": c.description_brief or "",
-                    "enseignant_principal": ep_nom,
-                    "enseignant_principal_avatar_url": ep_avatar_url,
-                    "lessons": c.nb_lecons,
-                    "assignments": c.nb_devoirs,
-                    "icon": c.icon_name or "school",
-                    "color": c.color_code or "#2884A0",
-                    "progression": prog_map.get(c.id, 0.0),
-                    "niveau": c.niveau,
-                    "departement_id": c.departement_id,
-                    "est_accessible": _est_accessible(c.departement),
-                }
-            )
-
+        page = self.paginate_queryset(catalogue["cours"])
+        result = appliquer_surcouche(page, catalogue, request)
         return self.get_paginated_response(result)
 
 
@@ -479,7 +429,7 @@ class CoursUpdateView(generics.RetrieveAPIView, generics.UpdateAPIView):
             "avec leurs leçons imbriquées."
         ),
         tags=["formation"],
-        parameters=[*PARAMS_PAGINATION],
+        parameters=[*PARAMS_PAGINATION, *PARAMS_GET_CONDITIONNEL],
         responses={200: ModuleAvecLeconsSerializer(many=True)},
         examples=[EXEMPLE_PAGINATION, *ERREURS_COURANTES],
     ),
@@ -488,13 +438,30 @@ class ModuleListByCoursView(PaginatedListMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, cours_id):
-        cours = get_object_or_404(Cours, id=cours_id)
+        cours = get_object_or_404(
+            versions_contenu.annoter_version(
+                Cours.objects.select_related("departement"), versions_contenu.TYPE_COURS
+            ),
+            id=cours_id,
+        )
+        # Variante : la vidéo des leçons est masquée au même public que les
+        # exercices au-delà de la vitrine (apprenant non Premium).
+        etag = versions_contenu.etag(
+            request,
+            cours.version_contenu,
+            AccesService.etoiles_max_visibles(request.user, cours.departement),
+        )
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
 
         modules = Module.objects.filter(cours=cours).prefetch_related("lecons").order_by("ordre")
 
         page = self.paginate_queryset(modules)
         serializer = ModuleAvecLeconsSerializer(page, many=True, context={"request": request})
-        return self.get_paginated_response(serializer.data)
+        return versions_contenu.avec_etag(
+            self.get_paginated_response(serializer.data), request, etag
+        )
 
 
 @extend_schema_view(
@@ -506,6 +473,7 @@ class ModuleListByCoursView(PaginatedListMixin, APIView):
             "connexion."
         ),
         tags=["formation"],
+        parameters=PARAMS_GET_CONDITIONNEL,
         responses={200: OpenApiTypes.OBJECT},
         examples=[EXEMPLE_NOT_FOUND],
     ),
@@ -515,8 +483,17 @@ class DepartementNiveauxAPIView(APIView):
     # (lib/views/auth/register_page.dart → _fetchNiveaux).
     permission_classes = [AllowAny]
 
+    @reponse_en_cache("departement_niveaux")
     def get(self, request, departement_id):
-        return Response(niveaux_distincts(departement_id))
+        etag = versions_contenu.etag(
+            request, versions_contenu.version(versions_contenu.TYPE_DEPARTEMENT, departement_id)
+        )
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
+        return versions_contenu.avec_etag(
+            Response(niveaux_distincts(departement_id)), request, etag
+        )
 
 
 @extend_schema(
@@ -535,11 +512,17 @@ class DepartementNiveauxAPIView(APIView):
     parameters=[
         *PARAMS_PAGINATION,
         OpenApiParameter(
-            "departement_id", OpenApiTypes.INT, OpenApiParameter.QUERY, required=False,
+            "departement_id",
+            OpenApiTypes.INT,
+            OpenApiParameter.QUERY,
+            required=False,
             description="Filtre optionnel par département.",
         ),
         OpenApiParameter(
-            "niveau", OpenApiTypes.STR, OpenApiParameter.QUERY, required=False,
+            "niveau",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            required=False,
             description="Filtre optionnel par niveau.",
         ),
     ],
@@ -604,8 +587,10 @@ class AjouterLeconView(APIView):
 
         serializer = LeconCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        fichiers = transferts.extraire(serializer.validated_data, ["fichier_pdf", "video"])
         serializer.save(cours=cours, created_by=request.user.profile)
         lecon = serializer.instance
+        transferts.differer(lecon, fichiers)
         enregistrer_activite(
             user=request.user,
             action="lesson_created",
@@ -936,7 +921,9 @@ class LeconUpdateView(APIView):
 
         serializer = LeconUpdateSerializer(lecon, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
+        fichiers = transferts.extraire(serializer.validated_data, ["fichier_pdf", "video"])
         updated = serializer.save()
+        transferts.differer(updated, fichiers)
         return Response(
             LeconSerializer(updated, context={"request": request}).data,
             status=status.HTTP_200_OK,
@@ -1279,7 +1266,7 @@ class ModifierCoursParCadreView(APIView):
             "taux_completion, color_code, icon_name."
         ),
         tags=["formation"],
-        parameters=[*PARAMS_PAGINATION],
+        parameters=[*PARAMS_PAGINATION, *PARAMS_GET_CONDITIONNEL],
         responses={200: OpenApiTypes.OBJECT},
         examples=[EXEMPLE_PAGINATION, *ERREURS_COURANTES],
     ),
@@ -1288,7 +1275,17 @@ class CoursParDepartementView(PaginatedListMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, departement_id):
-        departement = get_object_or_404(Departement, pk=departement_id)
+        departement = get_object_or_404(
+            versions_contenu.annoter_version(
+                Departement.objects.all(), versions_contenu.TYPE_DEPARTEMENT
+            ),
+            pk=departement_id,
+        )
+        etag = versions_contenu.etag(request, departement.version_contenu)
+        non_modifiee = versions_contenu.reponse_non_modifiee(request, etag)
+        if non_modifiee is not None:
+            return non_modifiee
+
         cours_qs = Cours.objects.filter(departement=departement).select_related(
             "enseignant_principal__user"
         )
@@ -1305,4 +1302,45 @@ class CoursParDepartementView(PaginatedListMixin, APIView):
             }
             for c in page
         ]
-        return self.get_paginated_response(data)
+        return versions_contenu.avec_etag(self.get_paginated_response(data), request, etag)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Obtenir l'URL de lecture de la vidéo ou du PDF d'une leçon",
+        description=(
+            "Vérifie l'accès (vidéo : abonnés Premium du département, comme "
+            "`video`/`video_verrouille` ; PDF : tout utilisateur connecté) et "
+            "retourne une URL signée, valable `expire_le`, à donner au lecteur. "
+            "Elle gère `Range` (déplacement dans la vidéo sans tout "
+            "retélécharger) et l'ETag. Après expiration (403), redemander une URL."
+        ),
+        tags=["formation"],
+        responses={200: UrlMediaSigneeSerializer},
+        examples=[*ERREURS_COURANTES],
+    ),
+)
+class LeconMediaView(APIView):
+    """
+    GET /api/lecons/<lecon_id>/medias/<champ>/   (champ : video | fichier_pdf)
+    Contrôle d'accès une fois par session de lecture, puis URL signée
+    (apps/core/diffusion_medias.py).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, lecon_id, champ):
+        if champ not in ("video", "fichier_pdf"):
+            return Response({"detail": "Média inconnu."}, status=status.HTTP_404_NOT_FOUND)
+        lecon = get_object_or_404(Lecon.objects.select_related("cours__departement"), pk=lecon_id)
+        if champ == "video" and not AccesService.peut_voir_video_lecon(request.user, lecon):
+            return Response(
+                {"detail": "La vidéo est réservée aux abonnés Premium."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if not getattr(lecon, champ):
+            return Response(
+                {"detail": "Cette leçon n'a pas ce média."}, status=status.HTTP_404_NOT_FOUND
+            )
+        url, expire_le = diffusion_medias.url_signee(request, lecon, champ)
+        return Response(UrlMediaSigneeSerializer({"url": url, "expire_le": expire_le}).data)
@@ -1,9 +1,6 @@
 import logging
 
-from django.db.models import Avg, Count, F, Q
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
-from datetime import timedelta
 
 from rest_framework import status
 from rest_framework.views import APIView
@@ -17,8 +14,12 @@ from drf_spectacular.types import OpenApiTypes
 from apps.accounts.models import Profile
 from apps.core.schema_examples import ERREURS_COURANTES
 from apps.evaluation.models import Devoir, SoumissionDevoir
-from apps.evaluation.services import ClassementService
-from apps.formation.models import Departement, Cours, Lecon, ProgressionLecon, DemandeAccesFormation
+from apps.formation.models import Departement, Cours, Lecon
+from apps.formation.tableaux_de_bord import (
+    instantane_cadre,
+    instantane_principal,
+    urls_absolues_cadre,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -61,248 +62,12 @@ class EnseignantCadreDashboardView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # ✅ Récupérer TOUS les départements du cadre
-        departements = (
-            Departement.objects.filter(cadre=profile, est_actif=True)
-            .select_related("parcours")
-            .prefetch_related("cours__enseignant_principal__user", "cours__enseignants__user")
-        )
-
-        nom_complet = (
-            f"{profile.user.first_name} {profile.user.last_name}".strip() or profile.user.username
-        )
-
-        # Si aucun département, retourner une structure vide
-        if not departements.exists():
-            return Response(
-                {
-                    "nom": nom_complet,
-                    "departements": [],
-                    "stats": {
-                        "nb_departements": 0,
-                        "nb_cours": 0,
-                        "nb_apprenants": 0,
-                        "nb_enseignants": 0,
-                        "taux_moyen": 0,
-                    },
-                },
-                status=status.HTTP_200_OK,
-            )
-
-        # ── Construire les données pour chaque département ──
-        departements_data = []
-        stats_globales = {
-            "nb_departements": departements.count(),
-            "nb_cours": 0,
-            "nb_apprenants": 0,
-            "nb_enseignants": 0,
-            "taux_moyen": 0,
-        }
-
-        # Pour éviter les doublons d'enseignants
-        enseignants_ids = set()
-        total_taux = 0
-
-        for dept in departements:
-            # Récupérer les cours du département
-            cours_qs = Cours.objects.filter(departement=dept).select_related(
-                "enseignant_principal__user"
-            )
-
-            cours_data = []
-            for c in cours_qs:
-                ep_data = None
-                if c.enseignant_principal:
-                    ep = c.enseignant_principal
-                    ep_data = {
-                        "id": ep.id,
-                        "nom": f"{ep.user.first_name} {ep.user.last_name}".strip()
-                        or ep.user.username,
-                        "username": ep.user.username,
-                        "photo": request.build_absolute_uri(ep.avatar.url) if ep.avatar else None,
-                    }
-                    enseignants_ids.add(ep.id)
-
-                # Calcul du taux de complétion moyen du cours
-                taux_completion = self._calculer_taux_completion_cours(c, request.user)
-
-                cours_data.append(
-                    {
-                        "id": c.id,
-                        "titre": c.titre,
-                        "niveau": c.niveau,
-                        "nb_apprenants": c.nb_apprenants,
-                        "taux_completion": taux_completion,
-                        "color_code": c.color_code,
-                        "icon_name": c.icon_name,
-                        "enseignant_principal": ep_data,
-                        "nb_lecons": c.nb_lecons,
-                        "nb_devoirs": c.nb_devoirs,
-                    }
-                )
-
-                stats_globales["nb_cours"] += 1
-                total_taux += taux_completion
-
-            # Récupérer les apprenants du parcours (calcul dynamique)
-            parcours_nom = dept.parcours.nom if dept.parcours else ""
-            nb_apprenants = Profile.objects.filter(
-                user_type="apprenant", cursus=parcours_nom, is_active=True
-            ).count()
-            stats_globales["nb_apprenants"] += nb_apprenants
-
-            # Demandes d'accès en attente — même calcul que
-            # `DepartementSerializer.get_demandes_acces`.
-            demandes_acces = [
-                {
-                    "id": d.id,
-                    "apprenant_id": d.apprenant.id,
-                    "apprenant_nom": f"{d.apprenant.first_name} {d.apprenant.last_name}".strip()
-                    or d.apprenant.username,
-                    "apprenant_username": d.apprenant.username,
-                    "message": d.message,
-                    "cree_le": d.cree_le.isoformat(),
-                }
-                for d in DemandeAccesFormation.objects.filter(
-                    departement=dept, statut="en_attente"
-                ).select_related("apprenant")
-            ]
-
-            # Données du département
-            dept_data = {
-                "id": dept.id,
-                "nom": dept.nom,
-                "description": getattr(dept, "description", ""),
-                "parcours": dept.parcours.nom if dept.parcours else "",
-                "parcours_id": dept.parcours.id if dept.parcours else None,
-                "couleur": dept.couleur,
-                "prix": dept.prix,
-                "est_actif": dept.est_actif,
-                "type_departement": dept.type_departement,
-                "image_url": request.build_absolute_uri(dept.image.url) if dept.image else None,
-                # Champs spécifiques
-                "est_prepa_concours": dept.est_prepa_concours,
-                "nom_concours": dept.nom_concours,
-                "organisme_concours": dept.organisme_concours,
-                "date_limite_inscription": dept.date_limite_inscription,
-                "date_examen": dept.date_examen,
-                "arrete_ministeriel": dept.arrete_ministeriel,
-                "places_disponibles": dept.places_disponibles,
-                "debouches": dept.debouches,
-                "est_formation_metier": dept.est_formation_metier,
-                "est_formation_classique": dept.est_formation_classique,
-                "duree_formation": dept.duree_formation,
-                "mode": dept.mode,
-                "certificat_delivre": dept.certificat_delivre,
-                "prerequis": dept.prerequis,
-                "objectifs": dept.objectifs,
-                "ville": dept.ville,
-                "domaine": dept.domaine,
-                "est_certifiante": dept.est_certifiante,
-                "niveau_formation": dept.niveau_formation,
-                # Bug corrigé (modification par un cadre) : ces champs
-                # étaient absents de ce dict — `departement_form_sheet.dart`
-                # les initialisait alors à des valeurs par défaut et les
-                # renvoyait quand même à chaque sauvegarde, écrasant
-                # silencieusement les vraies valeurs en base.
-                "acces_restreint": dept.acces_restreint,
-                "niveaux_accessibles": dept.get_niveaux_accessibles_list(),
-                "periode": dept.periode,
-                "prix_presentiel": dept.prix_presentiel,
-                "prix_mensuel": dept.prix_mensuel,
-                "prix_annuel": dept.prix_annuel,
-                "prix_presentiel_mensuel": dept.prix_presentiel_mensuel,
-                "prix_presentiel_annuel": dept.prix_presentiel_annuel,
-                "demandes_acces": demandes_acces,
-                # Statistiques
-                "nb_cours": cours_qs.count(),
-                "nb_apprenants": nb_apprenants,
-                "taux_moyen": self._calculer_taux_moyen_departement(cours_qs, request.user),
-                "cours": cours_data,
-            }
-            departements_data.append(dept_data)
-
-        # ── Enseignants principaux distincts ──
-        enseignants_data = []
-        for ep_id in enseignants_ids:
-            try:
-                ep = Profile.objects.get(id=ep_id)
-                nb_cours_ep = Cours.objects.filter(
-                    enseignant_principal=ep, departement__in=departements
-                ).count()
-                nb_app_ep = sum(
-                    c.nb_apprenants
-                    for c in Cours.objects.filter(
-                        enseignant_principal=ep, departement__in=departements
-                    )
-                )
-
-                # Somme brute des points d'exercices (pas de moyenne, P6.1).
-                # Clé JSON `score_moyen` conservée telle quelle (ticket
-                # backend seul, `cadre_dashboard_page.dart:1141` la
-                # consomme) bien que le nom devienne trompeur — un
-                # renommage exigerait une modification frontend coordonnée,
-                # hors périmètre de ce ticket.
-                score_moyen = round(
-                    ClassementService.score_total_exercices_enseignant(
-                        ep, departements=departements
-                    ),
-                    1,
-                )
-
-                enseignants_data.append(
-                    {
-                        "id": ep.id,
-                        "nom": f"{ep.user.first_name} {ep.user.last_name}".strip()
-                        or ep.user.username,
-                        "username": ep.user.username,
-                        "email": ep.user.email,
-                        "photo": request.build_absolute_uri(ep.avatar.url) if ep.avatar else None,
-                        "nb_cours": nb_cours_ep,
-                        "nb_apprenants": nb_app_ep,
-                        "score_moyen": score_moyen,
-                    }
-                )
-            except Profile.DoesNotExist:
-                pass
-
-        # Calcul des moyennes globales
-        if stats_globales["nb_cours"] > 0:
-            stats_globales["taux_moyen"] = round(total_taux / stats_globales["nb_cours"], 1)
-        stats_globales["nb_enseignants"] = len(enseignants_data)
-
+        # Instantané calculé par requêtes groupées et mis en cache
+        # (apps/formation/tableaux_de_bord.py).
         return Response(
-            {
-                "nom": nom_complet,
-                "departements": departements_data,
-                "enseignants_principaux": enseignants_data,
-                "stats": stats_globales,
-            },
-            status=status.HTTP_200_OK,
+            urls_absolues_cadre(instantane_cadre(profile), request), status=status.HTTP_200_OK
         )
 
-    def _calculer_taux_completion_cours(self, cours, user):
-        """Calcule le taux de complétion d'un cours pour un apprenant donné."""
-        total_lecons = Lecon.objects.filter(cours=cours).count()
-        if total_lecons == 0:
-            return 0.0
-        terminees = ProgressionLecon.objects.filter(
-            apprenant=user, cours=cours, terminee=True
-        ).count()
-        return round((terminees / total_lecons) * 100, 1)
-
-    def _calculer_taux_moyen_departement(self, cours_qs, user):
-        """Calcule le taux de complétion moyen d'un département."""
-        if not cours_qs.exists():
-            return 0.0
-        total = 0
-        count = 0
-        for cours in cours_qs:
-            taux = self._calculer_taux_completion_cours(cours, user)
-            total += taux
-            count += 1
-        return round(total / count, 1) if count > 0 else 0.0
-
 
 @extend_schema_view(
     get=extend_schema(
@@ -339,267 +104,7 @@ class PrincipalDashboardAPIView(APIView):
         if profile.user_type != "enseignant_principal":
             return Response({"detail": "Accès réservé aux enseignants principaux."}, status=403)
 
-        # Récupérer les cours du principal — matérialisé en liste Python UNE
-        # fois (évite que `cours_ids` (un queryset lazy) ne relance une
-        # requête à chaque réutilisation plus bas, contrairement à
-        # l'ancienne version).
-        cours_qs = Cours.objects.filter(enseignant_principal=profile).select_related(
-            "departement__parcours"
-        )
-        cours_list = list(cours_qs)
-        cours_ids = [c.id for c in cours_list]
-
-        # Si pas de cours, retourner des données vides
-        if not cours_ids:
-            return Response(
-                {
-                    "nom": f"{profile.user.first_name} {profile.user.last_name}".strip()
-                    or profile.user.username,
-                    "stats": {
-                        "nb_cours": 0,
-                        "nb_lecons": 0,
-                        "nb_devoirs": 0,
-                        "nb_apprenants": 0,
-                        "taux_rendu_global": 0,
-                        "moyenne_globale": 0,
-                        "nb_retards": 0,
-                    },
-                    "devoirs_par_cours": [],
-                    "apprenants_risque": [],
-                    "tendance_rendus": [],
-                }
-            )
-
-        # Statistiques de base
-        nb_cours = len(cours_ids)
-        nb_lecons = Lecon.objects.filter(cours_id__in=cours_ids).count()
-        nb_devoirs = Devoir.objects.filter(cours_lie_id__in=cours_ids).count()
-
-        # Compter les apprenants
-        parcours_noms = list(
-            Departement.objects.filter(cours__in=cours_ids)
-            .values_list("parcours__nom", flat=True)
-            .distinct()
-        )
-
-        apprenants_list = list(
-            Profile.objects.filter(
-                user_type="apprenant", cursus__in=parcours_noms, is_active=True
-            )
-            .select_related("user")
-            .distinct()
-        )
-        apprenants = len(apprenants_list)
-
-        # Taux de rendu global / moyenne / retards — une seule requête
-        # agrégée (3 `Count`/`Avg` conditionnels) au lieu de 3 requêtes
-        # séparées.
-        agg = SoumissionDevoir.objects.filter(devoir__cours_lie_id__in=cours_ids).aggregate(
-            total_rendus=Count("id", filter=Q(statut__in=["soumis", "corrige", "en_retard"])),
-            moyenne_globale=Avg("note", filter=Q(note__isnull=False)),
-            retards=Count("id", filter=Q(soumis_le__gt=F("devoir__date_limite"))),
-        )
-        total_rendus = agg["total_rendus"] or 0
-        moyenne_globale = agg["moyenne_globale"] or 0
-        retards = agg["retards"] or 0
-        total_attendu = nb_devoirs * apprenants if apprenants > 0 else 1
-        taux_rendu = (total_rendus / total_attendu * 100) if total_attendu > 0 else 0
-
-        # ── Apprenants à risque ──────────────────────────────────────
-        # Root cause du dashboard qui ne charge plus : `Devoir` n'a PAS de
-        # champ `cours` (seulement `cours_lie`, voir modèle) — l'ancienne
-        # ligne `Devoir.objects.filter(cours__in=cours_ids)` levait un
-        # `FieldError` dès qu'AU MOINS UN apprenant réel existait pour ce
-        # principal (la boucle qui l'appelait ne s'exécutait jamais sur un
-        # compte de démo sans apprenant inscrit — d'où "ça marchait avant,
-        # ça casse maintenant que de vrais apprenants existent"). En plus
-        # d'être fausse, cette requête était recalculée IDENTIQUE à chaque
-        # itération (elle ne dépend d'aucune variable de la boucle) —
-        # remplacée ici par `nb_devoirs`, déjà calculé une seule fois
-        # ci-dessus (même valeur, un seul champ correctement nommé).
-        #
-        # Récupère TOUTES les soumissions pertinentes en UNE requête et les
-        # agrège en Python par apprenant, plutôt qu'une requête par
-        # apprenant (l'ancien `O(n)` en boucle).
-        apprenants_risque = []
-        if nb_devoirs > 0 and apprenants_list:
-            soumissions_par_user: dict[int, list] = {}
-            for s in SoumissionDevoir.objects.filter(
-                devoir__cours_lie_id__in=cours_ids,
-                utilisateur_id__in=[p.user_id for p in apprenants_list],
-            ).values("utilisateur_id", "statut", "note"):
-                soumissions_par_user.setdefault(s["utilisateur_id"], []).append(s)
-
-            for p in apprenants_list:
-                soums = soumissions_par_user.get(p.user_id, [])
-                nb_rendus_p = sum(1 for s in soums if s["statut"] in ("soumis", "corrige", "en_retard"))
-                taux = nb_rendus_p / nb_devoirs * 100
-                if taux < 50:
-                    notes = [s["note"] for s in soums if s["note"] is not None]
-                    moyenne = (sum(notes) / len(notes)) if notes else 0
-                    raison = "Taux de rendu faible" if taux < 30 else "Taux de rendu moyen"
-                    apprenants_risque.append(
-                        {
-                            "id": p.id,
-                            "nom": p.user.last_name or "",
-                            "prenom": p.user.first_name or "",
-                            "email": p.user.email or "",
-                            "taux_rendu": round(taux, 1),
-                            "moyenne": round(moyenne, 1),
-                            "raison": raison,
-                        }
-                    )
-
-        # ── Devoirs par cours ────────────────────────────────────────
-        # Même principe : tous les devoirs et toutes les soumissions du
-        # périmètre sont chargés en 2 requêtes puis regroupés en Python,
-        # au lieu d'une requête par cours puis par devoir (l'ancien
-        # `O(cours × devoirs)`). `apprenants_cours` (nb d'apprenants par
-        # parcours) est lui aussi précalculé une seule fois par requête
-        # groupée, plutôt que recompté à chaque itération de cours.
-        devoirs_tous = list(
-            Devoir.objects.filter(cours_lie_id__in=cours_ids).order_by("id")
-        )
-        devoirs_par_cours_id: dict[int, list] = {}
-        for d in devoirs_tous:
-            devoirs_par_cours_id.setdefault(d.cours_lie_id, []).append(d)
-
-        soumissions_par_devoir_id: dict[int, list] = {}
-        for s in SoumissionDevoir.objects.filter(
-            devoir_id__in=[d.id for d in devoirs_tous]
-        ).values("devoir_id", "statut", "soumis_le", "note"):
-            soumissions_par_devoir_id.setdefault(s["devoir_id"], []).append(s)
-
-        apprenants_par_parcours: dict[str, int] = {
-            row["cursus"]: row["n"]
-            for row in Profile.objects.filter(
-                user_type="apprenant", cursus__in=parcours_noms, is_active=True
-            )
-            .values("cursus")
-            .annotate(n=Count("id"))
-        }
-
-        devoirs_par_cours = []
-        for c in cours_list:
-            try:
-                devoirs = devoirs_par_cours_id.get(c.id, [])
-                nb_devoirs_cours = len(devoirs)
-
-                parcours_nom_cours = (
-                    c.departement.parcours.nom if c.departement and c.departement.parcours else ""
-                )
-                apprenants_cours = apprenants_par_parcours.get(parcours_nom_cours, 0)
-
-                total_rendus_cours = 0
-                for d in devoirs:
-                    total_rendus_cours += sum(
-                        1
-                        for s in soumissions_par_devoir_id.get(d.id, [])
-                        if s["statut"] in ("soumis", "corrige", "en_retard")
-                    )
-                total_attendu_cours = (
-                    nb_devoirs_cours * apprenants_cours if apprenants_cours > 0 else 1
-                )
-                taux_cours = (
-                    (total_rendus_cours / total_attendu_cours * 100)
-                    if total_attendu_cours > 0
-                    else 0
-                )
-
-                details_devoirs = []
-                for devoir in devoirs:
-                    try:
-                        soums_devoir = soumissions_par_devoir_id.get(devoir.id, [])
-                        rendus_devoir = [
-                            s for s in soums_devoir if s["statut"] in ("soumis", "corrige", "en_retard")
-                        ]
-
-                        date_limite = devoir.date_limite.isoformat() if devoir.date_limite else None
-
-                        nb_retards = 0
-                        if devoir.date_limite:
-                            nb_retards = sum(
-                                1
-                                for s in rendus_devoir
-                                if s["soumis_le"] and s["soumis_le"] > devoir.date_limite
-                            )
-
-                        notes_devoir = [s["note"] for s in rendus_devoir if s["note"] is not None]
-                        note_moyenne = (sum(notes_devoir) / len(notes_devoir)) if notes_devoir else 0
-
-                        nb_rendus_devoir = len(rendus_devoir)
-                        details_devoirs.append(
-                            {
-                                "id": devoir.id,
-                                "titre": devoir.titre,
-                                "date_limite": date_limite,
-                                "nb_rendus": nb_rendus_devoir,
-                                "nb_retards": nb_retards,
-                                "taux_rendu": (
-                                    (nb_rendus_devoir / apprenants_cours * 100)
-                                    if apprenants_cours > 0
-                                    else 0
-                                ),
-                                "note_moyenne": round(note_moyenne, 1) if note_moyenne else 0,
-                                "type_correction": devoir.type_correction,
-                            }
-                        )
-                    except Exception:
-                        # Volontairement large : une ligne de devoir
-                        # défectueuse ne doit pas faire tomber tout le
-                        # dashboard, seulement être ignorée.
-                        logger.exception(
-                            "Erreur traitement devoir %s (dashboard principal)", devoir.id
-                        )
-                        continue
-
-                devoirs_par_cours.append(
-                    {
-                        "cours_id": c.id,
-                        "cours_titre": c.titre,
-                        "nb_devoirs": nb_devoirs_cours,
-                        "taux_rendu": round(taux_cours, 1),
-                        "details_devoirs": details_devoirs,
-                    }
-                )
-            except Exception:
-                # Volontairement large (idem ci-dessus).
-                logger.exception("Erreur traitement cours %s (dashboard principal)", c.id)
-                continue
-
-        # Tendance des rendus (7 derniers jours)
-        # timezone.localtime() (pas timezone.now() directement) : .date() sur
-        # un datetime aware sans conversion donne le jour calendaire en UTC,
-        # pas en heure locale Douala (UTC+1) — une soumission entre 23h et
-        # minuit heure locale serait comptée sur le mauvais jour.
-        tendance_rendus = []
-        for i in range(6, -1, -1):
-            date = timezone.localtime(timezone.now()).date() - timedelta(days=i)
-            nb_rendus_jour = SoumissionDevoir.objects.filter(
-                devoir__cours_lie__in=cours_ids,  # NOTE: Vérifiez le nom du champ
-                soumis_le__date=date,
-                statut__in=["soumis", "corrige", "en_retard"],
-            ).count()
-            tendance_rendus.append({"date": date.isoformat(), "nb_rendus": nb_rendus_jour})
-
-        return Response(
-            {
-                "nom": f"{profile.user.first_name} {profile.user.last_name}".strip()
-                or profile.user.username,
-                "stats": {
-                    "nb_cours": nb_cours,
-                    "nb_lecons": nb_lecons,
-                    "nb_devoirs": nb_devoirs,
-                    "nb_apprenants": apprenants,
-                    "taux_rendu_global": round(taux_rendu, 1),
-                    "moyenne_globale": round(moyenne_globale, 1) if moyenne_globale else 0,
-                    "nb_retards": retards,
-                },
-                "devoirs_par_cours": devoirs_par_cours,
-                "apprenants_risque": apprenants_risque,
-                "tendance_rendus": tendance_rendus,
-            }
-        )
+        return Response(instantane_principal(profile))
 
 
 @extend_schema_view(
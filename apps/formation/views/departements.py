@@ -16,6 +16,7 @@ from drf_spectacular.types import OpenApiTypes
 
 from apps.accounts.models import Profile
 from apps.accounts.services import _get_profile, _nom_profil
+from apps.core.cache_reponses import reponse_en_cache
 from apps.core.exceptions import ConflictError
 from apps.core.models import enregistrer_activite
 from apps.core.pagination import PaginatedListMixin, YekiPageNumberPagination
@@ -755,6 +756,7 @@ class EnseignantCadreDepartementUpdateView(APIView):
 @api_view(["GET"])
 @permission_classes([AllowAny])  # public : consulté depuis le formulaire d'inscription
 # (register_page.dart → _fetchDepartements), avant connexion
+@reponse_en_cache("departements_parcours")
 def departements_par_parcours(request, parcours_id):
     parcours = get_object_or_404(Parcours, pk=parcours_id)
     deps = Departement.objects.filter(parcours=parcours).select_related("cadre")
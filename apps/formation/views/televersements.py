@@ -0,0 +1,131 @@
+# apps/formation/views/televersements.py
+#
+# Téléversement direct de la vidéo et du PDF d'une leçon : le client
+# annonce le fichier, l'envoie au stockage par l'URL signée reçue, puis
+# demande la finalisation, qui vérifie le fichier et l'attache à la leçon
+# (voir apps/core/televersement_direct.py). Mêmes droits que la
+# modification de la leçon : enseignant principal du cours OU créateur.
+
+from django.shortcuts import get_object_or_404
+
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from drf_spectacular.utils import extend_schema, extend_schema_view
+
+from apps.accounts.models import Profile
+from apps.core import televersement_direct
+from apps.core.models import SessionTeleversement
+from apps.core.schema_examples import ERREURS_ECRITURE
+from apps.formation.models import Lecon
+from apps.formation.serializers import (
+    LeconSerializer,
+    SessionTeleversementSerializer,
+    TeleversementLeconSerializer,
+)
+
+
+def _peut_modifier(request, lecon):
+    try:
+        profile = request.user.profile
+    except Profile.DoesNotExist:
+        return False
+    return lecon.cours.enseignant_principal == profile or lecon.created_by == profile
+
+
+@extend_schema_view(
+    post=extend_schema(
+        summary="Ouvrir un téléversement direct pour une leçon",
+        description=(
+            "Annonce la vidéo ou le PDF d'une leçon (nom, taille en octets, type) "
+            "et retourne l'URL signée où l'envoyer directement, sans passer par "
+            "l'API : requêtes `PUT` avec les `entetes` indiqués, en un bloc ou par "
+            "morceaux `Content-Range` (upload reprenable). Appeler ensuite "
+            "`/api/lecons/televersements/<id>/finaliser/`. Réservé à l'enseignant "
+            "principal du cours OU au créateur de la leçon."
+        ),
+        tags=["formation"],
+        request=TeleversementLeconSerializer,
+        responses={201: SessionTeleversementSerializer},
+        examples=[*ERREURS_ECRITURE],
+    ),
+)
+class OuvrirTeleversementLeconView(APIView):
+    """
+    POST /api/lecons/<lecon_id>/televersements/
+    Ouvre une session de téléversement direct pour `video` ou `fichier_pdf`.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, lecon_id):
+        lecon = get_object_or_404(Lecon.objects.select_related("cours"), pk=lecon_id)
+        if not _peut_modifier(request, lecon):
+            return Response(
+                {"detail": "Vous n'avez pas la permission de modifier cette leçon."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        serializer = TeleversementLeconSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session, instructions = televersement_direct.ouvrir(
+            lecon, **serializer.validated_data, request=request
+        )
+        donnees = {
+            "id": session.pk,
+            "champ": session.champ,
+            "nom_cible": session.nom_cible,
+            "taille": session.taille,
+            "type_contenu": session.type_contenu,
+            "expire_le": session.expire_le,
+            **instructions,
+        }
+        return Response(
+            SessionTeleversementSerializer(donnees).data, status=status.HTTP_201_CREATED
+        )
+
+
+@extend_schema_view(
+    post=extend_schema(
+        summary="Finaliser un téléversement direct de leçon",
+        description=(
+            "Vérifie le fichier envoyé au stockage (taille et type annoncés, "
+            "premiers octets cohérents avec le type) et l'attache à la leçon. "
+            "Fichier non conforme : 400, il est supprimé et la session est close "
+            "(en ouvrir une nouvelle). Réservé à l'auteur de la session."
+        ),
+        tags=["formation"],
+        request=None,
+        responses={200: LeconSerializer},
+        examples=[*ERREURS_ECRITURE],
+    ),
+)
+class FinaliserTeleversementLeconView(APIView):
+    """
+    POST /api/lecons/televersements/<session_id>/finaliser/
+    Attache à la leçon le fichier reçu par le stockage.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, session_id):
+        session = get_object_or_404(
+            SessionTeleversement,
+            pk=session_id,
+            modele="formation.Lecon",
+            cree_par=request.user,
+        )
+        lecon = get_object_or_404(Lecon.objects.select_related("cours"), pk=session.objet_id)
+        if not _peut_modifier(request, lecon):
+            return Response(
+                {"detail": "Vous n'avez pas la permission de modifier cette leçon."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            lecon = televersement_direct.finaliser(session)
+        except televersement_direct.TeleversementRefuse as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(LeconSerializer(lecon, context={"request": request}).data)
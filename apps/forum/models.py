@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from apps.core.models import STATUTS_TRANSFERT
+
 
 # ─────────────────────────────────────────────────────────────────
 # QUESTION FORUM
@@ -45,12 +47,24 @@ class QuestionForum(models.Model):
         blank=True,
         help_text="Image jointe à la question",
     )
+    image_derivees = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Versions réduites (apps/core/images.py)",
+    )
     audio = models.FileField(
         upload_to="forum/questions/audios/",
         null=True,
         blank=True,
         help_text="Fichier audio joint à la question",
     )
+    transfert_statut = models.CharField(
+        max_length=12,
+        choices=STATUTS_TRANSFERT,
+        default="pret",
+        help_text="Écriture de l'image et de l'audio sur le stockage (apps/core/transferts.py)",
+    )
 
     class Meta:
         db_table = "yeki_questionforum"
@@ -99,6 +113,18 @@ class ReponseImage(models.Model):
 
     reponse = models.ForeignKey(ReponseQuestion, on_delete=models.CASCADE, related_name="images")
     image = models.ImageField(upload_to="forum/reponses/images/")
+    image_derivees = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Versions réduites (apps/core/images.py)",
+    )
+    transfert_statut = models.CharField(
+        max_length=12,
+        choices=STATUTS_TRANSFERT,
+        default="pret",
+        help_text="Écriture de l'image sur le stockage (apps/core/transferts.py)",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
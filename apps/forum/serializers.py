@@ -1,6 +1,10 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from apps.accounts.models import Profile
+from apps.core.images import urls_derivees
+from apps.core.serializers import ImagesDeriveesField
 from apps.forum.models import QuestionForum, ReponseQuestion
 
 
@@ -18,6 +22,17 @@ def _avatar_url(user, request):
     return request.build_absolute_uri(avatar.url) if request else avatar.url
 
 
+def _premiere_image(reponse):
+    """Première `ReponseImage` (par pk), lue dans le prefetch
+    `reponses__images` quand la vue l'a posé, et mémorisée sur la réponse :
+    `image_url` et `image_derivees` la lisent toutes deux."""
+    if not hasattr(reponse, "_premiere_image"):
+        reponse._premiere_image = min(
+            reponse.images.all(), key=lambda image: image.pk, default=None
+        )
+    return reponse._premiere_image
+
+
 class ReponseSerializer(serializers.ModelSerializer):
     auteur_nom = serializers.CharField(source="auteur.get_full_name", read_only=True)
     auteur_username = serializers.CharField(source="auteur.username", read_only=True)
@@ -26,6 +41,9 @@ class ReponseSerializer(serializers.ModelSerializer):
     nb_likes = serializers.SerializerMethodField()
     mon_like = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    auteur_avatar_derivees = ImagesDeriveesField("avatar", source="auteur.profile")
+    image_derivees = serializers.SerializerMethodField()
+    image_transfert_statut = serializers.SerializerMethodField()
 
     class Meta:
         model = ReponseQuestion
@@ -41,6 +59,9 @@ class ReponseSerializer(serializers.ModelSerializer):
             "nb_likes",
             "mon_like",
             "image_url",
+            "image_derivees",
+            "image_transfert_statut",
+            "auteur_avatar_derivees",
         ]
 
     def get_auteur_avatar_url(self, obj):
@@ -51,12 +72,24 @@ class ReponseSerializer(serializers.ModelSerializer):
         # pas un champ direct comme sur `QuestionForum` — une seule image
         # par réponse côté client (`ForumRepository.repondre()`), la
         # première suffit.
-        image = obj.images.first()
-        if not image:
+        image = _premiere_image(obj)
+        # Image encore en transfert vers le stockage : pas encore d'URL.
+        if not image or not image.image:
             return None
         request = self.context.get("request")
         return request.build_absolute_uri(image.image.url) if request else image.image.url
 
+    def get_image_transfert_statut(self, obj):
+        image = _premiere_image(obj)
+        return image.transfert_statut if image else None
+
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_image_derivees(self, obj):
+        image = _premiere_image(obj)
+        if not image:
+            return None
+        return urls_derivees(image.image_derivees, self.context.get("request"), image.image.storage)
+
     def get_auteur_est_enseignant(self, obj):
         try:
             profile = obj.auteur.profile
@@ -87,6 +120,8 @@ class QuestionForumDetailSerializer(serializers.ModelSerializer):
     nb_reponses = serializers.IntegerField(read_only=True)
     reponses = ReponseSerializer(many=True, read_only=True)
     image_url = serializers.SerializerMethodField()
+    image_derivees = ImagesDeriveesField("image")
+    auteur_avatar_derivees = ImagesDeriveesField("avatar", source="auteur.profile")
     audio_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -113,7 +148,10 @@ class QuestionForumDetailSerializer(serializers.ModelSerializer):
             "auteur_est_enseignant",
             "auteur_avatar_url",
             "image_url",
+            "image_derivees",
+            "auteur_avatar_derivees",
             "audio_url",
+            "transfert_statut",
         ]
 
     def get_auteur_nom(self, obj):
@@ -160,6 +198,8 @@ class QuestionForumListSerializer(serializers.ModelSerializer):
     auteur_avatar_url = serializers.SerializerMethodField()
     nb_reponses = serializers.IntegerField(read_only=True)
     image_url = serializers.SerializerMethodField()
+    image_derivees = ImagesDeriveesField("image")
+    auteur_avatar_derivees = ImagesDeriveesField("avatar", source="auteur.profile")
     audio_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -185,7 +225,10 @@ class QuestionForumListSerializer(serializers.ModelSerializer):
             "auteur_est_enseignant",
             "auteur_avatar_url",
             "image_url",
+            "image_derivees",
+            "auteur_avatar_derivees",
             "audio_url",
+            "transfert_statut",
         ]
 
     def get_auteur_nom(self, obj):
@@ -0,0 +1,24 @@
+from apps.core.recherche import POIDS_SECONDAIRE, POIDS_TEXTE
+from apps.forum.models import QuestionForum
+
+
+def documents_recherche_questions(ids):
+    """Source de l'index de recherche `question_forum` (apps/core/recherche.py) :
+    contenu de la question et titres des contenus auxquels elle est rattachée."""
+    documents = {}
+    for question in QuestionForum.objects.filter(pk__in=ids).only(
+        "contenu", "lecon_titre", "cours_titre", "exercice_titre", "devoir_titre"
+    ):
+        titres = " ".join(
+            filter(
+                None,
+                [
+                    question.lecon_titre,
+                    question.cours_titre,
+                    question.exercice_titre,
+                    question.devoir_titre,
+                ],
+            )
+        )
+        documents[question.pk] = [(titres, POIDS_SECONDAIRE), (question.contenu, POIDS_TEXTE)]
+    return documents
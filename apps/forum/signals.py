@@ -10,10 +10,12 @@ et une résolution de username non demandés ailleurs dans le code, une
 extension de périmètre non couverte par ce ticket.
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from apps.forum.models import ReponseQuestion
+from apps.core.images import deriver
+from apps.core.recherche import TYPE_QUESTION_FORUM, reindexer
+from apps.forum.models import QuestionForum, ReponseImage, ReponseQuestion
 from apps.notifications.models import creer_notification
 
 
@@ -37,3 +39,18 @@ def _notifier_reponse_question(sender, instance, created, **kwargs):
         # dans le catalogue CDC, qui ne correspond à aucune route go_router.
         action_route=f"/forum/questions/{question.id}",
     )
+
+
+@receiver(post_save, sender=QuestionForum)
+@receiver(post_delete, sender=QuestionForum)
+def _indexer_question(sender, instance, **kwargs):
+    """Index de recherche du forum (apps/core/recherche.py), filtre `q` de
+    `ListeQuestionsView`."""
+    reindexer(TYPE_QUESTION_FORUM, [instance.pk])
+
+
+@receiver(post_save, sender=QuestionForum)
+@receiver(post_save, sender=ReponseImage)
+def _deriver_image(sender, instance, update_fields, **kwargs):
+    """Versions réduites des images jointes (apps/core/images.py)."""
+    deriver(instance, "image", update_fields=update_fields)
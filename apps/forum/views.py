@@ -16,8 +16,10 @@ from drf_spectacular.utils import (
 from drf_spectacular.types import OpenApiTypes
 
 from apps.accounts.models import Profile
+from apps.core import transferts
 from apps.core.pagination import PaginatedListMixin
 from apps.core.permissions import AccesMatricePermission
+from apps.core.recherche import TYPE_QUESTION_FORUM, filtrer_par_pertinence
 from apps.core.schema_examples import (
     ERREURS_COURANTES,
     ERREURS_ECRITURE,
@@ -109,11 +111,23 @@ class DetailQuestionView(APIView):
             "Liste paginée des questions du forum, triées des plus récentes aux "
             "plus anciennes, avec le nombre de réponses de chacune. Filtrable par "
             "origine (source), par identifiant de leçon/exercice/devoir/cours, "
-            "par statut de résolution, et par date de création (`since`)."
+            "par statut de résolution, et par date de création (`since`). Avec "
+            "`q`, recherche dans le contenu et les titres rattachés, résultats "
+            "triés par pertinence et bornés à `RECHERCHE_LIMITE_RESULTATS`."
         ),
         tags=["forum"],
         parameters=[
             *PARAMS_PAGINATION,
+            OpenApiParameter(
+                "q",
+                OpenApiTypes.STR,
+                OpenApiParameter.QUERY,
+                required=False,
+                description=(
+                    "Texte recherché (contenu, titres de leçon/cours/exercice/devoir) : "
+                    "chaque mot est un préfixe, sans casse ni accents."
+                ),
+            ),
             OpenApiParameter(
                 "source",
                 OpenApiTypes.STR,
@@ -198,6 +212,7 @@ class ListeQuestionsView(PaginatedListMixin, APIView):
         cours_id = request.query_params.get("cours_id")
         resolue = request.query_params.get("resolue")
         since = request.query_params.get("since")
+        q = request.query_params.get("q", "").strip()
 
         if source:
             qs = qs.filter(source=source)
@@ -215,7 +230,11 @@ class ListeQuestionsView(PaginatedListMixin, APIView):
             qs = qs.filter(cree_le__gt=since)
 
         qs = qs.annotate(nb_reponses=Count("reponses", distinct=True))
-        qs = qs.order_by("-cree_le")
+        if q:
+            # Index de recherche (apps/core/recherche.py), ordre de pertinence.
+            qs = filtrer_par_pertinence(qs, TYPE_QUESTION_FORUM, q)
+        else:
+            qs = qs.order_by("-cree_le")
 
         page = self.paginate_queryset(qs)
         serializer = QuestionForumListSerializer(page, many=True, context={"request": request})
@@ -250,7 +269,9 @@ class ListeQuestionsView(PaginatedListMixin, APIView):
         serializer = QuestionForumCreateSerializer(data=data, context={"request": request})
 
         serializer.is_valid(raise_exception=True)
+        fichiers = transferts.extraire(serializer.validated_data, ["image", "audio"])
         question = serializer.save()
+        transferts.differer(question, fichiers)
 
         # Recharger avec les annotations
         question = QuestionForum.objects.annotate(nb_reponses=Count("reponses")).get(pk=question.pk)
@@ -443,7 +464,9 @@ class RepondreQuestionView(APIView):
 
         image = request.FILES.get("image")
         if image:
-            ReponseImage.objects.create(reponse=reponse, image=image)
+            donnees = {"image": image}
+            fichiers = transferts.extraire(donnees, ["image"])
+            transferts.differer(ReponseImage.objects.create(reponse=reponse, **donnees), fichiers)
 
         serializer = ReponseSerializer(reponse, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
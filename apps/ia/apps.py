@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class IaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.ia"
+
+    def ready(self):
+        import apps.ia.signals  # noqa: F401
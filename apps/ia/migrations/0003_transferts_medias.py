@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ia", "0002_images_derivees"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="yekiiachathistorique",
+            name="transfert_statut",
+            field=models.CharField(
+                choices=[
+                    ("pret", "Prêt"),
+                    ("en_attente", "Transfert en attente"),
+                    ("echec", "Échec du transfert"),
+                ],
+                default="pret",
+                help_text="Écriture de l'image et de l'audio sur le stockage (apps/core/transferts.py)",
+                max_length=12,
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from apps.core.models import STATUTS_TRANSFERT
 from apps.formation.models import Cours
 
 
@@ -124,6 +125,12 @@ class YekiIAChatHistorique(models.Model):
     source_titre = models.CharField(max_length=255, blank=True)
     # Image jointe (optionnel)
     image = models.ImageField(upload_to="ia_chat_images/", null=True, blank=True)
+    image_derivees = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Versions réduites (apps/core/images.py)",
+    )
     cree_le = models.DateTimeField(auto_now_add=True)
     tokens = models.PositiveIntegerField(default=0)
     tokens_input = models.PositiveIntegerField(default=0, help_text="Nombre de tokens en entrée")
@@ -134,6 +141,12 @@ class YekiIAChatHistorique(models.Model):
         blank=True,
         help_text="Fichier audio joint à la question",
     )
+    transfert_statut = models.CharField(
+        max_length=12,
+        choices=STATUTS_TRANSFERT,
+        default="pret",
+        help_text="Écriture de l'image et de l'audio sur le stockage (apps/core/transferts.py)",
+    )
 
     class Meta:
         db_table = "yeki_yekiiachathistorique"
@@ -0,0 +1,15 @@
+"""
+Versions réduites des images jointes au chat Yéki IA (apps/core/images.py).
+Connectés depuis IaConfig.ready().
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.core.images import deriver
+from apps.ia.models import YekiIAChatHistorique
+
+
+@receiver(post_save, sender=YekiIAChatHistorique)
+def _deriver_image(sender, instance, update_fields, **kwargs):
+    deriver(instance, "image", update_fields=update_fields)
@@ -10,6 +10,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from apps.accounts.models import Profile
+from apps.core import transferts
+from apps.core.images import urls_derivees
 from apps.core.pagination import PaginatedListMixin
 from apps.formation.models import Cours
 from apps.paiement.models import Paiement
@@ -46,7 +48,7 @@ logger = logging.getLogger(__name__)
             "Retourne la liste paginée (ordre chronologique) des messages "
             "échangés entre l'apprenant connecté et Yéki IA pour un cours "
             "donné : `id, role, contenu, source, source_id, source_titre, "
-            "image_url, audio_url, tokens_input, tokens_output, cree_le`."
+            "image_url, image_derivees, audio_url, transfert_statut, tokens_input, tokens_output, cree_le`."
         ),
         tags=["ia"],
         parameters=[*PARAMS_PAGINATION],
@@ -91,7 +93,9 @@ class YekiIAChatHistoriqueView(PaginatedListMixin, APIView):
                     "source_id": m.source_id,
                     "source_titre": m.source_titre,
                     "image_url": get_fichier_url(m.image),
+                    "image_derivees": urls_derivees(m.image_derivees, request, m.image.storage),
                     "audio_url": get_fichier_url(m.audio),
+                    "transfert_statut": m.transfert_statut,
                     "tokens_input": m.tokens_input,
                     "tokens_output": m.tokens_output,
                     "cree_le": m.cree_le.isoformat(),
@@ -206,7 +210,10 @@ class YekiIAChatAvecHistoriqueView(APIView):
                 status=402,
             )
 
-        # 6. Sauvegarde du message utilisateur
+        # 6. Sauvegarde du message utilisateur (pièces jointes écrites sur le
+        # stockage hors requête en production, voir apps/core/transferts.py)
+        pieces = {"image": image_file, "audio": audio_file}
+        fichiers = transferts.extraire(pieces, ["image", "audio"])
         user_msg = YekiIAChatHistorique.objects.create(
             apprenant=request.user,
             cours=cours,
@@ -215,9 +222,9 @@ class YekiIAChatAvecHistoriqueView(APIView):
             source=source,
             source_id=source_id,
             source_titre=source_titre,
-            image=image_file,
-            audio=audio_file,
+            **pieces,
         )
+        transferts.differer(user_msg, fichiers)
 
         # 7. Récupération de l'historique pour le contexte
         historique = list(
@@ -79,34 +79,69 @@ def _envoyer_push_sync(notification) -> None:
             "token", flat=True
         )
     )
-    if not tokens:
+    for token in tokens:
+        _envoyer_message(app, messaging, notification, token)
+
+
+def _envoyer_message(app, messaging, notification, token) -> None:
+    from apps.notifications.models import DeviceToken
+
+    message = messaging.Message(
+        notification=messaging.Notification(
+            title=notification.titre,
+            body=notification.contenu,
+        ),
+        data={
+            "action_route": notification.action_route or "",
+            "notification_id": str(notification.id),
+            "type": notification.type,
+        },
+        token=token,
+    )
+    try:
+        messaging.send(message, app=app)
+    except Exception as exc:
+        # Token invalide (UNREGISTERED ou équivalent) — désactivé
+        # automatiquement, JAMAIS supprimé (règle 5, CDC §9.2).
+        if "UNREGISTERED" in str(exc) or "NotRegisteredError" in type(exc).__name__:
+            DeviceToken.objects.filter(token=token).update(actif=False)
+        else:
+            logger.exception("Échec envoi push FCM (token=%s...)", token[:12])
+
+
+def _envoyer_push_groupe_sync(notifications) -> None:
+    """Variante groupée de `_envoyer_push_sync` pour une diffusion
+    (`creer_notifications`) : les jetons de TOUS les destinataires sont lus
+    en une requête, et un seul thread porte tout l'envoi."""
+    from apps.notifications.models import DeviceToken
+
+    app = _app_firebase()
+    if app is None:
         return
 
-    for token in tokens:
-        message = messaging.Message(
-            notification=messaging.Notification(
-                title=notification.titre,
-                body=notification.contenu,
-            ),
-            data={
-                "action_route": notification.action_route or "",
-                "notification_id": str(notification.id),
-                "type": notification.type,
-            },
-            token=token,
-        )
-        try:
-            messaging.send(message, app=app)
-        except Exception as exc:
-            # Token invalide (UNREGISTERED ou équivalent) — désactivé
-            # automatiquement, JAMAIS supprimé (règle 5, CDC §9.2).
-            if "UNREGISTERED" in str(exc) or "NotRegisteredError" in type(exc).__name__:
-                DeviceToken.objects.filter(token=token).update(actif=False)
-            else:
-                logger.exception("Échec envoi push FCM (token=%s...)", token[:12])
+    try:
+        from firebase_admin import messaging
+    except ImportError:
+        return
+
+    par_utilisateur = {n.utilisateur_id: n for n in notifications}
+    jetons = DeviceToken.objects.filter(user_id__in=par_utilisateur, actif=True).values_list(
+        "user_id", "token"
+    )
+    for user_id, token in jetons.iterator():
+        _envoyer_message(app, messaging, par_utilisateur[user_id], token)
 
 
 def envoyer_push_async(notification) -> None:
     """Point d'entrée public — lance l'envoi dans un thread démon, ne
     bloque jamais l'appelant."""
     threading.Thread(target=_envoyer_push_sync, args=(notification,), daemon=True).start()
+
+
+def envoyer_push_groupe_async(notifications) -> None:
+    """Un seul thread démon pour toute une diffusion (jamais un thread par
+    destinataire)."""
+    if notifications:
+        threading.Thread(
+            target=_envoyer_push_groupe_sync, args=(list(notifications),), daemon=True
+        ).start()
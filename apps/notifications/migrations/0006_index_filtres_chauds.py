@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_alter_notification_action_route"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="devicetoken",
+            index=models.Index(
+                condition=models.Q(("actif", True)), fields=["user"], name="device_token_actif_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["utilisateur", "objet_type", "objet_id"],
+                name="yeki_notifi_utilisa_3071d6_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,6 @@
 import logging
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 logger = logging.getLogger(__name__)
@@ -59,6 +59,11 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=["utilisateur", "est_lue"]),
             models.Index(fields=["utilisateur", "cree_le"]),
+            # Registre "déjà notifié" (`_deja_notifie`, envoyer_rappels) :
+            # objet_type + objet_id suffisent à isoler 0-2 lignes par
+            # utilisateur — `titre` (255 car.) reste un filtre résiduel
+            # plutôt que d'alourdir l'index.
+            models.Index(fields=["utilisateur", "objet_type", "objet_id"]),
         ]
         verbose_name = "Notification"
         verbose_name_plural = "Notifications"
@@ -91,6 +96,13 @@ class DeviceToken(models.Model):
 
     class Meta:
         db_table = "yeki_device_token"
+        # Envoi push (`fcm._envoyer_push_sync`) : jetons actifs d'un
+        # utilisateur uniquement.
+        indexes = [
+            models.Index(
+                fields=["user"], condition=models.Q(actif=True), name="device_token_actif_idx"
+            ),
+        ]
         verbose_name = "Jeton d'appareil"
         verbose_name_plural = "Jetons d'appareil"
 
@@ -139,3 +151,47 @@ def creer_notification(
 
     envoyer_push_async(notification)
     return True
+
+
+def creer_notifications(
+    utilisateurs_ids,
+    type_notif: str,
+    titre: str,
+    contenu: str,
+    objet_id: int = None,
+    objet_type: str = "",
+    action_route: str = "",
+):
+    """
+    Diffusion de la MÊME notification à de nombreux utilisateurs (ex.
+    classement d'olympiade publié) : un INSERT groupé au lieu d'un
+    `creer_notification` par destinataire, et un seul thread d'envoi push
+    lancé au commit. Retourne le nombre de notifications créées.
+    """
+    try:
+        # Savepoint : un échec ne doit pas casser la transaction métier
+        # appelante (même tolérance que `creer_notification`).
+        with transaction.atomic():
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        utilisateur_id=utilisateur_id,
+                        type=type_notif,
+                        titre=titre,
+                        contenu=contenu,
+                        objet_id=objet_id,
+                        objet_type=objet_type,
+                        action_route=action_route,
+                    )
+                    for utilisateur_id in utilisateurs_ids
+                ],
+                batch_size=1000,
+            )
+    except Exception:
+        logger.exception("Échec création groupée de Notification (type=%s)", type_notif)
+        return 0
+
+    from apps.notifications.fcm import envoyer_push_groupe_async
+
+    transaction.on_commit(lambda: envoyer_push_groupe_async(notifications))
+    return len(notifications)
@@ -4,7 +4,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from apps.core.pagination import PaginatedListMixin
+from apps.core.pagination import PaginatedListMixin, YekiKeysetPagination
 from apps.notifications.models import Notification, DeviceToken
 from apps.notifications.serializers import NotificationSerializer
 
@@ -13,7 +13,7 @@ from drf_spectacular.types import OpenApiTypes
 from apps.core.schema_examples import (
     ERREURS_COURANTES,
     EXEMPLE_PAGINATION,
-    PARAMS_PAGINATION,
+    PARAMS_PAGINATION_KEYSET,
 )
 
 
@@ -27,7 +27,7 @@ from apps.core.schema_examples import (
             "cree_le, action_route`."
         ),
         tags=["notifications"],
-        parameters=[*PARAMS_PAGINATION],
+        parameters=[*PARAMS_PAGINATION_KEYSET],
         responses={200: NotificationSerializer},
         examples=[EXEMPLE_PAGINATION, *ERREURS_COURANTES],
     ),
@@ -39,6 +39,8 @@ class NotificationsView(PaginatedListMixin, APIView):
     """
 
     permission_classes = [IsAuthenticated]
+    pagination_class = YekiKeysetPagination
+    keyset_champ = "cree_le"
 
     def get(self, request):
         notifications = Notification.objects.filter(utilisateur=request.user).order_by("-cree_le")
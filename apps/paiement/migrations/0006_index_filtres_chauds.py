@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formation", "0006_index_filtres_chauds"),
+        ("paiement", "0005_abonnementpremium_departement_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="abonnementpremium",
+            index=models.Index(
+                condition=models.Q(("actif", True)),
+                fields=["utilisateur", "fin"],
+                name="abo_premium_actif_idx",
+            ),
+        ),
+    ]
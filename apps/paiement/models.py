@@ -201,6 +201,16 @@ class AbonnementPremium(models.Model):
         ordering = ["-debut"]
         verbose_name = "Abonnement Premium"
         unique_together = [("utilisateur", "departement")]
+        # `AccesService.est_premium` (appelé par presque chaque vue
+        # apprenant) : utilisateur + fin, limité aux abonnements actifs —
+        # partiel, les abonnements expirés/inactifs n'y entrent jamais.
+        indexes = [
+            models.Index(
+                fields=["utilisateur", "fin"],
+                condition=models.Q(actif=True),
+                name="abo_premium_actif_idx",
+            ),
+        ]
 
     def __str__(self):
         dept = self.departement.nom if self.departement else "—"
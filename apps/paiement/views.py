@@ -20,7 +20,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 
 from apps.core.exceptions import ConflictError, PaymentRequiredError, InsufficientBalanceError
 from apps.core.models import ParametreSysteme, enregistrer_activite
-from apps.core.pagination import PaginatedListMixin
+from apps.core.pagination import PaginatedListMixin, YekiKeysetPagination
 from apps.formation.models import Cours, Departement
 from apps.paiement.models import (
     Paiement,
@@ -43,6 +43,7 @@ from apps.core.schema_examples import (
     ERREURS_ECRITURE,
     EXEMPLE_PAGINATION,
     PARAMS_PAGINATION,
+    PARAMS_PAGINATION_KEYSET,
     EXEMPLE_PAYMENT_REQUIRED,
     EXEMPLE_INSUFFICIENT_BALANCE,
     EXEMPLE_THROTTLED,
@@ -484,7 +485,7 @@ class VerifierPaiementCinetPayView(APIView):
             "`reference, type_paiement, montant, moyen, statut, date`."
         ),
         tags=["paiement"],
-        parameters=[*PARAMS_PAGINATION],
+        parameters=[*PARAMS_PAGINATION_KEYSET],
         responses={200: OpenApiTypes.OBJECT},
         examples=[EXEMPLE_PAGINATION, *ERREURS_COURANTES],
     ),
@@ -493,6 +494,8 @@ class HistoriquePaiementsView(PaginatedListMixin, APIView):
     """GET /api/paiements/historique/"""
 
     permission_classes = [IsAuthenticated]
+    pagination_class = YekiKeysetPagination
+    keyset_champ = "date"
 
     def get(self, request):
         paiements = Paiement.objects.filter(utilisateur=request.user).order_by("-date")
@@ -1786,7 +1789,7 @@ def _transaction_dict(p):
             "decideur. Réservé à l'admin général."
         ),
         tags=["paiement"],
-        parameters=[*PARAMS_PAGINATION],
+        parameters=[*PARAMS_PAGINATION_KEYSET],
         responses={200: OpenApiTypes.OBJECT},
         examples=[EXEMPLE_PAGINATION, *ERREURS_COURANTES],
     ),
@@ -1795,6 +1798,8 @@ class AdminTransactionsView(PaginatedListMixin, APIView):
     """GET /api/admin/transactions/"""
 
     permission_classes = [IsAdminGeneral]
+    pagination_class = YekiKeysetPagination
+    keyset_champ = "date"
 
     def get(self, request):
         qs = Paiement.objects.select_related(
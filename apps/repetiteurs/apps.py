@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RepetiteursConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.repetiteurs"
+
+    def ready(self):
+        import apps.repetiteurs.signals  # noqa: F401
@@ -0,0 +1,166 @@
+"""
+Banc d'essai de la recherche de répétiteurs : l'ancienne boucle de
+`RepetiteursSearchView` (jusqu'à cinq requêtes par enseignant validé)
+contre l'index `IndexRepetiteur` (un SELECT), sur N enseignants
+synthétiques. Vérifie au passage que les deux renvoient les mêmes
+enseignants.
+
+Usage :
+    python manage.py comparer_recherche_repetiteurs --enseignants 2000 --repetitions 20
+
+Tout est créé dans une transaction annulée à la fin : la base n'est pas
+modifiée. Refusé hors DEBUG, sauf `--force`.
+"""
+
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import Profile
+from apps.formation.models import Cours, Departement, Parcours
+from apps.repetiteurs.models import Repetiteur
+from apps.repetiteurs.services import rechercher, reindexer
+
+PREFIXE = "banc-rep-"
+MATIERES = ["Maths", "Physique", "Chimie", "SVT", "Anglais", "Français", "Histoire", "Philo"]
+NIVEAUX = ["Seconde", "Première", "Terminale"]
+VILLES = ["Yaoundé", "Douala", "Bafoussam", "Garoua"]
+
+
+class _Annuler(Exception):
+    pass
+
+
+def _recherche_historique(matiere, niveau, ville):
+    """Ancienne boucle de la vue, réduite aux ids (même ordre de tests)."""
+    ids = []
+    profils = Profile.objects.filter(
+        user_type__in=["enseignant_principal", "enseignant"], is_active=True, is_repetiteur=True
+    ).select_related("user")
+    for profil in profils:
+        cours_principaux = Cours.objects.filter(
+            enseignant_principal=profil, matiere__iexact=matiere
+        )
+        cours_secondaires = profil.cours_secondaires.filter(matiere__iexact=matiere)
+        if niveau:
+            cours_principaux = cours_principaux.filter(niveau__iexact=niveau)
+            cours_secondaires = cours_secondaires.filter(niveau__iexact=niveau)
+        if not (cours_principaux.exists() or cours_secondaires.exists()):
+            continue
+        profil_ville = (profil.ville or "").strip().lower()
+        if ville and profil_ville and ville not in profil_ville:
+            if not Cours.objects.filter(
+                departement__ville__iexact=ville, enseignant_principal=profil
+            ).exists():
+                continue
+        fiche = (
+            Repetiteur.objects.filter(enseignant=profil, cours__matiere__iexact=matiere)
+            .order_by("-disponible")
+            .first()
+        )
+        if fiche is not None and not fiche.disponible:
+            continue
+        ids.append(profil.id)
+    return ids
+
+
+def _mesurer(fonction, repetitions):
+    """(résultat, ms par appel, requêtes par appel)."""
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as requetes:
+        resultat = fonction()
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction()
+    return resultat, (time.perf_counter() - debut) / repetitions * 1000, len(requetes)
+
+
+class Command(BaseCommand):
+    help = "Compare l'ancienne recherche de répétiteurs à l'index IndexRepetiteur."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--enseignants", type=int, default=1000)
+        parser.add_argument("--repetitions", type=int, default=10)
+        parser.add_argument("--force", action="store_true", help="Autorise l'exécution hors DEBUG")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("Écrit puis annule des données : refusé hors DEBUG (voir --force).")
+        try:
+            with transaction.atomic():
+                self._banc(options["enseignants"], options["repetitions"])
+                raise _Annuler
+        except _Annuler:
+            pass
+
+    def _banc(self, n, repetitions):
+        alea = random.Random(42)
+        parcours = Parcours.objects.create(nom=f"{PREFIXE}parcours", type_parcours="cursus")
+        departements = [
+            Departement.objects.create(nom=f"{PREFIXE}{ville}", parcours=parcours, ville=ville)
+            for ville in VILLES
+        ]
+
+        self.stdout.write(f"Création de {n} enseignants synthétiques…")
+        profils = []
+        for i in range(n):
+            user = User.objects.create_user(username=f"{PREFIXE}{i}")
+            profils.append(
+                Profile.objects.create(
+                    user=user,
+                    user_type=alea.choice(["enseignant_principal", "enseignant"]),
+                    is_active=True,
+                    is_repetiteur=alea.random() < 0.8,
+                    ville=alea.choice(VILLES + [""]),
+                    whatsapp=f"6{i:08d}",
+                )
+            )
+        for profil in profils:
+            for _ in range(alea.randint(1, 3)):
+                cours = Cours.objects.create(
+                    titre=f"{PREFIXE}cours",
+                    niveau=alea.choice(NIVEAUX),
+                    matiere=alea.choice(MATIERES),
+                    departement=alea.choice(departements),
+                    enseignant_principal=(
+                        profil if profil.user_type == "enseignant_principal" else None
+                    ),
+                )
+                if profil.user_type == "enseignant":
+                    cours.enseignants.add(profil)
+                if alea.random() < 0.2:
+                    Repetiteur.objects.create(
+                        enseignant=profil,
+                        cours=cours,
+                        ville=alea.choice(VILLES),
+                        telephone=f"6{profil.pk:08d}",
+                        disponible=alea.random() < 0.8,
+                    )
+        # Index complet une fois (les signaux l'ont déjà tenu à jour).
+        reindexer([p.pk for p in profils])
+
+        cas = [
+            ("maths", "", ""),
+            ("physique", "terminale", ""),
+            ("svt", "", "douala"),
+            ("anglais", "première", "yaoundé"),
+        ]
+        for matiere, niveau, ville in cas:
+            ancien, ancien_ms, ancien_req = _mesurer(
+                lambda: _recherche_historique(matiere, niveau, ville), repetitions
+            )
+            (lignes, total), index_ms, index_req = _mesurer(
+                lambda: rechercher(matiere, niveau=niveau, ville=ville), repetitions
+            )
+            identiques = set(ancien) == {ligne.enseignant_id for ligne in lignes}
+            self.stdout.write(
+                f"{matiere}/{niveau or '*'}/{ville or '*'} : {total} résultat(s) — "
+                f"boucle {ancien_ms:.1f} ms, {ancien_req} requêtes ; "
+                f"index {index_ms:.1f} ms, {index_req} requête(s) ; "
+                f"{'mêmes enseignants' if identiques else 'RÉSULTATS DIFFÉRENTS'}"
+            )
@@ -0,0 +1,42 @@
+"""
+Reconstruit l'index de recherche des répétiteurs (`IndexRepetiteur`) depuis
+les cours, les profils et les fiches `Repetiteur`.
+
+L'index est tenu à jour par signaux (apps/repetiteurs/signals.py) ; cette
+commande le remplit après la migration qui le crée (vide), et sert après un
+import en masse (`bulk_create`/`update()` ne
+déclenchent aucun signal), ou pour corriger une dérive. Idempotente.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import Profile
+from apps.repetiteurs.models import IndexRepetiteur
+from apps.repetiteurs.services import LOT, TYPES_REPETITEUR, reindexer
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche des répétiteurs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile_id", type=int, help="Limiter à cet enseignant.")
+
+    def handle(self, *args, **options):
+        if options["profile_id"]:
+            ids = [options["profile_id"]]
+        else:
+            # Enseignants déjà indexés aussi : ceux devenus inéligibles
+            # perdent leurs lignes.
+            ids = sorted(
+                set(
+                    Profile.objects.filter(user_type__in=TYPES_REPETITEUR).values_list(
+                        "pk", flat=True
+                    )
+                )
+                | set(IndexRepetiteur.objects.values_list("enseignant_id", flat=True))
+            )
+
+        lignes = 0
+        for i in range(0, len(ids), LOT):
+            lignes += reindexer(ids[i : i + LOT])
+        self.stdout.write(f"{lignes} ligne(s) d'index pour {len(ids)} enseignant(s).")
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_index_filtres_chauds"),
+        ("formation", "0007_compteur_progression_cours"),
+        ("repetiteurs", "0003_alter_repetiteur_tarif_mensuel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexRepetiteur",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("matiere", models.CharField(max_length=255)),
+                ("niveau", models.CharField(blank=True, max_length=200)),
+                ("matieres", models.JSONField(default=list)),
+                ("ville_profil", models.CharField(blank=True, max_length=100)),
+                ("villes_cours", models.TextField(blank=True)),
+                ("ville", models.CharField(blank=True, max_length=100)),
+                ("whatsapp", models.CharField(blank=True, max_length=24)),
+                ("tarif", models.PositiveIntegerField(blank=True, null=True)),
+                ("disponible", models.BooleanField(default=True)),
+                ("note_moyenne", models.FloatField(default=0.0)),
+                (
+                    "enseignant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="index_repetiteur",
+                        to="accounts.profile",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "yeki_index_repetiteur",
+                "indexes": [
+                    models.Index(
+                        fields=["matiere", "niveau", "disponible", "-note_moyenne", "enseignant"],
+                        name="yeki_index__matiere_54c9cc_idx",
+                    )
+                ],
+                "unique_together": {("enseignant", "matiere", "niveau")},
+            },
+        ),
+        # Index créé vide : les règles de correspondance vivent dans
+        # apps/repetiteurs/services.py, qu'une migration ne doit pas importer
+        # (modèles courants, pas historiques). Le remplir ensuite avec
+        # `manage.py reconstruire_index_repetiteurs`.
+    ]
@@ -97,3 +97,46 @@ class Repetiteur(models.Model):
         numero = ParametreSysteme.get("whatsapp_service_client", default="")
         numero = numero.replace(" ", "").replace("+", "")
         return f"https://wa.me/{numero}?text={urllib.parse.quote(message)}"
+
+
+class IndexRepetiteur(models.Model):
+    """
+    Index de recherche des répétiteurs (`RepetiteursSearchView`) : une ligne
+    par (enseignant, matière normalisée, niveau normalisé) — plus une ligne
+    niveau "" (tous niveaux confondus) par matière — portant tout ce que la
+    recherche filtre, classe et renvoie. Une recherche = un SELECT indexé.
+
+    Dérivé de `Cours` (principal/secondaires), `Departement.ville`,
+    `Profile` et des fiches `Repetiteur` ; tenu à jour par signaux
+    (apps/repetiteurs/signals.py), reconstructible :
+    `manage.py reconstruire_index_repetiteurs`.
+    """
+
+    enseignant = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="index_repetiteur"
+    )
+    matiere = models.CharField(max_length=255)
+    niveau = models.CharField(max_length=200, blank=True)
+    # Libellés d'origine des matières des cours correspondants.
+    matieres = models.JSONField(default=list)
+    # Filtre ville : ville du profil (sous-chaîne) ou ville d'un département
+    # où l'enseignant est principal (`|ville|ville|`), normalisées.
+    ville_profil = models.CharField(max_length=100, blank=True)
+    villes_cours = models.TextField(blank=True)
+    # Valeurs renvoyées : fiche Repetiteur si elle existe, sinon profil.
+    ville = models.CharField(max_length=100, blank=True)
+    whatsapp = models.CharField(max_length=24, blank=True)
+    # None = tarif par défaut (`ParametreSysteme`), lu à la recherche.
+    tarif = models.PositiveIntegerField(null=True, blank=True)
+    disponible = models.BooleanField(default=True)
+    note_moyenne = models.FloatField(default=0.0)
+
+    class Meta:
+        db_table = "yeki_index_repetiteur"
+        unique_together = ("enseignant", "matiere", "niveau")
+        indexes = [
+            models.Index(fields=["matiere", "niveau", "disponible", "-note_moyenne", "enseignant"])
+        ]
+
+    def __str__(self):
+        return f"{self.enseignant_id} — {self.matiere} / {self.niveau or '*'}"
@@ -0,0 +1,143 @@
+"""
+Index de recherche des répétiteurs (`IndexRepetiteur`) : construction par
+enseignant et recherche en un SELECT.
+
+Mêmes règles que l'ancienne boucle de `RepetiteursSearchView` (un profil,
+jusqu'à cinq requêtes), désormais appliquées à l'écriture :
+
+- candidats : enseignants principaux et secondaires actifs, validés
+  répétiteurs (`is_repetiteur=True`) ;
+- correspondance : un cours dont l'enseignant est principal ou secondaire,
+  de même matière (et même niveau si précisé) — comparaison sans casse ni
+  espaces autour ;
+- ville : sous-chaîne de la ville du profil, ou ville d'un département où
+  l'enseignant est principal ; un profil sans ville passe toujours ;
+- fiche `Repetiteur` de la matière (la disponible d'abord) : prime pour
+  ville, tarif et téléphone ; une fiche indisponible exclut l'enseignant.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Q, Window
+
+from apps.accounts.models import Profile
+from apps.formation.models import Cours
+from apps.repetiteurs.models import IndexRepetiteur, Repetiteur
+
+TYPES_REPETITEUR = ("enseignant_principal", "enseignant")
+
+LOT = 500
+
+
+def normaliser(valeur) -> str:
+    return (valeur or "").strip().lower()
+
+
+def _whatsapp(numero) -> str:
+    if numero and not numero.startswith("+237"):
+        return f"+237{numero}"
+    return numero or ""
+
+
+def _lignes_enseignant(profil, cours, fiches):
+    """Lignes d'index d'un enseignant éligible. `cours` : ses cours comme
+    principal puis comme secondaire, `(est_principal, cours)` ; `fiches` :
+    ses fiches Repetiteur, cours chargé."""
+    villes_cours = sorted(
+        {normaliser(c.departement.ville) for principal, c in cours if principal} - {""}
+    )
+    fiche_par_matiere = {}
+    for fiche in sorted(fiches, key=lambda f: (not f.disponible, f.id)):
+        fiche_par_matiere.setdefault(normaliser(fiche.cours.matiere), fiche)
+
+    libelles = {}  # (matière, niveau) → libellés d'origine, dans l'ordre
+    for _principal, c in cours:
+        matiere = normaliser(c.matiere)
+        if not matiere:
+            continue
+        for niveau in (normaliser(c.niveau), ""):
+            liste = libelles.setdefault((matiere, niveau), [])
+            if c.matiere not in liste:
+                liste.append(c.matiere)
+
+    lignes = []
+    for (matiere, niveau), matieres in libelles.items():
+        fiche = fiche_par_matiere.get(matiere)
+        lignes.append(
+            IndexRepetiteur(
+                enseignant=profil,
+                matiere=matiere,
+                niveau=niveau,
+                matieres=matieres,
+                ville_profil=normaliser(profil.ville),
+                villes_cours="".join(f"|{v}" for v in villes_cours) + "|" if villes_cours else "",
+                ville=fiche.ville if fiche is not None else (profil.ville or ""),
+                whatsapp=_whatsapp(
+                    fiche.telephone if fiche is not None else (profil.whatsapp or profil.phone)
+                ),
+                tarif=fiche.tarif_mensuel if fiche is not None else None,
+                disponible=fiche is None or fiche.disponible,
+                note_moyenne=fiche.note_moyenne if fiche is not None else 0.0,
+            )
+        )
+    return lignes
+
+
+def reindexer(profile_ids) -> int:
+    """Recalcule les lignes d'index de ces enseignants (aucune pour un
+    profil non éligible ou disparu). Retourne le nombre de lignes écrites."""
+    profile_ids = {i for i in profile_ids if i is not None}
+    if not profile_ids:
+        return 0
+
+    profils = list(
+        Profile.objects.filter(
+            pk__in=profile_ids,
+            user_type__in=TYPES_REPETITEUR,
+            is_active=True,
+            is_repetiteur=True,
+        )
+    )
+    eligibles = [p.pk for p in profils]
+    cours = {pk: [] for pk in eligibles}
+    for c in (
+        Cours.objects.filter(enseignant_principal_id__in=eligibles)
+        .select_related("departement")
+        .order_by("id")
+    ):
+        cours[c.enseignant_principal_id].append((True, c))
+    secondaires = Cours.enseignants.through.objects.filter(profile_id__in=eligibles)
+    for lien in secondaires.select_related("cours__departement").order_by("cours_id"):
+        cours[lien.profile_id].append((False, lien.cours))
+    fiches = {pk: [] for pk in eligibles}
+    for fiche in Repetiteur.objects.filter(enseignant_id__in=eligibles).select_related("cours"):
+        fiches[fiche.enseignant_id].append(fiche)
+
+    lignes = [ligne for p in profils for ligne in _lignes_enseignant(p, cours[p.pk], fiches[p.pk])]
+    with transaction.atomic():
+        IndexRepetiteur.objects.filter(enseignant_id__in=profile_ids).delete()
+        IndexRepetiteur.objects.bulk_create(lignes, batch_size=LOT)
+    return len(lignes)
+
+
+def rechercher(matiere, niveau="", ville="", debut=0, fin=None):
+    """
+    `(lignes, total)` des répétiteurs disponibles pour `matiere` (et
+    `niveau`/`ville` s'ils sont fournis, déjà normalisés), classés par note
+    de fiche décroissante puis par enseignant ; `lignes[debut:fin]`, profil
+    et utilisateur joints. Un seul SELECT (total par fonction fenêtre),
+    sauf page au-delà du dernier résultat.
+    """
+    qs = IndexRepetiteur.objects.filter(matiere=matiere, niveau=niveau, disponible=True)
+    if ville:
+        qs = qs.filter(
+            Q(ville_profil="")
+            | Q(ville_profil__contains=ville)
+            | Q(villes_cours__contains=f"|{ville}|")
+        )
+    qs = qs.order_by("-note_moyenne", "enseignant_id")
+
+    lignes = list(
+        qs.select_related("enseignant__user").annotate(total=Window(Count("id")))[debut:fin]
+    )
+    total = lignes[0].total if lignes else (qs.count() if debut else 0)
+    return lignes, total
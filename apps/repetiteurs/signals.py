@@ -0,0 +1,122 @@
+"""
+Maintenance de l'index de recherche des répétiteurs (`IndexRepetiteur`,
+apps/repetiteurs/services.py) : toute écriture qui change ce qu'un
+enseignant enseigne, où, ou à quelles conditions, réindexe cet enseignant.
+Connectés depuis RepetiteursConfig.ready().
+
+Les écritures en masse (`update()`, `bulk_create`) ne passent pas par ici :
+`manage.py reconstruire_index_repetiteurs` après un import.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.accounts.models import Profile
+from apps.formation.models import Cours, Departement
+from apps.repetiteurs.models import Repetiteur
+from apps.repetiteurs.services import reindexer
+
+# Champs de `Profile` lus par l'index.
+CHAMPS_PROFIL_INDEXES = {"user_type", "is_active", "is_repetiteur", "ville", "phone", "whatsapp"}
+
+# Compteurs de `Cours`, réécrits à chaque leçon ou devoir publié : l'index
+# ne les lit pas.
+CHAMPS_COURS_COMPTEURS = {"nb_apprenants", "nb_devoirs", "nb_lecons"}
+
+
+def _compteurs_seuls(update_fields) -> bool:
+    return update_fields is not None and set(update_fields) <= CHAMPS_COURS_COMPTEURS
+
+
+@receiver(pre_save, sender=Cours)
+def _memoriser_ancien_principal(sender, instance, update_fields=None, **kwargs):
+    if _compteurs_seuls(update_fields):
+        return
+    instance._ancien_principal_id = (
+        Cours.objects.filter(pk=instance.pk)
+        .values_list("enseignant_principal_id", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Cours)
+def _reindexer_cours(sender, instance, update_fields=None, **kwargs):
+    if _compteurs_seuls(update_fields):
+        return
+    reindexer(
+        [
+            instance.enseignant_principal_id,
+            getattr(instance, "_ancien_principal_id", None),
+            *instance.enseignants.values_list("pk", flat=True),
+        ]
+    )
+
+
+@receiver(pre_delete, sender=Cours)
+def _memoriser_enseignants_cours(sender, instance, **kwargs):
+    # Après suppression, les liens secondaires ont disparu avec le cours.
+    instance._enseignants_a_reindexer = [
+        instance.enseignant_principal_id,
+        *instance.enseignants.values_list("pk", flat=True),
+    ]
+
+
+@receiver(post_delete, sender=Cours)
+def _reindexer_cours_supprime(sender, instance, **kwargs):
+    reindexer(getattr(instance, "_enseignants_a_reindexer", [instance.enseignant_principal_id]))
+
+
+@receiver(m2m_changed, sender=Cours.enseignants.through)
+def _reindexer_enseignants_secondaires(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # `instance` est le profil, `pk_set` ses cours.
+        if action in ("post_add", "post_remove", "post_clear"):
+            reindexer([instance.pk])
+        return
+    if action == "pre_clear":
+        instance._secondaires_retires = list(instance.enseignants.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        reindexer(pk_set or [])
+    elif action == "post_clear":
+        reindexer(getattr(instance, "_secondaires_retires", []))
+
+
+@receiver(post_save, sender=Departement)
+def _reindexer_departement(sender, instance, update_fields, **kwargs):
+    # La ville du département sert au filtre ville des enseignants principaux.
+    if update_fields is not None and "ville" not in update_fields:
+        return
+    reindexer(
+        Cours.objects.filter(departement=instance, enseignant_principal__isnull=False)
+        .values_list("enseignant_principal_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(pre_save, sender=Repetiteur)
+def _memoriser_ancien_enseignant(sender, instance, **kwargs):
+    instance._ancien_enseignant_id = (
+        Repetiteur.objects.filter(pk=instance.pk).values_list("enseignant_id", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Repetiteur)
+@receiver(post_delete, sender=Repetiteur)
+def _reindexer_fiche(sender, instance, **kwargs):
+    reindexer([instance.enseignant_id, getattr(instance, "_ancien_enseignant_id", None)])
+
+
+@receiver(post_save, sender=Profile)
+def _reindexer_profil(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and not CHAMPS_PROFIL_INDEXES & set(update_fields):
+        return
+    # Un profil qui n'a jamais été enseignant n'a rien à indexer ni à retirer.
+    if instance.user_type not in ("enseignant_principal", "enseignant") and getattr(
+        instance, "_ancien_user_type", None
+    ) not in ("enseignant_principal", "enseignant"):
+        return
+    reindexer([instance.pk])
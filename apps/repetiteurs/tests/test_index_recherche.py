@@ -0,0 +1,143 @@
+"""
+Index de recherche des répétiteurs (`IndexRepetiteur`) : mêmes règles que
+l'ancienne boucle de `RepetiteursSearchView`, tenues à jour par signaux,
+recherche en un SELECT classé et paginé, reconstructible par commande.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import Profile
+from apps.formation.models import Cours
+from apps.repetiteurs.models import IndexRepetiteur, Repetiteur
+
+
+def _repetiteur(username, cours=None, **champs):
+    user = User.objects.create_user(username=username, first_name=username.title())
+    profil = Profile.objects.create(
+        user=user, user_type="enseignant", is_active=True, is_repetiteur=True, **champs
+    )
+    if cours is not None:
+        cours.enseignants.add(profil)
+    return profil
+
+
+@pytest.fixture
+def maths(cours):
+    cours.matiere = "Maths"
+    cours.save(update_fields=["matiere"])
+    return cours
+
+
+def _chercher(client, **params):
+    response = client.get(reverse("repetiteurs-search"), {"matiere": "maths", **params})
+    assert response.status_code == 200
+    return response.data
+
+
+@pytest.mark.django_db
+def test_secondaire_trouve_avec_valeurs_du_profil(client_apprenant, maths):
+    _repetiteur("awa", maths, ville="Douala", whatsapp="690000001")
+
+    data = _chercher(client_apprenant)
+
+    assert data["total"] == 1
+    [resultat] = data["repetiteurs"]
+    assert resultat["nom"] == "Awa"
+    assert resultat["matieres"] == ["Maths"]
+    assert resultat["whatsapp"] == "+237690000001"
+    assert resultat["ville"] == "Douala"
+    assert resultat["tarif"] == data["tarif_mensuel"]
+
+
+@pytest.mark.django_db
+def test_fiche_prime_et_fiche_indisponible_exclut(client_apprenant, maths):
+    awa = _repetiteur("awa", maths, ville="Douala")
+    bob = _repetiteur("bob", maths)
+    Repetiteur.objects.create(
+        enseignant=awa, cours=maths, ville="Kribi", telephone="+237611", tarif_mensuel=9000
+    )
+    fiche_bob = Repetiteur.objects.create(
+        enseignant=bob, cours=maths, ville="Buea", telephone="622", disponible=False
+    )
+
+    [resultat] = _chercher(client_apprenant)["repetiteurs"]
+    assert (resultat["id"], resultat["ville"], resultat["tarif"]) == (awa.id, "Kribi", 9000)
+    assert resultat["whatsapp"] == "+237611"
+
+    fiche_bob.disponible = True
+    fiche_bob.save()
+    assert _chercher(client_apprenant)["total"] == 2
+
+
+@pytest.mark.django_db
+def test_filtre_ville_et_niveau_de_l_appelant(client_apprenant, departement, maths):
+    _repetiteur("awa", maths, ville="Yaoundé Centre")
+    _repetiteur("bob", maths, ville="Douala")
+    _repetiteur("sans_ville", maths)
+    premiere = Cours.objects.create(
+        titre="Maths 1re", niveau="Première", matiere="maths", departement=departement
+    )
+    _repetiteur("cathy", premiere)
+
+    data = _chercher(client_apprenant, ville="yaoundé")
+
+    # L'apprenant est en Terminale : cathy (Première) n'apparaît pas.
+    assert {r["nom"] for r in data["repetiteurs"]} == {"Awa", "Sans_Ville"}
+
+
+@pytest.mark.django_db
+def test_signaux_retrait_du_cours_et_invalidation(client_apprenant, maths):
+    awa = _repetiteur("awa", maths)
+    bob = _repetiteur("bob", maths)
+
+    maths.enseignants.remove(awa)
+    bob.is_repetiteur = False
+    bob.save(update_fields=["is_repetiteur"])
+
+    assert _chercher(client_apprenant)["total"] == 0
+    assert not IndexRepetiteur.objects.exists()
+
+
+@pytest.mark.django_db
+def test_compteurs_du_cours_ne_reindexent_pas(maths):
+    _repetiteur("awa", maths)
+
+    maths.nb_lecons += 1
+    with CaptureQueriesContext(connection) as requetes:
+        maths.save(update_fields=["nb_lecons"])
+
+    assert not any("yeki_index_repetiteur" in q["sql"] for q in requetes.captured_queries)
+
+
+@pytest.mark.django_db
+def test_requetes_constantes_et_pagination(client_apprenant, maths):
+    for i in range(3):
+        _repetiteur(f"ens{i}", maths)
+    _chercher(client_apprenant)  # cache des paramètres chaud
+    with CaptureQueriesContext(connection) as peu:
+        _chercher(client_apprenant)
+    for i in range(3, 12):
+        _repetiteur(f"ens{i}", maths)
+    with CaptureQueriesContext(connection) as beaucoup:
+        data = _chercher(client_apprenant, page=2, page_size=5)
+
+    assert len(beaucoup) == len(peu)
+    assert data["total"] == 12
+    assert [r["nom"] for r in data["repetiteurs"]] == [f"Ens{i}" for i in range(5, 10)]
+
+
+@pytest.mark.django_db
+def test_reconstruction_apres_ecriture_en_masse(client_apprenant, maths):
+    awa = _repetiteur("awa", maths)
+    Profile.objects.filter(pk=awa.pk).update(ville="Garoua")
+    IndexRepetiteur.objects.all().delete()
+
+    call_command("reconstruire_index_repetiteurs", stdout=None)
+
+    assert IndexRepetiteur.objects.get(enseignant=awa, niveau="").ville_profil == "garoua"
+    assert _chercher(client_apprenant)["total"] == 1
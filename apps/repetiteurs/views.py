@@ -15,9 +15,11 @@ from drf_spectacular.types import OpenApiTypes
 from apps.accounts.models import Profile
 from apps.accounts.services import _nom_profil
 from apps.core.models import ParametreSysteme
+from apps.core.pagination import YekiPageNumberPagination
 from apps.core.schema_examples import ERREURS_COURANTES
 from apps.formation.models import Cours
 from apps.repetiteurs.models import Repetiteur
+from apps.repetiteurs.services import rechercher
 from apps.repetiteurs.serializers import RepetiteurSerializer
 from yeki.permissions import IsServiceClient
 
@@ -32,7 +34,11 @@ from yeki.permissions import IsServiceClient
 # (contrat déjà testé, apps/repetiteurs/tests/test_views.py) — PAS
 # réécrite pour interroger `Repetiteur.cours` directement, ce qui casserait
 # ce contrat (les fiches Repetiteur restent une donnée complémentaire,
-# optionnelle, pas la source de vérité de "qui enseigne quoi").
+# optionnelle, pas la source de vérité de "qui enseigne quoi"). Ces règles
+# sont désormais appliquées à l'écriture, dans l'index `IndexRepetiteur`
+# (apps/repetiteurs/services.py) : la recherche est un seul SELECT classé
+# (note de fiche décroissante) et paginé, au lieu de cinq requêtes par
+# enseignant validé.
 @extend_schema_view(
     get=extend_schema(
         summary="Rechercher des répétiteurs par matière",
@@ -69,6 +75,20 @@ from yeki.permissions import IsServiceClient
                 required=False,
                 description="Niveau recherché (transmis tel quel dans la réponse, non utilisé pour filtrer les résultats).",
             ),
+            OpenApiParameter(
+                "page",
+                OpenApiTypes.INT,
+                OpenApiParameter.QUERY,
+                required=False,
+                description="Numéro de page (défaut : 1).",
+            ),
+            OpenApiParameter(
+                "page_size",
+                OpenApiTypes.INT,
+                OpenApiParameter.QUERY,
+                required=False,
+                description="Taille de page (défaut et maximum : 100). `total` compte tous les résultats.",
+            ),
         ],
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
         examples=[
@@ -141,7 +161,9 @@ class RepetiteursSearchView(APIView):
                 matiere = cours_contexte.matiere.strip().lower()
 
         if not matiere:
-            return Response({"detail": "Le paramètre 'matiere' ou 'cours_id' est requis."}, status=400)
+            return Response(
+                {"detail": "Le paramètre 'matiere' ou 'cours_id' est requis."}, status=400
+            )
 
         # Bug pré-existant corrigé (P1.6, `niveau` lu mais jamais utilisé
         # pour filtrer — `# noqa: F841`) : dérivé du profil connecté (jamais
@@ -157,100 +179,54 @@ class RepetiteursSearchView(APIView):
 
         tarif_defaut = int(ParametreSysteme.get("tarif_repetiteur_mensuel", default=7500))
 
-        # Rechercher les enseignants (principaux et secondaires)
-        # qui enseignent dans des cours correspondant à la matière.
-        # is_repetiteur=True (P2.1) : validé par le Service Client — arbitrage
-        # tranché par l'utilisateur, appliqué aux deux grades (principal et
-        # secondaire) plutôt que d'exclure l'enseignant principal.
-        profils = Profile.objects.filter(
-            user_type__in=["enseignant_principal", "enseignant"],
-            is_active=True,
-            is_repetiteur=True,
-        ).select_related("user")
+        pagination = YekiPageNumberPagination
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+            page_size = min(
+                max(int(request.query_params.get("page_size", pagination.max_page_size)), 1),
+                pagination.max_page_size,
+            )
+        except ValueError:
+            return Response(
+                {"detail": "'page' et 'page_size' doivent être des entiers."}, status=400
+            )
 
-        resultats = []
-        for profil in profils:
-            # Vérifier si l'enseignant enseigne la matière recherchée
-            enseigne_matiere = False
+        # Index précalculé (apps/repetiteurs/services.py) : enseignants
+        # validés répétiteurs (is_repetiteur=True, P2.1 — principaux et
+        # secondaires), fiche Repetiteur prioritaire (P9.5), un seul SELECT.
+        lignes, total = rechercher(
+            matiere,
+            niveau=niveau,
+            ville=ville,
+            debut=(page - 1) * page_size,
+            fin=page * page_size,
+        )
 
-            # Cours en tant que principal
-            cours_principaux = Cours.objects.filter(
-                enseignant_principal=profil, matiere__iexact=matiere
+        resultats = []
+        for ligne in lignes:
+            profil = ligne.enseignant
+            resultats.append(
+                {
+                    "id": profil.id,
+                    "nom": _nom_profil(profil),
+                    "username": profil.user.username,
+                    "matiere": matiere.capitalize(),
+                    "matieres": ligne.matieres,
+                    "tarif": ligne.tarif if ligne.tarif is not None else tarif_defaut,
+                    "whatsapp": ligne.whatsapp,
+                    "avatar": (
+                        request.build_absolute_uri(profil.avatar.url) if profil.avatar else None
+                    ),
+                    "ville": ligne.ville,
+                    "disponible": True,
+                    "niveau": profil.niveau or "",
+                }
             )
-            if niveau:
-                cours_principaux = cours_principaux.filter(niveau__iexact=niveau)
-
-            # Cours en tant que secondaire
-            cours_secondaires = profil.cours_secondaires.filter(matiere__iexact=matiere)
-            if niveau:
-                cours_secondaires = cours_secondaires.filter(niveau__iexact=niveau)
-
-            if cours_principaux.exists() or cours_secondaires.exists():
-                enseigne_matiere = True
-
-            # Filtrer par ville si spécifiée
-            if ville and enseigne_matiere:
-                profil_ville = (profil.ville or "").strip().lower()
-                if profil_ville and ville not in profil_ville:
-                    # Si la ville ne correspond pas, on vérifie si l'enseignant a des cours dans cette ville
-                    cours_ville = Cours.objects.filter(
-                        departement__ville__iexact=ville, enseignant_principal=profil
-                    )
-                    if not cours_ville.exists():
-                        enseigne_matiere = False
-
-            if enseigne_matiere:
-                # P9.5 : si le Service Client a créé/édité une fiche
-                # Repetiteur pour ce profil sur un cours de cette matière,
-                # elle prime (ville/tarif individualisés) — sinon repli sur
-                # le profil + le tarif par défaut. Une fiche explicitement
-                # marquée indisponible exclut le profil des résultats.
-                fiche = (
-                    Repetiteur.objects.filter(enseignant=profil, cours__matiere__iexact=matiere)
-                    .order_by("-disponible")
-                    .first()
-                )
-                if fiche is not None and not fiche.disponible:
-                    continue
-
-                if fiche is not None:
-                    whatsapp = fiche.telephone or ""
-                else:
-                    whatsapp = getattr(profil, "whatsapp", None) or profil.phone or ""
-                if not whatsapp.startswith("+237") and whatsapp:
-                    whatsapp = f"+237{whatsapp}"
-
-                # Récupérer les matières enseignées
-                matieres_enseignees = []
-                for c in cours_principaux:
-                    if c.matiere and c.matiere not in matieres_enseignees:
-                        matieres_enseignees.append(c.matiere)
-                for c in cours_secondaires:
-                    if c.matiere and c.matiere not in matieres_enseignees:
-                        matieres_enseignees.append(c.matiere)
-
-                resultats.append(
-                    {
-                        "id": profil.id,
-                        "nom": _nom_profil(profil),
-                        "username": profil.user.username,
-                        "matiere": matiere.capitalize(),
-                        "matieres": matieres_enseignees,
-                        "tarif": fiche.tarif_mensuel if fiche is not None else tarif_defaut,
-                        "whatsapp": whatsapp,
-                        "avatar": (
-                            request.build_absolute_uri(profil.avatar.url) if profil.avatar else None
-                        ),
-                        "ville": fiche.ville if fiche is not None else (profil.ville or ""),
-                        "disponible": True,
-                        "niveau": profil.niveau or "",
-                    }
-                )
 
         return Response(
             {
                 "matiere": matiere,
-                "total": len(resultats),
+                "total": total,
                 "repetiteurs": resultats,
                 "tarif_mensuel": tarif_defaut,
                 "message_whatsapp_template": f"Bonjour, je souhaite prendre des cours de {matiere} avec vous à domicile.",
@@ -330,7 +306,9 @@ class RepetiteurCandidatsListView(APIView):
 
     def get(self, request):
         qs = (
-            Profile.objects.filter(user_type__in=["enseignant", "enseignant_principal"], is_active=True)
+            Profile.objects.filter(
+                user_type__in=["enseignant", "enseignant_principal"], is_active=True
+            )
             .select_related("user")
             .order_by("user__username")
         )
@@ -105,7 +105,9 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        # TokenAuthentication résolue depuis le cache (voir
+        # apps/accounts/authentication.py).
+        "apps.accounts.authentication.YekiTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -128,11 +130,13 @@ REST_FRAMEWORK = {
     # `throttle_scope` : l'inclure globalement ici permet à login/otp/ia/
     # paiement de déclarer juste `throttle_scope = '...'` sans avoir à
     # surcharger `throttle_classes` vue par vue.
+    # Variantes Yéki des 3 throttles DRF : compteur à fenêtre glissante sur
+    # le cache `THROTTLE_CACHE` (partagé entre process en production), et
+    # multiplicateur du scope "otp" ("3/10min") que ScopedRateThrottle natif
+    # ne supporte pas — voir apps/core/throttling.py.
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
-        # ScopedRateThrottle natif ne supporte pas le multiplicateur du
-        # scope "otp" ("3/10min") — voir apps/core/throttling.py.
+        "apps.core.throttling.YekiAnonRateThrottle",
+        "apps.core.throttling.YekiUserRateThrottle",
         "apps.core.throttling.YekiScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
@@ -263,6 +267,82 @@ CACHES = {
 }
 
 
+# ── Throttling (apps/core/throttling.py) ────────────────────────────────────
+# Alias de cache des compteurs de throttling. Production : "throttle", un
+# Redis partagé par tous les process (config/settings/production.py).
+THROTTLE_CACHE = "default"
+
+# ── Cache partagé entre process ─────────────────────────────────────────────
+# Alias des données en cache lues par tous les process et invalidées par un
+# autre (fiches de apps/core/versions_app.py, recalculées par l'API admin ou
+# une commande ; réponses de apps/core/cache_reponses.py). Production :
+# "partage", Redis (config/settings/production.py).
+CACHE_PARTAGE = "default"
+
+# ── Cache de réponses (apps/core/cache_reponses.py) ─────────────────────────
+# Durée de vie par défaut d'une réponse gardée ; l'invalidation par signaux
+# prime, la durée ne borne que les écritures faites sans signal.
+CACHE_REPONSES_DUREE = env.int("CACHE_REPONSES_DUREE", default=3600)
+
+
+# ── Journal d'activité (écriture groupée, voir apps/core/journal.py) ──────────
+# Le tampon est vidé à chaque fin de requête ; ces seuils bornent en plus sa
+# taille et l'âge de son plus ancien événement entre deux vidages.
+JOURNAL_ACTIVITE_TAILLE_LOT = 100
+JOURNAL_ACTIVITE_DELAI_SECONDES = 5
+
+
+# ── Classement d'olympiade en direct (apps/evaluation/classement_direct.py) ──
+# Redis partagé entre process (le même que le channel layer en production) ;
+# vide : structure en mémoire du process, rechargée périodiquement.
+CLASSEMENT_DIRECT_REDIS_URL = env("REDIS_URL", default="")
+
+
+# ── Cache d'authentification (apps/accounts/authentication.py) ──────────────
+# Durée de vie des entrées jeton → utilisateur. Supprimées explicitement à la
+# déconnexion, au changement de mot de passe, à la désactivation ; la durée
+# borne le retard des autres process quand le cache est local (LocMemCache).
+AUTH_TOKEN_CACHE_SECONDES = 30
+# Expiration des jetons d'API, en secondes ; vide : jamais (comportement
+# historique de DRF).
+AUTH_TOKEN_DUREE_VIE = env.int("AUTH_TOKEN_DUREE_VIE", default=None)
+
+
+# ── Recherche textuelle (apps/core/recherche.py) ──────────────────────────────
+# Nombre maximal d'identifiants renvoyés par une recherche (enseignants de
+# l'admin général, `q` du forum), du plus pertinent au moins pertinent.
+RECHERCHE_LIMITE_RESULTATS = 500
+
+
+# ── Transfert différé des uploads (apps/core/transferts.py) ───────────────────
+# Activé en production (Firebase Storage) : la requête écrit le fichier sur
+# le disque local et répond, des workers le poussent ensuite vers le
+# stockage. Désactivé ici : `FileSystemStorage` écrit déjà en local.
+TRANSFERT_MEDIAS_DIFFERE = env.bool("TRANSFERT_MEDIAS_DIFFERE", default=False)
+# Copies locales en attente : un volume persistant, sinon un redéploiement
+# les perd (transferts alors en échec, signalés sur l'objet).
+TRANSFERT_MEDIAS_SPOOL = env("TRANSFERT_MEDIAS_SPOOL", default=str(BASE_DIR / "spool"))
+# Workers par processus.
+TRANSFERT_MEDIAS_WORKERS = env.int("TRANSFERT_MEDIAS_WORKERS", default=2)
+
+
+# ── Téléversement direct vers le stockage (apps/core/televersement_direct.py) ─
+# Validité d'une session (URL d'upload signée) ; les fichiers des sessions
+# non finalisées à échéance sont supprimés par
+# `purger_televersements_expires`. Une session GCS vaut au plus 7 jours.
+TELEVERSEMENT_DIRECT_DUREE_HEURES = env.int("TELEVERSEMENT_DIRECT_DUREE_HEURES", default=24)
+
+
+# ── Diffusion des médias par URL signée (apps/core/diffusion_medias.py) ───────
+# Validité d'une URL de lecture : l'accès n'est revérifié qu'à la suivante.
+MEDIAS_URL_DUREE_SECONDES = env.int("MEDIAS_URL_DUREE_SECONDES", default=4 * 3600)
+# Envoi du fichier délégué au serveur frontal : "" (Django lit le fichier),
+# "x-accel-redirect" (nginx, emplacement `internal` sur MEDIA_ROOT préfixé
+# par MEDIAS_SENDFILE_PREFIXE) ou "x-sendfile" (Apache, lighttpd).
+MEDIAS_SENDFILE = env("MEDIAS_SENDFILE", default="")
+MEDIAS_SENDFILE_PREFIXE = env("MEDIAS_SENDFILE_PREFIXE", default="/media-interne/")
+
+
 # ── Email (Gmail SMTP) ──────────────────────────────────────────────────────
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
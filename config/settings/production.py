@@ -105,3 +105,28 @@ if _firebase_credentials_json:
     GS_QUERYSTRING_AUTH = False  # URLs publiques stables, pas de jeton signé expirant
 
     STORAGES["default"]["BACKEND"] = "storages.backends.gcloud.GoogleCloudStorage"
+    # Écritures GCS hors requête (apps/core/transferts.py).
+    TRANSFERT_MEDIAS_DIFFERE = env.bool("TRANSFERT_MEDIAS_DIFFERE", default=True)
+
+# ── Throttling partagé entre process ────────────────────────────────────────
+# Compteurs de apps/core/throttling.py dans le Redis déjà requis par le
+# channel layer : avec le cache local par défaut, chaque process Daphne
+# comptait de son côté et les limites étaient multipliées par le nombre de
+# workers.
+CACHES = {
+    **CACHES,  # noqa: F405
+    "throttle": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("REDIS_URL"),  # noqa: F405
+        "KEY_PREFIX": "throttle",
+    },
+    # Données invalidées par un autre process que celui qui les lit
+    # (CACHE_PARTAGE, voir config/settings/base.py).
+    "partage": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("REDIS_URL"),  # noqa: F405
+        "KEY_PREFIX": "partage",
+    },
+}
+THROTTLE_CACHE = "throttle"
+CACHE_PARTAGE = "partage"
@@ -2,6 +2,7 @@
 
 from django.urls import re_path
 from . import consumers
+from apps.evaluation.consumers import ClassementDirectConsumer
 
 websocket_urlpatterns = [
     # Forum global (sans cours spécifique)
@@ -9,4 +10,10 @@ websocket_urlpatterns = [
     
     # Forum par cours (recommandé)
     re_path(r'ws/forum/cours/(?P<cours_id>\d+)/$', consumers.ForumConsumer.as_asgi()),
+
+    # Classement provisoire en direct d'une olympiade
+    re_path(
+        r'ws/olympiades/(?P<olympiade_id>\d+)/classement/$',
+        ClassementDirectConsumer.as_asgi(),
+    ),
 ]
\ No newline at end of file